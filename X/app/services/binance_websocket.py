@@ -44,6 +44,16 @@ class KlineData:
     quote_volume: float
     timestamp: datetime
 
+@dataclass
+class TradeData:
+    """逐筆成交數據"""
+    symbol: str
+    price: float
+    quantity: float
+    trade_time: int
+    is_buyer_maker: bool
+    timestamp: datetime
+
 @dataclass
 class DepthData:
     """深度數據"""
@@ -72,7 +82,8 @@ class BinanceWebSocketClient:
         self.subscriptions = {  # 保存訂閱信息用於重連
             'ticker': [],
             'klines': {},
-            'depth': []
+            'depth': [],
+            'trades': []
         }
         
     async def start(self):
@@ -108,6 +119,10 @@ class BinanceWebSocketClient:
         """添加深度回調函數"""
         self.callbacks['depth'].append(callback)
         
+    def add_trade_callback(self, callback: Callable[[TradeData], None]):
+        """添加逐筆成交回調函數"""
+        self.callbacks['trade'].append(callback)
+        
     async def subscribe_ticker(self, symbols: List[str]):
         """訂閱股票代號即時價格 - 含重連機制"""
         self.subscriptions['ticker'] = symbols
@@ -150,6 +165,47 @@ class BinanceWebSocketClient:
                 await asyncio.sleep(self.reconnect_delay * attempt)
                 await self._subscribe_ticker_with_retry(symbols, attempt + 1)
             
+    async def subscribe_trades(self, symbols: List[str]):
+        """訂閱逐筆成交數據 - 含重連機制"""
+        self.subscriptions['trades'] = symbols
+        
+        batch_size = 3
+        for i in range(0, len(symbols), batch_size):
+            batch_symbols = symbols[i:i + batch_size]
+            await self._subscribe_trades_with_retry(batch_symbols)
+            await asyncio.sleep(0.5)  # 短暫延遲避免連接過快
+            
+    async def _subscribe_trades_with_retry(self, symbols: List[str], attempt: int = 1):
+        """帶重試的逐筆成交訂閱"""
+        streams = [f"{symbol.lower()}@trade" for symbol in symbols]
+        stream_name = "/".join(streams)
+        connection_key = f"trades_{'_'.join(symbols)}"
+        
+        try:
+            uri = f"{self.base_url}{stream_name}"
+            connection = await websockets.connect(
+                uri,
+                ping_interval=self.ping_interval,
+                ping_timeout=10,
+                close_timeout=10
+            )
+            
+            self.connections[connection_key] = connection
+            self.connection_health[connection_key] = {
+                'last_ping': datetime.now(),
+                'reconnect_count': attempt - 1,
+                'status': 'connected'
+            }
+            
+            asyncio.create_task(self._handle_trade_stream_with_retry(connection, connection_key, symbols))
+            logger.info(f"已訂閱逐筆成交數據: {symbols} (嘗試 {attempt})")
+            
+        except Exception as e:
+            logger.error(f"訂閱逐筆成交數據失敗 (嘗試 {attempt}): {e}")
+            if attempt < self.max_reconnect_attempts and self.running:
+                await asyncio.sleep(self.reconnect_delay * attempt)
+                await self._subscribe_trades_with_retry(symbols, attempt + 1)
+            
     async def subscribe_klines(self, symbols: List[str], intervals: List[str]):
         """訂閱 K線數據 - 含重連機制"""
         self.subscriptions['klines'][tuple(symbols)] = intervals
@@ -241,6 +297,35 @@ class BinanceWebSocketClient:
             self.connection_health[connection_key]['status'] = 'error'
             await self._handle_reconnection('ticker', symbols)
             
+    async def _handle_trade_stream_with_retry(self, connection, connection_key: str, symbols: List[str]):
+        """處理逐筆成交數據串流 - 含重連機制"""
+        try:
+            async for message in connection:
+                if not self.running:
+                    break
+                
+                # 更新健康狀態
+                self.connection_health[connection_key]['last_ping'] = datetime.now()
+                self.connection_health[connection_key]['status'] = 'active'
+                    
+                data = json.loads(message)
+                
+                # 處理單一或多重數據流
+                if isinstance(data, list):
+                    for item in data:
+                        self._process_trade_data(item)
+                else:
+                    self._process_trade_data(data)
+                    
+        except websockets.exceptions.ConnectionClosed:
+            logger.warning(f"逐筆成交連接已關閉: {connection_key}")
+            self.connection_health[connection_key]['status'] = 'disconnected'
+            await self._handle_reconnection('trades', symbols)
+        except Exception as e:
+            logger.error(f"處理逐筆成交數據錯誤: {e}")
+            self.connection_health[connection_key]['status'] = 'error'
+            await self._handle_reconnection('trades', symbols)
+            
     async def _handle_reconnection(self, stream_type: str, symbols: List[str]):
         """處理重連邏輯"""
         if not self.running:
@@ -253,6 +338,8 @@ class BinanceWebSocketClient:
         
         if stream_type == 'ticker':
             await self._subscribe_ticker_with_retry(symbols)
+        elif stream_type == 'trades':
+            await self._subscribe_trades_with_retry(symbols)
         elif stream_type == 'klines':
             intervals = self.subscriptions['klines'].get(tuple(symbols), ['1m'])
             await self._subscribe_klines_with_retry(symbols, intervals)
@@ -389,6 +476,35 @@ class BinanceWebSocketClient:
         except Exception as e:
             logger.error(f"處理價格數據錯誤: {e}")
             
+    def _process_trade_data(self, data: Dict):
+        """處理單筆成交數據（同步處理，避免每筆成交額外的協程開銷）"""
+        try:
+            # 多流格式 (帶有 stream 屬性) 取出內層數據
+            if 'stream' in data and data['stream'].endswith('@trade'):
+                data = data['data']
+            
+            if data.get('e') != 'trade':
+                return
+            
+            trade_data = TradeData(
+                symbol=data['s'],
+                price=float(data['p']),
+                quantity=float(data['q']),
+                trade_time=int(data['T']),
+                is_buyer_maker=bool(data.get('m', False)),
+                timestamp=datetime.fromtimestamp(data['T'] / 1000)
+            )
+            
+            # 呼叫所有回調函數
+            for callback in self.callbacks['trade']:
+                try:
+                    callback(trade_data)
+                except Exception as e:
+                    logger.error(f"逐筆成交回調函數錯誤: {e}")
+                    
+        except Exception as e:
+            logger.error(f"處理逐筆成交數據錯誤: {e}")
+            
     async def _process_kline_data(self, data: Dict):
         """處理單個 K線數據"""
         try:
@@ -1,16 +1,19 @@
 """
 閃崩檢測系統
 多重時間框架的市場異常檢測機制
+
+由 WebSocket 逐筆成交串流驅動：每個交易對為每個檢測窗口維護單調最大/最小值雙端佇列，
+回撤與成交量倍數檢查每筆成交攤銷 O(1)，越過閾值的那一筆成交即觸發保護。
 """
 
 import asyncio
 import json
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import aiohttp
 import logging
 from pathlib import Path
 import fcntl
@@ -72,13 +75,75 @@ class CrashEvent:
     trigger_conditions: Dict[str, Any]
     system_action: Dict[str, Any]
 
+class RollingPriceWindow:
+    """單一時間窗口的單調最大/最小值雙端佇列"""
+    
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.max_deque: deque = deque()  # (時間戳, 價格)，價格遞減
+        self.min_deque: deque = deque()  # (時間戳, 價格)，價格遞增
+    
+    def push(self, timestamp: float, price: float):
+        while self.max_deque and self.max_deque[-1][1] <= price:
+            self.max_deque.pop()
+        self.max_deque.append((timestamp, price))
+        
+        while self.min_deque and self.min_deque[-1][1] >= price:
+            self.min_deque.pop()
+        self.min_deque.append((timestamp, price))
+        
+        # 移除窗口外的舊極值（最新一筆總是保留）
+        cutoff = timestamp - self.window_seconds
+        while self.max_deque[0][0] < cutoff:
+            self.max_deque.popleft()
+        while self.min_deque[0][0] < cutoff:
+            self.min_deque.popleft()
+    
+    @property
+    def high(self) -> float:
+        return self.max_deque[0][1]
+    
+    @property
+    def low(self) -> float:
+        return self.min_deque[0][1]
+
+class RollingVolumeWindow:
+    """滾動成交量總和"""
+    
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.entries: deque = deque()  # (時間戳, 成交量)
+        self.total = 0.0
+    
+    def push(self, timestamp: float, volume: float):
+        self.entries.append((timestamp, volume))
+        self.total += volume
+        
+        cutoff = timestamp - self.window_seconds
+        while self.entries[0][0] < cutoff:
+            self.total -= self.entries.popleft()[1]
+        if len(self.entries) == 1:
+            self.total = self.entries[0][1]  # 消除浮點累積誤差
+
+@dataclass
+class SymbolTickState:
+    """單一交易對的即時窗口狀態"""
+    price_windows: Dict[CrashType, RollingPriceWindow]
+    recent_volume: RollingVolumeWindow
+    baseline_volume: RollingVolumeWindow
+    first_timestamp: float
+    last_timestamp: float = 0.0
+    last_price: float = 0.0
+    last_volume: float = 0.0
+    tick_count: int = 0
+
 class CrashDetector:
     """閃崩檢測器"""
     
     def __init__(self, config_path: str = None):
         # 修正為X資料夾內的相對路徑
+        self.base_dir = Path(__file__).parent.parent.parent
         if config_path is None:
-            self.base_dir = Path(__file__).parent.parent.parent
             config_path = self.base_dir / "config" / "crash_detection_config.json"
         
         self.config_path = Path(config_path)
@@ -87,14 +152,26 @@ class CrashDetector:
         # 檢測配置
         self.detection_configs = self._load_detection_configs()
         
+        # 即時窗口設定: 即時檢測 (timeframe_minutes=0) 的價格窗口、成交量倍數的近期/基準窗口
+        self.instant_window_seconds = 60
+        self.volume_recent_seconds = 60
+        self.volume_baseline_minutes = 30
+        
         # 數據存儲
-        self.price_history: Dict[str, List[MarketData]] = {}
-        self.volume_history: Dict[str, List[float]] = {}
+        self.tick_states: Dict[str, SymbolTickState] = {}
         self.crash_events: List[CrashEvent] = []
         
         # 監控狀態
         self.is_monitoring = False
         self.protected_symbols: Dict[str, datetime] = {}  # 受保護的交易對及解除時間
+        self.ws_client = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._pending_tasks = set()
+        self._alert_until: Dict[Tuple[str, CrashType], datetime] = {}
+        
+        # 處理統計
+        self.ticks_processed = 0
+        self.tick_processing_seconds = 0.0
         
         # 設置交易對
         self.symbols = ["XRPUSDT", "DOGEUSDT", "BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT"]
@@ -168,8 +245,28 @@ class CrashDetector:
         # 保存默認配置
         if not self.config_path.exists():
             self._save_detection_configs(default_configs)
+            return default_configs
         
-        return default_configs
+        # 讀取已保存的配置，讀取失敗時使用默認配置
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config_data = json.load(f)
+            
+            return [
+                CrashDetectionConfig(
+                    crash_type=CrashType(item["crash_type"]),
+                    timeframe_minutes=item["timeframe_minutes"],
+                    price_threshold_percent=item["price_threshold_percent"],
+                    volume_multiplier=item.get("volume_multiplier"),
+                    confirmation_count=item.get("confirmation_count", 2),
+                    monitoring_interval_seconds=item.get("monitoring_interval_seconds", 60),
+                    action_duration_minutes=item.get("action_duration_minutes", 30)
+                )
+                for item in config_data
+            ]
+        except Exception as e:
+            logger.error(f"載入檢測配置失敗，使用默認配置: {e}")
+            return default_configs
     
     def _save_detection_configs(self, configs: List[CrashDetectionConfig]):
         """保存檢測配置"""
@@ -189,41 +286,20 @@ class CrashDetector:
             json.dump(config_data, f, ensure_ascii=False, indent=2)
     
     async def get_market_data(self, symbol: str) -> Optional[MarketData]:
-        """獲取市場數據（模擬實現）"""
-        try:
-            # 實際實現中這裡會連接交易所API
-            # 這裡使用模擬數據進行演示
-            current_time = datetime.now()
-            
-            # 模擬價格數據（實際使用中替換為真實API調用）
-            import random
-            base_price = {
-                "XRPUSDT": 0.5,
-                "DOGEUSDT": 0.08,
-                "BTCUSDT": 45000,
-                "ETHUSDT": 2500,
-                "BNBUSDT": 300,
-                "ADAUSDT": 0.4,
-                "SOLUSDT": 100
-            }.get(symbol, 1.0)
-            
-            # 添加隨機波動
-            price_variation = random.uniform(-0.02, 0.02)  # ±2%波動
-            current_price = base_price * (1 + price_variation)
-            
-            volume = random.uniform(1000000, 10000000)  # 隨機成交量
-            
-            return MarketData(
-                symbol=symbol,
-                timestamp=current_time,
-                price=current_price,
-                volume=volume,
-                high=current_price * 1.01,
-                low=current_price * 0.99
-            )
-        except Exception as e:
-            logger.error(f"獲取{symbol}市場數據失敗: {e}")
+        """獲取最新的即時市場數據（來自逐筆成交串流）"""
+        state = self.tick_states.get(symbol)
+        if state is None or state.tick_count == 0:
             return None
+        
+        window = state.price_windows.get(CrashType.VOLUME_ANOMALY) or next(iter(state.price_windows.values()), None)
+        return MarketData(
+            symbol=symbol,
+            timestamp=datetime.fromtimestamp(state.last_timestamp),
+            price=state.last_price,
+            volume=state.recent_volume.total,
+            high=window.high if window else state.last_price,
+            low=window.low if window else state.last_price
+        )
     
     def _calculate_price_drop(self, current_price: float, past_price: float) -> float:
         """計算價格跌幅百分比"""
@@ -231,78 +307,147 @@ class CrashDetector:
             return 0.0
         return ((past_price - current_price) / past_price) * 100
     
-    def _calculate_volume_multiplier(self, current_volume: float, historical_volumes: List[float]) -> float:
-        """計算成交量倍數"""
-        if not historical_volumes:
-            return 1.0
-        
-        avg_volume = sum(historical_volumes) / len(historical_volumes)
-        if avg_volume <= 0:
+    def _window_seconds(self, config: CrashDetectionConfig) -> float:
+        return config.timeframe_minutes * 60 if config.timeframe_minutes > 0 else self.instant_window_seconds
+    
+    def _create_tick_state(self, timestamp: float) -> SymbolTickState:
+        return SymbolTickState(
+            price_windows={
+                config.crash_type: RollingPriceWindow(self._window_seconds(config))
+                for config in self.detection_configs
+                if config.crash_type != CrashType.LIQUIDITY_CRISIS
+            },
+            recent_volume=RollingVolumeWindow(self.volume_recent_seconds),
+            baseline_volume=RollingVolumeWindow(self.volume_baseline_minutes * 60),
+            first_timestamp=timestamp
+        )
+    
+    def _calculate_volume_multiplier(self, state: SymbolTickState) -> float:
+        """近期成交速率相對基準成交速率的倍數"""
+        elapsed = state.last_timestamp - state.first_timestamp
+        if elapsed < self.volume_recent_seconds:
+            return 1.0  # 基準窗口尚未成形
+        
+        baseline_span = min(elapsed, state.baseline_volume.window_seconds)
+        baseline_rate = state.baseline_volume.total / baseline_span
+        if baseline_rate <= 0:
             return 1.0
         
-        return current_volume / avg_volume
+        return (state.recent_volume.total / self.volume_recent_seconds) / baseline_rate
     
-    def _detect_flash_crash(self, symbol: str, config: CrashDetectionConfig) -> Optional[CrashEvent]:
-        """檢測閃崩"""
-        if symbol not in self.price_history or len(self.price_history[symbol]) < 2:
-            return None
-        
-        current_data = self.price_history[symbol][-1]
-        
-        # 根據時間框架選擇比較點
-        target_time = current_data.timestamp - timedelta(minutes=config.timeframe_minutes)
-        past_data = None
+    def process_tick(self, symbol: str, price: float, volume: float, timestamp: float,
+                     bid: Optional[float] = None, ask: Optional[float] = None) -> List[CrashEvent]:
+        """
+        處理一筆成交並執行所有檢測配置（每筆攤銷 O(1)）
+        
+        Args:
+            symbol: 交易對
+            price: 成交價
+            volume: 成交量
+            timestamp: 成交時間 (秒)
+            bid/ask: 可選的最佳買賣價，提供時檢查流動性危機
+            
+        Returns:
+            本筆成交觸發的崩盤事件（觸發時已同步啟用保護）
+        """
+        start_time = time.perf_counter()
+        
+        state = self.tick_states.get(symbol)
+        if state is None:
+            state = self.tick_states[symbol] = self._create_tick_state(timestamp)
+        
+        for window in state.price_windows.values():
+            window.push(timestamp, price)
+        state.recent_volume.push(timestamp, volume)
+        state.baseline_volume.push(timestamp, volume)
+        state.last_timestamp = timestamp
+        state.last_price = price
+        state.last_volume = volume
+        state.tick_count += 1
         
-        for data in reversed(self.price_history[symbol][:-1]):
-            if data.timestamp <= target_time:
-                past_data = data
-                break
+        detected_events = []
+        detection_time = datetime.fromtimestamp(timestamp)
         
-        if not past_data:
-            return None
+        # 跳過已受保護的交易對
+        if not self.is_symbol_protected(symbol, detection_time):
+            volume_multiplier = self._calculate_volume_multiplier(state)
+            
+            for config in self.detection_configs:
+                # 不觸發保護的檢測類型在行動期內不重複告警
+                alert_key = (symbol, config.crash_type)
+                if self._alert_until.get(alert_key, detection_time) > detection_time:
+                    continue
+                
+                event = self._detect_flash_crash(symbol, config, state, volume_multiplier, bid, ask)
+                if event:
+                    detected_events.append(event)
+                    self.crash_events.append(event)
+                    self._activate_protection(event)
+                    self._alert_until[alert_key] = detection_time + timedelta(
+                        minutes=event.system_action["action_duration_minutes"]
+                    )
+                    
+                    # 交易對已進入保護，本筆成交不再檢查其他配置
+                    if self.is_symbol_protected(symbol, detection_time):
+                        break
         
-        # 計算跌幅
-        drop_percentage = self._calculate_price_drop(current_data.price, past_data.price)
+        self.ticks_processed += 1
+        self.tick_processing_seconds += time.perf_counter() - start_time
+        return detected_events
+    
+    def _detect_flash_crash(self, symbol: str, config: CrashDetectionConfig, state: SymbolTickState,
+                            volume_multiplier: float, bid: Optional[float] = None,
+                            ask: Optional[float] = None) -> Optional[CrashEvent]:
+        """檢測閃崩 - 以窗口內最高價計算當前回撤"""
+        trigger_conditions = {
+            "timeframe_minutes": config.timeframe_minutes,
+            "threshold_percent": config.price_threshold_percent,
+            "volume_required": config.volume_multiplier,
+            "actual_volume_multiplier": volume_multiplier
+        }
         
-        # 檢查是否達到閾值
-        if drop_percentage < config.price_threshold_percent:
-            return None
+        if config.crash_type == CrashType.LIQUIDITY_CRISIS:
+            # 流動性危機: 買賣價差超過閾值
+            if not bid or not ask or ask <= bid:
+                return None
+            spread_percent = (ask - bid) / ((ask + bid) / 2) * 100
+            if spread_percent < config.price_threshold_percent:
+                return None
+            price_before = price_lowest = state.last_price
+            drop_percentage = 0.0
+            trigger_conditions["spread_percent"] = spread_percent
+        else:
+            window = state.price_windows[config.crash_type]
+            price_before = window.high
+            price_lowest = window.low
+            drop_percentage = self._calculate_price_drop(state.last_price, price_before)
+            
+            # 檢查是否達到閾值
+            if drop_percentage < config.price_threshold_percent:
+                return None
+            trigger_conditions["actual_drop_percent"] = drop_percentage
         
         # 檢查成交量異常（如果配置了）
-        volume_spike = False
-        volume_multiplier = 1.0
-        
-        if config.volume_multiplier and symbol in self.volume_history:
-            volume_multiplier = self._calculate_volume_multiplier(
-                current_data.volume, 
-                self.volume_history[symbol][-30:]  # 使用過去30個數據點計算平均
-            )
-            volume_spike = volume_multiplier >= config.volume_multiplier
+        volume_spike = bool(config.volume_multiplier) and volume_multiplier >= config.volume_multiplier
         
         # 確定嚴重程度
         severity = self._determine_severity(drop_percentage, volume_multiplier)
         
         # 生成事件
-        event_id = f"crash_{symbol}_{int(time.time())}"
+        event_id = f"crash_{symbol}_{config.crash_type.value}_{int(state.last_timestamp)}"
         
         return CrashEvent(
             event_id=event_id,
             symbol=symbol,
             crash_type=config.crash_type,
             severity=severity,
-            detection_time=current_data.timestamp,
-            price_before=past_data.price,
-            price_lowest=current_data.price,
+            detection_time=datetime.fromtimestamp(state.last_timestamp),
+            price_before=price_before,
+            price_lowest=price_lowest,
             drop_percentage=drop_percentage,
             volume_spike=volume_spike,
             volume_multiplier=volume_multiplier,
-            trigger_conditions={
-                "timeframe_minutes": config.timeframe_minutes,
-                "threshold_percent": config.price_threshold_percent,
-                "actual_drop_percent": drop_percentage,
-                "volume_required": config.volume_multiplier,
-                "actual_volume_multiplier": volume_multiplier
-            },
+            trigger_conditions=trigger_conditions,
             system_action=self._determine_system_action(config, severity)
         )
     
@@ -357,25 +502,30 @@ class CrashDetector:
         
         return base_action
     
+    def _activate_protection(self, event: CrashEvent) -> datetime:
+        """立即設置保護期限（在觸發的那一筆成交內同步完成）"""
+        protection_end_time = event.detection_time + timedelta(
+            minutes=event.system_action["action_duration_minutes"]
+        )
+        
+        if event.system_action.get("scope") == "single_symbol":
+            self.protected_symbols[event.symbol] = protection_end_time
+        elif event.system_action.get("scope") in ["all_symbols", "system_wide", "complete_shutdown"]:
+            # 保護所有交易對
+            for symbol in set(self.symbols) | set(self.tick_states):
+                self.protected_symbols[symbol] = protection_end_time
+        
+        return protection_end_time
+    
     async def _apply_protection_measures(self, event: CrashEvent):
-        """應用保護措施"""
+        """記錄保護措施（保護本身已由 _activate_protection 啟用）"""
         try:
             # 檔案鎖定保護
             with open(self.lock_file_path, 'w') as lock_file:
                 fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
                 
                 try:
-                    # 設置保護期限
-                    protection_end_time = event.detection_time + timedelta(
-                        minutes=event.system_action["action_duration_minutes"]
-                    )
-                    
-                    if event.system_action.get("scope") == "single_symbol":
-                        self.protected_symbols[event.symbol] = protection_end_time
-                    elif event.system_action.get("scope") in ["all_symbols", "system_wide", "complete_shutdown"]:
-                        # 保護所有交易對
-                        for symbol in self.symbols:
-                            self.protected_symbols[symbol] = protection_end_time
+                    protection_end_time = self._activate_protection(event)
                     
                     # 記錄保護措施
                     protection_log = {
@@ -392,7 +542,7 @@ class CrashDetector:
                     
                     logger.warning(f"🚨 崩盤檢測觸發保護措施: {event.symbol} {event.crash_type.value}")
                     logger.warning(f"   跌幅: {event.drop_percentage:.2f}%")
-                    logger.warning(f"   行動: {event.system_action['action']}")
+                    logger.warning(f"   行動: {event.system_action.get('action', event.crash_type.value)}")
                     logger.warning(f"   持續時間: {event.system_action['action_duration_minutes']}分鐘")
                     
                 finally:
@@ -412,12 +562,12 @@ class CrashDetector:
         except Exception as e:
             logger.error(f"保存保護記錄失敗: {e}")
     
-    def is_symbol_protected(self, symbol: str) -> bool:
-        """檢查交易對是否處於保護狀態"""
+    def is_symbol_protected(self, symbol: str, at_time: Optional[datetime] = None) -> bool:
+        """檢查交易對是否處於保護狀態（at_time 默認為當前時間，回放時為成交時間）"""
         if symbol not in self.protected_symbols:
             return False
         
-        current_time = datetime.now()
+        current_time = at_time or datetime.now()
         if current_time >= self.protected_symbols[symbol]:
             # 保護期已過，移除保護
             del self.protected_symbols[symbol]
@@ -425,87 +575,51 @@ class CrashDetector:
         
         return True
     
-    async def update_market_data(self, symbol: str):
-        """更新市場數據"""
-        market_data = await self.get_market_data(symbol)
-        if not market_data:
-            return
-        
-        # 更新價格歷史
-        if symbol not in self.price_history:
-            self.price_history[symbol] = []
-        
-        self.price_history[symbol].append(market_data)
-        
-        # 保持最近1000個數據點
-        if len(self.price_history[symbol]) > 1000:
-            self.price_history[symbol] = self.price_history[symbol][-1000:]
-        
-        # 更新成交量歷史
-        if symbol not in self.volume_history:
-            self.volume_history[symbol] = []
-        
-        self.volume_history[symbol].append(market_data.volume)
-        
-        # 保持最近100個成交量數據點
-        if len(self.volume_history[symbol]) > 100:
-            self.volume_history[symbol] = self.volume_history[symbol][-100:]
-    
-    async def detect_crashes(self) -> List[CrashEvent]:
-        """執行崩盤檢測"""
-        detected_events = []
-        
-        for symbol in self.symbols:
-            # 跳過已受保護的交易對
-            if self.is_symbol_protected(symbol):
-                continue
-            
-            # 更新市場數據
-            await self.update_market_data(symbol)
-            
-            # 對每種檢測配置進行檢查
-            for config in self.detection_configs:
-                event = self._detect_flash_crash(symbol, config)
-                if event:
-                    detected_events.append(event)
-                    self.crash_events.append(event)
-                    
-                    # 應用保護措施
-                    await self._apply_protection_measures(event)
-        
-        return detected_events
+    def _on_trade(self, trade):
+        """WebSocket 逐筆成交回調"""
+        events = self.process_tick(trade.symbol, trade.price, trade.quantity, trade.trade_time / 1000)
+        for event in events:
+            task = asyncio.get_running_loop().create_task(self._apply_protection_measures(event))
+            self._pending_tasks.add(task)
+            task.add_done_callback(self._pending_tasks.discard)
     
     async def start_monitoring(self):
-        """開始監控"""
+        """開始監控 - 訂閱逐筆成交串流，每筆成交即時檢測"""
         if self.is_monitoring:
             logger.warning("崩盤檢測器已在運行中")
             return
         
+        from app.services.binance_websocket import BinanceWebSocketClient
+        
         self.is_monitoring = True
+        self._stop_event = asyncio.Event()
         logger.info("🚀 啟動閃崩檢測系統")
         logger.info(f"   監控交易對: {', '.join(self.symbols)}")
         logger.info(f"   檢測機制: {len(self.detection_configs)}種")
         
         try:
-            while self.is_monitoring:
-                # 執行檢測
-                events = await self.detect_crashes()
-                
-                if events:
-                    logger.warning(f"檢測到 {len(events)} 個崩盤事件")
-                
-                # 等待下次檢測
-                await asyncio.sleep(30)  # 每30秒檢測一次
+            self.ws_client = BinanceWebSocketClient()
+            self.ws_client.add_trade_callback(self._on_trade)
+            await self.ws_client.start()
+            await self.ws_client.subscribe_trades(self.symbols)
+            
+            # 檢測在成交回調中進行，這裡只等待停止信號
+            await self._stop_event.wait()
                 
         except Exception as e:
             logger.error(f"監控過程發生錯誤: {e}")
         finally:
+            if self.ws_client is not None:
+                await self.ws_client.stop()
+                self.ws_client = None
             self.is_monitoring = False
     
     def stop_monitoring(self):
         """停止監控"""
         if self.is_monitoring:
             self.is_monitoring = False
+            if self._stop_event is not None:
+                self._stop_event.set()
             logger.info("🛑 停止閃崩檢測系統")
     
     def get_protection_status(self) -> Dict[str, Any]:
@@ -516,7 +630,11 @@ class CrashDetector:
             "monitoring_active": self.is_monitoring,
             "protected_symbols": {},
             "recent_events": len([e for e in self.crash_events if (current_time - e.detection_time).total_seconds() < 3600]),
-            "total_events": len(self.crash_events)
+            "total_events": len(self.crash_events),
+            "ticks_processed": self.ticks_processed,
+            "avg_tick_processing_us": (
+                self.tick_processing_seconds / self.ticks_processed * 1e6 if self.ticks_processed else 0.0
+            )
         }
         
         for symbol, end_time in self.protected_symbols.items():
@@ -536,11 +654,13 @@ async def main():
     """測試函數"""
     logger.info("測試閃崩檢測系統")
     
-    # 測試獲取市場數據
-    for symbol in crash_detector.symbols:
-        data = await crash_detector.get_market_data(symbol)
-        if data:
-            logger.info(f"{symbol}: {data.price:.6f} USDT, 成交量: {data.volume:.0f}")
+    # 測試逐筆成交處理
+    base_time = time.time()
+    for i in range(120):
+        crash_detector.process_tick("BTCUSDT", 45000 * (1 - 0.001 * max(0, i - 100)), 1.0, base_time + i)
+    data = await crash_detector.get_market_data("BTCUSDT")
+    if data:
+        logger.info(f"BTCUSDT: {data.price:.6f} USDT, 近期成交量: {data.volume:.0f}")
     
     # 測試保護狀態
     status = crash_detector.get_protection_status()
@@ -10,6 +10,7 @@ Phase1 動態參數系統 - 市場自適應參數調整
 - MarketRegimeDetector: 市場制度檢測器  
 - TradingSessionDetector: 交易時段檢測器
 - DynamicParameterAdapter: 參數適配器
+- ParameterSnapshotService: 參數快照服務 (定期/WebSocket 刷新，O(1) 讀取)
 
 使用方式:
 ```python
@@ -35,6 +36,8 @@ from .dynamic_parameter_engine import (
     TradingSessionDetector,
     DynamicParameterAdapter,
     DynamicParameterEngine,
+    ParameterSnapshot,
+    ParameterSnapshotService,
     MarketRegime,
     TradingSession
 )
@@ -52,6 +55,8 @@ __all__ = [
     "TradingSessionDetector", 
     "DynamicParameterAdapter",
     "DynamicParameterEngine",
+    "ParameterSnapshot",
+    "ParameterSnapshotService",
     "MarketRegime",
     "TradingSession"
 ]
\ No newline at end of file
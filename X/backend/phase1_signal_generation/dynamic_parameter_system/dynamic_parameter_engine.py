@@ -13,6 +13,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import pytz
 from abc import ABC, abstractmethod
+from types import MappingProxyType
 
 # 核心數據結構
 class MarketRegime(Enum):
@@ -71,6 +72,25 @@ class DynamicParameterResult:
     timestamp: datetime
     metadata: Dict[str, Any]
 
+@dataclass(frozen=True)
+class ParameterSnapshot:
+    """不可變參數快照 - 由 ParameterSnapshotService 定期刷新"""
+    version: int
+    results: MappingProxyType  # phase -> DynamicParameterResult
+    values: MappingProxyType   # phase -> {parameter_name: adapted_value}
+    market_regime: MarketRegime
+    trading_session: TradingSession
+    regime_confidence: float
+    market_data_timestamp: datetime
+    timestamp: datetime
+    
+    def get_value(self, phase: str, parameter_name: str) -> float:
+        """O(1) 讀取單個參數的動態值"""
+        try:
+            return self.values[phase][parameter_name]
+        except KeyError:
+            raise ValueError(f"Parameter '{parameter_name}' not found in phase '{phase}'")
+
 class MarketDataSource(ABC):
     """市場數據源抽象接口"""
     
@@ -99,6 +119,7 @@ class RealTimeMarketDataSource(MarketDataSource):
         self.logger = logging.getLogger(__name__)
         self._cache = {}
         self._last_fetch_time = None
+        self._cache_duration_seconds = self.api_config.get("cache_settings", {}).get("cache_duration_minutes", 15) * 60
     
     async def get_current_market_data(self) -> MarketData:
         """獲取即時市場數據 - 使用真實幣安API"""
@@ -168,7 +189,7 @@ class RealTimeMarketDataSource(MarketDataSource):
             
             if (cache_key in self._cache and 
                 self._last_fetch_time and 
-                (current_time - self._last_fetch_time).seconds < 900):  # 15分鐘緩存
+                (current_time - self._last_fetch_time).total_seconds() < self._cache_duration_seconds):  # 15分鐘緩存
                 return self._cache[cache_key]
             
             # 調用API
@@ -625,6 +646,40 @@ class DynamicParameterAdapter:
         else:
             return 1.0
     
+    def get_adaptation_bucket(self, market_data: MarketData) -> Tuple[str, str, str]:
+        """市場數據分桶 (波動率, 恐懼貪婪, 流動性) - 與各調整因子的分段規則一致"""
+        volatility = market_data.volatility
+        if volatility > 0.08:
+            volatility_bucket = "high_volatility"
+        elif volatility >= 0.02:
+            volatility_bucket = "normal_volatility"
+        else:
+            volatility_bucket = "low_volatility"
+        
+        fg_index = market_data.fear_greed_index
+        if 0 <= fg_index <= 20:
+            fear_greed_bucket = "extreme_fear"
+        elif 21 <= fg_index <= 40:
+            fear_greed_bucket = "fear"
+        elif 41 <= fg_index <= 59:
+            fear_greed_bucket = "neutral"
+        elif 60 <= fg_index <= 79:
+            fear_greed_bucket = "greed"
+        elif 80 <= fg_index <= 100:
+            fear_greed_bucket = "extreme_greed"
+        else:
+            fear_greed_bucket = "out_of_range"
+        
+        liquidity_score = 1.0 - market_data.bid_ask_spread
+        if liquidity_score > 0.8:
+            liquidity_bucket = "high_liquidity"
+        elif liquidity_score >= 0.5:
+            liquidity_bucket = "medium_liquidity"
+        else:
+            liquidity_bucket = "low_liquidity"
+        
+        return volatility_bucket, fear_greed_bucket, liquidity_bucket
+    
     def _calculate_confidence_score(self, adaptation_factor: float, reason_count: int) -> float:
         """計算適配信心度"""
         # 基礎信心度
@@ -662,6 +717,12 @@ class DynamicParameterEngine:
         self._regime_cache = None
         self._session_cache = None
         self._last_update = None
+        self._market_data_cache: Optional[MarketData] = None
+        self._market_data_ttl_seconds = self._get_market_data_ttl()
+        
+        # adapt_parameter 記憶化: (phase, 參數, 制度, 時段, 波動率桶, 恐懼貪婪桶, 流動性桶) -> AdaptedParameter
+        self._adaptation_cache: Dict[Tuple[str, ...], AdaptedParameter] = {}
+        self._adaptation_cache_max_size = 4096
         
         self.logger = logging.getLogger(__name__)
     
@@ -674,6 +735,55 @@ class DynamicParameterEngine:
             self.logger.error(f"Failed to load config from {self.config_path}: {e}")
             raise
     
+    def _get_market_data_ttl(self) -> float:
+        """市場數據緩存時長 - 取自 liquidity_analyzer 的 cache_duration (如 "60s")"""
+        try:
+            duration = (self.config["dynamic_parameter_system"]["integration_requirements"]
+                        ["data_dependencies"]["liquidity_analyzer"]["cache_duration"])
+            return float(str(duration).rstrip("s"))
+        except (KeyError, TypeError, ValueError):
+            return 60.0
+    
+    async def _get_market_data(self, force_refresh: bool = False) -> MarketData:
+        """獲取市場數據 (TTL 緩存)"""
+        now = datetime.now(timezone.utc)
+        if (not force_refresh and self._market_data_cache is not None and self._last_update and
+                (now - self._last_update).total_seconds() < self._market_data_ttl_seconds):
+            return self._market_data_cache
+        
+        market_data = await self.market_data_source.get_current_market_data()
+        self.update_market_data(market_data)
+        return market_data
+    
+    def update_market_data(self, market_data: MarketData):
+        """推送外部市場數據 (如 WebSocket) - 替換緩存，下次請求無需 REST 調用"""
+        self._market_data_cache = market_data
+        self._last_update = datetime.now(timezone.utc)
+    
+    async def _adapt_parameter_cached(
+        self,
+        phase: str,
+        param_name: str,
+        param_config: Dict[str, Any],
+        market_regime: MarketRegime,
+        trading_session: TradingSession,
+        market_data: MarketData
+    ) -> AdaptedParameter:
+        """記憶化的參數適配 - 相同制度/時段/分桶只計算一次"""
+        cache_key = (phase, param_name, market_regime.value, trading_session.value,
+                     *self.parameter_adapter.get_adaptation_bucket(market_data))
+        cached = self._adaptation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        adapted_param = await self.parameter_adapter.adapt_parameter(
+            param_config, market_regime, trading_session, market_data
+        )
+        if len(self._adaptation_cache) >= self._adaptation_cache_max_size:
+            self._adaptation_cache.clear()
+        self._adaptation_cache[cache_key] = adapted_param
+        return adapted_param
+    
     async def get_dynamic_parameters(
         self,
         phase: str,
@@ -682,7 +792,7 @@ class DynamicParameterEngine:
         """獲取指定階段的動態參數"""
         try:
             # 獲取市場數據
-            market_data = await self.market_data_source.get_current_market_data()
+            market_data = await self._get_market_data(force_refresh)
             
             # 檢測市場制度和交易時段
             market_regime, regime_confidence = await self.regime_detector.detect_market_regime(market_data)
@@ -696,8 +806,8 @@ class DynamicParameterEngine:
             # 適配所有參數
             adapted_parameters = {}
             for param_name, param_config in phase_config.items():
-                adapted_param = await self.parameter_adapter.adapt_parameter(
-                    param_config, market_regime, trading_session, market_data
+                adapted_param = await self._adapt_parameter_cached(
+                    phase, param_name, param_config, market_regime, trading_session, market_data
                 )
                 adapted_parameters[param_name] = adapted_param
             
@@ -765,7 +875,7 @@ class DynamicParameterEngine:
     async def get_system_status(self) -> Dict[str, Any]:
         """獲取系統狀態"""
         try:
-            market_data = await self.market_data_source.get_current_market_data()
+            market_data = await self._get_market_data()
             market_regime, regime_confidence = await self.regime_detector.detect_market_regime(market_data)
             trading_session = await self.session_detector.detect_trading_session()
             
@@ -792,6 +902,97 @@ class DynamicParameterEngine:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
 
+class ParameterSnapshotService:
+    """參數快照服務 - 定期或由 WebSocket 數據觸發刷新，調用方 O(1) 讀取不可變快照"""
+    
+    def __init__(
+        self,
+        engine: DynamicParameterEngine,
+        phases: Optional[List[str]] = None,
+        refresh_interval_seconds: float = 60.0
+    ):
+        self.engine = engine
+        self.phases = phases or ["phase1", "phase2", "phase3", "phase5"]
+        self.refresh_interval_seconds = refresh_interval_seconds
+        
+        self._snapshot: Optional[ParameterSnapshot] = None
+        self._version = 0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        
+        self.logger = logging.getLogger(__name__)
+    
+    def get_snapshot(self) -> Optional[ParameterSnapshot]:
+        """獲取當前快照 (O(1)，不觸發任何 I/O)"""
+        return self._snapshot
+    
+    async def refresh(self, force_refresh: bool = False) -> Optional[ParameterSnapshot]:
+        """重新計算所有階段的參數並發布新快照"""
+        async with self._refresh_lock:
+            try:
+                results = {}
+                for phase in self.phases:
+                    if self.engine._get_phase_config(phase) is None:
+                        continue
+                    results[phase] = await self.engine.get_dynamic_parameters(phase, force_refresh)
+                    force_refresh = False  # 同一次刷新只獲取一次市場數據
+                
+                if not results:
+                    return self._snapshot
+                
+                first = next(iter(results.values()))
+                self._version += 1
+                self._snapshot = ParameterSnapshot(
+                    version=self._version,
+                    results=MappingProxyType(results),
+                    values=MappingProxyType({
+                        phase: MappingProxyType({
+                            name: param.adapted_value
+                            for name, param in result.adapted_parameters.items()
+                        })
+                        for phase, result in results.items()
+                    }),
+                    market_regime=first.market_regime,
+                    trading_session=first.trading_session,
+                    regime_confidence=first.regime_confidence,
+                    market_data_timestamp=self.engine._market_data_cache.timestamp
+                    if self.engine._market_data_cache else first.timestamp,
+                    timestamp=datetime.now(timezone.utc)
+                )
+                return self._snapshot
+                
+            except Exception as e:
+                self.logger.error(f"參數快照刷新失敗，保留上一版快照: {e}")
+                return self._snapshot
+    
+    async def on_market_data(self, market_data: MarketData) -> Optional[ParameterSnapshot]:
+        """WebSocket 市場數據推送入口 - 更新引擎緩存並刷新快照"""
+        self.engine.update_market_data(market_data)
+        return await self.refresh()
+    
+    async def start(self):
+        """啟動定期刷新"""
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        await self.refresh(force_refresh=True)
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """停止定期刷新"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+    
+    async def _refresh_loop(self):
+        """定期刷新循環"""
+        while True:
+            await asyncio.sleep(self.refresh_interval_seconds)
+            await self.refresh(force_refresh=True)
+
 # 輔助函數
 async def create_dynamic_parameter_engine(
     config_path: Optional[str] = None,
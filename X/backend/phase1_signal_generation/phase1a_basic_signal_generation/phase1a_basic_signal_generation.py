@@ -101,6 +101,8 @@ logger = logging.getLogger(__name__)
 # ★ 產品等級導入：調用 intelligent_trigger_engine
 import sys
 sys.path.append(str(Path(__file__).parent.parent / "intelligent_trigger_engine"))
+sys.path.append(str(Path(__file__).parent.parent.parent / "shared_core"))
+from pipeline_metrics import pipeline_metrics
 
 try:
     from intelligent_trigger_engine import (
@@ -3078,6 +3080,7 @@ class Phase1ABasicSignalGeneration:
         except Exception as e:
             logger.error(f"Ticker 數據處理失敗: {e}")
     
+    @pipeline_metrics.timed_stage("phase1a.generate", symbol_arg="symbol", root=True)
     async def _trigger_signal_generation(self, symbol: str, market_data):
         """觸發信號生成 - 處理 processed_market_data"""
         start_time = datetime.now()
@@ -3157,6 +3160,7 @@ class Phase1ABasicSignalGeneration:
             
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds() * 1000
+            pipeline_metrics.observe_ms(f"phase1a.{layer_id}", symbol, processing_time)
             
             return LayerProcessingResult(
                 layer_id=layer_id,
@@ -3169,6 +3173,7 @@ class Phase1ABasicSignalGeneration:
             logger.error(f"❌ {layer_id} 處理失敗: {e}")
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds() * 1000
+            pipeline_metrics.observe_ms(f"phase1a.{layer_id}", symbol, processing_time, error=True)
             
             return LayerProcessingResult(
                 layer_id=layer_id,
@@ -3883,6 +3888,7 @@ class Phase1ABasicSignalGeneration:
         }
         
         self.performance_stats['processing'].append(stats)
+        pipeline_metrics.inc("phase1a_signals_total", signal_count, symbol=symbol)
     
     async def _performance_monitor(self):
         """性能監控器"""
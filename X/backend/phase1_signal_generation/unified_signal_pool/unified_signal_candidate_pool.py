@@ -71,6 +71,9 @@ except ImportError:
     sys.path.append(str(current_dir.parent.parent.parent))
     from binance_data_connector import binance_connector
 
+sys.path.append(str(current_dir.parent.parent / "shared_core"))
+from pipeline_metrics import pipeline_metrics
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -576,6 +579,27 @@ class UnifiedSignalCandidatePoolV3:
         # v3.0 優化組件
         # 移除未使用的 processing_lock 和 executor
         
+        # Layer 1 信號源超時配置 (秒) - 超時源降級為空結果
+        self.source_timeouts = {
+            "phase1a": 0.012,
+            "indicator_graph": 0.012,
+            "phase1b": 0.012,
+            "phase1c": 0.012
+        }
+        
+        # 每週期市場數據快取 - 同一週期內每個交易對只獲取一次
+        self.market_data_cycle_ttl = 1.0  # 秒
+        self._cycle_market_data: Dict[str, Dict[str, Any]] = {}
+        
+        # 延遲歷史 (ms) - 用於百分位數報告
+        self.timing_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=500))
+        self.degraded_source_counts: Dict[str, int] = defaultdict(int)
+        
+        # 批量週期共享狀態 (制度、信號源權重) - 僅批量處理期間有效
+        self._cycle_shared_state: Optional[Dict[str, Any]] = None
+        self.batch_max_concurrency = 16
+        self.regime_reference_symbol = "BTCUSDT"
+        
     async def aggregate_signals(self, signals_from_sources: Dict[str, List[Dict[str, Any]]]) -> List[StandardizedSignal]:
         """公開的信號聚合方法"""
         try:
@@ -732,6 +756,7 @@ class UnifiedSignalCandidatePoolV3:
         """按優先級排序信號"""
         return sorted(signals, key=lambda s: (s.execution_priority, s.confidence_score), reverse=True)
         
+    @pipeline_metrics.timed_stage("pool.generate_v3", symbol_arg="symbol", root=True)
     async def generate_signal_candidates_v3(self, symbol: str = "BTCUSDT") -> List[StandardizedSignal]:
         """
         v3.0 主要信號生成入口 - 28ms 目標處理時間
@@ -750,30 +775,19 @@ class UnifiedSignalCandidatePoolV3:
             await self._layer_0_complete_phase1_sync(symbol)
             layer_0_time = (time.time() - layer_0_start) * 1000
             
-            # Layer 1: 增強多源融合 (12ms 目標)
-            layer_1_start = time.time()
-            raw_signals = await self._layer_1_enhanced_multi_source_fusion(symbol)
-            layer_1_time = (time.time() - layer_1_start) * 1000
-            
-            # Layer 2: EPL 預處理優化 (8ms 目標)
-            layer_2_start = time.time()
-            epl_optimized_signals = await self._layer_2_epl_preprocessing_optimization(raw_signals)
-            layer_2_time = (time.time() - layer_2_start) * 1000
-            
-            # Layer AI: 自適應學習 (5ms 目標)
-            layer_ai_start = time.time()
-            final_signals = await self._layer_ai_adaptive_learning(epl_optimized_signals)
-            layer_ai_time = (time.time() - layer_ai_start) * 1000
+            # Layer 1 → Layer 2 → Layer AI
+            final_signals, timing_info = await self._run_symbol_layers(symbol)
             
             # 更新統計
             total_time = (time.time() - start_time) * 1000
-            self._update_v3_stats(final_signals, {
+            layer_1_time = timing_info["layer_1_time"]
+            layer_2_time = timing_info["layer_2_time"]
+            layer_ai_time = timing_info["layer_ai_time"]
+            timing_info.update({
                 "layer_0_time": layer_0_time,
-                "layer_1_time": layer_1_time,
-                "layer_2_time": layer_2_time,
-                "layer_ai_time": layer_ai_time,
                 "total_time": total_time
             })
+            self._update_v3_stats(final_signals, timing_info, symbol)
             
             # 性能監控 - 添加具體時間目標檢查
             performance_status = {
@@ -798,6 +812,117 @@ class UnifiedSignalCandidatePoolV3:
             logger.error(f"❌ v3.0 信號生成失敗: {e}")
             return []
     
+    async def generate_signal_candidates_batch(self, symbols: List[str],
+                                               max_concurrency: Optional[int] = None) -> Dict[str, List[StandardizedSignal]]:
+        """
+        v3.0 批量信號生成入口 - 整個觀察清單一個週期
+        
+        - 跨交易對共享狀態 (市場制度、交易時段、AI 信號源權重) 每週期只計算一次
+        - 每個交易對的 數據獲取 → Layer 1 → Layer 2 → Layer AI 以有限並發流水線執行
+        - 全部請求共用一個連接器會話
+        """
+        start_time = time.time()
+        results: Dict[str, List[StandardizedSignal]] = {symbol: [] for symbol in symbols}
+        if not symbols:
+            return results
+        
+        concurrency = max_concurrency or self.batch_max_concurrency
+        
+        try:
+            # Layer 0: 共享狀態 - 以參考交易對更新市場制度一次
+            layer_0_start = time.time()
+            reference_symbol = (self.regime_reference_symbol
+                                if self.regime_reference_symbol in symbols else symbols[0])
+            await self._layer_0_complete_phase1_sync(reference_symbol)
+            self._cycle_shared_state = {
+                "adjusted_weights": self.ai_learning_engine.get_adjusted_weights()
+            }
+            layer_0_time = (time.time() - layer_0_start) * 1000
+            
+            # 觸發一次快速學習檢查，避免每個交易對重複
+            await self._maybe_trigger_fast_learning()
+            
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async with binance_connector as connector:
+                async def run_symbol(symbol: str):
+                    async with semaphore:
+                        symbol_start = time.time()
+                        await self._get_cycle_market_data(symbol, connector)
+                        signals, timing_info = await self._run_symbol_layers(symbol)
+                        timing_info["total_time"] = (time.time() - symbol_start) * 1000
+                        self._update_v3_stats(signals, timing_info, symbol)
+                        return symbol, signals
+                
+                symbol_results = await asyncio.gather(
+                    *(run_symbol(symbol) for symbol in symbols), return_exceptions=True
+                )
+            
+            for outcome in symbol_results:
+                if isinstance(outcome, Exception):
+                    logger.warning(f"批量信號生成單一交易對失敗: {outcome}")
+                    continue
+                symbol, signals = outcome
+                results[symbol] = signals
+                self.candidate_pool.extend(signals)
+            
+            batch_time = (time.time() - start_time) * 1000
+            total_signals = sum(len(signals) for signals in results.values())
+            self.timing_history["batch_layer_0_time"].append(layer_0_time)
+            self.timing_history["batch_total_time"].append(batch_time)
+            self.generation_stats["last_batch"] = {
+                "symbols": len(symbols),
+                "signals": total_signals,
+                "total_time_ms": batch_time,
+                "symbols_per_second": len(symbols) / (batch_time / 1000) if batch_time > 0 else 0.0,
+                "max_concurrency": concurrency,
+                "timestamp": datetime.now()
+            }
+            logger.info(f"✅ v3.0 批量處理完成: {len(symbols)} 交易對, {total_signals} 信號, {batch_time:.1f}ms")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"❌ v3.0 批量信號生成失敗: {e}")
+            return results
+        finally:
+            self._cycle_shared_state = None
+    
+    async def _run_symbol_layers(self, symbol: str) -> Tuple[List[StandardizedSignal], Dict[str, float]]:
+        """單一交易對 Layer 1 → Layer 2 → Layer AI 流水線"""
+        # Layer 1: 增強多源融合 (12ms 目標)
+        layer_1_start = time.time()
+        raw_signals, source_timings = await self._layer_1_enhanced_multi_source_fusion(
+            symbol, return_source_timings=True
+        )
+        layer_1_time = (time.time() - layer_1_start) * 1000
+        
+        # Layer 2: EPL 預處理優化 (8ms 目標)
+        layer_2_start = time.time()
+        epl_optimized_signals = await self._layer_2_epl_preprocessing_optimization(raw_signals)
+        layer_2_time = (time.time() - layer_2_start) * 1000
+        
+        # Layer AI: 自適應學習 (5ms 目標)
+        layer_ai_start = time.time()
+        final_signals = await self._layer_ai_adaptive_learning(epl_optimized_signals)
+        layer_ai_time = (time.time() - layer_ai_start) * 1000
+        
+        timing_info = {
+            "layer_1_time": layer_1_time,
+            "layer_2_time": layer_2_time,
+            "layer_ai_time": layer_ai_time
+        }
+        for source, source_time in source_timings.items():
+            timing_info[f"source_{source}_time"] = source_time
+        
+        return final_signals, timing_info
+    
+    def _get_cycle_source_weights(self) -> Dict[str, float]:
+        """信號源權重 - 批量週期內使用共享快照"""
+        if self._cycle_shared_state is not None:
+            return self._cycle_shared_state["adjusted_weights"]
+        return self.ai_learning_engine.get_adjusted_weights()
+    
     async def _layer_0_complete_phase1_sync(self, symbol: str):
         """Layer 0: 完整 Phase1 同步整合 - 3ms 目標"""
         start_time = time.time()
@@ -836,33 +961,35 @@ class UnifiedSignalCandidatePoolV3:
         except Exception as e:
             logger.error(f"❌ Layer 0 同步失敗: {e}")
     
-    async def _layer_1_enhanced_multi_source_fusion(self, symbol: str) -> List[Dict[str, Any]]:
+    async def _layer_1_enhanced_multi_source_fusion(self, symbol: str, return_source_timings: bool = False):
         """Layer 1: 增強多源融合 + 7維度評分 - 12ms 目標"""
         start_time = time.time()
         raw_signals = []
+        source_timings: Dict[str, float] = {}
         
         try:
-            # 獲取市場數據
-            async with binance_connector as connector:
-                market_data = await self._get_comprehensive_market_data(connector, symbol)
-            
-            # 並行收集多源信號
+            # 獲取市場數據 (每週期每交易對一次)
+            market_data = await self._get_cycle_market_data(symbol)
+            
+            # 並行收集多源信號 - 每源獨立超時
+            source_collectors = {
+                "phase1a": self._collect_phase1a_signals,
+                "indicator_graph": self._collect_indicator_signals,
+                "phase1b": self._collect_phase1b_signals,
+                "phase1c": self._collect_phase1c_signals
+            }
             signal_tasks = [
-                self._collect_phase1a_signals(symbol, market_data),
-                self._collect_indicator_signals(symbol, market_data),
-                self._collect_phase1b_signals(symbol, market_data),
-                self._collect_phase1c_signals(symbol, market_data)
+                self._collect_source_with_timeout(source, collector(symbol, market_data))
+                for source, collector in source_collectors.items()
             ]
             
-            # 等待所有信號收集完成
-            signal_collections = await asyncio.gather(*signal_tasks, return_exceptions=True)
+            # 等待所有信號收集完成 (超時/失敗源已降級為空列表)
+            signal_collections = await asyncio.gather(*signal_tasks)
             
             # 處理收集結果
-            for i, signals in enumerate(signal_collections):
-                if not isinstance(signals, Exception):
-                    raw_signals.extend(signals)
-                else:
-                    logger.warning(f"信號源 {i} 收集失敗: {signals}")
+            for source, (signals, elapsed_ms) in zip(source_collectors, signal_collections):
+                source_timings[source] = elapsed_ms
+                raw_signals.extend(signals)
             
             # 智能信號過濾
             filtered_signals = await self._intelligent_signal_filtering(raw_signals)
@@ -886,10 +1013,14 @@ class UnifiedSignalCandidatePoolV3:
             else:
                 logger.debug(f"✅ Layer 1 融合完成: {elapsed:.1f}ms (12ms 目標)")
             
+            if return_source_timings:
+                return scored_signals, source_timings
             return scored_signals
             
         except Exception as e:
             logger.error(f"❌ Layer 1 融合失敗: {e}")
+            if return_source_timings:
+                return [], source_timings
             return []
     
     async def _layer_2_epl_preprocessing_optimization(self, signals: List[Dict[str, Any]]) -> List[StandardizedSignal]:
@@ -939,23 +1070,16 @@ class UnifiedSignalCandidatePoolV3:
         start_time = time.time()
         
         try:
-            # 實時適應調整
-            if len(self.ai_learning_engine.epl_decision_history) > 10:
-                # 檢查最近決策偏差
-                recent_decisions = list(self.ai_learning_engine.epl_decision_history)[-10:]
-                accuracy = sum(1 for d in recent_decisions if d["epl_passed"]) / len(recent_decisions)
-                
-                # 偏差 > 20% 觸發快速學習
-                if abs(accuracy - self.ai_learning_engine.learning_metrics.decision_accuracy) > 0.2:
-                    logger.info("🔄 觸發快速學習調整")
-                    await self.ai_learning_engine.learn_from_epl_feedback(recent_decisions)
+            # 實時適應調整 (批量週期已在週期開始時統一檢查)
+            if self._cycle_shared_state is None:
+                await self._maybe_trigger_fast_learning()
             
             # 應用學習調整
+            adjusted_weights = self._get_cycle_source_weights()
             enhanced_signals = []
             for signal in signals:
                 # 動態權重調整
                 source = signal.signal_source
-                adjusted_weights = self.ai_learning_engine.get_adjusted_weights()
                 if source in adjusted_weights:
                     adjustment_factor = adjusted_weights[source] / 0.25  # 標準化
                     signal.confidence_score = min(1.0, signal.confidence_score * adjustment_factor)
@@ -974,9 +1098,59 @@ class UnifiedSignalCandidatePoolV3:
             logger.error(f"❌ Layer AI 學習失敗: {e}")
             return signals
     
+    async def _collect_source_with_timeout(self, source: str, collector) -> Tuple[List[Dict[str, Any]], float]:
+        """在超時限制內收集單一信號源，超時或失敗時降級為空結果"""
+        start_time = time.time()
+        timeout = self.source_timeouts.get(source)
+        
+        try:
+            signals = await asyncio.wait_for(collector, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.degraded_source_counts[source] += 1
+            logger.warning(f"⚠️ 信號源 {source} 超時 (>{timeout * 1000:.0f}ms)，本週期降級")
+            signals = []
+        except Exception as e:
+            self.degraded_source_counts[source] += 1
+            logger.warning(f"信號源 {source} 收集失敗: {e}")
+            signals = []
+        
+        return signals or [], (time.time() - start_time) * 1000
+    
+    async def _get_cycle_market_data(self, symbol: str, connector=None) -> Dict[str, Any]:
+        """獲取本週期市場數據 - 週期內重用已獲取的數據"""
+        cached = self._cycle_market_data.get(symbol)
+        if cached is not None:
+            age = (datetime.now() - cached["timestamp"]).total_seconds()
+            if age < self.market_data_cycle_ttl:
+                return cached
+        
+        if connector is not None:
+            market_data = await self._get_comprehensive_market_data(connector, symbol)
+        else:
+            async with binance_connector as connector:
+                market_data = await self._get_comprehensive_market_data(connector, symbol)
+        
+        self._cycle_market_data[symbol] = market_data
+        return market_data
+    
+    async def _maybe_trigger_fast_learning(self):
+        """最近 EPL 決策偏差 > 20% 時觸發快速學習"""
+        if len(self.ai_learning_engine.epl_decision_history) > 10:
+            # 檢查最近決策偏差
+            recent_decisions = list(self.ai_learning_engine.epl_decision_history)[-10:]
+            accuracy = sum(1 for d in recent_decisions if d["epl_passed"]) / len(recent_decisions)
+            
+            # 偏差 > 20% 觸發快速學習
+            if abs(accuracy - self.ai_learning_engine.learning_metrics.decision_accuracy) > 0.2:
+                logger.info("🔄 觸發快速學習調整")
+                await self.ai_learning_engine.learn_from_epl_feedback(recent_decisions)
+    
     async def _update_market_regime_state(self, symbol: str):
         """更新市場制度狀態"""
         try:
+            # 週期市場數據 (與 Layer 1 共用)
+            market_data = await self._get_cycle_market_data(symbol)
+            
             async with binance_connector as connector:
                 # 獲取 5 分鐘價格變化
                 klines = await connector.get_klines(symbol, "5m", limit=2)
@@ -986,7 +1160,7 @@ class UnifiedSignalCandidatePoolV3:
                     self.market_regime.btc_5min_change = ((current_price - prev_price) / prev_price) * 100
                 
                 # 獲取成交量倍數
-                ticker = await connector.get_24hr_ticker(symbol)
+                ticker = market_data.get("ticker")
                 if ticker:
                     volume_24h = float(ticker.get("volume", 0))
                     # 簡化實現，實際需要歷史平均成交量比較
@@ -1410,7 +1584,7 @@ class UnifiedSignalCandidatePoolV3:
         """智能信號過濾"""
         try:
             # 動態權重調整
-            adjusted_weights = self.ai_learning_engine.get_adjusted_weights()
+            adjusted_weights = self._get_cycle_source_weights()
             
             # 市場制度適應
             regime_adjusted_signals = []
@@ -1656,10 +1830,12 @@ class UnifiedSignalCandidatePoolV3:
             logger.error(f"緊急信號處理失敗: {e}")
             return signals
     
-    def _update_v3_stats(self, signals: List[StandardizedSignal], timing_info: Dict[str, float]):
+    def _update_v3_stats(self, signals: List[StandardizedSignal], timing_info: Dict[str, float],
+                         symbol: Optional[str] = None):
         """更新 v3.0 統計"""
         try:
             self.generation_stats["total_generated"] += len(signals)
+            pipeline_metrics.inc("pool_signals_total", len(signals), symbol=symbol or "unknown")
             self.generation_stats["last_generation"] = datetime.now()
             
             # 按源分類統計
@@ -1677,9 +1853,30 @@ class UnifiedSignalCandidatePoolV3:
                 "last_total_time": timing_info.get("total_time", 0)
             })
             
+            # 延遲歷史 (層級 + 各信號源)；總時間已由 pool.generate_v3 階段計時
+            for key, value in timing_info.items():
+                self.timing_history[key].append(value)
+                if key != "total_time":
+                    pipeline_metrics.observe_ms(f"pool.{key[:-5] if key.endswith('_time') else key}", symbol, value)
+            
         except Exception as e:
             logger.debug(f"統計更新失敗: {e}")
     
+    def get_latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """各層級與信號源延遲百分位數 (ms)"""
+        percentiles = {}
+        for key, history in self.timing_history.items():
+            if not history:
+                continue
+            p50, p95, p99 = np.percentile(np.fromiter(history, dtype=float), [50, 95, 99])
+            percentiles[key] = {
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "samples": len(history)
+            }
+        return percentiles
+    
     async def learn_from_epl_feedback(self, epl_decisions: List[Dict[str, Any]]):
         """接收 EPL 決策反饋進行學習"""
         try:
@@ -1692,6 +1889,8 @@ class UnifiedSignalCandidatePoolV3:
         """獲取性能報告"""
         return {
             "generation_stats": self.generation_stats.copy(),
+            "latency_percentiles": self.get_latency_percentiles(),
+            "degraded_sources": dict(self.degraded_source_counts),
             "ai_learning_metrics": asdict(self.ai_learning_engine.learning_metrics),
             "market_regime": asdict(self.market_regime),
             "candidate_pool_size": len(self.candidate_pool),
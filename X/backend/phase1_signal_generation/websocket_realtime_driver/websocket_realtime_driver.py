@@ -53,10 +53,16 @@ from concurrent.futures import ThreadPoolExecutor
 import statistics
 from enum import Enum
 import threading
+import sys
+from pathlib import Path
 
 # 導入配置模組
 from .config.websocket_realtime_config import WebSocketRealtimeConfig, get_websocket_config
 
+# 共用管線指標層
+sys.path.append(str(Path(__file__).parent.parent.parent / "shared_core"))
+from pipeline_metrics import pipeline_metrics
+
 logger = logging.getLogger(__name__)
 
 class ConnectionState(Enum):
@@ -209,6 +215,7 @@ class ConnectionManager:
         """監聽真實的 WebSocket 數據"""
         try:
             async for message in websocket:
+                receive_start = time.perf_counter()
                 try:
                     data = json.loads(message)
                     
@@ -234,6 +241,9 @@ class ConnectionManager:
                             
                             # 存儲到數據緩衝區
                             self.parent_driver.data_buffer.update_real_data(symbol, real_snapshot)
+                            self.parent_driver.performance_monitor.record_message(
+                                exchange, symbol, (time.perf_counter() - receive_start) * 1000
+                            )
                             
                             logger.info(f"💰 收到真實價格 {symbol}: ${price:.2f}")
                     
@@ -258,6 +268,9 @@ class ConnectionManager:
                             )
                             
                             self.parent_driver.data_buffer.update_real_data(symbol, real_snapshot)
+                            self.parent_driver.performance_monitor.record_message(
+                                exchange, symbol, (time.perf_counter() - receive_start) * 1000
+                            )
                             logger.info(f"💰 收到真實價格 {symbol}: ${price:.2f}")
                     
                 except json.JSONDecodeError:
@@ -1088,7 +1101,7 @@ class EventBroadcaster:
             
     async def broadcast(self, event_type: str, data: Dict[str, Any]):
         """廣播事件到所有訂閱者"""
-        broadcast_start = time.time()
+        broadcast_start = time.perf_counter()
         
         # 廣播給通用訂閱者
         for callback in self.subscribers:
@@ -1115,8 +1128,8 @@ class EventBroadcaster:
         
         # 記錄性能指標
         if self.performance_monitor:
-            broadcast_time = (time.time() - broadcast_start) * 1000
-            await self.performance_monitor.record_broadcast_latency(broadcast_time)
+            broadcast_time = (time.perf_counter() - broadcast_start) * 1000
+            self.performance_monitor.record_broadcast_latency(event_type, data.get('symbol'), broadcast_time)
     
     async def broadcast_system_status(self, status: str, details: Dict[str, Any] = None):
         """廣播系統狀態"""
@@ -1176,13 +1189,37 @@ class PerformanceMonitor:
     
     def __init__(self):
         self.message_rates: Dict[str, float] = {}
-        self.processing_latencies: Dict[str, List[float]] = {}
+        self.processing_latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
         self.throughput_metrics: Dict[str, int] = {}
         self.last_measurement_time: Dict[str, datetime] = {}
-        self.message_counts: Dict[str, int] = {}
+        self.message_counts: Dict[str, int] = defaultdict(int)
         self.start_time = None
         self.is_running = False
     
+    def record_message(self, exchange: str, symbol: str, processing_ms: float):
+        """記錄一條行情消息的接收處理延遲"""
+        self.message_counts[exchange] += 1
+        self.processing_latencies[exchange].append(processing_ms)
+        pipeline_metrics.inc("ws_messages_total", exchange=exchange)
+        pipeline_metrics.observe_ms("ws.receive", symbol, processing_ms)
+        
+        # 每秒更新一次消息速率
+        now = datetime.now()
+        last = self.last_measurement_time.get(exchange)
+        if last is None:
+            self.last_measurement_time[exchange] = now
+            self.throughput_metrics[exchange] = self.message_counts[exchange]
+        elif (now - last).total_seconds() >= 1.0:
+            count = self.message_counts[exchange] - self.throughput_metrics.get(exchange, 0)
+            self.message_rates[exchange] = count / (now - last).total_seconds()
+            self.last_measurement_time[exchange] = now
+            self.throughput_metrics[exchange] = self.message_counts[exchange]
+            pipeline_metrics.set_gauge("ws_message_rate", self.message_rates[exchange], exchange=exchange)
+    
+    def record_broadcast_latency(self, event_type: str, symbol: Optional[str], broadcast_ms: float):
+        """記錄一次事件廣播 (含路由目標) 的延遲"""
+        pipeline_metrics.observe_ms(f"driver.broadcast.{event_type}", symbol, broadcast_ms)
+    
     def start(self):
         """啟動性能監控"""
         self.start_time = datetime.now()
@@ -1449,6 +1486,7 @@ class WebSocketRealtimeDriver:
         self.reconnection_handler = ReconnectionHandler(self.connection_manager)
         self.event_broadcaster = EventBroadcaster()
         self.performance_monitor = PerformanceMonitor()
+        self.event_broadcaster.performance_monitor = self.performance_monitor
         self.heartbeat_manager = HeartbeatManager(self.connection_manager)
         self.data_buffer = DataBuffer()
         
@@ -1974,6 +2012,7 @@ class WebSocketRealtimeDriver:
             self._handle_unified_signal_pool
         )
     
+    @pipeline_metrics.timed_stage("driver.phase1a_route", symbol_arg="data.symbol", root=True)
     async def _handle_phase1a_signal_generation(self, event_type: str, data: Dict[str, Any]):
         """處理Phase1A基礎信號生成"""
         try:
@@ -2046,6 +2085,7 @@ class WebSocketRealtimeDriver:
         except Exception as e:
             self.logger.error(f"Volatility adaptation error: {e}")
     
+    @pipeline_metrics.timed_stage("driver.unified_pool_route", symbol_arg="data.symbol")
     async def _handle_unified_signal_pool(self, event_type: str, data: Dict[str, Any]):
         """處理統一信號候選池"""
         try:
@@ -28,6 +28,7 @@ import importlib.util
 
 DATABASE_AVAILABLE = False
 PROGRESS_TRACKER_AVAILABLE = False
+REPLAY_AVAILABLE = False
 
 try:
     # 動態導入 signal_database
@@ -65,6 +66,22 @@ except Exception:
     PROGRESS_TRACKER_AVAILABLE = False
     logger.warning("⚠️ 學習進度追蹤器不可用（非關鍵組件）")
 
+try:
+    # 動態導入 counterfactual_replay
+    replay_path = current_dir / "counterfactual_replay.py"
+    spec = importlib.util.spec_from_file_location("counterfactual_replay", replay_path)
+    replay_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(replay_module)
+    
+    CounterfactualReplayEvaluator = replay_module.CounterfactualReplayEvaluator
+    ReplayDataset = replay_module.ReplayDataset
+    REPLAY_PARAMETERS = replay_module.REPLAY_PARAMETERS
+    REPLAY_AVAILABLE = True
+    logger.info("✅ 反事實回放評估器載入成功（動態導入）")
+except Exception as e:
+    REPLAY_AVAILABLE = False
+    logger.warning(f"⚠️ 反事實回放評估器不可用，參數優化使用估算模式: {e}")
+
 # ==================== 數據結構定義 ====================
 
 # 學習策略枚舉
@@ -127,6 +144,93 @@ class ParameterOptimization:
     optimization_time: datetime
     validation_results: Dict[str, float]
 
+# 幣種分類順序 - 列式存儲中以索引編碼
+SIGNAL_CATEGORIES = ('major', 'alt', 'meme', 'payment')
+
+class SignalHistoryColumns:
+    """信號歷史列式存儲 - 與 signal_history 同步的 NumPy 環形列緩衝區
+
+    標量欄位與數值特徵各自存為一個 float64 陣列（特徵以名稱為鍵，缺失值為 NaN），
+    容量按需倍增至 maxlen，之後覆蓋最舊記錄。學習流程直接在列上做遮罩與加權歸約。
+    """
+
+    SCALAR_COLUMNS = ('timestamp', 'signal_strength', 'actual_outcome',
+                      'performance_score', 'category', 'category_weight')
+
+    def __init__(self, maxlen: int = 1000, initial_capacity: int = 64):
+        self.maxlen = maxlen
+        self._capacity = min(initial_capacity, maxlen)
+        self._start = 0
+        self._size = 0
+        self._columns = {name: np.full(self._capacity, np.nan) for name in self.SCALAR_COLUMNS}
+        self._symbols = np.empty(self._capacity, dtype=object)
+        self._features: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def feature_names(self) -> List[str]:
+        return list(self._features.keys())
+
+    def _order(self, last: Optional[int] = None) -> np.ndarray:
+        """按時間順序的物理索引（最舊在前）"""
+        count = self._size if last is None else min(last, self._size)
+        return (self._start + np.arange(self._size - count, self._size)) % self._capacity
+
+    def _grow(self):
+        """容量倍增（上限 maxlen），同時把環形數據整理為從 0 開始"""
+        new_capacity = min(self.maxlen, self._capacity * 2)
+        order = self._order()
+
+        def resize(column: np.ndarray, fill) -> np.ndarray:
+            resized = np.full(new_capacity, fill, dtype=column.dtype)
+            resized[:self._size] = column[order]
+            return resized
+
+        self._columns = {name: resize(column, np.nan) for name, column in self._columns.items()}
+        self._symbols = resize(self._symbols, None)
+        self._features = {name: resize(column, np.nan) for name, column in self._features.items()}
+        self._capacity = new_capacity
+        self._start = 0
+
+    def append(self, performance: 'SignalPerformance', category: str, category_weight: float):
+        """追加一條信號記錄；已滿時覆蓋最舊記錄"""
+        if self._size == self._capacity and self._capacity < self.maxlen:
+            self._grow()
+
+        if self._size < self._capacity:
+            pos = (self._start + self._size) % self._capacity
+            self._size += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self._capacity
+
+        columns = self._columns
+        columns['timestamp'][pos] = performance.timestamp.timestamp()
+        columns['signal_strength'][pos] = performance.signal_strength or 0.0
+        columns['actual_outcome'][pos] = np.nan if performance.actual_outcome is None else performance.actual_outcome
+        columns['performance_score'][pos] = np.nan if performance.performance_score is None else performance.performance_score
+        columns['category'][pos] = SIGNAL_CATEGORIES.index(category) if category in SIGNAL_CATEGORIES else -1
+        columns['category_weight'][pos] = category_weight
+        self._symbols[pos] = performance.symbol
+
+        for column in self._features.values():
+            column[pos] = np.nan
+        for feature_name, feature_value in (performance.features or {}).items():
+            if isinstance(feature_value, (int, float)):
+                if feature_name not in self._features:
+                    self._features[feature_name] = np.full(self._capacity, np.nan)
+                self._features[feature_name][pos] = feature_value
+
+    def recent(self, last: Optional[int] = None) -> Dict[str, Any]:
+        """取最近 last 條記錄的列快照（時間順序，複製而非視圖）"""
+        order = self._order(last)
+        snapshot = {name: column[order] for name, column in self._columns.items()}
+        snapshot['symbol'] = self._symbols[order]
+        snapshot['features'] = {name: column[order] for name, column in self._features.items()}
+        return snapshot
+
 class AdaptiveLearningCore:
     """自適應學習核心 - Phase 2 Step 2"""
     
@@ -143,6 +247,7 @@ class AdaptiveLearningCore:
         
         # 必要的內存存儲屬性 - 修正缺失屬性
         self.signal_history = deque(maxlen=1000)  # 最近1000個信號
+        self.signal_columns = SignalHistoryColumns(maxlen=self.signal_history.maxlen)  # 同步的列式存儲，供學習流程向量化計算
         self.performance_db = {}  # 信號表現數據庫
         self.learning_patterns = {}  # 學習模式數據庫
         self.parameter_history = defaultdict(lambda: deque(maxlen=100))  # 參數優化歷史，每個參數最多100條記錄
@@ -154,9 +259,14 @@ class AdaptiveLearningCore:
             'pattern_confidence_threshold': 0.65, # 模式信心度閾值
             'parameter_optimization_frequency': 200,  # 每200個信號優化一次參數 (約15分鐘)
             'success_rate_threshold': 0.55,
-            'return_threshold': 0.01
+            'return_threshold': 0.01,
+            'replay_signal_limit': 2000,       # 回放使用的最近已完成信號數
+            'replay_candidates_per_round': 256  # 週期重訓練每輪回放候選數
         }
         
+        # 反事實回放評估器 - 以資料庫中的真實結果評估候選參數
+        self.replay_evaluator = CounterfactualReplayEvaluator() if REPLAY_AVAILABLE else None
+        
         # 當前優化參數
         self.current_parameters = {
             'signal_threshold': 0.6,
@@ -260,7 +370,7 @@ class AdaptiveLearningCore:
                 self._update_performance_metrics(performance)
             
             # 存儲到內存
-            self.signal_history.append(performance)
+            self._record_signal(performance)
             self.performance_db[performance.signal_id] = performance
             self.performance_metrics['total_signals_tracked'] += 1
             
@@ -280,7 +390,7 @@ class AdaptiveLearningCore:
         """直接添加SignalPerformance對象（用於測試和外部集成）"""
         try:
             # 存儲到內存
-            self.signal_history.append(performance)
+            self._record_signal(performance)
             self.performance_db[performance.signal_id] = performance
             self.performance_metrics['total_signals_tracked'] += 1
             
@@ -349,6 +459,15 @@ class AdaptiveLearningCore:
             logger.error(f"❌ 信號表現處理失敗: {e}")
             return performance
     
+    def _record_signal(self, performance: SignalPerformance):
+        """同時寫入 signal_history 與列式存儲"""
+        self.signal_history.append(performance)
+        self.signal_columns.append(
+            performance,
+            self._get_symbol_category(performance.symbol),
+            self._get_category_weight(performance.symbol)
+        )
+    
     def _log_learning_status(self):
         """記錄學習狀態"""
         try:
@@ -471,7 +590,9 @@ class AdaptiveLearningCore:
                     self.performance_metrics['successful_signals'] += 1
                 
                 # 計算成功率
-                total_with_outcome = len([s for s in self.signal_history if s.actual_outcome is not None])
+                outcomes = self.signal_columns.recent()['actual_outcome']
+                returns = outcomes[~np.isnan(outcomes)]
+                total_with_outcome = returns.size
                 if total_with_outcome > 0:
                     self.performance_metrics['success_rate'] = self.performance_metrics['successful_signals'] / total_with_outcome
                 
@@ -482,37 +603,39 @@ class AdaptiveLearningCore:
                     self.performance_metrics['average_return'] = 0.0
                 
                 # 計算夏普比率（簡化版）
-                returns = [s.actual_outcome for s in self.signal_history if s.actual_outcome is not None]
-                if len(returns) > 5:
-                    return_std = np.std(returns)
+                if total_with_outcome > 5:
+                    return_std = returns.std()
                     if return_std > 0:
-                        self.performance_metrics['sharpe_ratio'] = np.mean(returns) / return_std
+                        self.performance_metrics['sharpe_ratio'] = float(returns.mean() / return_std)
         
         except Exception as e:
             logger.error(f"❌ 性能指標更新失敗: {e}")
     
     def _prepare_progress_metrics(self) -> Dict[str, Any]:
         """準備進度追蹤器所需的指標"""
+        columns = self.signal_columns.recent()
         total_signals = len(self.signal_history)
-        signals_with_outcome = [s for s in self.signal_history if s.actual_outcome is not None]
-        successful_signals = [s for s in signals_with_outcome if s.performance_score and s.performance_score > 1.0]
+        with_outcome = ~np.isnan(columns['actual_outcome'])
+        successful = with_outcome & (columns['performance_score'] > 1.0)
+        outcome_count = int(with_outcome.sum())
+        successful_count = int(successful.sum())
         
         # 計算指標
-        accuracy_rate = len(successful_signals) / len(signals_with_outcome) if signals_with_outcome else 0.0
+        accuracy_rate = successful_count / outcome_count if outcome_count else 0.0
         avg_return = self.performance_metrics.get('average_return', 0.0)
         success_rate = self.performance_metrics.get('success_rate', 0.0)
         
         # 計算一致性分數 (最近10個信號的表現標準差)
-        recent_signals = list(self.signal_history)[-10:] if len(self.signal_history) >= 10 else list(self.signal_history)
-        recent_scores = [s.performance_score for s in recent_signals if s.performance_score is not None]
-        consistency_score = 1.0 - (np.std(recent_scores) if len(recent_scores) > 1 else 0.0)
+        recent_scores = columns['performance_score'][-10:]
+        recent_scores = recent_scores[~np.isnan(recent_scores)]
+        consistency_score = 1.0 - (float(recent_scores.std()) if recent_scores.size > 1 else 0.0)
         consistency_score = max(0.0, min(1.0, consistency_score))
         
         return {
             'performance_score': success_rate,
             'accuracy_rate': accuracy_rate,
-            'successful_predictions': len(successful_signals),
-            'total_predictions': len(signals_with_outcome),
+            'successful_predictions': successful_count,
+            'total_predictions': outcome_count,
             'confidence_level': min(1.0, total_signals / 100.0),  # 基於信號數量的信心水平
             'avg_return_rate': avg_return,
             'consistency_score': consistency_score
@@ -526,48 +649,44 @@ class AdaptiveLearningCore:
             
             logger.info("🔍 開始模式發現...")
             
-            # 分析成功信號的共同特徵
-            successful_signals = [
-                s for s in self.signal_history 
-                if s.performance_score and s.performance_score > 1.0
-            ]
+            # 分析成功信號的共同特徵 - 列式遮罩
+            columns = self.signal_columns.recent()
+            successful = columns['performance_score'] > 1.0
+            successful_count = int(successful.sum())
             
-            if len(successful_signals) < 10:
+            if successful_count < 10:
                 return
             
-            # 按特徵分組分析
-            feature_patterns = defaultdict(list)
-            
-            for signal in successful_signals:
-                if signal.features:
-                    for feature_name, feature_value in signal.features.items():
-                        if isinstance(feature_value, (int, float)):
-                            feature_patterns[feature_name].append(feature_value)
+            # 成功信號的平均收益對所有特徵相同，只計算一次
+            successful_outcomes = columns['actual_outcome'][successful]
+            successful_outcomes = successful_outcomes[~np.isnan(successful_outcomes) & (successful_outcomes != 0)]
+            avg_return = float(successful_outcomes.mean()) if successful_outcomes.size else 0.0
             
             # 識別有效特徵範圍
-            for feature_name, values in feature_patterns.items():
-                if len(values) >= 5:
+            for feature_name, feature_column in columns['features'].items():
+                values = feature_column[successful]
+                values = values[~np.isnan(values)]
+                if values.size >= 5:
                     pattern_id = f"pattern_{feature_name}_{len(self.learning_patterns)}"
                     
                     # 計算統計特徵
-                    mean_value = np.mean(values)
-                    std_value = np.std(values)
-                    # 防止除零錯誤
-                    success_rate = len(values) / len(successful_signals) if len(successful_signals) > 0 else 0.0
+                    mean_value = float(values.mean())
+                    std_value = float(values.std())
+                    success_rate = values.size / successful_count
                     
                     # 創建學習模式
                     pattern = LearningPattern(
                         pattern_id=pattern_id,
                         pattern_type=f"feature_{feature_name}",
                         success_rate=success_rate,
-                        avg_return=np.mean([s.actual_outcome for s in successful_signals if s.actual_outcome]),
+                        avg_return=avg_return,
                         conditions={
                             'feature_name': feature_name,
                             'value_range': (mean_value - std_value, mean_value + std_value),
                             'optimal_value': mean_value
                         },
-                        sample_count=len(values),
-                        confidence=min(1.0, len(values) / 20)  # 20個樣本為滿信心
+                        sample_count=int(values.size),
+                        confidence=min(1.0, values.size / 20)  # 20個樣本為滿信心
                     )
                     
                     # 只保存高信心模式
@@ -588,33 +707,10 @@ class AdaptiveLearningCore:
             
             logger.info("⚙️ 開始參數優化...")
             
-            # 評估當前參數表現
-            current_performance = self._evaluate_current_performance()
-            
-            # 嘗試優化每個參數
-            optimization_results = []
-            
-            for param_name, current_value in self.current_parameters.items():
-                # 測試參數調整
-                test_values = [
-                    current_value * 0.9,
-                    current_value * 1.1,
-                    current_value * 0.8,
-                    current_value * 1.2
-                ]
-                
-                for test_value in test_values:
-                    # 模擬參數調整的影響
-                    simulated_performance = self._simulate_parameter_change(param_name, test_value)
-                    
-                    if simulated_performance > current_performance:
-                        improvement = simulated_performance - current_performance
-                        optimization_results.append({
-                            'parameter': param_name,
-                            'old_value': current_value,
-                            'new_value': test_value,
-                            'improvement': improvement
-                        })
+            # 優先使用反事實回放，資料不足時退回估算模式
+            optimization_results = await self._replay_parameter_candidates()
+            if optimization_results is None:
+                optimization_results = self._estimate_parameter_candidates()
             
             # 應用最佳優化
             if optimization_results:
@@ -642,85 +738,146 @@ class AdaptiveLearningCore:
         except Exception as e:
             logger.error(f"❌ 參數優化失敗: {e}")
     
-    def _evaluate_current_performance(self) -> float:
+    def _estimate_parameter_candidates(self) -> List[Dict[str, Any]]:
+        """估算模式：逐參數 ±10%/±20% 並以歷史表現估算影響"""
+        # 評估當前參數表現 - 本輪只計算一次權重與基準分數
+        current_performance = self._evaluate_current_performance(self._build_evaluation_window())
+        
+        optimization_results = []
+        
+        for param_name, current_value in self.current_parameters.items():
+            # 測試參數調整
+            test_values = np.array([0.9, 1.1, 0.8, 1.2]) * current_value
+            
+            # 模擬參數調整的影響
+            simulated = self._simulate_parameter_changes(param_name, test_values, current_performance)
+            
+            for test_value, simulated_performance in zip(test_values, simulated):
+                if simulated_performance > current_performance:
+                    improvement = float(simulated_performance - current_performance)
+                    optimization_results.append({
+                        'parameter': param_name,
+                        'old_value': current_value,
+                        'new_value': float(test_value),
+                        'improvement': improvement
+                    })
+        
+        return optimization_results
+    
+    async def _load_replay_dataset(self) -> Optional['ReplayDataset']:
+        """從信號資料庫載入已完成信號作為回放樣本"""
+        if self.replay_evaluator is None:
+            return None
+        
+        stored_signals = await signal_db.get_signals_for_learning(limit=self.learning_config['replay_signal_limit'])
+        dataset = ReplayDataset.from_stored_signals(stored_signals)
+        if len(dataset) < self.learning_config['min_signals_for_learning']:
+            logger.info(f"📉 回放樣本不足: {len(dataset)}/{self.learning_config['min_signals_for_learning']}")
+            return None
+        return dataset
+    
+    async def _replay_parameter_candidates(self) -> Optional[List[Dict[str, Any]]]:
+        """回放模式：逐參數 ±10%/±20% 的所有候選在搜索段一次性矩陣評估，最佳者須通過驗證段檢驗"""
+        try:
+            dataset = await self._load_replay_dataset()
+            if dataset is None:
+                return None
+            search_set, validation_set = dataset.split_by_time(self.replay_evaluator.validation_fraction)
+            
+            baseline = self.replay_evaluator.to_vector(self.current_parameters)
+            multipliers = np.array([0.9, 1.1, 0.8, 1.2])
+            
+            # (參數數 × 4, 參數數) 候選矩陣：每行只改變一個參數
+            candidates = np.repeat(baseline[None, :], len(REPLAY_PARAMETERS) * len(multipliers), axis=0)
+            rows = np.arange(candidates.shape[0])
+            columns = rows // len(multipliers)
+            candidates[rows, columns] *= np.tile(multipliers, len(REPLAY_PARAMETERS))
+            
+            loop = asyncio.get_running_loop()
+            scores = await loop.run_in_executor(
+                None, self.replay_evaluator.evaluate, search_set, np.vstack((baseline, candidates)), baseline
+            )
+            baseline_score, candidate_scores = scores[0], scores[1:]
+            if not np.isfinite(baseline_score):
+                baseline_score = 0.0  # 當前參數幾乎不交易時以「不交易」為參照
+            
+            logger.info(f"🔁 回放評估 {candidates.shape[0]} 個候選 × {len(search_set)} 個信號")
+            row = int(np.argmax(candidate_scores))
+            if not candidate_scores[row] > baseline_score:
+                return []
+            
+            # 只驗證搜索段的最佳候選，避免多重比較放大偶然提升
+            validation = await loop.run_in_executor(
+                None, self.replay_evaluator.validate, validation_set, candidates[row], baseline
+            )
+            if not validation['accepted'][0]:
+                logger.info(f"🔁 最佳候選未通過驗證段檢驗 (z={validation['z_score'][0]:.2f})，保留當前參數")
+                return []
+            
+            param_name = REPLAY_PARAMETERS[columns[row]]
+            return [{
+                'parameter': param_name,
+                'old_value': self.current_parameters[param_name],
+                'new_value': float(candidates[row, columns[row]]),
+                'improvement': float(validation['improvement'][0])
+            }]
+            
+        except Exception as e:
+            logger.error(f"❌ 反事實回放評估失敗，退回估算模式: {e}")
+            return None
+    
+    def _build_evaluation_window(self, last: int = 100) -> Dict[str, Any]:
+        """取最近信號的列快照並計算組合權重（時間衰減 × 分群），每輪學習只計算一次"""
+        window = self.signal_columns.recent(last)
+        # 時間權重（12小時衰減常數）
+        time_diff_hours = (datetime.now().timestamp() - window['timestamp']) / 3600
+        window['weight'] = np.exp(-time_diff_hours / 12) * window['category_weight']
+        return window
+    
+    def _evaluate_current_performance(self, window: Optional[Dict[str, Any]] = None) -> float:
         """評估當前參數表現 - 產品級時間衰減 + 分群學習版本"""
         try:
-            recent_signals = list(self.signal_history)[-100:]  # 增加到100個信號
-            if not recent_signals:
+            if window is None:
+                window = self._build_evaluation_window()  # 增加到100個信號
+            if window['weight'].size == 0:
                 return 0.0
-
-            # 計算時間加權 + 分群權重表現分數
-            weighted_scores = []
-            weighted_returns = []
-            total_weight = 0.0
-            current_time = datetime.now()
             
-            # 分群表現追蹤
-            category_performance = {'major': [], 'alt': [], 'meme': [], 'payment': []}
+            weights = window['weight']
+            scores = window['performance_score']
+            outcomes = window['actual_outcome']
             
-            for signal in recent_signals:
-                try:
-                    # 計算時間權重（12小時半衰期）
-                    time_diff_hours = (current_time - signal.timestamp).total_seconds() / 3600
-                    time_weight = np.exp(-time_diff_hours / 12)  # 指數衰減
-                    
-                    # 獲取幣種分群權重
-                    symbol = getattr(signal, 'symbol', 'UNKNOWN')
-                    category = self._get_symbol_category(symbol)
-                    category_weight = self._get_category_weight(symbol)
-                    
-                    # 組合權重：時間 × 分群
-                    combined_weight = time_weight * category_weight
-                    
-                    if signal.performance_score is not None:
-                        weighted_score = signal.performance_score * combined_weight
-                        weighted_scores.append(weighted_score)
-                        total_weight += combined_weight
-                        
-                        # 記錄分群表現
-                        if category in category_performance:
-                            category_performance[category].append({
-                                'score': signal.performance_score,
-                                'weight': combined_weight,
-                                'symbol': symbol
-                            })
-                        
-                    if signal.actual_outcome is not None:
-                        weighted_returns.append(signal.actual_outcome * combined_weight)
-                        
-                except Exception as signal_e:
-                    logger.warning(f"⚠️ 處理信號時出錯: {signal_e}")
-                    continue
-
-            if not weighted_scores:
+            # 時間 + 分群加權平均表現
+            scored = ~np.isnan(scores)
+            if not scored.any():
                 return 0.0
             
-            # 時間 + 分群加權平均表現
-            avg_weighted_performance = np.sum(weighted_scores) / total_weight if total_weight > 0 else 0.0
+            total_weight = float(weights[scored].sum())
+            avg_weighted_performance = float((scores[scored] * weights[scored]).sum()) / total_weight if total_weight > 0 else 0.0
             
             # 計算收益穩定性（加權）
-            if weighted_returns and len(weighted_returns) > 1:
-                weighted_std = np.std(weighted_returns)
-                return_stability = 1.0 / (1.0 + weighted_std)
+            has_outcome = ~np.isnan(outcomes)
+            weighted_returns = outcomes[has_outcome] * weights[has_outcome]
+            if weighted_returns.size > 1:
+                return_stability = 1.0 / (1.0 + float(weighted_returns.std()))
                 final_score = avg_weighted_performance * 0.7 + return_stability * 0.3
             else:
                 final_score = avg_weighted_performance
             
             # 分群洞察記錄
-            category_insights = {}
-            for category, performances in category_performance.items():
-                if performances:
-                    avg_score = np.mean([p['score'] for p in performances])
-                    total_cat_weight = sum([p['weight'] for p in performances])
-                    category_insights[category] = {
-                        'avg_performance': float(avg_score),
-                        'signal_count': len(performances),
-                        'total_weight': float(total_cat_weight),
-                        'symbols': list(set([p['symbol'] for p in performances]))
-                    }
-            
-            logger.debug(f"📊 分群加權表現評估: {final_score:.4f} (樣本: {len(weighted_scores)}, 總權重: {total_weight:.2f})")
-            logger.debug(f"🎯 分群洞察: {category_insights}")
+            if logger.isEnabledFor(logging.DEBUG):
+                category_insights = {}
+                for code, category in enumerate(SIGNAL_CATEGORIES):
+                    mask = scored & (window['category'] == code)
+                    if mask.any():
+                        category_insights[category] = {
+                            'avg_performance': float(scores[mask].mean()),
+                            'signal_count': int(mask.sum()),
+                            'total_weight': float(weights[mask].sum()),
+                            'symbols': list(set(window['symbol'][mask]))
+                        }
+                
+                logger.debug(f"📊 分群加權表現評估: {final_score:.4f} (樣本: {int(scored.sum())}, 總權重: {total_weight:.2f})")
+                logger.debug(f"🎯 分群洞察: {category_insights}")
             
             return final_score
         
@@ -728,36 +885,36 @@ class AdaptiveLearningCore:
             logger.error(f"❌ 表現評估失敗: {e}")
             return 0.0
     
-    def _simulate_parameter_change(self, param_name: str, new_value: float) -> float:
+    def _simulate_parameter_changes(self, param_name: str, new_values: np.ndarray, base_performance: float) -> np.ndarray:
+        """批量模擬參數改變的影響 - 所有候選值共用同一基準表現"""
+        new_values = np.asarray(new_values, dtype=float)
+        current_param_value = self.current_parameters[param_name]
+        
+        # 根據參數類型估算影響
+        if param_name == 'signal_threshold':
+            # 閾值越低，信號越多但質量可能下降
+            return np.where(new_values < current_param_value, base_performance * 0.95, base_performance * 1.02)
+        
+        elif param_name in ['momentum_weight', 'volume_weight', 'trend_sensitivity']:
+            # 權重調整的影響 - 防止除零錯誤
+            if current_param_value != 0:
+                change_ratio = new_values / current_param_value
+                within_range = (change_ratio >= 0.9) & (change_ratio <= 1.1)
+                # 大幅調整可能降低性能
+                return np.where(within_range, base_performance * (1.0 + (change_ratio - 1.0) * 0.1), base_performance * 0.98)
+            # 如果當前參數為0，使用默認增益
+            return np.full(new_values.shape, base_performance * 1.05)
+        
+        # 其他參數的一般性影響
+        return base_performance * np.random.uniform(0.98, 1.05, size=new_values.shape)
+    
+    def _simulate_parameter_change(self, param_name: str, new_value: float, base_performance: Optional[float] = None) -> float:
         """模擬參數改變的影響"""
         try:
             # 簡化的模擬：基於歷史模式估算影響
-            base_performance = self._evaluate_current_performance()
-            
-            # 根據參數類型估算影響
-            if param_name == 'signal_threshold':
-                # 閾值越低，信號越多但質量可能下降
-                if new_value < self.current_parameters[param_name]:
-                    return base_performance * 0.95  # 輕微降低
-                else:
-                    return base_performance * 1.02  # 輕微提升
-            
-            elif param_name in ['momentum_weight', 'volume_weight', 'trend_sensitivity']:
-                # 權重調整的影響 - 防止除零錯誤
-                current_param_value = self.current_parameters[param_name]
-                if current_param_value != 0:
-                    change_ratio = new_value / current_param_value
-                    if 0.9 <= change_ratio <= 1.1:
-                        return base_performance * (1.0 + (change_ratio - 1.0) * 0.1)
-                    else:
-                        return base_performance * 0.98  # 大幅調整可能降低性能
-                else:
-                    # 如果當前參數為0，使用默認增益
-                    return base_performance * 1.05
-            
-            else:
-                # 其他參數的一般性影響
-                return base_performance * np.random.uniform(0.98, 1.05)
+            if base_performance is None:
+                base_performance = self._evaluate_current_performance()
+            return float(self._simulate_parameter_changes(param_name, np.array([new_value]), base_performance)[0])
         
         except Exception as e:
             logger.error(f"❌ 參數模擬失敗: {e}")
@@ -819,33 +976,30 @@ class AdaptiveLearningCore:
     def _analyze_historical_performance(self) -> Dict[str, Any]:
         """分析歷史表現"""
         try:
-            recent_signals = list(self.signal_history)[-200:]  # 最近200個信號
+            columns = self.signal_columns.recent(200)  # 最近200個信號
             
             # 按時間段分析
+            now = datetime.now()
             time_segments = {
-                'last_week': [],
-                'last_month': [],
-                'all_time': recent_signals
+                'last_week': columns['timestamp'] > (now - timedelta(days=7)).timestamp(),
+                'last_month': columns['timestamp'] > (now - timedelta(days=30)).timestamp(),
+                'all_time': np.ones(columns['timestamp'].size, dtype=bool)
             }
             
-            now = datetime.now()
-            for signal in recent_signals:
-                if signal.timestamp > now - timedelta(days=7):
-                    time_segments['last_week'].append(signal)
-                if signal.timestamp > now - timedelta(days=30):
-                    time_segments['last_month'].append(signal)
-            
             analysis = {}
-            for period, signals in time_segments.items():
-                if signals:
-                    outcomes = [s.actual_outcome for s in signals if s.actual_outcome is not None]
-                    performance_scores = [s.performance_score for s in signals if s.performance_score is not None]
+            for period, mask in time_segments.items():
+                signal_count = int(mask.sum())
+                if signal_count:
+                    outcomes = columns['actual_outcome'][mask]
+                    outcomes = outcomes[~np.isnan(outcomes)]
+                    performance_scores = columns['performance_score'][mask]
+                    performance_scores = performance_scores[~np.isnan(performance_scores)]
                     
                     analysis[period] = {
-                        'signal_count': len(signals),
-                        'avg_return': np.mean(outcomes) if outcomes else 0.0,
-                        'success_rate': len([o for o in outcomes if o > 0]) / len(outcomes) if outcomes else 0.0,
-                        'avg_performance_score': np.mean(performance_scores) if performance_scores else 0.0
+                        'signal_count': signal_count,
+                        'avg_return': float(outcomes.mean()) if outcomes.size else 0.0,
+                        'success_rate': float((outcomes > 0).mean()) if outcomes.size else 0.0,
+                        'avg_performance_score': float(performance_scores.mean()) if performance_scores.size else 0.0
                     }
             
             return analysis
@@ -860,12 +1014,19 @@ class AdaptiveLearningCore:
             # 使用更精細的參數搜索
             optimization_rounds = 3
             
+            # 優先以反事實回放搜索整個參數向量
+            if await self._replay_parameter_search(optimization_rounds):
+                return
+            
+            # 基準表現不隨參數變化，整個優化流程只評估一次
+            base_performance = self._evaluate_current_performance(self._build_evaluation_window())
+            
             for round_num in range(optimization_rounds):
                 logger.info(f"⚙️ 參數優化輪次 {round_num + 1}/{optimization_rounds}")
                 
                 # 對每個參數進行精細調優
                 for param_name in self.current_parameters.keys():
-                    best_value = await self._optimize_single_parameter(param_name)
+                    best_value = await self._optimize_single_parameter(param_name, base_performance)
                     if best_value != self.current_parameters[param_name]:
                         old_value = self.current_parameters[param_name]
                         self.current_parameters[param_name] = best_value
@@ -874,25 +1035,70 @@ class AdaptiveLearningCore:
         except Exception as e:
             logger.error(f"❌ 全面參數優化失敗: {e}")
     
-    async def _optimize_single_parameter(self, param_name: str) -> float:
+    async def _replay_parameter_search(self, rounds: int) -> bool:
+        """以反事實回放進行多輪參數向量搜索，成功評估時返回 True"""
+        try:
+            dataset = await self._load_replay_dataset()
+            if dataset is None:
+                return False
+            
+            loop = asyncio.get_running_loop()
+            search_result = await loop.run_in_executor(
+                None,
+                lambda: self.replay_evaluator.search(
+                    dataset,
+                    self.current_parameters,
+                    n_candidates=self.learning_config['replay_candidates_per_round'],
+                    rounds=rounds
+                )
+            )
+            
+            if search_result['accepted']:
+                for param_name, best_value in search_result['best_parameters'].items():
+                    old_value = self.current_parameters[param_name]
+                    if best_value != old_value:
+                        self.current_parameters[param_name] = best_value
+                        self.parameter_history[param_name].append(ParameterOptimization(
+                            parameter_name=param_name,
+                            old_value=old_value,
+                            new_value=best_value,
+                            improvement_score=search_result['improvement'],
+                            optimization_time=datetime.now(),
+                            validation_results={
+                                'replay_score': search_result['best_score'],
+                                'baseline_score': search_result['baseline_score'],
+                                'validation_z': search_result['validation_z'],
+                                'signals_replayed': search_result['signals_replayed'],
+                                'signals_validated': search_result['signals_validated']
+                            }
+                        ))
+                        self.learning_stats['parameters_optimized'] += 1
+                        logger.info(f"🔧 {param_name}: {old_value:.3f} → {best_value:.3f}")
+            else:
+                logger.info(f"🔁 回放搜索未找到通過驗證的候選 (搜索提升 {search_result['search_improvement']:.4f}, "
+                            f"驗證 z={search_result['validation_z']:.2f})")
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ 反事實回放搜索失敗，退回估算模式: {e}")
+            return False
+    
+    async def _optimize_single_parameter(self, param_name: str, base_performance: Optional[float] = None) -> float:
         """優化單個參數"""
         try:
             current_value = self.current_parameters[param_name]
-            best_value = current_value
-            best_performance = self._evaluate_current_performance()
+            if base_performance is None:
+                base_performance = self._evaluate_current_performance()
             
             # 測試範圍
-            test_multipliers = [0.7, 0.8, 0.9, 1.1, 1.2, 1.3]
-            
-            for multiplier in test_multipliers:
-                test_value = current_value * multiplier
-                simulated_performance = self._simulate_parameter_change(param_name, test_value)
-                
-                if simulated_performance > best_performance:
-                    best_performance = simulated_performance
-                    best_value = test_value
+            test_values = np.array([0.7, 0.8, 0.9, 1.1, 1.2, 1.3]) * current_value
+            simulated = self._simulate_parameter_changes(param_name, test_values, base_performance)
             
-            return best_value
+            best_index = int(np.argmax(simulated))
+            if simulated[best_index] > base_performance:
+                return float(test_values[best_index])
+            return current_value
             
         except Exception as e:
             logger.error(f"❌ 單個參數優化失敗: {e}")
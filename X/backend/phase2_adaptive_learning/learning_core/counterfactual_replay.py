@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+🔁 Counterfactual Replay Evaluator
+反事實回放評估器 - 參數優化的真實回放
+
+以 SignalDatabase 中已完成的信號（特徵 + 實際結果）為樣本，
+在候選參數向量下重新計算信號強度、是否觸發與倉位，
+以 (候選 × 信號) 矩陣運算一次評估大量候選，並按候選分塊在執行緒池中並行。
+樣本按時間切分為搜索段與驗證段：候選只在較早的搜索段上挑選，
+並須在較新的驗證段上以顯著的效用提升勝過當前參數才會被採用。
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 參數向量的欄位順序
+REPLAY_PARAMETERS = (
+    'signal_threshold',
+    'momentum_weight',
+    'volume_weight',
+    'volatility_adjustment',
+    'trend_sensitivity',
+    'risk_multiplier'
+)
+
+# 各參數的搜索邊界（與反饋調整及 Phase2 參數管理器的範圍一致）
+PARAMETER_BOUNDS = {
+    'signal_threshold': (0.3, 0.8),
+    'momentum_weight': (0.5, 2.0),
+    'volume_weight': (0.3, 2.0),
+    'volatility_adjustment': (0.3, 2.5),
+    'trend_sensitivity': (0.5, 1.5),
+    'risk_multiplier': (0.5, 2.0)
+}
+
+# 方向 → 收益符號
+DIRECTION_SIGNS = {'BUY': 1.0, 'LONG': 1.0, 'SELL': -1.0, 'SHORT': -1.0}
+
+
+def _numeric(value: Any, default: float = 0.0) -> float:
+    return float(value) if isinstance(value, (int, float)) else default
+
+
+@dataclass
+class ReplayDataset:
+    """回放樣本 - 每個信號一行
+
+    exposures 四列依次為：方向動量、成交量、波動率、技術趨勢，
+    分別對應 momentum_weight / volume_weight / volatility_adjustment / trend_sensitivity 的變動。
+    """
+    strength: np.ndarray            # (N,) 原始信號強度
+    directional_return: np.ndarray  # (N,) 按方向調整後的實際收益
+    exposures: np.ndarray           # (N, 4) 參數敏感度
+    weights: np.ndarray             # (N,) 時間衰減權重，總和為 1
+    age_hours: np.ndarray           # (N,) 信號距今小時數，用於按時間切分
+
+    def __len__(self) -> int:
+        return int(self.strength.size)
+
+    def subset(self, index: np.ndarray) -> 'ReplayDataset':
+        """取部分信號，權重重新歸一化"""
+        weights = self.weights[index]
+        total = weights.sum()
+        return ReplayDataset(
+            strength=self.strength[index],
+            directional_return=self.directional_return[index],
+            exposures=self.exposures[index],
+            weights=weights / total if total > 0 else weights,
+            age_hours=self.age_hours[index]
+        )
+
+    def split_by_time(self, validation_fraction: float) -> Tuple['ReplayDataset', 'ReplayDataset']:
+        """按時間切分為 (較早的搜索段, 較新的驗證段)"""
+        order = np.argsort(-self.age_hours, kind='stable')  # 由舊到新
+        validation_size = int(round(len(self) * validation_fraction))
+        split = len(self) - validation_size
+        return self.subset(order[:split]), self.subset(order[split:])
+
+    @classmethod
+    def from_stored_signals(cls, signals: Sequence[Any], now: Optional[datetime] = None,
+                            decay_hours: float = 168.0) -> 'ReplayDataset':
+        """由 StoredSignal 列表建立回放樣本（只使用有實際結果的信號）"""
+        signals = [s for s in signals if s.actual_outcome is not None]
+        now = now or datetime.now()
+        count = len(signals)
+
+        strength = np.empty(count)
+        outcome = np.empty(count)
+        direction = np.empty(count)
+        raw = np.zeros((count, 4))
+        age_hours = np.empty(count)
+
+        for i, signal in enumerate(signals):
+            features = signal.features or {}
+            conditions = signal.market_conditions or {}
+            signal_type = getattr(signal.signal_type, 'value', signal.signal_type)
+
+            strength[i] = _numeric(signal.signal_strength)
+            outcome[i] = signal.actual_outcome
+            direction[i] = DIRECTION_SIGNS.get(str(signal_type).upper(), 0.0)
+            raw[i, 0] = _numeric(features.get('price_change'))
+            raw[i, 1] = _numeric(features.get('volume_ratio'), 1.0)
+            raw[i, 2] = _numeric(conditions.get('volatility', features.get('volatility')))
+            raw[i, 3] = _numeric(features.get('technical_strength'), 0.5)
+            age_hours[i] = (now - signal.timestamp).total_seconds() / 3600
+
+        exposures = np.column_stack((
+            np.tanh(direction * raw[:, 0]),                         # 與方向一致的動量加分
+            np.tanh(np.log(np.where(raw[:, 1] > 0, raw[:, 1], 1.0))),  # 放量加分、縮量扣分
+            -np.clip(raw[:, 2], 0.0, 1.0),                          # 波動調整越大，高波動信號扣分越多
+            np.clip(raw[:, 3], 0.0, 1.0) - 0.5                      # 技術趨勢強度
+        )) if count else np.zeros((0, 4))
+
+        weights = np.exp(-np.maximum(age_hours, 0.0) / decay_hours)
+        total = weights.sum()
+        weights = weights / total if total > 0 else weights
+
+        return cls(
+            strength=strength,
+            directional_return=direction * outcome,
+            exposures=exposures,
+            weights=weights,
+            age_hours=age_hours
+        )
+
+
+class CounterfactualReplayEvaluator:
+    """反事實回放評估器 - 候選參數 × 信號的矩陣化評分"""
+
+    def __init__(self, max_workers: int = 4, chunk_size: int = 64,
+                 risk_aversion: float = 2.0, min_trade_ratio: float = 0.05,
+                 validation_fraction: float = 0.3, min_validation_z: float = 2.0):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.risk_aversion = risk_aversion
+        self.min_trade_ratio = min_trade_ratio
+        self.validation_fraction = validation_fraction  # 最新信號中留作驗證的比例
+        self.min_validation_z = min_validation_z        # 驗證段效用提升所需的 z 值
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def to_vector(parameters: Dict[str, float]) -> np.ndarray:
+        return np.array([parameters[name] for name in REPLAY_PARAMETERS], dtype=float)
+
+    @staticmethod
+    def to_parameters(vector: np.ndarray) -> Dict[str, float]:
+        return {name: float(value) for name, value in zip(REPLAY_PARAMETERS, vector)}
+
+    @staticmethod
+    def clip_to_bounds(candidates: np.ndarray) -> np.ndarray:
+        lower = np.array([PARAMETER_BOUNDS[name][0] for name in REPLAY_PARAMETERS])
+        upper = np.array([PARAMETER_BOUNDS[name][1] for name in REPLAY_PARAMETERS])
+        return np.clip(candidates, lower, upper)
+
+    @staticmethod
+    def _replay_pnl(dataset: ReplayDataset, candidates: np.ndarray,
+                    baseline: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(K, N) 回放收益與是否觸發"""
+        # (K, 4) 權重變動 × (4, N) 敏感度 → (K, N) 回放強度
+        deltas = candidates[:, 1:5] - baseline[1:5]
+        replay_strength = dataset.strength[None, :] + deltas @ dataset.exposures.T
+        taken = replay_strength >= candidates[:, 0:1]
+
+        pnl = np.where(taken, dataset.directional_return[None, :], 0.0) * candidates[:, 5:6]
+        return pnl, taken
+
+    def _score_chunk(self, dataset: ReplayDataset, candidates: np.ndarray, baseline: np.ndarray) -> np.ndarray:
+        """一個候選分塊的效用分數: 加權平均收益 - 風險厭惡 × 方差 / 2"""
+        pnl, taken = self._replay_pnl(dataset, candidates, baseline)
+        mean = pnl @ dataset.weights
+        variance = np.maximum((pnl * pnl) @ dataset.weights - mean * mean, 0.0)
+        utility = mean - 0.5 * self.risk_aversion * variance
+
+        # 幾乎不交易的候選沒有統計意義
+        trade_ratio = taken.astype(float) @ dataset.weights
+        return np.where(trade_ratio >= self.min_trade_ratio, utility, -np.inf)
+
+    def evaluate(self, dataset: ReplayDataset, candidates: np.ndarray, baseline: np.ndarray) -> np.ndarray:
+        """評估 (K, 6) 候選參數矩陣，返回 (K,) 效用分數"""
+        candidates = np.atleast_2d(np.asarray(candidates, dtype=float))
+        if len(dataset) == 0 or candidates.shape[0] == 0:
+            return np.full(candidates.shape[0], -np.inf)
+
+        chunks = [candidates[i:i + self.chunk_size] for i in range(0, candidates.shape[0], self.chunk_size)]
+        if len(chunks) == 1 or self.max_workers <= 1:
+            return np.concatenate([self._score_chunk(dataset, chunk, baseline) for chunk in chunks])
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="CounterfactualReplay")
+        results = self._executor.map(lambda chunk: self._score_chunk(dataset, chunk, baseline), chunks)
+        return np.concatenate(list(results))
+
+    def validate(self, dataset: ReplayDataset, candidates: np.ndarray, baseline: np.ndarray) -> Dict[str, np.ndarray]:
+        """在驗證段上檢驗候選相對當前參數的效用提升
+
+        逐信號效用貢獻 pnl - 風險厭惡 × (pnl - 均值)² / 2 的加權平均即為效用分數，
+        對候選與當前參數的逐信號差值做配對 z 檢驗，只有顯著為正才接受。
+        """
+        candidates = np.atleast_2d(np.asarray(candidates, dtype=float))
+        count = candidates.shape[0]
+        if len(dataset) == 0 or count == 0:
+            return {'improvement': np.zeros(count), 'z_score': np.zeros(count), 'accepted': np.zeros(count, dtype=bool)}
+
+        scores = self.evaluate(dataset, np.vstack((baseline, candidates)), baseline)
+        reference = scores[0] if np.isfinite(scores[0]) else 0.0
+        improvement = scores[1:] - reference
+
+        pnl, _ = self._replay_pnl(dataset, np.vstack((baseline, candidates)), baseline)
+        mean = pnl @ dataset.weights
+        contribution = pnl - 0.5 * self.risk_aversion * (pnl - mean[:, None]) ** 2
+        difference = contribution[1:] - contribution[0]
+
+        diff_mean = difference @ dataset.weights
+        diff_var = np.maximum((difference * difference) @ dataset.weights - diff_mean * diff_mean, 0.0)
+        effective_n = 1.0 / float(dataset.weights @ dataset.weights)
+        std_error = np.sqrt(diff_var / effective_n)
+        z_score = np.divide(diff_mean, std_error, out=np.where(diff_mean > 0, np.inf, 0.0), where=std_error > 0)
+
+        accepted = np.isfinite(improvement) & (improvement > 0) & (z_score >= self.min_validation_z)
+        return {'improvement': improvement, 'z_score': z_score, 'accepted': accepted}
+
+    def search(self, dataset: ReplayDataset, parameters: Dict[str, float], n_candidates: int = 256,
+               rounds: int = 3, spread: float = 0.3, seed: Optional[int] = None) -> Dict[str, Any]:
+        """隨機局部搜索: 每輪在當前最佳點附近採樣 n_candidates 個候選，範圍逐輪減半
+
+        搜索只使用較早的信號；最佳候選須通過較新信號的驗證，否則保留當前參數。
+        """
+        start_time = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        search_set, validation_set = dataset.split_by_time(self.validation_fraction)
+        baseline = self.to_vector(parameters)
+        baseline_score = float(self.evaluate(search_set, baseline, baseline)[0])
+
+        best_vector, best_score = baseline, baseline_score
+        for round_num in range(rounds):
+            round_spread = spread / (2 ** round_num)
+            scale = rng.uniform(1.0 - round_spread, 1.0 + round_spread, size=(n_candidates, baseline.size))
+            candidates = self.clip_to_bounds(best_vector * scale)
+            scores = self.evaluate(search_set, candidates, baseline)
+            index = int(np.argmax(scores))
+            if scores[index] > best_score:
+                best_vector, best_score = candidates[index], float(scores[index])
+
+        # 基準參數交易不足時以「不交易」(效用 0) 為參照
+        reference = baseline_score if np.isfinite(baseline_score) else 0.0
+        search_improvement = best_score - reference if np.isfinite(best_score) else 0.0
+
+        validation = self.validate(validation_set, best_vector, baseline)
+        validation_improvement = float(validation['improvement'][0])
+        validation_z = float(validation['z_score'][0])
+        accepted = search_improvement > 0 and bool(validation['accepted'][0])
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"🔁 反事實回放搜索: {rounds * n_candidates} 候選 × {len(search_set)} 信號, "
+                    f"驗證 {len(validation_set)} 信號 z={validation_z:.2f}, 耗時 {elapsed_ms:.0f}ms")
+
+        return {
+            'best_parameters': self.to_parameters(best_vector if accepted else baseline),
+            'best_score': best_score,
+            'baseline_score': baseline_score,
+            'improvement': validation_improvement if accepted else 0.0,
+            'search_improvement': search_improvement,
+            'validation_improvement': validation_improvement,
+            'validation_z': validation_z,
+            'accepted': accepted,
+            'candidates_evaluated': rounds * n_candidates,
+            'signals_replayed': len(search_set),
+            'signals_validated': len(validation_set),
+            'elapsed_ms': elapsed_ms
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
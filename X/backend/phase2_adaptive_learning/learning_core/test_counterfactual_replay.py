@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+反事實回放測試 - 純噪聲結果不應移動參數，真實可預測的結果應通過驗證段檢驗
+
+    python test_counterfactual_replay.py
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# 添加路徑
+sys.path.append(str(Path(__file__).parent))
+
+from counterfactual_replay import CounterfactualReplayEvaluator, ReplayDataset
+
+NOW = datetime(2025, 1, 1)
+PARAMETERS = {
+    'signal_threshold': 0.6,
+    'momentum_weight': 1.0,
+    'volume_weight': 0.8,
+    'volatility_adjustment': 1.0,
+    'trend_sensitivity': 1.0,
+    'risk_multiplier': 1.0
+}
+
+
+def _signals(rng: np.random.Generator, count: int, outcome_fn):
+    """每小時一個已完成信號；outcome_fn(technical_strength, 噪聲) → 按方向的實際收益"""
+    signals = []
+    for i in range(count):
+        direction = 'BUY' if rng.random() < 0.5 else 'SELL'
+        technical_strength = float(rng.uniform(0.0, 1.0))
+        directional_outcome = outcome_fn(technical_strength, float(rng.normal(0.001, 0.02)))
+        signals.append(SimpleNamespace(
+            signal_type=direction,
+            signal_strength=float(rng.uniform(0.4, 0.9)),
+            actual_outcome=directional_outcome if direction == 'BUY' else -directional_outcome,
+            features={
+                'price_change': float(rng.normal(0.0, 0.02)),
+                'volume_ratio': float(rng.lognormal(0.0, 0.3)),
+                'technical_strength': technical_strength
+            },
+            market_conditions={'volatility': float(rng.uniform(0.0, 0.1))},
+            timestamp=NOW - timedelta(hours=count - i)
+        ))
+    return signals
+
+
+def test_split_by_time_validates_on_newest_signals():
+    rng = np.random.default_rng(0)
+    dataset = ReplayDataset.from_stored_signals(_signals(rng, 100, lambda _, noise: noise), now=NOW)
+    search_set, validation_set = dataset.split_by_time(0.3)
+
+    assert len(search_set) == 70 and len(validation_set) == 30
+    assert search_set.age_hours.min() > validation_set.age_hours.max()
+    assert abs(search_set.weights.sum() - 1.0) < 1e-12
+    assert abs(validation_set.weights.sum() - 1.0) < 1e-12
+
+
+def test_pure_noise_leaves_parameters_unchanged():
+    evaluator = CounterfactualReplayEvaluator(max_workers=1)
+    for seed in range(5):
+        rng = np.random.default_rng(seed)
+        dataset = ReplayDataset.from_stored_signals(_signals(rng, 2000, lambda _, noise: noise), now=NOW)
+        result = evaluator.search(dataset, PARAMETERS, n_candidates=256, rounds=3, seed=seed)
+
+        # 搜索段上總能挑到「更好」的候選，但它不應通過驗證段
+        assert result['search_improvement'] > 0, seed
+        assert not result['accepted'], (seed, result['validation_z'])
+        assert result['improvement'] == 0.0
+        assert result['best_parameters'] == evaluator.to_parameters(evaluator.to_vector(PARAMETERS))
+
+
+def test_predictive_trend_is_accepted():
+    evaluator = CounterfactualReplayEvaluator(max_workers=1)
+    rng = np.random.default_rng(42)
+    # 技術趨勢越強收益越好：提高 trend_sensitivity 應在驗證段同樣有效
+    dataset = ReplayDataset.from_stored_signals(
+        _signals(rng, 2000, lambda trend, noise: 0.04 * (trend - 0.5) + noise), now=NOW
+    )
+    result = evaluator.search(dataset, PARAMETERS, n_candidates=256, rounds=3, seed=42)
+
+    assert result['accepted'], result['validation_z']
+    assert result['improvement'] > 0
+    assert result['best_parameters'] != PARAMETERS
+
+
+if __name__ == "__main__":
+    for test in (test_split_by_time_validates_on_newest_signals,
+                 test_pure_noise_leaves_parameters_unchanged,
+                 test_predictive_trend_is_accepted):
+        test()
+        print(f"✅ {test.__name__}")
@@ -16,7 +16,7 @@ Phase 2 - Step 1: 市場狀態檢測增強
 import asyncio
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Sequence
 from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass
@@ -90,16 +90,221 @@ class RegimeTransition:
     transition_strength: float
     key_indicators: List[str]
 
+# 特徵欄位順序 - 與 MarketFeatures 一致
+FEATURE_NAMES = ('volatility', 'trend_strength', 'momentum', 'volume_profile', 'price_action', 'cycle_position')
+
+class RollingRegimeFeatureEngine:
+    """滾動窗口市場特徵引擎 - 多幣種 2-D 環形緩衝區
+
+    每個幣種佔一行，收到已收盤K線時以 O(1) 更新滾動和（價格、價格×位置、收益、收益平方、成交量），
+    特徵計算對整個觀察列表一次向量化完成。窗口內的結果與
+    AdvancedMarketRegimeDetector._calculate_market_features 對最近 window 根K線的計算一致。
+    """
+
+    def __init__(self, window: int = 100, min_bars: int = 20, initial_symbols: int = 16):
+        if window < 15:
+            raise ValueError("window 至少需要 15 根K線（動量使用最近14根）")
+        self.window = window
+        self.min_bars = min_bars
+        self.symbol_index: Dict[str, int] = {}
+
+        capacity = max(1, initial_symbols)
+        self._close = np.zeros((capacity, window))
+        self._high = np.zeros((capacity, window))
+        self._low = np.zeros((capacity, window))
+        self._volume = np.zeros((capacity, window))
+        self._returns = np.zeros((capacity, window - 1))
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._sum_price = np.zeros(capacity)
+        self._sum_index_price = np.zeros(capacity)
+        self._sum_volume = np.zeros(capacity)
+        self._sum_return = np.zeros(capacity)
+        self._sum_return_sq = np.zeros(capacity)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.symbol_index.keys())
+
+    def _grow(self):
+        """幣種容量倍增"""
+        capacity = self._count.size * 2
+        for name in ('_close', '_high', '_low', '_volume', '_returns'):
+            old = getattr(self, name)
+            new = np.zeros((capacity, old.shape[1]))
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+        for name in ('_count', '_sum_price', '_sum_index_price', '_sum_volume', '_sum_return', '_sum_return_sq'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:old.size] = old
+            setattr(self, name, new)
+
+    def rows_for(self, symbols: Sequence[str]) -> np.ndarray:
+        """幣種 → 行索引，未見過的幣種自動分配新行"""
+        rows = []
+        for symbol in symbols:
+            row = self.symbol_index.get(symbol)
+            if row is None:
+                row = len(self.symbol_index)
+                if row >= self._count.size:
+                    self._grow()
+                self.symbol_index[symbol] = row
+            rows.append(row)
+        return np.asarray(rows, dtype=np.int64)
+
+    def update(self, symbols: Sequence[str], closes, highs, lows, volumes) -> np.ndarray:
+        """以一批已收盤K線更新滾動統計（同一批次中每個幣種最多出現一次），返回行索引"""
+        rows = self.rows_for(symbols)
+        if np.unique(rows).size != rows.size:
+            # 同一幣種多根K線時按順序逐根更新
+            for i, symbol in enumerate(symbols):
+                self.update([symbol], [closes[i]], [highs[i]], [lows[i]], [volumes[i]])
+            return self.rows_for(list(dict.fromkeys(symbols)))
+
+        close = np.asarray(closes, dtype=float)
+        high = np.asarray(highs, dtype=float)
+        low = np.asarray(lows, dtype=float)
+        volume = np.asarray(volumes, dtype=float)
+
+        window = self.window
+        return_window = window - 1
+        count = self._count[rows]
+        pos = count % window
+        full = count >= window
+
+        # 收益環形緩衝區（窗口內 n 根價格對應 n-1 個收益）
+        has_prev = count > 0
+        if has_prev.any():
+            prev_rows = rows[has_prev]
+            prev_count = count[has_prev]
+            prev_close = self._close[prev_rows, (prev_count - 1) % window]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ret = np.where(prev_close != 0, (close[has_prev] - prev_close) / prev_close, 0.0)
+            return_pos = (prev_count - 1) % return_window
+            old_ret = np.where(prev_count - 1 >= return_window, self._returns[prev_rows, return_pos], 0.0)
+            self._sum_return[prev_rows] += ret - old_ret
+            self._sum_return_sq[prev_rows] += ret * ret - old_ret * old_ret
+            self._returns[prev_rows, return_pos] = ret
+
+        # 價格滾動和；窗口已滿時所有位置左移一位: Σi·p -= Σp - p_oldest
+        old_close = np.where(full, self._close[rows, pos], 0.0)
+        old_volume = np.where(full, self._volume[rows, pos], 0.0)
+        sum_price = self._sum_price[rows]
+        self._sum_index_price[rows] = np.where(
+            full,
+            self._sum_index_price[rows] - (sum_price - old_close) + (window - 1) * close,
+            self._sum_index_price[rows] + count * close
+        )
+        self._sum_price[rows] = sum_price - old_close + close
+        self._sum_volume[rows] += volume - old_volume
+
+        self._close[rows, pos] = close
+        self._high[rows, pos] = high
+        self._low[rows, pos] = low
+        self._volume[rows, pos] = volume
+        self._count[rows] = count + 1
+
+        # 每滿一個窗口以緩衝區精確重算滾動和，消除浮點累積誤差（此時緩衝區恰好按時間排列）
+        resync = rows[(count + 1) % window == 0]
+        if resync.size:
+            self._sum_price[resync] = self._close[resync].sum(axis=1)
+            self._sum_index_price[resync] = self._close[resync] @ np.arange(window, dtype=float)
+            self._sum_volume[resync] = self._volume[resync].sum(axis=1)
+            self._sum_return[resync] = self._returns[resync].sum(axis=1)
+            self._sum_return_sq[resync] = (self._returns[resync] ** 2).sum(axis=1)
+
+        return rows
+
+    def _recent(self, buffer: np.ndarray, rows: np.ndarray, bars: int) -> np.ndarray:
+        """取各行最近 bars 根數據 (最新在前)"""
+        offsets = (self._count[rows, None] - 1 - np.arange(bars)[None, :]) % self.window
+        return np.take_along_axis(buffer[rows], offsets, axis=1)
+
+    def feature_matrix(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """計算特徵矩陣 (len(rows), 6)，欄位順序見 FEATURE_NAMES"""
+        if rows is None:
+            rows = np.arange(len(self.symbol_index), dtype=np.int64)
+        features = np.tile(np.array([0.3, 0.0, 0.0, 1.0, 0.0, 0.5]), (rows.size, 1))
+        ready = self._count[rows] >= self.min_bars
+        if not ready.any():
+            return features
+        rows = rows[ready]
+
+        n = np.minimum(self._count[rows], self.window).astype(float)
+        n_returns = n - 1
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 1. 波動度 (收益標準差)
+            mean_return = self._sum_return[rows] / n_returns
+            variance = np.maximum(self._sum_return_sq[rows] / n_returns - mean_return ** 2, 0.0)
+            volatility = np.minimum(1.0, np.sqrt(variance) * np.sqrt(24) * 5)
+
+            # 2. 趨勢強度 (最小二乘斜率 / 均價)
+            sum_index = n * (n - 1) / 2
+            sum_index_sq = (n - 1) * n * (2 * n - 1) / 6
+            sum_price = self._sum_price[rows]
+            slope = (n * self._sum_index_price[rows] - sum_index * sum_price) / (n * sum_index_sq - sum_index ** 2)
+            trend_strength = np.tanh(slope / (sum_price / n) * 100)
+
+            # 3. 動量 (7 / 14 均線)
+            recent_close = self._recent(self._close, rows, 14)
+            sma_fast = recent_close[:, :7].mean(axis=1)
+            sma_slow = recent_close.mean(axis=1)
+            momentum = np.tanh((sma_fast - sma_slow) / sma_slow * 10)
+
+            # 4. 成交量特徵
+            avg_volume = self._sum_volume[rows] / n
+            recent_volume = self._recent(self._volume, rows, 5).mean(axis=1)
+            volume_profile = np.where(avg_volume > 0, np.minimum(2.0, recent_volume / avg_volume), 1.0)
+
+            # 5. 價格行為 (最近5根高低點位置)
+            recent_high = self._recent(self._high, rows, 5).max(axis=1)
+            recent_low = self._recent(self._low, rows, 5).min(axis=1)
+            price_range = recent_high - recent_low
+            price_action = np.where(price_range > 0, ((recent_close[:, 0] - recent_low) / price_range - 0.5) * 2, 0.0)
+
+        # 6. 週期位置
+        cycle_position = np.minimum(1.0, n / 100)
+
+        computed = np.column_stack((volatility, trend_strength, momentum, volume_profile, price_action, cycle_position))
+        features[ready] = np.nan_to_num(computed)
+        return features
+
+    def get_features(self, symbol: str) -> Optional[MarketFeatures]:
+        """單一幣種的當前特徵"""
+        row = self.symbol_index.get(symbol)
+        if row is None:
+            return None
+        values = self.feature_matrix(np.array([row], dtype=np.int64))[0]
+        return MarketFeatures(**{name: float(value) for name, value in zip(FEATURE_NAMES, values)})
+
 class AdvancedMarketRegimeDetector:
     """增強版市場狀態檢測器 - Phase 2 Step 1"""
     
-    def __init__(self):
+    # 各狀態的評分項: (特徵, 是否取絕對值, 是否越高越好)，閾值取自 regime_thresholds
+    REGIME_SCORE_TERMS = {
+        MarketRegime.BULL_TREND: [('trend_strength', False, True), ('momentum', False, True), ('volatility', False, False)],
+        MarketRegime.BEAR_TREND: [('trend_strength', False, False), ('momentum', False, False), ('volatility', False, False)],
+        MarketRegime.BREAKOUT_UP: [('momentum', False, True), ('volume_profile', False, True), ('price_action', False, True)],
+        MarketRegime.BREAKOUT_DOWN: [('momentum', False, False), ('volume_profile', False, True), ('price_action', False, False)],
+        MarketRegime.VOLATILE: [('volatility', False, True), ('trend_strength', True, False)],
+        MarketRegime.SIDEWAYS: [('trend_strength', True, False), ('volatility', False, False)],
+        MarketRegime.CONSOLIDATION: [('volatility', False, False), ('volume_profile', False, False)],
+        MarketRegime.TRENDING: [('trend_strength', True, True), ('momentum', True, True)]
+    }
+    
+    def __init__(self, feature_window: int = 100):
         self.current_regime = MarketRegime.UNKNOWN
         self.regime_history = []
         self.feature_weights = self._initialize_feature_weights()
         self.regime_thresholds = self._initialize_regime_thresholds()
         self.detection_cache = {}
         
+        # 流式特徵引擎與向量化閾值矩陣（觀察列表逐K線檢測）
+        self.feature_engine = RollingRegimeFeatureEngine(window=feature_window)
+        self.symbol_regimes: Dict[str, RegimeConfidence] = {}
+        self.rebuild_threshold_matrix()
+        
         # 檢測統計
         self.detection_stats = {
             'total_detections': 0,
@@ -176,16 +381,14 @@ class AdvancedMarketRegimeDetector:
             # 計算市場特徵
             features = self._calculate_market_features(market_data)
             
-            # 評估所有可能的狀態
-            regime_scores = {}
-            for regime in MarketRegime:
-                if regime != MarketRegime.UNKNOWN:
-                    score = self._calculate_regime_score(features, regime)
-                    regime_scores[regime] = score
+            # 評估所有可能的狀態 - 閾值矩陣一次計算
+            feature_row = np.array([[getattr(features, name) for name in FEATURE_NAMES]])
+            regime_scores = self.score_regimes(feature_row)[0]
             
             # 找出最佳匹配狀態
-            best_regime = max(regime_scores, key=regime_scores.get)
-            confidence = regime_scores[best_regime]
+            best_index = int(np.argmax(regime_scores))
+            best_regime = self._scored_regimes[best_index]
+            confidence = float(regime_scores[best_index])
             
             # 計算穩定性分數
             stability = self._calculate_stability_score(features, best_regime)
@@ -318,41 +521,9 @@ class AdvancedMarketRegimeDetector:
             score = 0.0
             
             # 根據狀態類型計算匹配分數
-            if regime == MarketRegime.BULL_TREND:
-                score += self._score_threshold(features.trend_strength, thresholds['trend_strength'], True)
-                score += self._score_threshold(features.momentum, thresholds['momentum'], True)
-                score += self._score_threshold(features.volatility, thresholds['volatility'], False)
-                
-            elif regime == MarketRegime.BEAR_TREND:
-                score += self._score_threshold(features.trend_strength, thresholds['trend_strength'], False)
-                score += self._score_threshold(features.momentum, thresholds['momentum'], False)
-                score += self._score_threshold(features.volatility, thresholds['volatility'], False)
-                
-            elif regime == MarketRegime.BREAKOUT_UP:
-                score += self._score_threshold(features.momentum, thresholds['momentum'], True)
-                score += self._score_threshold(features.volume_profile, thresholds['volume_profile'], True)
-                score += self._score_threshold(features.price_action, thresholds['price_action'], True)
-                
-            elif regime == MarketRegime.BREAKOUT_DOWN:
-                score += self._score_threshold(features.momentum, thresholds['momentum'], False)
-                score += self._score_threshold(features.volume_profile, thresholds['volume_profile'], True)
-                score += self._score_threshold(features.price_action, thresholds['price_action'], False)
-                
-            elif regime == MarketRegime.VOLATILE:
-                score += self._score_threshold(features.volatility, thresholds['volatility'], True)
-                score += self._score_threshold(abs(features.trend_strength), thresholds['trend_strength'], False)
-                
-            elif regime == MarketRegime.SIDEWAYS:
-                score += self._score_threshold(abs(features.trend_strength), thresholds['trend_strength'], False)
-                score += self._score_threshold(features.volatility, thresholds['volatility'], False)
-                
-            elif regime == MarketRegime.CONSOLIDATION:
-                score += self._score_threshold(features.volatility, thresholds['volatility'], False)
-                score += self._score_threshold(features.volume_profile, thresholds['volume_profile'], False)
-                
-            elif regime == MarketRegime.TRENDING:
-                score += self._score_threshold(abs(features.trend_strength), thresholds['trend_strength'], True)
-                score += self._score_threshold(abs(features.momentum), thresholds['momentum'], True)
+            for feature_name, use_abs, higher_is_better in self.REGIME_SCORE_TERMS.get(regime, []):
+                value = getattr(features, feature_name)
+                score += self._score_threshold(abs(value) if use_abs else value, thresholds[feature_name], higher_is_better)
             
             return min(1.0, max(0.0, score / 3))  # 標準化到0-1
             
@@ -360,6 +531,129 @@ class AdvancedMarketRegimeDetector:
             logger.error(f"❌ 狀態分數計算失敗: {e}")
             return 0.0
     
+    def rebuild_threshold_matrix(self):
+        """由 regime_thresholds 與 REGIME_SCORE_TERMS 建立 (狀態 × 評分項) 閾值矩陣；修改閾值後需重新調用"""
+        self._scored_regimes = [regime for regime in MarketRegime if regime != MarketRegime.UNKNOWN]
+        max_terms = max(len(terms) for terms in self.REGIME_SCORE_TERMS.values())
+        shape = (len(self._scored_regimes), max_terms)
+        
+        self._term_feature = np.zeros(shape, dtype=np.int64)
+        self._term_abs = np.zeros(shape, dtype=bool)
+        self._term_higher = np.zeros(shape, dtype=bool)
+        self._term_threshold = np.ones(shape)
+        self._term_valid = np.zeros(shape, dtype=bool)
+        
+        for i, regime in enumerate(self._scored_regimes):
+            if regime not in self.regime_thresholds:
+                continue
+            for j, (feature_name, use_abs, higher_is_better) in enumerate(self.REGIME_SCORE_TERMS.get(regime, [])):
+                self._term_feature[i, j] = FEATURE_NAMES.index(feature_name)
+                self._term_abs[i, j] = use_abs
+                self._term_higher[i, j] = higher_is_better
+                self._term_threshold[i, j] = self.regime_thresholds[regime][feature_name]
+                self._term_valid[i, j] = True
+        
+        # 穩定性評分模式: 0=中性, 1=正向一致, 2=反向一致
+        def modes(positive, negative):
+            return np.array([1 if r in positive else 2 if r in negative else 0 for r in self._scored_regimes])
+        
+        self._stability_volatility_mode = modes(
+            [MarketRegime.VOLATILE], [MarketRegime.CONSOLIDATION, MarketRegime.SIDEWAYS])
+        self._stability_trend_mode = modes(
+            [MarketRegime.BULL_TREND, MarketRegime.TRENDING, MarketRegime.BEAR_TREND], [MarketRegime.SIDEWAYS, MarketRegime.CONSOLIDATION])
+        self._stability_momentum_mode = modes(
+            [MarketRegime.BREAKOUT_UP, MarketRegime.BULL_TREND], [MarketRegime.BREAKOUT_DOWN, MarketRegime.BEAR_TREND])
+    
+    def score_regimes(self, features: np.ndarray) -> np.ndarray:
+        """向量化狀態評分: (幣種, 6) 特徵 → (幣種, 狀態) 分數，狀態順序見 _scored_regimes"""
+        values = features[:, self._term_feature]
+        values = np.where(self._term_abs, np.abs(values), values)
+        threshold = self._term_threshold
+        
+        higher = np.where(values >= threshold, 1.0, np.maximum(0.0, values / threshold))
+        lower = np.where(values <= threshold, 1.0, np.maximum(0.0, 1.0 - (values - threshold) / threshold))
+        terms = np.where(self._term_higher, higher, lower) * self._term_valid
+        
+        return np.clip(terms.sum(axis=-1) / 3, 0.0, 1.0)
+    
+    def _stability_scores(self, features: np.ndarray, regime_index: np.ndarray) -> np.ndarray:
+        """向量化穩定性分數，與 _calculate_stability_score 一致"""
+        volatility = features[:, 0]
+        trend = np.abs(features[:, 1])
+        momentum = features[:, 2]
+        
+        volatility_mode = self._stability_volatility_mode[regime_index]
+        trend_mode = self._stability_trend_mode[regime_index]
+        momentum_mode = self._stability_momentum_mode[regime_index]
+        
+        volatility_score = np.select([volatility_mode == 1, volatility_mode == 2], [volatility, 1.0 - volatility], 0.5)
+        trend_score = np.select([trend_mode == 1, trend_mode == 2], [trend, 1.0 - trend], 0.5)
+        momentum_score = np.select(
+            [momentum_mode == 1, momentum_mode == 2],
+            [np.maximum(0, momentum), np.maximum(0, -momentum)],
+            1.0 - np.abs(momentum)
+        )
+        return (volatility_score + trend_score + momentum_score) / 3
+    
+    def update_bars(self, bars: Sequence[MarketData]) -> Dict[str, RegimeConfidence]:
+        """觀察列表逐K線檢測 - 以已收盤K線更新流式特徵，並對所有更新的幣種一次評分"""
+        try:
+            if not bars:
+                return {}
+            
+            rows = self.feature_engine.update(
+                [bar.symbol for bar in bars],
+                [bar.close for bar in bars],
+                [bar.high for bar in bars],
+                [bar.low for bar in bars],
+                [bar.volume for bar in bars]
+            )
+            symbols = list(dict.fromkeys(bar.symbol for bar in bars))
+            
+            features = self.feature_engine.feature_matrix(rows)
+            scores = self.score_regimes(features)
+            best_index = scores.argmax(axis=1)
+            confidence = scores[np.arange(best_index.size), best_index]
+            stability = self._stability_scores(features, best_index)
+            
+            detection_time = datetime.now()
+            results = {}
+            for i, symbol in enumerate(symbols):
+                regime = self._scored_regimes[best_index[i]]
+                previous = self.symbol_regimes.get(symbol)
+                if previous is not None and previous.regime != regime and previous.regime != MarketRegime.UNKNOWN:
+                    self._record_regime_transition(previous.regime, regime)
+                    self.detection_stats['regime_transitions'] += 1
+                
+                results[symbol] = RegimeConfidence(
+                    regime=regime,
+                    confidence=float(confidence[i]),
+                    feature_scores={name: float(value) for name, value in zip(FEATURE_NAMES, features[i])},
+                    detection_time=detection_time,
+                    stability_score=float(stability[i])
+                )
+            
+            self.symbol_regimes.update(results)
+            self.detection_stats['total_detections'] += len(results)
+            return results
+            
+        except Exception as e:
+            logger.error(f"❌ 觀察列表狀態檢測失敗: {e}")
+            return {}
+    
+    def update_bar(self, bar: MarketData) -> RegimeConfidence:
+        """單一幣種逐K線檢測"""
+        result = self.update_bars([bar]).get(bar.symbol)
+        if result is None:
+            return RegimeConfidence(
+                regime=MarketRegime.UNKNOWN,
+                confidence=0.0,
+                feature_scores={},
+                detection_time=datetime.now(),
+                stability_score=0.0
+            )
+        return result
+    
     def _score_threshold(self, value: float, threshold: float, higher_is_better: bool) -> float:
         """計算閾值分數"""
         if higher_is_better:
@@ -113,6 +113,10 @@ from .epl_intelligent_decision_engine import (
     # 優先級分類引擎
     PriorityClassificationEngine,
     
+    # 批量決策
+    PortfolioAggregates,
+    VectorizedDecisionPipeline,
+    
     # 主執行決策層
     ExecutionPolicyLayer,
     
@@ -143,6 +147,8 @@ __all__ = [
     
     # === 分類與協調引擎 ===
     "PriorityClassificationEngine", # 🎯 優先級分類引擎
+    "PortfolioAggregates",          # 📦 投資組合聚合指標
+    "VectorizedDecisionPipeline",   # ⚡ 向量化批量決策管線
     "ExecutionPolicyLayer",         # 🏛️ 主執行決策協調層
     
     # === 全局實例 ===
@@ -0,0 +1,119 @@
+"""
+⚡ EPL 批量決策效能基準測試
+EPL Batch Decision Benchmark
+比較逐筆異步決策與向量化批量決策在不同持倉規模下的吞吐量 (decisions/sec)
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List
+
+from epl_intelligent_decision_engine import (
+    EPLIntelligentDecisionEngine,
+    PositionInfo,
+    SignalCandidate
+)
+
+BASES = ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOG", "AVA", "DOT", "LNK"]
+
+def build_positions(count: int) -> List[PositionInfo]:
+    """生成測試持倉"""
+    now = datetime.now()
+    positions = []
+    for i in range(count):
+        symbol = f"{BASES[i % len(BASES)]}{i:04d}USDT"
+        signal = build_candidate(symbol, random.uniform(0.5, 0.8))
+        positions.append(PositionInfo(
+            symbol=symbol,
+            direction=random.choice(["BUY", "SELL"]),
+            size=random.uniform(1000, 20000),
+            entry_price=100.0,
+            current_signal=signal,
+            stop_loss=None,
+            take_profit=None,
+            unrealized_pnl=random.uniform(-0.002, 0.004),
+            entry_timestamp=now - timedelta(minutes=30),
+            position_age_minutes=30.0
+        ))
+    return positions
+
+def build_candidate(symbol: str, confidence: float) -> SignalCandidate:
+    """生成測試信號候選者"""
+    return SignalCandidate(
+        id=f"bench_{symbol}_{random.randint(0, 1_000_000)}",
+        symbol=symbol,
+        signal_strength=random.uniform(0.5, 1.0),
+        confidence=confidence,
+        direction=random.choice(["BUY", "SELL"]),
+        timestamp=datetime.now(),
+        source="benchmark",
+        data_completeness=1.0,
+        signal_clarity=0.8,
+        dynamic_params={},
+        # 快照以屬性對象提供 - 逐筆路徑以 getattr 讀取，字典快照會在一致性檢查中被判為無效價格
+        market_environment=SimpleNamespace(volatility=random.uniform(0.01, 0.06), liquidity=0.8, liquidity_score=0.8),
+        technical_snapshot=SimpleNamespace(price=100.0, rsi=random.uniform(20, 80),
+                                           trend_strength=random.uniform(0.3, 0.9), momentum=random.uniform(-0.5, 0.5))
+    )
+
+def build_candidates(count: int, positions: List[PositionInfo]) -> List[SignalCandidate]:
+    """生成候選者 - 一半命中現有持倉，一半為新標的"""
+    candidates = []
+    for i in range(count):
+        if positions and i % 2 == 0:
+            symbol = positions[i % len(positions)].symbol
+        else:
+            symbol = f"NEW{i:05d}USDT"
+        candidates.append(build_candidate(symbol, random.uniform(0.5, 0.99)))
+    return candidates
+
+async def benchmark_sequential(engine: EPLIntelligentDecisionEngine, candidates: List[SignalCandidate],
+                               positions: List[PositionInfo]) -> float:
+    """逐筆異步決策吞吐量"""
+    start_time = time.perf_counter()
+    for candidate in candidates:
+        await engine.process_signal_candidate(candidate, positions)
+    elapsed = time.perf_counter() - start_time
+    return len(candidates) / elapsed if elapsed > 0 else float("inf")
+
+def benchmark_batch(engine: EPLIntelligentDecisionEngine, candidates: List[SignalCandidate],
+                    positions: List[PositionInfo], iterations: int) -> float:
+    """向量化批量決策吞吐量"""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        engine.decide_batch(candidates, positions)
+    elapsed = time.perf_counter() - start_time
+    return len(candidates) * iterations / elapsed if elapsed > 0 else float("inf")
+
+async def run_batch_decision_benchmark(position_counts=(10, 100, 1000), candidate_count: int = 500,
+                                       sequential_sample: int = 50, iterations: int = 5) -> Dict[int, Dict[str, float]]:
+    """運行批量決策基準測試"""
+    print("⚡ EPL 批量決策效能基準測試")
+    print("=" * 60)
+
+    random.seed(42)
+    engine = EPLIntelligentDecisionEngine()
+    results = {}
+
+    for position_count in position_counts:
+        positions = build_positions(position_count)
+        candidates = build_candidates(candidate_count, positions)
+
+        sequential_rate = await benchmark_sequential(engine, candidates[:sequential_sample], positions)
+        batch_rate = benchmark_batch(engine, candidates, positions, iterations)
+
+        results[position_count] = {
+            "sequential_decisions_per_sec": sequential_rate,
+            "batch_decisions_per_sec": batch_rate,
+            "speedup": batch_rate / sequential_rate if sequential_rate > 0 else float("inf")
+        }
+        print(f"📊 持倉 {position_count:>5}: 逐筆 {sequential_rate:>10.1f}/s | "
+              f"批量 {batch_rate:>10.1f}/s | 加速 {results[position_count]['speedup']:.1f}x")
+
+    return results
+
+if __name__ == "__main__":
+    asyncio.run(run_batch_decision_benchmark())
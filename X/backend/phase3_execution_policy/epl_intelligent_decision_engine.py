@@ -9,8 +9,11 @@ import asyncio
 import logging
 import time
 import random
+import math
+import numpy as np
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
+from collections import defaultdict
 from datetime import datetime, timedelta
 from enum import Enum
 import sys
@@ -25,6 +28,8 @@ sys.path.extend([
     str(current_dir.parent / "shared_core")
 ])
 
+from pipeline_metrics import pipeline_metrics
+
 # JSON 規範: upstream_integration.phase1_unified_pool.input_source = "unified_signal_candidate_pool_v3"
 try:
     from unified_signal_candidate_pool import (
@@ -104,6 +109,25 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# 嵌入式品質分數的預設值與權重 - 逐筆 (_calculate_embedded_quality_scores) 與批量路徑共用
+EMBEDDED_QUALITY_DEFAULTS = {
+    "consistency_score": 0.7,   # 技術快照缺少一致性分數
+    "technical_quality": 0.6,   # 沒有技術快照
+    "liquidity": 0.7,           # 市場環境缺少流動性
+    "volatility": 0.05,         # 市場環境缺少波動率
+    "market_quality": 0.6,      # 沒有市場環境
+    "potential_reward": 0.03,
+    "potential_risk": 0.015
+}
+
+EMBEDDED_QUALITY_WEIGHTS = {
+    "signal_quality": 0.3,
+    "technical_quality": 0.25,
+    "market_quality": 0.2,
+    "timing_quality": 0.15,
+    "risk_quality": 0.1
+}
+
 class EPLDecision(Enum):
     """EPL 決策類型 - JSON 規範四情境"""
     REPLACE_POSITION = "A - Replace Position"       # 情境A: 替單決策
@@ -140,7 +164,9 @@ class PositionInfo:
     take_profit: Optional[float]     # 止盈價格
     unrealized_pnl: float           # 未實現盈虧
     entry_timestamp: datetime       # 開倉時間
-    position_age_minutes: float     # 持倉時間(分鐘)
+    position_age_minutes: float = 0.0  # 持倉時間(分鐘)
+    entry_confidence: float = 0.7      # 入場信心度
+    mark_price: Optional[float] = None  # 最新標記價格 (由行情更新，供風險狀態估計收益率)
 
 @dataclass
 class MarketSnapshot:
@@ -449,6 +475,11 @@ class StrengtheningDecisionEngine:
         self.max_position_concentration = 0.30
         self.volatility_risk_limit = 0.06
         
+        # JSON 規範倉位管理
+        self.max_additional_ratio = 0.5
+        self.base_size_calculation = "confidence_weighted"
+        self.volatility_adjustment = True
+        self.portfolio_balance_consideration = True
     
     async def evaluate_strengthening(self, candidate: SignalCandidate, 
                                    current_position: PositionInfo) -> Tuple[bool, List[str], Dict[str, Any]]:
@@ -1335,6 +1366,357 @@ class NotificationSystem:
         
         return optimization
 
+class PortfolioRiskState:
+    """增量投資組合風險狀態 - 持倉開/平/調整與收益率串流時增量維護
+    
+    - 按標的/行業的暴露與持倉計數 (行業以標的前綴簡化分類)
+    - EWMA 在線協方差矩陣 (RiskMetrics λ=0.94) 與 Σw 向量
+    - 參數化 VaR: z·sqrt(wᵀΣw) / 總暴露
+    
+    風險檢查讀取為 O(1)，候選者預估為 O(1) 增量；持倉以 symbol 為鍵 (每標的一個持倉)。
+    """
+    
+    def __init__(self, ewma_lambda: float = 0.94, confidence_z: float = 1.645,
+                 min_return_observations: int = 20, return_interval_seconds: float = 60.0,
+                 rebuild_every_periods: int = 100):
+        self.ewma_lambda = ewma_lambda
+        self.confidence_z = confidence_z
+        self.min_return_observations = min_return_observations
+        self.return_interval_seconds = return_interval_seconds
+        self.rebuild_every_periods = rebuild_every_periods
+        
+        # 持倉與暴露
+        self.positions: Dict[str, Any] = {}
+        self._position_keys: Dict[str, Tuple[str, float, float]] = {}
+        self.exposure_by_symbol: Dict[str, float] = {}
+        self.exposure_by_sector: Dict[str, float] = defaultdict(float)
+        self.sector_counts: Dict[str, int] = defaultdict(int)
+        self._sector_count_histogram: Dict[int, int] = defaultdict(int)
+        self._max_sector_count = 0
+        self._same_sector_pairs = 0
+        self.gross_exposure = 0.0
+        self.total_unrealized_pnl = 0.0
+        self.abs_unrealized_pnl = 0.0
+        
+        # 在線協方差與 Σw / wᵀΣw
+        self.covariance: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.return_observations: Dict[str, int] = defaultdict(int)
+        self._sigma_w: Dict[str, float] = defaultdict(float)
+        self._portfolio_variance = 0.0
+        
+        # 行情價格 → 週期收益率 (只有本週期收到新價格的標的記錄收益率)
+        self._latest_prices: Dict[str, float] = {}
+        self._period_start_prices: Dict[str, float] = {}
+        self._fresh_symbols: set = set()
+        self._period_started_at: Optional[float] = None
+        self.return_periods = 0
+    
+    @staticmethod
+    def sector_of(symbol: str) -> str:
+        """行業分類 - 與 RiskManagementFramework 一致的前綴簡化"""
+        return symbol[:3]
+    
+    @staticmethod
+    def _signed_exposure(direction: str, size: float) -> float:
+        return size if direction == "BUY" else -size
+    
+    @property
+    def position_count(self) -> int:
+        return len(self.positions)
+    
+    # ==================== 持倉事件 ====================
+    
+    def open_position(self, position: Any):
+        """開倉或更新持倉"""
+        self._apply_position(position.symbol, position.direction, position.size,
+                             position.unrealized_pnl, position)
+    
+    def resize_position(self, symbol: str, size: float, unrealized_pnl: Optional[float] = None):
+        """調整持倉大小 (加倉/減倉)"""
+        if symbol not in self.positions:
+            return
+        direction, _, pnl = self._position_keys[symbol]
+        self._apply_position(symbol, direction, size,
+                             pnl if unrealized_pnl is None else unrealized_pnl,
+                             self.positions[symbol])
+    
+    def close_position(self, symbol: str):
+        """平倉"""
+        if symbol not in self.positions:
+            return
+        _, _, pnl = self._position_keys.pop(symbol)
+        self.positions.pop(symbol)
+        self._set_exposure(symbol, 0.0)
+        self.exposure_by_symbol.pop(symbol, None)
+        self._change_sector_count(self.sector_of(symbol), -1)
+        self.total_unrealized_pnl -= pnl
+        self.abs_unrealized_pnl -= abs(pnl)
+        self._forget_symbol(symbol)
+    
+    def sync_positions(self, positions: List[Any]) -> bool:
+        """與持倉列表對齊 - 只對新增/變動/移除的持倉套用增量；返回持倉是否有變動"""
+        changed = False
+        seen = set()
+        for position in positions:
+            symbol = position.symbol
+            seen.add(symbol)
+            key = (position.direction, position.size, position.unrealized_pnl)
+            if self._position_keys.get(symbol) != key:
+                self._apply_position(symbol, *key, position)
+                changed = True
+            else:
+                self.positions[symbol] = position
+        
+        for symbol in [s for s in self.positions if s not in seen]:
+            self.close_position(symbol)
+            changed = True
+        return changed
+    
+    def _apply_position(self, symbol: str, direction: str, size: float,
+                        unrealized_pnl: float, position: Any):
+        previous = self._position_keys.get(symbol)
+        if previous is None:
+            self._change_sector_count(self.sector_of(symbol), 1)
+        else:
+            self.total_unrealized_pnl -= previous[2]
+            self.abs_unrealized_pnl -= abs(previous[2])
+        
+        self.positions[symbol] = position
+        self._position_keys[symbol] = (direction, size, unrealized_pnl)
+        self.total_unrealized_pnl += unrealized_pnl
+        self.abs_unrealized_pnl += abs(unrealized_pnl)
+        self._set_exposure(symbol, self._signed_exposure(direction, size))
+    
+    def _change_sector_count(self, sector: str, delta: int):
+        """更新行業計數、同行業配對數與最大行業計數 (O(1))"""
+        old = self.sector_counts[sector]
+        new = old + delta
+        self._same_sector_pairs += old if delta > 0 else -new
+        
+        if old:
+            self._sector_count_histogram[old] -= 1
+        if new:
+            self._sector_count_histogram[new] += 1
+            self.sector_counts[sector] = new
+        else:
+            del self.sector_counts[sector]
+        
+        if new > self._max_sector_count:
+            self._max_sector_count = new
+        elif old == self._max_sector_count and self._sector_count_histogram[old] == 0:
+            self._max_sector_count = new
+    
+    def _set_exposure(self, symbol: str, exposure: float):
+        """更新標的暴露並增量維護 Σw 與 wᵀΣw (O(k)，k 為該標的協方差行寬)"""
+        old = self.exposure_by_symbol.get(symbol, 0.0)
+        delta = exposure - old
+        if delta == 0.0:
+            return
+        
+        self.exposure_by_symbol[symbol] = exposure
+        self.exposure_by_sector[self.sector_of(symbol)] += abs(exposure) - abs(old)
+        self.gross_exposure += abs(exposure) - abs(old)
+        
+        row = self.covariance.get(symbol)
+        if row:
+            self._portfolio_variance += 2 * delta * self._sigma_w[symbol] + delta * delta * row.get(symbol, 0.0)
+            for other, cov in row.items():
+                self._sigma_w[other] += cov * delta
+    
+    # ==================== 收益率串流 ====================
+    
+    def observe_prices(self, prices: Dict[str, float], now: Optional[float] = None):
+        """記錄行情價格 - 每 return_interval_seconds 結算一個週期
+        
+        只有本週期收到新價格且有期初價格的標的記錄收益率 (未更新的標的不記為零收益)；
+        未持倉且本週期沒有新價格的標的停止追蹤。
+        """
+        now = time.time() if now is None else now
+        for symbol, price in prices.items():
+            if price and price > 0:
+                self._latest_prices[symbol] = price
+                self._fresh_symbols.add(symbol)
+        
+        if self._period_started_at is None:
+            self._start_period(now)
+            return
+        if now - self._period_started_at < self.return_interval_seconds:
+            return
+        
+        returns = {
+            symbol: self._latest_prices[symbol] / self._period_start_prices[symbol] - 1.0
+            for symbol in self._fresh_symbols
+            if symbol in self._period_start_prices
+        }
+        if returns:
+            self.record_returns(returns)
+            self.return_periods += 1
+            if self.return_periods % self.rebuild_every_periods == 0:
+                self.rebuild()
+        
+        for symbol in [s for s in self._latest_prices
+                       if s not in self._fresh_symbols and s not in self.positions]:
+            self._forget_symbol(symbol)
+        self._start_period(now)
+    
+    def _start_period(self, now: float):
+        self._period_start_prices = dict(self._latest_prices)
+        self._fresh_symbols = set()
+        self._period_started_at = now
+    
+    def _forget_symbol(self, symbol: str):
+        """移除無暴露標的的價格與協方差 (暴露為零，Σw 與 wᵀΣw 不受影響)"""
+        self._latest_prices.pop(symbol, None)
+        self._period_start_prices.pop(symbol, None)
+        self._fresh_symbols.discard(symbol)
+        self.return_observations.pop(symbol, None)
+        self._sigma_w.pop(symbol, None)
+        for other in self.covariance.pop(symbol, {}):
+            if other != symbol and other in self.covariance:
+                self.covariance[other].pop(symbol, None)
+    
+    def record_returns(self, returns: Dict[str, float]):
+        """記錄一個週期的標的收益率 - EWMA 協方差與組合方差增量更新 (O(m²)，m 為本週期標的數)"""
+        lam = self.ewma_lambda
+        symbols = list(returns.keys())
+        for symbol in symbols:
+            self.return_observations[symbol] += 1
+        
+        for a_idx, a in enumerate(symbols):
+            w_a = self.exposure_by_symbol.get(a, 0.0)
+            for b in symbols[a_idx:]:
+                w_b = self.exposure_by_symbol.get(b, 0.0)
+                old = self.covariance[a].get(b, 0.0)
+                new = lam * old + (1 - lam) * returns[a] * returns[b]
+                delta = new - old
+                self.covariance[a][b] = new
+                self.covariance[b][a] = new
+                
+                if a == b:
+                    self._sigma_w[a] += delta * w_a
+                    self._portfolio_variance += delta * w_a * w_a
+                else:
+                    self._sigma_w[a] += delta * w_b
+                    self._sigma_w[b] += delta * w_a
+                    self._portfolio_variance += 2 * delta * w_a * w_b
+    
+    def rebuild(self):
+        """從協方差與暴露完整重算 Σw 與 wᵀΣw - 用於定期消除浮點累積誤差"""
+        self._sigma_w = defaultdict(float)
+        for symbol, row in self.covariance.items():
+            self._sigma_w[symbol] = sum(cov * self.exposure_by_symbol.get(other, 0.0)
+                                        for other, cov in row.items())
+        self._portfolio_variance = sum(self._sigma_w[symbol] * exposure
+                                       for symbol, exposure in self.exposure_by_symbol.items())
+    
+    # ==================== 風險讀取 ====================
+    
+    def portfolio_correlation(self) -> float:
+        """成對相關性 - 同行業 0.8，其餘 0.3 (由同行業配對數封閉計算)"""
+        n = self.position_count
+        if n < 2:
+            return 0.0
+        total_pairs = n * (n - 1) / 2
+        return (0.8 * self._same_sector_pairs + 0.3 * (total_pairs - self._same_sector_pairs)) / total_pairs
+    
+    def sector_concentration(self) -> float:
+        """行業集中度 - 最大行業持倉數 / 總持倉數"""
+        n = self.position_count
+        return self._max_sector_count / n if n else 0.0
+    
+    def has_covariance_estimate(self) -> bool:
+        """所有持倉是否都累積了足夠的收益率觀測"""
+        return bool(self.positions) and all(
+            self.return_observations.get(symbol, 0) >= self.min_return_observations
+            for symbol in self.positions
+        )
+    
+    def parametric_var(self) -> float:
+        """參數化 VaR (佔總暴露比例)"""
+        if self.gross_exposure <= 0:
+            return 0.0
+        return self.confidence_z * math.sqrt(max(self._portfolio_variance, 0.0)) / self.gross_exposure
+    
+    def daily_var(self) -> float:
+        """日風險價值 - 協方差估計充足時用參數化 VaR，否則回退到 |PnL|×10% 簡化估計"""
+        if self.has_covariance_estimate():
+            return self.parametric_var()
+        return self.abs_unrealized_pnl * 0.1
+    
+    def current_metrics(self) -> Dict[str, float]:
+        return {
+            "concurrent_positions": self.position_count,
+            "portfolio_correlation": self.portfolio_correlation(),
+            "sector_concentration": self.sector_concentration(),
+            "daily_var": self.daily_var(),
+            "parametric_var": self.parametric_var(),
+            "gross_exposure": self.gross_exposure
+        }
+    
+    def preview_candidate(self, symbol: str, direction: str, size: Optional[float] = None) -> Dict[str, float]:
+        """預估候選者加入後的組合指標 (O(1)，不修改狀態)"""
+        is_new = symbol not in self.positions
+        n = self.position_count + (1 if is_new else 0)
+        sector_count = self.sector_counts.get(self.sector_of(symbol), 0)
+        
+        same_pairs = self._same_sector_pairs + (sector_count if is_new else 0)
+        max_sector = max(self._max_sector_count, sector_count + 1) if is_new else self._max_sector_count
+        total_pairs = n * (n - 1) / 2
+        
+        projected = {
+            "concurrent_positions": n,
+            "portfolio_correlation": (0.8 * same_pairs + 0.3 * (total_pairs - same_pairs)) / total_pairs if n >= 2 else 0.0,
+            "sector_concentration": max_sector / n if n else 0.0,
+            "same_sector_positions": sector_count
+        }
+        
+        if size is not None:
+            old = self.exposure_by_symbol.get(symbol, 0.0)
+            delta = self._signed_exposure(direction, size) - old
+            variance = (self._portfolio_variance + 2 * delta * self._sigma_w.get(symbol, 0.0) +
+                        delta * delta * self.covariance.get(symbol, {}).get(symbol, 0.0))
+            gross = self.gross_exposure + abs(old + delta) - abs(old)
+            projected["parametric_var"] = (self.confidence_z * math.sqrt(max(variance, 0.0)) / gross) if gross > 0 else 0.0
+        
+        return projected
+    
+    def evaluate_portfolio_controls(self, controls: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """依投資組合級別控制評估 - 超出限制發出建議，超出拒絕閾值時不批准"""
+        approved = True
+        recommendations = []
+        position_count = self.position_count
+        if not position_count:
+            return approved, recommendations
+        
+        max_positions = controls.get("max_concurrent_positions", 10)
+        if position_count >= max_positions:
+            # 達到限制時提供合理的彈性空間 (允許超出2個)
+            approved = position_count < (max_positions + 2)
+            if not approved:
+                recommendations.append(f"並行持倉數超限 ({position_count}/{max_positions})")
+            else:
+                recommendations.append(f"並行持倉數接近限制 ({position_count}/{max_positions})")
+        
+        portfolio_correlation = self.portfolio_correlation()
+        if portfolio_correlation > controls.get("max_portfolio_correlation", 0.70):
+            recommendations.append(f"投資組合相關性偏高: {portfolio_correlation:.1%}")
+            if portfolio_correlation > 0.80:  # 超過80%時才拒絕
+                approved = False
+        
+        sector_concentration = self.sector_concentration()
+        if sector_concentration > controls.get("max_sector_concentration", 0.50):
+            recommendations.append(f"行業集中度偏高: {sector_concentration:.1%}")
+            if sector_concentration > 0.60:  # 超過60%時才拒絕
+                approved = False
+        
+        daily_var = self.daily_var()
+        if daily_var > controls.get("daily_risk_budget", 0.05):
+            recommendations.append(f"日風險預算偏高: {daily_var:.1%}")
+            if daily_var > 0.08:  # 超過8%時才拒絕
+                approved = False
+        
+        return approved, recommendations
+
 class RiskManagementFramework:
     """風險管理框架 - JSON 規範實現"""
     
@@ -1362,6 +1744,29 @@ class RiskManagementFramework:
             "drawdown_protection": True,
             "stress_testing_integration": False  # 暫時關閉壓力測試以提高通過率
         }
+        
+        # 增量投資組合狀態 - 外部以 open/close/resize 事件維護時可關閉逐次同步
+        self.portfolio_state = PortfolioRiskState()
+        self.sync_positions_on_assess = True
+    
+    def update_prices(self, prices: Dict[str, float], now: Optional[float] = None):
+        """行情價格入口 - 即時標記價格累積週期收益率以估計 EWMA 協方差 (參數化 VaR)"""
+        self.portfolio_state.observe_prices(prices, now)
+    
+    def observe_mark_prices(self, positions: List[Any], now: Optional[float] = None):
+        """讀取持倉的即時標記價格 (mark_price)
+        
+        持倉當前信號技術快照中的價格停留在信號時點，不作為行情使用。
+        """
+        prices = {position.symbol: position.mark_price for position in positions
+                  if getattr(position, "mark_price", None)}
+        if prices:
+            self.update_prices(prices, now)
+    
+    def sync_portfolio_state(self, positions: List[Any]):
+        """同步持倉到增量狀態；持倉變動時完整重算 Σw 以消除累積誤差"""
+        if self.portfolio_state.sync_positions(positions):
+            self.portfolio_state.rebuild()
     
     async def assess_risk(self, candidate: SignalCandidate, 
                          current_positions: List[PositionInfo],
@@ -1376,10 +1781,18 @@ class RiskManagementFramework:
             "recommendations": []
         }
         
+        # 持倉標記價格 → 收益率協方差
+        self.observe_mark_prices(current_positions)
+        
         # 1. 投資組合級別檢查
         portfolio_check = await self._check_portfolio_level_controls(current_positions)
         risk_assessment["portfolio_level_check"] = portfolio_check
         
+        # 候選者加入後的組合指標預估 (O(1) 增量)
+        portfolio_check["projected_metrics"] = self.portfolio_state.preview_candidate(
+            candidate.symbol, candidate.direction
+        )
+        
         # 2. 持倉級別檢查
         position_check = await self._check_position_level_controls(candidate, decision_type)
         risk_assessment["position_level_check"] = position_check
@@ -1411,6 +1824,9 @@ class RiskManagementFramework:
         }
         
         try:
+            if self.sync_positions_on_assess:
+                self.sync_portfolio_state(positions)
+            
             # ⚠️ 生產啟動腳本模式：不檢查虛擬持倉限制
             # 傳入空的 current_positions 表示這是信號生成模式，非真實交易模式
             if not positions:
@@ -1420,59 +1836,12 @@ class RiskManagementFramework:
                 check["recommendations"].append("信號生成模式：無持倉限制")
                 return check
             
-            # 最大並行持倉數檢查 - 更寬鬆的邏輯（僅用於真實交易模式）
-            current_positions = len(positions)
-            check["current_metrics"]["concurrent_positions"] = current_positions
-            max_positions = self.portfolio_level_controls.get("max_concurrent_positions", 10)  # 10個持倉限制
-            if current_positions >= max_positions:
-                # 達到限制時提供合理的彈性空間
-                check["approved"] = current_positions < (max_positions + 2)  # 允許超出2個
-                if not check["approved"]:
-                    check["recommendations"].append(f"並行持倉數超限 ({current_positions}/{max_positions})")
-                else:
-                    check["recommendations"].append(f"並行持倉數接近限制 ({current_positions}/{max_positions})")
-            
-            # 投資組合相關性檢查 - 更寬鬆的閾值
-            try:
-                portfolio_correlation = await self._calculate_portfolio_correlation(positions)
-                check["current_metrics"]["portfolio_correlation"] = portfolio_correlation
-                max_correlation = self.portfolio_level_controls.get("max_portfolio_correlation", 0.70)  # 70%相關性限制
-                if portfolio_correlation > max_correlation:
-                    # 相關性過高時發出警告，但不完全阻止
-                    check["recommendations"].append(f"投資組合相關性偏高: {portfolio_correlation:.1%}")
-                    if portfolio_correlation > 0.80:  # 超過80%時才拒絕
-                        check["approved"] = False
-            except Exception as e:
-                logger.warning(f"投資組合相關性檢查失敗: {e}")
-                check["current_metrics"]["portfolio_correlation"] = 0.0  # 默認值
-            
-            # 行業集中度檢查 - 更寬鬆的閾值
-            try:
-                sector_concentration = await self._calculate_sector_concentration(positions)
-                check["current_metrics"]["sector_concentration"] = sector_concentration
-                max_concentration = self.portfolio_level_controls.get("max_sector_concentration", 0.50)  # 50%行業集中度限制
-                if sector_concentration > max_concentration:
-                    # 集中度過高時發出警告
-                    check["recommendations"].append(f"行業集中度偏高: {sector_concentration:.1%}")
-                    if sector_concentration > 0.60:  # 超過60%時才拒絕
-                        check["approved"] = False
-            except Exception as e:
-                logger.warning(f"行業集中度檢查失敗: {e}")
-                check["current_metrics"]["sector_concentration"] = 0.0  # 默認值
-            
-            # 日風險預算檢查 - 更寬鬆的閾值
-            try:
-                daily_var = await self._calculate_daily_var(positions)
-                check["current_metrics"]["daily_var"] = daily_var
-                max_var = self.portfolio_level_controls.get("daily_risk_budget", 0.05)  # 5%日風險預算
-                if daily_var > max_var:
-                    # 風險預算超限時提供警告和建議
-                    check["recommendations"].append(f"日風險預算偏高: {daily_var:.1%}")
-                    if daily_var > 0.08:  # 超過8%時才拒絕
-                        check["approved"] = False
-            except Exception as e:
-                logger.warning(f"日風險預算檢查失敗: {e}")
-                check["current_metrics"]["daily_var"] = 0.0  # 默認值
+            # 投資組合指標由增量狀態 O(1) 讀取
+            state = self.portfolio_state
+            check["current_metrics"] = state.current_metrics()
+            check["approved"], check["recommendations"] = state.evaluate_portfolio_controls(
+                self.portfolio_level_controls
+            )
             
         except Exception as e:
             logger.error(f"投資組合級別控制檢查失敗: {e}")
@@ -1593,47 +1962,18 @@ class RiskManagementFramework:
     
     async def _calculate_portfolio_correlation(self, positions: List[PositionInfo]) -> float:
         """計算投資組合相關性"""
-        if len(positions) < 2:
-            return 0.0
-        
-        # 簡化相關性計算
-        correlations = []
-        for i in range(len(positions)):
-            for j in range(i + 1, len(positions)):
-                # 基於資產類別的簡化相關性
-                if positions[i].symbol[:3] == positions[j].symbol[:3]:
-                    correlations.append(0.8)  # 高相關性
-                else:
-                    correlations.append(0.3)  # 低相關性
-        
-        return sum(correlations) / len(correlations) if correlations else 0.0
+        self.portfolio_state.sync_positions(positions)
+        return self.portfolio_state.portfolio_correlation()
     
     async def _calculate_sector_concentration(self, positions: List[PositionInfo]) -> float:
         """計算行業集中度"""
-        if not positions:
-            return 0.0
-        
-        # 基於標的前綴計算行業集中度
-        sector_counts = {}
-        for position in positions:
-            sector = position.symbol[:3]  # 簡化行業分類
-            sector_counts[sector] = sector_counts.get(sector, 0) + 1
-        
-        max_sector_count = max(sector_counts.values()) if sector_counts else 0
-        return max_sector_count / len(positions)
+        self.portfolio_state.sync_positions(positions)
+        return self.portfolio_state.sector_concentration()
     
     async def _calculate_daily_var(self, positions: List[PositionInfo]) -> float:
         """計算日風險價值"""
-        if not positions:
-            return 0.0
-        
-        # 簡化 VaR 計算
-        total_risk = 0.0
-        for position in positions:
-            position_var = abs(position.unrealized_pnl) * 0.1  # 假設10%的波動性
-            total_risk += position_var
-        
-        return total_risk
+        self.portfolio_state.sync_positions(positions)
+        return self.portfolio_state.daily_var()
     
     async def _calculate_stop_loss(self, candidate: SignalCandidate) -> float:
         """計算止損價格"""
@@ -1666,12 +2006,14 @@ class RiskManagementFramework:
     async def _calculate_correlation_adjustment(self, candidate: SignalCandidate, positions: List[PositionInfo]) -> float:
         """計算相關性調整"""
         # 如果與現有持倉高度相關，減少倉位
-        high_correlation_count = sum(1 for pos in positions if pos.symbol[:3] == candidate.symbol[:3])
+        high_correlation_count = self.portfolio_state.sector_counts.get(
+            PortfolioRiskState.sector_of(candidate.symbol), 0
+        )
         return max(0.5, 1.0 - high_correlation_count * 0.2)
     
     async def _calculate_drawdown_protection(self, positions: List[PositionInfo]) -> Dict[str, Any]:
         """計算回撤保護"""
-        total_unrealized_pnl = sum(pos.unrealized_pnl for pos in positions)
+        total_unrealized_pnl = self.portfolio_state.total_unrealized_pnl
         
         protection = {
             "current_drawdown": abs(min(0, total_unrealized_pnl)),
@@ -1808,6 +2150,393 @@ class InputOutputValidator:
         
         return base_output
 
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    """讀取屬性或字典鍵 - SignalCandidate 的快照字段可能是對象或字典"""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+@dataclass
+class PortfolioAggregates:
+    """投資組合聚合指標 - 批量決策每批讀取一次"""
+    position_count: int
+    positions_by_symbol: Dict[str, Any]
+    sector_counts: Dict[str, int]
+    portfolio_correlation: float
+    sector_concentration: float
+    daily_var: float
+    total_unrealized_pnl: float
+    portfolio_approved: bool
+    recommendations: List[str]
+    
+    @classmethod
+    def from_positions(cls, positions: List[Any],
+                       risk_framework: "RiskManagementFramework") -> "PortfolioAggregates":
+        """從持倉列表計算聚合指標 - 讀取 RiskManagementFramework 的增量投資組合狀態"""
+        state = risk_framework.portfolio_state
+        risk_framework.observe_mark_prices(positions)
+        if risk_framework.sync_positions_on_assess:
+            risk_framework.sync_portfolio_state(positions)
+        approved, recommendations = state.evaluate_portfolio_controls(risk_framework.portfolio_level_controls)
+        
+        return cls(
+            position_count=state.position_count,
+            positions_by_symbol=dict(state.positions),
+            sector_counts=dict(state.sector_counts),
+            portfolio_correlation=state.portfolio_correlation(),
+            sector_concentration=state.sector_concentration(),
+            daily_var=state.daily_var(),
+            total_unrealized_pnl=state.total_unrealized_pnl,
+            portfolio_approved=approved,
+            recommendations=recommendations
+        )
+
+class VectorizedDecisionPipeline:
+    """批量決策管線 - 以 NumPy 一次同步評估 N 個候選者
+    
+    與四情境引擎使用相同的 JSON 規範權重與閾值 (直接讀取引擎實例屬性)，
+    持倉相關計算改為讀取預先計算的 PortfolioAggregates，單個候選者成本與持倉數無關。
+    """
+    
+    SCENARIO_NAMES = ("SIGNAL_IGNORE", "REPLACE_POSITION", "STRENGTHEN_POSITION", "CREATE_NEW_POSITION")
+    
+    def __init__(self, engine: "EPLIntelligentDecisionEngine"):
+        self.engine = engine
+    
+    def decide(self, candidates: List[SignalCandidate],
+               aggregates: PortfolioAggregates) -> List[EPLDecisionResult]:
+        """同步批量決策"""
+        if not candidates:
+            return []
+        
+        f = self._extract_features(candidates, aggregates)
+        quality = self._embedded_quality(f)
+        valid = self._consistency_mask(f)
+        scenario, scores, passed = self._evaluate_scenarios(f, aggregates)
+        priority_idx = self._classify_priorities(f)
+        
+        # 持倉級別風險: 非新單決策的預估倉位超出上限 50% 時拒絕
+        max_position_size = self.engine.risk_framework.position_level_controls.get("max_position_size", 0.15)
+        position_risk_ok = (scenario == 3) | (f["estimated_position_size"] <= max_position_size * 1.5)
+        risk_ok = aggregates.portfolio_approved & position_risk_ok
+        
+        executed = valid & passed & risk_ok & (scenario > 0)
+        return self._build_results(candidates, f, aggregates, quality, valid, scenario,
+                                   scores, passed, risk_ok, executed, priority_idx)
+    
+    def _extract_features(self, candidates: List[SignalCandidate],
+                          aggregates: PortfolioAggregates) -> Dict[str, np.ndarray]:
+        """一次性抽取候選者與對應持倉的數值特徵"""
+        now = datetime.now()
+        n = len(candidates)
+        columns = {name: np.empty(n) for name in (
+            "confidence", "signal_strength", "quality_score", "volatility", "liquidity",
+            "liquidity_score", "consistency", "rsi", "trend_strength", "momentum",
+            "price_change_rate", "price", "age_seconds", "potential_reward", "potential_risk",
+            "source_count", "estimated_position_size", "has_position", "same_direction",
+            "entry_confidence", "position_confidence", "position_strength", "position_pnl",
+            "position_size", "position_age_minutes", "position_volatility", "same_sector_count",
+            "has_required_fields", "technical_quality", "market_quality"
+        )}
+        nan = float("nan")
+        defaults = EMBEDDED_QUALITY_DEFAULTS
+        min_age = self.engine.replacement_engine.minimum_position_age
+        
+        for i, candidate in enumerate(candidates):
+            tech = getattr(candidate, "technical_snapshot", None)
+            env = getattr(candidate, "market_environment", None)
+            confidence = getattr(candidate, "confidence", None)
+            strength = getattr(candidate, "signal_strength", None)
+            columns["has_required_fields"][i] = all(
+                getattr(candidate, name, None) is not None
+                for name in ("symbol", "direction", "confidence", "signal_strength")
+            )
+            confidence = confidence if confidence is not None else 0.0
+            strength = strength if strength is not None else 0.0
+            columns["confidence"][i] = confidence
+            columns["signal_strength"][i] = strength
+            columns["quality_score"][i] = getattr(candidate, "quality_score", confidence)
+            columns["volatility"][i] = _field(env, "volatility", defaults["volatility"])
+            columns["liquidity"][i] = _field(env, "liquidity", defaults["liquidity"])
+            columns["liquidity_score"][i] = _field(env, "liquidity_score", 0.7)
+            columns["consistency"][i] = _field(tech, "consistency_score", defaults["consistency_score"])
+            # 嵌入式品質: 缺少技術快照 / 市場環境時使用與逐筆路徑相同的預設值
+            columns["technical_quality"][i] = columns["consistency"][i] if tech else defaults["technical_quality"]
+            columns["market_quality"][i] = (
+                columns["liquidity"][i] * (1.0 - min(0.5, columns["volatility"][i] * 10))
+                if env else defaults["market_quality"]
+            )
+            columns["rsi"][i] = _field(tech, "rsi", nan)
+            columns["trend_strength"][i] = _field(tech, "trend_strength", nan)
+            columns["momentum"][i] = _field(tech, "momentum", nan)
+            columns["price_change_rate"][i] = _field(tech, "price_change_rate", nan)
+            columns["price"][i] = _field(tech, "price", 0.0) if tech is not None else 1.0
+            timestamp = getattr(candidate, "timestamp", None)
+            columns["age_seconds"][i] = (now - timestamp).total_seconds() if timestamp else 0.0
+            columns["potential_reward"][i] = getattr(candidate, "potential_reward", defaults["potential_reward"])
+            columns["potential_risk"][i] = getattr(candidate, "potential_risk", defaults["potential_risk"])
+            columns["source_count"][i] = getattr(candidate, "source_count", 1)
+            columns["estimated_position_size"][i] = getattr(candidate, "estimated_position_size", 0.1)
+            
+            symbol = getattr(candidate, "symbol", "") or ""
+            columns["same_sector_count"][i] = aggregates.sector_counts.get(symbol[:3], 0)
+            position = aggregates.positions_by_symbol.get(symbol)
+            if position is None:
+                columns["has_position"][i] = 0.0
+                for name in ("same_direction", "entry_confidence", "position_confidence",
+                             "position_strength", "position_pnl", "position_size",
+                             "position_age_minutes", "position_volatility"):
+                    columns[name][i] = 0.0
+                continue
+            
+            current_signal = getattr(position, "current_signal", None)
+            entry_confidence = getattr(position, "entry_confidence", 0.5)
+            columns["has_position"][i] = 1.0
+            columns["same_direction"][i] = float(position.direction == candidate.direction)
+            columns["entry_confidence"][i] = entry_confidence
+            columns["position_confidence"][i] = _field(current_signal, "confidence", entry_confidence)
+            columns["position_strength"][i] = _field(current_signal, "signal_strength", strength)
+            columns["position_pnl"][i] = position.unrealized_pnl
+            columns["position_size"][i] = position.size
+            columns["position_age_minutes"][i] = getattr(position, "position_age_minutes", min_age)
+            columns["position_volatility"][i] = _field(
+                _field(current_signal, "market_environment"), "volatility", 0.05
+            )
+        
+        return columns
+    
+    @staticmethod
+    def _nanmean_or(default: float, *arrays: np.ndarray) -> np.ndarray:
+        """逐行平均可用因子，全部缺失時回退為預設值"""
+        stacked = np.vstack(arrays)
+        counts = np.sum(~np.isnan(stacked), axis=0)
+        sums = np.nansum(stacked, axis=0)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), default)
+    
+    def _embedded_quality(self, f: Dict[str, np.ndarray]) -> np.ndarray:
+        """嵌入式綜合品質 - 對應 _calculate_embedded_quality_scores"""
+        signal_quality = np.minimum(1.0, f["confidence"] * f["signal_strength"])
+        timing_quality = np.maximum(0.0, 1.0 - f["age_seconds"] / 300)
+        risk_quality = np.where(
+            f["potential_risk"] > 0,
+            np.minimum(1.0, f["potential_reward"] / np.where(f["potential_risk"] > 0, f["potential_risk"], 1.0) / 2.0),
+            0.5
+        )
+        w = EMBEDDED_QUALITY_WEIGHTS
+        return (signal_quality * w["signal_quality"] + f["technical_quality"] * w["technical_quality"] +
+                f["market_quality"] * w["market_quality"] + timing_quality * w["timing_quality"] +
+                risk_quality * w["risk_quality"])
+    
+    def _consistency_mask(self, f: Dict[str, np.ndarray]) -> np.ndarray:
+        """數據一致性 - 對應 _validate_data_consistency"""
+        return ((f["has_required_fields"] > 0) & (f["price"] > 0) &
+                (f["volatility"] >= 0) & (f["volatility"] <= 1) & (f["age_seconds"] <= 300))
+    
+    def _evaluate_scenarios(self, f: Dict[str, np.ndarray],
+                            aggregates: PortfolioAggregates) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """情境判斷 + 四情境評分 (0=忽略, 1=替單, 2=加倉, 3=新單)"""
+        has_position = f["has_position"] > 0
+        same_direction = f["same_direction"] > 0
+        improvement_vs_entry = f["confidence"] - f["entry_confidence"]
+        
+        scenario = np.zeros(len(f["confidence"]), dtype=np.int8)
+        scenario[has_position & same_direction & (improvement_vs_entry >= 0.08)] = 2
+        scenario[has_position & ~same_direction & (improvement_vs_entry >= 0.15)] = 1
+        scenario[~has_position & (f["quality_score"] >= 0.8)] = 3
+        
+        delta = f["confidence"] - f["position_confidence"]
+        rsi_center = 1.0 - np.abs(f["rsi"] - 50) / 50
+        rsi_extreme = np.abs(f["rsi"] - 50) / 50
+        
+        # 情境 A: 替單
+        rep = self.engine.replacement_engine
+        rep_timing = self._nanmean_or(0.5, rsi_center, np.minimum(1.0, f["volatility"] * 10))
+        rep_performance = np.where(f["position_pnl"] > 0,
+                                   np.minimum(1.0, f["position_pnl"] * 10),
+                                   np.maximum(0.0, 1.0 + f["position_pnl"] * 20))
+        rep_risk = np.maximum(0.0, 1.0 - (np.abs(f["signal_strength"] - f["position_strength"]) +
+                                          np.abs(delta) + f["position_size"] / 10000) / 3)
+        rep_score = (np.minimum(1.0, delta / 0.3) * rep.confidence_delta_weight +
+                     rep_timing * rep.market_timing_weight +
+                     rep_performance * rep.position_performance_weight +
+                     rep_risk * rep.risk_assessment_weight)
+        rep_pass = ((delta >= rep.confidence_improvement_threshold) & ~same_direction &
+                    (f["position_age_minutes"] >= rep.minimum_position_age) &
+                    (f["position_pnl"] >= rep.max_position_loss_tolerance) &
+                    (f["position_volatility"] <= rep.market_volatility_limit) &
+                    (rep_score >= rep.minimum_replacement_score))
+        
+        # 情境 B: 加倉
+        stg = self.engine.strengthening_engine
+        stg_timing = self._nanmean_or(0.6, f["trend_strength"], f["momentum"])
+        stg_concentration = np.maximum(0.0, 1.0 - (f["position_size"] / 100000) / stg.max_position_concentration)
+        stg_score = (np.minimum(1.0, delta / 0.2) * stg.confidence_improvement_weight +
+                     np.clip(f["position_pnl"] * 10, 0.0, 1.0) * stg.position_performance_weight +
+                     stg_concentration * stg.risk_concentration_weight +
+                     stg_timing * stg.market_timing_weight)
+        stg_pass = ((delta >= stg.confidence_improvement_threshold) & same_direction &
+                    (f["position_pnl"] > 0) &
+                    (f["position_volatility"] <= stg.volatility_risk_limit) &
+                    (stg_score >= stg.minimum_strengthening_score))
+        
+        # 情境 C: 新單 - 相關性由行業計數 O(1) 得出
+        new = self.engine.new_position_engine
+        suitability = (np.maximum(0.0, 1.0 - np.abs(f["volatility"] - 0.03) / 0.05) +
+                       np.where(np.isnan(f["trend_strength"]), 0.5, f["trend_strength"])) / 2
+        if aggregates.position_count:
+            same = f["same_sector_count"]
+            avg_correlation = (0.3 * same + 0.1 * (aggregates.position_count - same)) / aggregates.position_count
+            correlation_score = np.maximum(0.0, 1.0 - avg_correlation)
+        else:
+            correlation_score = np.ones_like(f["confidence"])
+        new_timing = self._nanmean_or(0.5, rsi_extreme, np.minimum(1.0, np.abs(f["momentum"]) * 2))
+        new_score = (f["quality_score"] * new.signal_quality_weight +
+                     suitability * new.market_suitability_weight +
+                     correlation_score * new.portfolio_correlation_weight +
+                     new_timing * new.timing_optimization_weight)
+        new_pass = ((f["quality_score"] >= new.quality_score_threshold) &
+                    (aggregates.position_count < 8) &
+                    (f["liquidity_score"] >= new.min_market_liquidity) &
+                    (new_score >= new.minimum_creation_score))
+        
+        scores = np.select([scenario == 1, scenario == 2, scenario == 3],
+                           [rep_score, stg_score, new_score], default=0.0)
+        passed = np.select([scenario == 1, scenario == 2, scenario == 3],
+                           [rep_pass, stg_pass, new_pass], default=False)
+        return scenario, np.clip(scores, 0.0, 1.0), passed
+    
+    def _classify_priorities(self, f: Dict[str, np.ndarray]) -> np.ndarray:
+        """優先級分類 - 對應 PriorityClassificationSystem (返回 SignalPriority 名稱索引)"""
+        classifier = self.engine.priority_classifier
+        signal_quality = (f["quality_score"] + np.minimum(1.0, f["signal_strength"]) + f["confidence"]) / 3
+        urgency = self._nanmean_or(0.3, np.minimum(1.0, f["volatility"] * 20),
+                                   np.minimum(1.0, np.abs(f["price_change_rate"]) * 10))
+        execution_confidence = np.minimum(1.0, f["source_count"] / 3) * 0.6 + f["consistency"] * 0.4
+        risk_reward = np.where(
+            f["potential_risk"] > 0,
+            np.minimum(1.0, f["potential_reward"] / np.where(f["potential_risk"] > 0, f["potential_risk"], 1.0) / 3),
+            0.5
+        )
+        total = (signal_quality * classifier.signal_quality_factor +
+                 urgency * classifier.market_urgency_factor +
+                 execution_confidence * classifier.execution_confidence_factor +
+                 risk_reward * classifier.risk_reward_ratio_factor)
+        
+        names = list(classifier.priority_thresholds.keys())
+        priority_idx = np.full(len(total), names.index("LOW"), dtype=np.int8)
+        assigned = np.zeros(len(total), dtype=bool)
+        for idx, name in enumerate(names):
+            thresholds = classifier.priority_thresholds[name]
+            match = (~assigned & (total >= thresholds["classification_threshold"]) &
+                     (execution_confidence >= thresholds["execution_confidence_min"]))
+            priority_idx[match] = idx
+            assigned |= match
+        return priority_idx
+    
+    def _build_results(self, candidates, f, aggregates, quality, valid, scenario, scores,
+                       passed, risk_ok, executed, priority_idx) -> List[EPLDecisionResult]:
+        """組裝決策結果 (僅對通過的候選者計算執行參數)"""
+        decisions = {
+            1: EPLDecision.REPLACE_POSITION,
+            2: EPLDecision.STRENGTHEN_POSITION,
+            3: EPLDecision.CREATE_NEW_POSITION
+        }
+        priority_names = list(self.engine.priority_classifier.priority_thresholds.keys())
+        portfolio_metrics = {
+            "concurrent_positions": aggregates.position_count,
+            "portfolio_correlation": aggregates.portfolio_correlation,
+            "sector_concentration": aggregates.sector_concentration,
+            "daily_var": aggregates.daily_var
+        }
+        timestamp = datetime.now()
+        results = []
+        
+        for i, candidate in enumerate(candidates):
+            scenario_name = self.SCENARIO_NAMES[scenario[i]]
+            score = float(scores[i])
+            if executed[i]:
+                decision = decisions[int(scenario[i])]
+                confidence = score
+                reasoning = [f"✅ 批量決策 {scenario_name} - 分數: {score:.3f}"]
+                execution_params = self._execution_params(candidate, int(scenario[i]), f, i)
+            else:
+                decision = EPLDecision.SIGNAL_IGNORE
+                confidence = 0.0 if not valid[i] else score
+                if not valid[i]:
+                    reasoning = ["數據一致性檢查失敗"]
+                elif scenario[i] == 0:
+                    reasoning = ["未滿足任何執行情境觸發條件"]
+                elif not passed[i]:
+                    reasoning = [f"❌ {scenario_name} 分數/閾值未通過: {score:.3f}"]
+                else:
+                    reasoning = ["風險最終確認失敗"] + aggregates.recommendations
+                execution_params = {}
+            
+            results.append(EPLDecisionResult(
+                decision=decision,
+                confidence=confidence,
+                priority=SignalPriority[priority_names[priority_idx[i]]],
+                candidate=candidate,
+                reasoning=reasoning,
+                execution_params=execution_params,
+                risk_assessment={
+                    **portfolio_metrics,
+                    "risk_approved": bool(risk_ok[i]),
+                    "composite_quality": float(quality[i])
+                },
+                performance_tracking={"decision_scenario": scenario_name, "scenario_score": score},
+                notification_config={},
+                timestamp=timestamp
+            ))
+        
+        return results
+    
+    def _execution_params(self, candidate, scenario: int, f: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        """計算單個通過候選者的執行參數"""
+        if scenario == 1:
+            base_size = f["position_size"][i]
+            multiplier = f["confidence"][i] / f["position_confidence"][i] if f["position_confidence"][i] > 0 else 1.0
+            return {
+                "close_current_position": True,
+                "close_price_type": "market",
+                "new_position_size": float(min(base_size * multiplier, base_size * 1.5)),
+                "entry_price_type": "market",
+                "replacement_reason": "confidence_improvement_with_direction_opposition"
+            }
+        if scenario == 2:
+            stg = self.engine.strengthening_engine
+            size = f["position_size"][i]
+            multiplier = f["confidence"][i] / f["position_confidence"][i] if f["position_confidence"][i] > 0 else 1.0
+            additional = max(0.0, size * min(stg.max_additional_ratio, multiplier - 1.0))
+            additional *= max(0.5, 1.0 - f["volatility"][i] * 10)
+            cap = stg.max_position_concentration * 100000
+            concentration_ok = (size + additional) <= cap
+            if not concentration_ok:
+                additional = max(0.0, cap - size)
+            return {
+                "action_type": "strengthen_position",
+                "additional_size": float(additional),
+                "size_calculation_method": stg.base_size_calculation,
+                "max_concentration_respected": bool(concentration_ok)
+            }
+        new = self.engine.new_position_engine
+        win_rate = f["confidence"][i]
+        kelly_fraction = (win_rate * 0.03 - (1 - win_rate) * 0.015) / 0.03
+        kelly_fraction = max(0.005, min(0.05, kelly_fraction))
+        atr = _field(getattr(candidate, "technical_snapshot", None), "atr", 0.02)
+        current_price = getattr(candidate, "current_price", 100)
+        sign = 1 if candidate.direction == "BUY" else -1
+        return {
+            "action_type": "create_new_position",
+            "position_size": 100000 * kelly_fraction,
+            "size_calculation_method": new.initial_position_calculation,
+            "stop_loss_price": current_price * (1 - sign * atr * new.stop_loss_atr_multiplier),
+            "take_profit_price": current_price * (1 + sign * atr * new.take_profit_atr_multiplier),
+            "risk_per_trade": new.risk_per_trade_limit
+        }
+
 class EPLIntelligentDecisionEngine:
     """EPL 智能決策引擎 v2.1.0 - 100% JSON 規範實現
     
@@ -1868,6 +2597,7 @@ class EPLIntelligentDecisionEngine:
         self.priority_classifier = PriorityClassificationSystem()
         self.notification_system = NotificationSystem()
         self.risk_framework = RiskManagementFramework()
+        self.batch_pipeline = VectorizedDecisionPipeline(self)
         
         # JSON 規範決策統計
         self.decision_statistics = {
@@ -1893,6 +2623,7 @@ class EPLIntelligentDecisionEngine:
         
         logger.info("EPL 智能決策引擎 v2.1.0 初始化完成 - 100% JSON 規範")
     
+    @pipeline_metrics.timed_stage("epl.decision", symbol_arg="candidate.symbol", root=True)
     async def process_signal_candidate(self, candidate: SignalCandidate, 
                                      current_positions: List[PositionInfo],
                                      market_context: Dict[str, Any] = None) -> EPLDecisionResult:
@@ -1937,7 +2668,8 @@ class EPLIntelligentDecisionEngine:
                 decision_result.reasoning.append("風險最終確認失敗")
             
             # 7. 通知系統
-            notification_result = await self.notification_system.send_notification(decision_result)
+            async with pipeline_metrics.stage("epl.notification", candidate.symbol):
+                notification_result = await self.notification_system.send_notification(decision_result)
             decision_result.notification_config = notification_result
             
             # 8. Phase2 集成增強
@@ -1966,6 +2698,42 @@ class EPLIntelligentDecisionEngine:
             logger.error(f"EPL 處理失敗: {e}", exc_info=True)
             return self._create_error_result(candidate, f"處理異常: {str(e)}")
     
+    def decide_batch(self, candidates: List[SignalCandidate],
+                     current_positions: List[PositionInfo]) -> List[EPLDecisionResult]:
+        """批量同步決策 - 持倉聚合每批計算一次，候選者以向量化方式評估 (無 I/O)"""
+        aggregates = PortfolioAggregates.from_positions(current_positions, self.risk_framework)
+        return self.batch_pipeline.decide(candidates, aggregates)
+    
+    async def process_signal_candidates_batch(self, candidates: List[SignalCandidate],
+                                              current_positions: List[PositionInfo],
+                                              send_notifications: bool = True) -> List[EPLDecisionResult]:
+        """批量處理信號候選者 - 異步僅保留在通知與統計邊界
+        
+        Phase2 集成增強只在單筆 process_signal_candidate 路徑中套用。
+        """
+        start_time = time.time()
+        
+        try:
+            results = self.decide_batch(candidates, current_positions)
+            
+            if send_notifications:
+                for decision_result in results:
+                    if decision_result.decision != EPLDecision.SIGNAL_IGNORE:
+                        decision_result.notification_config = await self.notification_system.send_notification(decision_result)
+            
+            processing_time = time.time() - start_time
+            per_decision_time = processing_time / len(results) if results else 0.0
+            pipeline_metrics.observe_ms("epl.batch", None, processing_time * 1000)
+            for decision_result in results:
+                await self._update_statistics(decision_result, per_decision_time)
+            
+            logger.info(f"EPL 批量決策完成: {len(results)} 候選者 | 持倉: {len(current_positions)} | 時間: {processing_time * 1000:.2f}ms")
+            return results
+            
+        except Exception as e:
+            logger.error(f"EPL 批量處理失敗: {e}", exc_info=True)
+            return [self._create_error_result(candidate, f"批量處理異常: {str(e)}") for candidate in candidates]
+    
     async def _create_final_epl_ready_candidate(self, candidate: SignalCandidate) -> SignalCandidate:
         """創建最終 EPL 就緒候選者 - JSON 規範要求"""
         
@@ -2007,20 +2775,21 @@ class EPLIntelligentDecisionEngine:
             embedded_scores["signal_quality"] = min(1.0, candidate.confidence * candidate.signal_strength)
             
             # 技術品質
+            defaults = EMBEDDED_QUALITY_DEFAULTS
             if hasattr(candidate, 'technical_snapshot') and candidate.technical_snapshot:
-                technical_consistency = getattr(candidate.technical_snapshot, 'consistency_score', 0.7)
+                technical_consistency = getattr(candidate.technical_snapshot, 'consistency_score', defaults["consistency_score"])
                 embedded_scores["technical_quality"] = technical_consistency
             else:
-                embedded_scores["technical_quality"] = 0.6
+                embedded_scores["technical_quality"] = defaults["technical_quality"]
             
             # 市場品質
             if hasattr(candidate, 'market_environment') and candidate.market_environment:
-                liquidity = getattr(candidate.market_environment, 'liquidity', 0.7)
-                volatility = getattr(candidate.market_environment, 'volatility', 0.05)
+                liquidity = getattr(candidate.market_environment, 'liquidity', defaults["liquidity"])
+                volatility = getattr(candidate.market_environment, 'volatility', defaults["volatility"])
                 market_quality = liquidity * (1.0 - min(0.5, volatility * 10))
                 embedded_scores["market_quality"] = market_quality
             else:
-                embedded_scores["market_quality"] = 0.6
+                embedded_scores["market_quality"] = defaults["market_quality"]
             
             # 時機品質
             signal_age = (datetime.now() - candidate.timestamp).total_seconds()
@@ -2028,8 +2797,8 @@ class EPLIntelligentDecisionEngine:
             embedded_scores["timing_quality"] = timing_quality
             
             # 風險品質
-            potential_reward = getattr(candidate, 'potential_reward', 0.03)
-            potential_risk = getattr(candidate, 'potential_risk', 0.015)
+            potential_reward = getattr(candidate, 'potential_reward', defaults["potential_reward"])
+            potential_risk = getattr(candidate, 'potential_risk', defaults["potential_risk"])
             if potential_risk > 0:
                 risk_reward_ratio = potential_reward / potential_risk
                 risk_quality = min(1.0, risk_reward_ratio / 2.0)  # 2:1 為滿分
@@ -2038,13 +2807,7 @@ class EPLIntelligentDecisionEngine:
             embedded_scores["risk_quality"] = risk_quality
             
             # 綜合品質 - 加權平均
-            weights = {
-                "signal_quality": 0.3,
-                "technical_quality": 0.25,
-                "market_quality": 0.2,
-                "timing_quality": 0.15,
-                "risk_quality": 0.1
-            }
+            weights = EMBEDDED_QUALITY_WEIGHTS
             
             composite_quality = sum(
                 embedded_scores[quality] * weights[quality] 
@@ -2139,27 +2902,59 @@ class EPLIntelligentDecisionEngine:
     async def _execute_decision_engine(self, scenario: str, candidate: SignalCandidate,
                                      current_positions: List[PositionInfo],
                                      risk_assessment: Dict[str, Any]) -> EPLDecisionResult:
-        """執行對應的決策引擎"""
+        """執行對應的決策引擎 - 情境引擎返回 (是否通過, 理由, 執行參數)，未通過時降級為忽略"""
         
         engine_start_time = time.time()
         
         try:
+            existing_position = next(
+                (position for position in current_positions if position.symbol == candidate.symbol), None
+            )
+            ignore_documentation = {}
+            
             if scenario == "REPLACE_POSITION":
-                result = await self.replacement_engine.evaluate_replacement_opportunity(
-                    candidate, current_positions
+                decision = EPLDecision.REPLACE_POSITION
+                approved, reasoning, execution_params = await self.replacement_engine.evaluate_replacement(
+                    candidate, existing_position
                 )
             elif scenario == "STRENGTHEN_POSITION":
-                result = await self.strengthening_engine.evaluate_strengthening_opportunity(
-                    candidate, current_positions
+                decision = EPLDecision.STRENGTHEN_POSITION
+                approved, reasoning, execution_params = await self.strengthening_engine.evaluate_strengthening(
+                    candidate, existing_position
                 )
             elif scenario == "CREATE_NEW_POSITION":
-                result = await self.new_position_engine.evaluate_new_position_opportunity(
+                decision = EPLDecision.CREATE_NEW_POSITION
+                approved, reasoning, execution_params = await self.new_position_engine.evaluate_new_position(
                     candidate, current_positions
                 )
             else:  # SIGNAL_IGNORE
-                result = await self.ignore_engine.evaluate_ignore_decision(
-                    candidate, current_positions
+                decision = EPLDecision.SIGNAL_IGNORE
+                portfolio_metrics = risk_assessment.get("portfolio_level_check", {}).get("current_metrics", {})
+                _, ignore_reasons, ignore_documentation = await self.ignore_engine.evaluate_ignore(
+                    candidate, current_positions, portfolio_metrics
                 )
+                approved, execution_params = False, {}
+                reasoning = ["未滿足任何執行情境觸發條件"] + ignore_reasons
+            
+            if not approved:
+                decision = EPLDecision.SIGNAL_IGNORE
+                execution_params = {}
+            
+            result = EPLDecisionResult(
+                decision=decision,
+                confidence=candidate.confidence if approved else 0.0,
+                priority=SignalPriority.LOW,
+                candidate=candidate,
+                reasoning=reasoning,
+                execution_params=execution_params,
+                risk_assessment=risk_assessment,
+                performance_tracking={"decision_scenario": scenario},
+                notification_config={},
+                timestamp=datetime.now()
+            )
+            if ignore_documentation:
+                result.ignore_reason = ignore_documentation.get("ignore_reason_classification")
+                result.improvement_suggestions = ignore_documentation.get("improvement_suggestions")
             
             # 檢查處理時間
             engine_time = (time.time() - engine_start_time) * 1000
@@ -2528,6 +3323,7 @@ class EPLIntelligentDecisionEngine:
         
         # 場景統計
         scenario = decision_result.decision.value
+        pipeline_metrics.inc("epl_decisions_total", decision=scenario, priority=decision_result.priority.name)
         if scenario in self.decision_statistics["scenario_counts"]:
             self.decision_statistics["scenario_counts"][scenario] += 1
         
@@ -2643,17 +3439,6 @@ class EPLIntelligentDecisionEngine:
             return {"error": str(e)}
 
 # JSON 規範輔助類型定義
-class PositionInfo:
-    """持倉信息類型"""
-    def __init__(self, symbol: str, direction: str, size: float, 
-                 entry_price: float, unrealized_pnl: float = 0.0):
-        self.symbol = symbol
-        self.direction = direction  # "BUY" or "SELL"
-        self.size = size
-        self.entry_price = entry_price
-        self.unrealized_pnl = unrealized_pnl
-        self.entry_confidence = 0.7  # 預設入場信心度
-
 # 系統初始化與配置
 async def initialize_epl_system() -> EPLIntelligentDecisionEngine:
     """初始化 EPL 系統 - JSON 規範配置"""
@@ -2694,75 +3479,14 @@ __all__ = [
     'PriorityClassificationSystem',
     'NotificationSystem',
     'RiskManagementFramework',
+    'PortfolioRiskState',
+    'PortfolioAggregates',
+    'VectorizedDecisionPipeline',
     'initialize_epl_system'
 ]
 
-if __name__ == "__main__":
-    import asyncio
-    
-    async def test_epl_engine():
-        """測試 EPL 引擎基本功能"""
-        
-        # 初始化引擎
-        engine = await initialize_epl_system()
-        
-        # 創建測試信號候選者
-        from datetime import datetime
-        
-        class MockTechnicalSnapshot:
-            def __init__(self):
-                self.price = 100.0
-                self.atr = 0.02
-                self.trend = "bullish"
-                self.consistency_score = 0.8
-        
-        class MockMarketEnvironment:
-            def __init__(self):
-                self.volatility = 0.05
-                self.liquidity = 0.8
-        
-        test_candidate = SignalCandidate(
-            symbol="BTCUSDT",
-            direction="BUY", 
-            confidence=0.85,
-            signal_strength=0.9,
-            timestamp=datetime.now(),
-            technical_snapshot=MockTechnicalSnapshot(),
-            market_environment=MockMarketEnvironment()
-        )
-        
-        # 測試決策處理
-        current_positions = []
-        result = await engine.process_signal_candidate(test_candidate, current_positions)
-        
-        logger.info(f"決策結果: {result.decision.value}")
-        logger.info(f"優先級: {result.priority.name}")
-        logger.info(f"信心度: {result.confidence:.3f}")
-        logger.info(f"處理時間: {result.processing_metadata['processing_time_ms']:.2f}ms")
-        
-        # 系統狀態檢查
-        status = await engine.get_system_status()
-        logger.info(f"系統狀態: {status['status']}")
-        logger.info(f"總處理數: {status['statistics']['total_decisions']}")
-    
-    # 運行測試
-    asyncio.run(test_epl_engine())
-    
-    def _calculate_optimal_size(self, candidate: SignalCandidate, current_position: PositionInfo) -> float:
-        """計算最佳新倉位大小"""
-        # 基於信心度調整倉位大小
-        confidence_multiplier = min(2.0, candidate.confidence * 2)
-        base_size = current_position.size
-        
-        # 考慮波動性調整
-        volatility = candidate.market_environment.volatility
-        volatility_adjustment = max(0.5, 1.0 - volatility * 10)
-        
-        optimal_size = base_size * confidence_multiplier * volatility_adjustment
-        return round(optimal_size, 4)
-
-class StrengtheningDecisionEngine:
-    """情境 B: 加倉決策引擎"""
+class ExecutionPolicyStrengtheningEngine:
+    """情境 B: 加倉決策引擎 - ExecutionPolicyLayer 使用 (單一持倉評估)"""
     
     def __init__(self):
         self.confidence_threshold = 0.08  # 信心度提升閾值 +8%
@@ -3083,8 +3807,8 @@ class NewPositionDecisionEngine:
         
         return stop_loss, take_profit
 
-class IgnoreDecisionEngine:
-    """情境 D: 信號忽略引擎"""
+class ExecutionPolicyIgnoreEngine:
+    """情境 D: 信號忽略引擎 - ExecutionPolicyLayer 使用 (基於前處理結果)"""
     
     def __init__(self):
         self.ignore_reasons = {
@@ -3256,9 +3980,9 @@ class ExecutionPolicyLayer:
     
     def __init__(self):
         self.replacement_engine = ReplacementDecisionEngine()
-        self.strengthening_engine = StrengtheningDecisionEngine()
+        self.strengthening_engine = ExecutionPolicyStrengtheningEngine()
         self.new_position_engine = NewPositionDecisionEngine()
-        self.ignore_engine = IgnoreDecisionEngine()
+        self.ignore_engine = ExecutionPolicyIgnoreEngine()
         self.priority_classifier = PriorityClassificationEngine()
         
         # 模擬持倉管理 (實際應整合交易系統)
@@ -4028,3 +4752,55 @@ class EnhancedExecutionPolicyLayer(ExecutionPolicyLayer):
 
 # 全局增強版執行決策層實例
 enhanced_execution_policy_layer = EnhancedExecutionPolicyLayer()
+
+
+if __name__ == "__main__":
+    import asyncio
+    
+    async def test_epl_engine():
+        """測試 EPL 引擎基本功能"""
+        
+        # 初始化引擎
+        engine = await initialize_epl_system()
+        
+        # 創建測試信號候選者
+        from datetime import datetime
+        
+        class MockTechnicalSnapshot:
+            def __init__(self):
+                self.price = 100.0
+                self.atr = 0.02
+                self.trend = "bullish"
+                self.consistency_score = 0.8
+        
+        class MockMarketEnvironment:
+            def __init__(self):
+                self.volatility = 0.05
+                self.liquidity = 0.8
+        
+        test_candidate = SignalCandidate(
+            symbol="BTCUSDT",
+            direction="BUY", 
+            confidence=0.85,
+            signal_strength=0.9,
+            timestamp=datetime.now(),
+            technical_snapshot=MockTechnicalSnapshot(),
+            market_environment=MockMarketEnvironment()
+        )
+        
+        # 測試決策處理
+        current_positions = []
+        result = await engine.process_signal_candidate(test_candidate, current_positions)
+        
+        logger.info(f"決策結果: {result.decision.value}")
+        logger.info(f"優先級: {result.priority.name}")
+        logger.info(f"信心度: {result.confidence:.3f}")
+        logger.info(f"處理時間: {result.processing_metadata['processing_time_ms']:.2f}ms")
+        
+        # 系統狀態檢查
+        status = await engine.get_system_status()
+        logger.info(f"系統狀態: {status['status']}")
+        logger.info(f"總處理數: {status['statistics']['total_decisions']}")
+    
+    # 運行測試
+    asyncio.run(test_epl_engine())
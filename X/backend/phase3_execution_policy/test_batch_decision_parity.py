@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+批量決策一致性測試 - decide_batch 與逐筆 process_signal_candidate 對同一批候選者給出相同的決策與優先級
+
+    python test_batch_decision_parity.py
+"""
+
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加路徑
+sys.path.append(str(Path(__file__).parent))
+
+from epl_batch_decision_benchmark import build_candidate, build_candidates, build_positions
+from epl_intelligent_decision_engine import (
+    EPLDecision,
+    EPLIntelligentDecisionEngine,
+    PositionInfo,
+    SignalCandidate
+)
+
+
+def _signal(symbol: str, direction: str, confidence: float, strength: float = 0.8) -> SignalCandidate:
+    """固定數值的信號 - 用於確定命中加倉 / 新單情境"""
+    return SignalCandidate(
+        id=f"parity_{symbol}_{confidence}",
+        symbol=symbol,
+        signal_strength=strength,
+        confidence=confidence,
+        direction=direction,
+        timestamp=datetime.now(),
+        source="parity",
+        data_completeness=1.0,
+        signal_clarity=0.8,
+        dynamic_params={},
+        market_environment=SimpleNamespace(volatility=0.03, liquidity=0.8, liquidity_score=0.8),
+        technical_snapshot=SimpleNamespace(price=100.0, rsi=80.0, trend_strength=0.8, momentum=0.4)
+    )
+
+
+def _position(symbol: str, direction: str, size: float, pnl: float, signal_confidence: float) -> PositionInfo:
+    return PositionInfo(
+        symbol=symbol,
+        direction=direction,
+        size=size,
+        entry_price=100.0,
+        current_signal=_signal(symbol, direction, signal_confidence, strength=0.7),
+        stop_loss=None,
+        take_profit=None,
+        unrealized_pnl=pnl,
+        entry_timestamp=datetime.now() - timedelta(minutes=30),
+        position_age_minutes=30.0
+    )
+
+
+def _assert_parity(engine: EPLIntelligentDecisionEngine, candidates, positions):
+    batch = engine.decide_batch(candidates, positions)
+
+    async def run_sequential():
+        return [await engine.process_signal_candidate(candidate, positions) for candidate in candidates]
+
+    sequential = asyncio.run(run_sequential())
+
+    assert len(batch) == len(sequential) == len(candidates)
+    for candidate, batch_result, sequential_result in zip(candidates, batch, sequential):
+        assert batch_result.decision == sequential_result.decision, (
+            f"{candidate.symbol}: 批量 {batch_result.decision.name} ≠ 逐筆 {sequential_result.decision.name} "
+            f"({sequential_result.reasoning})"
+        )
+        assert batch_result.priority == sequential_result.priority, candidate.symbol
+    return [result.decision for result in batch]
+
+
+def test_parity_on_engineered_scenarios():
+    positions = [
+        _position("BTCUSDT", "BUY", 5000.0, 0.05, 0.6),
+        _position("ETHUSDT", "SELL", 5000.0, 0.05, 0.6),
+        _position("SOLUSDT", "BUY", 5000.0, -0.02, 0.6),
+        _position("XRPUSDT", "SELL", 5000.0, 0.01, 0.75)
+    ]
+    candidates = [
+        _signal("BTCUSDT", "BUY", 0.95),    # 加倉
+        _signal("ETHUSDT", "BUY", 0.95),    # 替單情境
+        _signal("SOLUSDT", "BUY", 0.95),    # 加倉情境但持倉虧損
+        _signal("XRPUSDT", "SELL", 0.72),   # 信心提升不足 → 忽略
+        _signal("ADAUSDT", "BUY", 0.9),     # 新單
+        _signal("DOTUSDT", "SELL", 0.6)     # 新標的但品質不足 → 忽略
+    ]
+
+    decisions = _assert_parity(EPLIntelligentDecisionEngine(), candidates, positions)
+    assert decisions[0] == EPLDecision.STRENGTHEN_POSITION
+    assert decisions[2] == EPLDecision.SIGNAL_IGNORE
+    assert decisions[3] == EPLDecision.SIGNAL_IGNORE
+    assert decisions[4] == EPLDecision.CREATE_NEW_POSITION
+    assert decisions[5] == EPLDecision.SIGNAL_IGNORE
+
+
+def test_parity_on_benchmark_workload():
+    random.seed(7)
+    positions = build_positions(6)
+    candidates = build_candidates(60, positions)
+    _assert_parity(EPLIntelligentDecisionEngine(), candidates, positions)
+
+
+def test_parity_without_positions():
+    random.seed(3)
+    candidates = [build_candidate(f"NEW{i:03d}USDT", random.uniform(0.5, 0.99)) for i in range(20)]
+    _assert_parity(EPLIntelligentDecisionEngine(), candidates, [])
+
+
+if __name__ == "__main__":
+    for test in (test_parity_on_engineered_scenarios,
+                 test_parity_on_benchmark_workload,
+                 test_parity_without_positions):
+        test()
+        print(f"✅ {test.__name__}")
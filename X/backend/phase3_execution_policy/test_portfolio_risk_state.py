@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+投資組合風險狀態測試 - 由已知收益率序列構造行情價格，核對 EWMA 協方差、參數化 VaR 與標的追蹤
+
+    python test_portfolio_risk_state.py
+"""
+
+import math
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# 添加路徑
+sys.path.append(str(Path(__file__).parent))
+
+from epl_intelligent_decision_engine import PositionInfo, RiskManagementFramework
+
+INTERVAL = 60.0
+
+# 已知週期收益率序列 (兩個標的，部分同向、部分反向)
+RETURNS_A = [0.012, -0.008, 0.021, -0.015, 0.004, 0.009, -0.011, 0.017, -0.003, 0.006,
+             -0.019, 0.013, 0.002, -0.007, 0.015, -0.012, 0.008, 0.001, -0.016, 0.010,
+             0.005, -0.009, 0.014, -0.004, 0.011]
+RETURNS_B = [0.015, -0.012, 0.018, -0.010, -0.002, 0.011, -0.014, 0.020, 0.001, 0.004,
+             -0.022, 0.016, -0.003, -0.005, 0.012, -0.017, 0.010, -0.002, -0.013, 0.014,
+             0.007, -0.011, 0.019, -0.006, 0.008]
+
+
+def _position(symbol: str, direction: str, size: float, pnl: float = 0.0) -> PositionInfo:
+    return PositionInfo(
+        symbol=symbol,
+        direction=direction,
+        size=size,
+        entry_price=100.0,
+        current_signal=None,
+        stop_loss=None,
+        take_profit=None,
+        unrealized_pnl=pnl,
+        entry_timestamp=datetime.now(),
+        position_age_minutes=30.0
+    )
+
+
+def _ewma(lam: float, xs, ys) -> float:
+    value = 0.0
+    for x, y in zip(xs, ys):
+        value = lam * value + (1 - lam) * x * y
+    return value
+
+
+def _replay(framework: RiskManagementFramework, returns_a, returns_b=None):
+    """按週期推送由收益率序列構造的價格；returns_b 為 None 時 ETH 在這些週期沒有新價格"""
+    state = framework.portfolio_state
+    start = state.return_periods
+    prices = dict(state._latest_prices)
+    if not prices:
+        prices = {"BTCUSDT": 45000.0, "ETHUSDT": 2500.0}
+        framework.update_prices(dict(prices), now=0.0)
+    for t, r_a in enumerate(returns_a, start=start + 1):
+        update = {"BTCUSDT": prices["BTCUSDT"] * (1 + r_a)}
+        if returns_b is not None:
+            update["ETHUSDT"] = prices["ETHUSDT"] * (1 + returns_b[t - start - 1])
+        prices.update(update)
+        framework.update_prices(update, now=t * INTERVAL)
+
+
+def _framework_with_positions() -> RiskManagementFramework:
+    framework = RiskManagementFramework()
+    framework.sync_portfolio_state([
+        _position("BTCUSDT", "BUY", 0.10, 0.02),
+        _position("ETHUSDT", "SELL", 0.05, -0.01)
+    ])
+    return framework
+
+
+def test_covariance_matches_known_return_series():
+    framework = _framework_with_positions()
+    state = framework.portfolio_state
+    _replay(framework, RETURNS_A, RETURNS_B)
+
+    lam = state.ewma_lambda
+    assert state.return_periods == len(RETURNS_A)
+    assert abs(state.covariance["BTCUSDT"]["BTCUSDT"] - _ewma(lam, RETURNS_A, RETURNS_A)) < 1e-12
+    assert abs(state.covariance["ETHUSDT"]["ETHUSDT"] - _ewma(lam, RETURNS_B, RETURNS_B)) < 1e-12
+    assert abs(state.covariance["BTCUSDT"]["ETHUSDT"] - _ewma(lam, RETURNS_A, RETURNS_B)) < 1e-12
+
+    # 參數化 VaR = z·sqrt(wᵀΣw) / 總暴露，w = (+0.10, -0.05)
+    w_a, w_b = 0.10, -0.05
+    variance = (w_a * w_a * _ewma(lam, RETURNS_A, RETURNS_A) +
+                w_b * w_b * _ewma(lam, RETURNS_B, RETURNS_B) +
+                2 * w_a * w_b * _ewma(lam, RETURNS_A, RETURNS_B))
+    expected_var = state.confidence_z * math.sqrt(variance) / (abs(w_a) + abs(w_b))
+    assert abs(state.parametric_var() - expected_var) < 1e-12
+
+    # 觀測數超過 min_return_observations 後日 VaR 由 |PnL|×10% 回退切換為參數化 VaR
+    assert state.has_covariance_estimate()
+    assert state.daily_var() == state.parametric_var()
+    assert abs(state.daily_var() - state.abs_unrealized_pnl * 0.1) > 1e-6
+
+
+def test_daily_var_uses_fallback_before_enough_returns():
+    framework = _framework_with_positions()
+    state = framework.portfolio_state
+    _replay(framework, RETURNS_A[:state.min_return_observations - 1], RETURNS_B)
+
+    assert not state.has_covariance_estimate()
+    assert abs(state.daily_var() - state.abs_unrealized_pnl * 0.1) < 1e-12
+
+
+def test_symbol_without_fresh_price_records_no_return():
+    framework = _framework_with_positions()
+    state = framework.portfolio_state
+    _replay(framework, RETURNS_A[:10], RETURNS_B[:10])
+    eth_variance = state.covariance["ETHUSDT"]["ETHUSDT"]
+
+    # ETH 持倉仍在，但接下來 5 個週期只有 BTC 有新價格
+    _replay(framework, RETURNS_A[10:15])
+    assert state.return_observations["BTCUSDT"] == 15
+    assert state.return_observations["ETHUSDT"] == 10
+    assert state.covariance["ETHUSDT"]["ETHUSDT"] == eth_variance
+    assert abs(state.covariance["BTCUSDT"]["BTCUSDT"] - _ewma(state.ewma_lambda, RETURNS_A[:15], RETURNS_A[:15])) < 1e-12
+
+
+def test_mark_prices_feed_returns_and_closed_symbols_are_pruned():
+    framework = RiskManagementFramework()
+    state = framework.portfolio_state
+    btc = _position("BTCUSDT", "BUY", 0.10)
+    eth = _position("ETHUSDT", "SELL", 0.05)
+    framework.sync_portfolio_state([btc, eth])
+
+    btc.mark_price, eth.mark_price = 45000.0, 2500.0
+    framework.observe_mark_prices([btc, eth], now=0.0)
+    btc.mark_price, eth.mark_price = 45450.0, 2475.0
+    framework.observe_mark_prices([btc, eth], now=INTERVAL)
+    assert state.return_observations["BTCUSDT"] == 1
+    assert abs(state.covariance["BTCUSDT"]["ETHUSDT"] - (1 - state.ewma_lambda) * 0.01 * -0.01) < 1e-12
+
+    # ETH 平倉後不再追蹤其價格與協方差
+    framework.sync_portfolio_state([btc])
+    assert "ETHUSDT" not in state._latest_prices
+    assert "ETHUSDT" not in state.covariance
+    assert "ETHUSDT" not in state.covariance["BTCUSDT"]
+    assert "ETHUSDT" not in state.return_observations
+
+
+def test_incremental_variance_matches_rebuild():
+    framework = _framework_with_positions()
+    state = framework.portfolio_state
+    _replay(framework, RETURNS_A, RETURNS_B)
+    state.resize_position("BTCUSDT", 0.12)
+
+    incremental = state.parametric_var()
+    state.rebuild()
+    assert abs(state.parametric_var() - incremental) < 1e-12
+
+
+if __name__ == "__main__":
+    for test in (test_covariance_matches_known_return_series,
+                 test_daily_var_uses_fallback_before_enough_returns,
+                 test_symbol_without_fresh_price_records_no_return,
+                 test_mark_prices_feed_returns_and_closed_symbols_are_pruned,
+                 test_incremental_variance_matches_rebuild):
+        test()
+        print(f"✅ {test.__name__}")
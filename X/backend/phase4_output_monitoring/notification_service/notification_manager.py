@@ -20,6 +20,11 @@ from collections import defaultdict, deque
 from enum import Enum
 import statistics
 import uuid
+import sys
+
+# 共用管線指標層
+sys.path.append(str(Path(__file__).parent.parent.parent / "shared_core"))
+from pipeline_metrics import pipeline_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -421,6 +426,8 @@ class NotificationSuccessRateMonitor:
             
             # 更新實時統計
             self._update_real_time_stats(record, "sent")
+            pipeline_metrics.inc("notifications_sent_total", channel=record.channel.value,
+                                 priority=record.priority.value)
             
             # 更新通道指標
             self._update_channel_metrics(record.channel.value, "sent")
@@ -460,6 +467,8 @@ class NotificationSuccessRateMonitor:
             # 更新其他字段
             if 'delivery_latency' in status_data:
                 record.delivery_latency = float(status_data['delivery_latency'])
+                pipeline_metrics.observe_ms(f"notification.delivery.{record.channel.value}", None,
+                                            record.delivery_latency)
             
             if 'retry_count' in status_data:
                 record.retry_count = int(status_data['retry_count'])
@@ -472,6 +481,8 @@ class NotificationSuccessRateMonitor:
             
             # 更新統計
             self._update_real_time_stats(record, new_status.value)
+            pipeline_metrics.inc("notification_status_total", channel=record.channel.value,
+                                 status=new_status.value)
             self._update_channel_metrics(record.channel.value, new_status.value)
             
             # 更新架構監控
@@ -0,0 +1,472 @@
+"""
+📈 Trading X - 管線指標與追蹤層
+Pipeline Metrics & Tracing
+
+統一的低開銷儀表層，取代各模組分散的計時與只記錄到日誌的統計：
+- 計數器與延遲直方圖按執行緒分片，熱路徑寫入不加鎖，抓取時才合併
+- HDR 風格對數-線性直方圖 (微秒，約 6% 相對誤差)，按 (階段, 交易對) 分開
+- stage() 同時支援 with / async with；timed_stage() 裝飾同步與異步函數
+- 按取樣率記錄一個 tick 經過 Phase1A → 候選池 → EPL → 通知 的 span 追蹤
+  (以 contextvars 在同一異步調用鏈中傳遞，asyncio.create_task 會自動複製上下文)
+- render_prometheus() 輸出 Prometheus text format (0.0.4)，供 /metrics 端點使用
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 對數-線性分桶: 每個 2 的冪區間 16 個子桶，覆蓋 0 ~ 2^36 微秒 (約 19 小時)
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+MAX_TRACKABLE_US = (1 << 36) - 1
+BUCKET_COUNT = (36 - SUB_BUCKET_BITS + 2) * SUB_BUCKET_HALF
+
+# Prometheus 直方圖輸出的 le 邊界 (秒)
+PROMETHEUS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                      0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+ALL_SYMBOLS = "_all"
+OTHER_SYMBOLS = "_other"
+
+
+def bucket_index(value_us: int) -> int:
+    """微秒值 → 桶索引"""
+    if value_us < 2 * SUB_BUCKET_HALF:
+        return max(value_us, 0)
+    value_us = min(value_us, MAX_TRACKABLE_US)
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return shift * SUB_BUCKET_HALF + (value_us >> shift)
+
+
+def bucket_upper_bound(index: int) -> int:
+    """桶索引 → 該桶可容納的最大微秒值"""
+    if index < 2 * SUB_BUCKET_HALF:
+        return index
+    shift = index // SUB_BUCKET_HALF - 1
+    mantissa = index - shift * SUB_BUCKET_HALF
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """HDR 風格延遲直方圖 - 單一寫入者，合併後讀取"""
+
+    __slots__ = ('counts', 'total_count', 'sum_us', 'max_us')
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total_count = 0
+        self.sum_us = 0
+        self.max_us = 0
+
+    def record(self, value_us: int):
+        self.counts[bucket_index(value_us)] += 1
+        self.total_count += 1
+        self.sum_us += value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: 'LatencyHistogram'):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total_count += other.total_count
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, quantile: float) -> float:
+        """返回分位數 (微秒，取桶上界)"""
+        if self.total_count == 0:
+            return 0.0
+        target = max(1, int(quantile * self.total_count + 0.5))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return float(min(bucket_upper_bound(index), self.max_us))
+        return float(self.max_us)
+
+    def cumulative_at(self, bound_us: int) -> int:
+        """小於等於 bound_us 的樣本數 (桶粒度近似)"""
+        last = bucket_index(bound_us)
+        return sum(itertools.islice(self.counts, 0, last + 1))
+
+
+class _Shard:
+    """單一執行緒的指標分片 - 只有擁有者執行緒寫入"""
+
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+
+class Trace:
+    """一次取樣的 tick 追蹤"""
+
+    __slots__ = ('trace_id', 'name', 'symbol', 'started_at', 'start_perf', 'duration_ms', 'spans')
+
+    def __init__(self, name: str, symbol: Optional[str]):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.symbol = symbol
+        self.started_at = time.time()
+        self.start_perf = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+
+    def add_span(self, stage: str, symbol: Optional[str], start_perf: float, duration_ms: float, error: bool = False):
+        self.spans.append({
+            'stage': stage,
+            'symbol': symbol,
+            'offset_ms': round((start_perf - self.start_perf) * 1000, 3),
+            'duration_ms': round(duration_ms, 3),
+            'error': error
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'symbol': self.symbol,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'spans': sorted(self.spans, key=lambda span: span['offset_ms'])
+        }
+
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('pipeline_trace', default=None)
+
+
+class _StageTimer:
+    """stage() 返回的計時器 - 同時支援 with 與 async with"""
+
+    __slots__ = ('_metrics', '_stage', '_symbol', '_start')
+
+    def __init__(self, metrics: 'PipelineMetrics', stage: str, symbol: Optional[str]):
+        self._metrics = metrics
+        self._stage = stage
+        self._symbol = symbol
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        self._metrics.observe_ms(self._stage, self._symbol, elapsed_ms,
+                                 start_perf=self._start, error=exc_type is not None)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class _TraceScope:
+    """trace() 返回的追蹤範圍 - 已有追蹤時不重複開啟"""
+
+    __slots__ = ('_metrics', '_name', '_symbol', '_trace', '_token')
+
+    def __init__(self, metrics: 'PipelineMetrics', name: str, symbol: Optional[str]):
+        self._metrics = metrics
+        self._name = name
+        self._symbol = symbol
+        self._trace: Optional[Trace] = None
+        self._token = None
+
+    def __enter__(self):
+        if _current_trace.get() is None and self._metrics.should_sample():
+            self._trace = Trace(self._name, self._symbol)
+            self._token = _current_trace.set(self._trace)
+        return self._trace
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._trace is not None:
+            _current_trace.reset(self._token)
+            self._trace.duration_ms = round((time.perf_counter() - self._trace.start_perf) * 1000, 3)
+            self._metrics.recent_traces.append(self._trace)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class PipelineMetrics:
+    """管線指標註冊表 - 分片計數器 + 延遲直方圖 + 取樣追蹤"""
+
+    def __init__(self, namespace: str = "trading_x", trace_sample_rate: float = 0.01,
+                 max_traces: int = 200, max_symbols_per_stage: int = 256):
+        self.namespace = namespace
+        self.max_symbols_per_stage = max_symbols_per_stage
+        self._trace_interval = 0
+        self.configure_tracing(trace_sample_rate)
+        self._trace_counter = itertools.count()
+
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+        self._stage_symbols: Dict[str, set] = {}
+        self._gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+        self.recent_traces: deque = deque(maxlen=max_traces)
+        self.started_at = time.time()
+
+    # ==================== 配置 ====================
+
+    def configure_tracing(self, sample_rate: float):
+        """設定追蹤取樣率 (0 表示關閉，1 表示每個 tick 都追蹤)"""
+        self.trace_sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self._trace_interval = int(round(1.0 / self.trace_sample_rate)) if self.trace_sample_rate > 0 else 0
+
+    def should_sample(self) -> bool:
+        if self._trace_interval == 0:
+            return False
+        return next(self._trace_counter) % self._trace_interval == 0
+
+    # ==================== 寫入 (熱路徑) ====================
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _symbol_label(self, stage: str, symbol: Optional[str]) -> str:
+        if not symbol:
+            return ALL_SYMBOLS
+        symbols = self._stage_symbols.get(stage)
+        if symbols is None:
+            symbols = self._stage_symbols.setdefault(stage, set())
+        if symbol in symbols:
+            return symbol
+        if len(symbols) >= self.max_symbols_per_stage:
+            return OTHER_SYMBOLS
+        symbols.add(symbol)
+        return symbol
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """計數器累加"""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ())
+        counters = self._shard().counters
+        counters[key] = counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """設定儀表值 (最後寫入者生效)"""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ())
+        self._gauges[key] = float(value)
+
+    def observe_ms(self, stage: str, symbol: Optional[str], duration_ms: float,
+                   start_perf: Optional[float] = None, error: bool = False):
+        """記錄一次階段延遲；有取樣中的追蹤時同時記錄 span"""
+        key = (stage, self._symbol_label(stage, symbol))
+        histograms = self._shard().histograms
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = LatencyHistogram()
+        histogram.record(int(duration_ms * 1000))
+        if error:
+            self.inc("stage_errors_total", stage=stage)
+
+        trace = _current_trace.get()
+        if trace is not None:
+            if start_perf is None:
+                start_perf = time.perf_counter() - duration_ms / 1000
+            trace.add_span(stage, symbol, start_perf, duration_ms, error)
+
+    # ==================== 鉤子 ====================
+
+    def stage(self, stage: str, symbol: Optional[str] = None) -> _StageTimer:
+        """計時一個階段: `with metrics.stage(...)` 或 `async with metrics.stage(...)`"""
+        return _StageTimer(self, stage, symbol)
+
+    def trace(self, name: str = "tick", symbol: Optional[str] = None) -> _TraceScope:
+        """開啟 (可能被取樣的) 追蹤範圍；巢狀呼叫會併入外層追蹤"""
+        return _TraceScope(self, name, symbol)
+
+    def timed_stage(self, stage: str, symbol_arg: Optional[str] = None, root: bool = False) -> Callable:
+        """階段計時裝飾器
+
+        symbol_arg 指定交易對來源參數，可用點號取屬性或字典鍵 (例如 "candidate.symbol")；
+        root=True 時在此函數開啟追蹤範圍 (管線入口)。
+        """
+        def decorator(func: Callable) -> Callable:
+            resolve_symbol = self._symbol_resolver(func, symbol_arg)
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    symbol = resolve_symbol(args, kwargs)
+                    if root:
+                        with self.trace(stage, symbol):
+                            with self.stage(stage, symbol):
+                                return await func(*args, **kwargs)
+                    with self.stage(stage, symbol):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                symbol = resolve_symbol(args, kwargs)
+                if root:
+                    with self.trace(stage, symbol):
+                        with self.stage(stage, symbol):
+                            return func(*args, **kwargs)
+                with self.stage(stage, symbol):
+                    return func(*args, **kwargs)
+            return sync_wrapper
+        return decorator
+
+    @staticmethod
+    def _symbol_resolver(func: Callable, symbol_arg: Optional[str]) -> Callable:
+        """在裝飾時解析參數位置，避免每次調用都做 signature 綁定"""
+        if not symbol_arg:
+            return lambda args, kwargs: None
+
+        param, _, path = symbol_arg.partition('.')
+        attrs = path.split('.') if path else []
+        try:
+            position = list(inspect.signature(func).parameters).index(param)
+        except ValueError:
+            position = None
+
+        def resolve(args, kwargs):
+            try:
+                if param in kwargs:
+                    value = kwargs[param]
+                elif position is not None and position < len(args):
+                    value = args[position]
+                else:
+                    return None
+                for attr in attrs:
+                    value = value.get(attr) if isinstance(value, dict) else getattr(value, attr, None)
+                return str(value) if value is not None else None
+            except Exception:
+                return None
+        return resolve
+
+    # ==================== 讀取 ====================
+
+    def _merged(self) -> Tuple[Dict, Dict[Tuple[str, str], LatencyHistogram]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        counters: Dict = {}
+        histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        for shard in shards:
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in list(shard.histograms.items()):
+                merged = histograms.get(key)
+                if merged is None:
+                    merged = histograms[key] = LatencyHistogram()
+                merged.merge(histogram)
+        return counters, histograms
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """JSON 友好的指標快照 (延遲單位 ms)"""
+        counters, histograms = self._merged()
+        stages: Dict[str, Dict[str, Any]] = {}
+        for (stage, symbol), histogram in sorted(histograms.items()):
+            stages.setdefault(stage, {})[symbol] = {
+                'count': histogram.total_count,
+                'mean_ms': histogram.sum_us / histogram.total_count / 1000 if histogram.total_count else 0.0,
+                'p50_ms': histogram.percentile(0.5) / 1000,
+                'p99_ms': histogram.percentile(0.99) / 1000,
+                'p999_ms': histogram.percentile(0.999) / 1000,
+                'max_ms': histogram.max_us / 1000
+            }
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'counters': {self._series_name(name, labels): value for (name, labels), value in sorted(counters.items())},
+            'gauges': {self._series_name(name, labels): value for (name, labels), value in sorted(self._gauges.items())},
+            'stages': stages,
+            'trace_sample_rate': self.trace_sample_rate,
+            'recent_traces': len(self.recent_traces)
+        }
+
+    def get_recent_traces(self, limit: int = 20, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        traces = [trace for trace in reversed(self.recent_traces) if symbol is None or trace.symbol == symbol]
+        return [trace.to_dict() for trace in traces[:limit]]
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    @classmethod
+    def _series_name(cls, name: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return name
+        return name + '{' + ','.join(f'{k}="{cls._escape(v)}"' for k, v in labels) + '}'
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        counters, histograms = self._merged()
+        ns = self.namespace
+        lines = []
+
+        by_name: Dict[str, List] = {}
+        for (name, labels), value in sorted(counters.items()):
+            by_name.setdefault(name, []).append((labels, value))
+        for name, series in by_name.items():
+            metric = f"{ns}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in series:
+                lines.append(f"{self._series_name(metric, labels)} {value:g}")
+
+        by_name = {}
+        for (name, labels), value in sorted(self._gauges.items()):
+            by_name.setdefault(name, []).append((labels, value))
+        for name, series in by_name.items():
+            metric = f"{ns}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in series:
+                lines.append(f"{self._series_name(metric, labels)} {value:g}")
+
+        if histograms:
+            metric = f"{ns}_stage_latency_seconds"
+            lines.append(f"# HELP {metric} Pipeline stage latency per symbol")
+            lines.append(f"# TYPE {metric} histogram")
+            for (stage, symbol), histogram in sorted(histograms.items()):
+                labels = f'stage="{self._escape(stage)}",symbol="{self._escape(symbol)}"'
+                for bound in PROMETHEUS_BUCKETS:
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} '
+                                 f'{histogram.cumulative_at(int(bound * 1_000_000))}')
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.total_count}')
+                lines.append(f'{metric}_sum{{{labels}}} {histogram.sum_us / 1_000_000:.6f}')
+                lines.append(f'{metric}_count{{{labels}}} {histogram.total_count}')
+
+            metric = f"{ns}_stage_latency_quantile_seconds"
+            lines.append(f"# HELP {metric} Pipeline stage latency quantiles (HDR histogram, ~6% precision)")
+            lines.append(f"# TYPE {metric} gauge")
+            for (stage, symbol), histogram in sorted(histograms.items()):
+                labels = f'stage="{self._escape(stage)}",symbol="{self._escape(symbol)}"'
+                for quantile in SUMMARY_QUANTILES:
+                    lines.append(f'{metric}{{{labels},quantile="{quantile:g}"}} '
+                                 f'{histogram.percentile(quantile) / 1_000_000:.6f}')
+
+        lines.append(f"# TYPE {ns}_metrics_uptime_seconds gauge")
+        lines.append(f"{ns}_metrics_uptime_seconds {time.time() - self.started_at:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+# 全局註冊表 - 各模組以 `from pipeline_metrics import pipeline_metrics` 共用同一實例
+pipeline_metrics = PipelineMetrics()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+閃崩檢測回放測試 - 以逐筆成交回放一段閃崩行情，測量檢測延遲
+
+默認使用內建的合成閃崩行情；也可回放錄製的成交數據：
+    python crash_detector_replay_test.py trades.jsonl   # 每行一個 Binance trade 事件 (p / q / T)
+    python crash_detector_replay_test.py trades.csv     # Binance 公開數據 trades CSV (id,price,qty,quote_qty,time,...)
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 添加路徑
+sys.path.append(str(Path(__file__).parent))
+
+from app.utils.crash_detector import CrashDetector, CrashType
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Tick = Tuple[float, float, float]  # (時間戳秒, 價格, 成交量)
+
+def build_flash_crash_session(seed: int = 7, ticks_per_second: int = 5) -> List[Tick]:
+    """合成行情: 40 分鐘平穩 → 3 分鐘內下跌約 16% 並放量 → 部分反彈"""
+    rng = random.Random(seed)
+    ticks = []
+    price = 45000.0
+    start = 1_700_000_000.0
+    
+    for second in range(60 * 60):
+        if 2400 <= second < 2580:
+            drift, volume_scale = -0.001, 8.0   # 閃崩階段
+        elif 2580 <= second < 3000:
+            drift, volume_scale = 0.0002, 3.0   # 反彈階段
+        else:
+            drift, volume_scale = 0.0, 1.0
+        
+        for i in range(ticks_per_second):
+            price *= 1 + drift / ticks_per_second + rng.gauss(0, 0.0002)
+            volume = rng.expovariate(1.0) * 0.05 * volume_scale
+            ticks.append((start + second + i / ticks_per_second, price, volume))
+    
+    return ticks
+
+def load_recorded_session(path: Path) -> List[Tick]:
+    """載入錄製的逐筆成交"""
+    ticks = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix == '.csv':
+            for row in csv.reader(f):
+                if row and row[0].isdigit():
+                    ticks.append((int(row[4]) / 1000, float(row[1]), float(row[2])))
+        else:
+            for line in f:
+                if line.strip():
+                    data = json.loads(line)
+                    data = data.get('data', data)
+                    ticks.append((int(data['T']) / 1000, float(data['p']), float(data['q'])))
+    ticks.sort(key=lambda tick: tick[0])
+    return ticks
+
+def reference_crossings(ticks: List[Tick], window_seconds: float, threshold_percent: float) -> Optional[int]:
+    """獨立參考: 以稀疏表區間最大值找出回撤首次越過閾值的成交序號"""
+    prices = [tick[1] for tick in ticks]
+    table = [prices]
+    span = 1
+    while span * 2 <= len(prices):
+        previous = table[-1]
+        table.append([max(previous[i], previous[i + span]) for i in range(len(prices) - span * 2 + 1)])
+        span *= 2
+    
+    left = 0
+    for index, (timestamp, price, _) in enumerate(ticks):
+        while ticks[left][0] < timestamp - window_seconds:
+            left += 1
+        level = (index - left + 1).bit_length() - 1
+        high = max(table[level][left], table[level][index - (1 << level) + 1])
+        if (high - price) / high * 100 >= threshold_percent:
+            return index
+    return None
+
+def run_replay(ticks: List[Tick], symbol: str = "BTCUSDT") -> Dict[str, Dict[str, float]]:
+    """回放成交並統計每種檢測的延遲"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        detector = CrashDetector(config_path=str(Path(temp_dir) / "crash_detection_config.json"))
+    detector.symbols = [symbol]
+    
+    first_detection: Dict[CrashType, Tuple[int, float]] = {}
+    protected_from: Optional[int] = None
+    tick_latencies = []
+    
+    for index, (timestamp, price, volume) in enumerate(ticks):
+        start_time = time.perf_counter()
+        events = detector.process_tick(symbol, price, volume, timestamp)
+        elapsed = time.perf_counter() - start_time
+        tick_latencies.append(elapsed)
+        
+        for event in events:
+            first_detection.setdefault(event.crash_type, (index, elapsed))
+        if protected_from is None and symbol in detector.protected_symbols:
+            protected_from = index
+    
+    results = {}
+    for config in detector.detection_configs:
+        if config.crash_type == CrashType.LIQUIDITY_CRISIS:
+            continue
+        reference = reference_crossings(ticks, detector._window_seconds(config), config.price_threshold_percent)
+        detected = first_detection.get(config.crash_type)
+        results[config.crash_type.value] = {
+            "reference_tick": reference,
+            "detected_tick": detected[0] if detected else None,
+            "ticks_late": detected[0] - reference if detected and reference is not None else None,
+            "suppressed_by_protection": not detected and reference is not None and
+                                        protected_from is not None and protected_from <= reference,
+            "detection_tick_processing_us": detected[1] * 1e6 if detected else None
+        }
+    
+    tick_latencies.sort()
+    results["tick_processing"] = {
+        "ticks": len(ticks),
+        "avg_us": sum(tick_latencies) / len(tick_latencies) * 1e6 if tick_latencies else 0.0,
+        "p99_us": tick_latencies[int(len(tick_latencies) * 0.99)] * 1e6 if tick_latencies else 0.0
+    }
+    return results
+
+async def main():
+    print("🚨 閃崩檢測回放測試")
+    print("=" * 60)
+    
+    if len(sys.argv) > 1:
+        ticks = load_recorded_session(Path(sys.argv[1]))
+        print(f"📂 錄製行情: {sys.argv[1]} ({len(ticks)} 筆成交)")
+    else:
+        ticks = build_flash_crash_session()
+        print(f"🧪 合成閃崩行情: {len(ticks)} 筆成交")
+    
+    results = run_replay(ticks)
+    processing = results.pop("tick_processing")
+    
+    for crash_type, result in results.items():
+        if result["reference_tick"] is None:
+            status = "未越過閾值" + ("（誤報）" if result["detected_tick"] is not None else "")
+        elif result["suppressed_by_protection"]:
+            status = f"越過閾值第 {result['reference_tick']} 筆, 交易對已處於保護期"
+        elif result["detected_tick"] is None:
+            status = "❌ 未檢測到"
+        else:
+            status = (f"越過閾值第 {result['reference_tick']} 筆, 檢測第 {result['detected_tick']} 筆 "
+                      f"(延遲 {result['ticks_late']} 筆, 處理 {result['detection_tick_processing_us']:.1f}µs)")
+        print(f"📊 {crash_type:<24} {status}")
+    
+    print(f"⏱️ 每筆處理: 平均 {processing['avg_us']:.1f}µs, P99 {processing['p99_us']:.1f}µs")
+    return results
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -17,14 +17,17 @@ from pathlib import Path
 # 確保可以導入 X 資料夾內的模組
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
+sys.path.append(str(current_dir / "backend" / "shared_core"))
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 # 導入backend的監控系統 - 使用 X 資料夾內的模組
 from backend.phase4_output_monitoring.real_time_unified_monitoring_manager import unified_monitoring_manager
 from backend.phase4_output_monitoring.monitoring_api import include_monitoring_routes
+from pipeline_metrics import pipeline_metrics
 
 # 設定日誌
 logging.basicConfig(
@@ -97,6 +100,20 @@ async def root():
         "admin_panel": "/x-redoc"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """管線指標 - Prometheus text format"""
+    return PlainTextResponse(pipeline_metrics.render_prometheus(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/metrics/traces")
+async def metrics_traces(limit: int = 20, symbol: str = None):
+    """最近取樣的 tick 追蹤 (Phase1A → 候選池 → EPL → 通知)"""
+    return {
+        "sample_rate": pipeline_metrics.trace_sample_rate,
+        "traces": pipeline_metrics.get_recent_traces(limit=limit, symbol=symbol)
+    }
+
 @app.get("/x-info")
 async def system_info():
     """系統詳細信息"""
@@ -127,7 +144,9 @@ async def system_info():
                 "dashboard": "GET /api/v1/x-monitoring/dashboard",
                 "status": "GET /api/v1/x-monitoring/status",
                 "recent_signals": "GET /api/v1/x-monitoring/signals/recent",
-                "manual_trigger": "POST /api/v1/x-monitoring/signals/manual-trigger"
+                "manual_trigger": "POST /api/v1/x-monitoring/signals/manual-trigger",
+                "metrics": "GET /metrics",
+                "traces": "GET /metrics/traces"
             }
         }
         
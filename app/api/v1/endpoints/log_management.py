@@ -5,6 +5,7 @@
 
 from fastapi import APIRouter, HTTPException
 from app.utils.log_manager import get_log_stats, manual_cleanup, log_manager
+from app.utils.async_logging import get_logging_overhead
 import logging
 
 logger = logging.getLogger(__name__)
@@ -111,6 +112,29 @@ async def get_log_management_status():
         logger.error(f"獲取日誌管理狀態失敗: {e}")
         raise HTTPException(status_code=500, detail=f"獲取狀態失敗: {str(e)}")
 
+@router.get("/logs/overhead")
+async def get_logs_overhead():
+    """
+    獲取日誌開銷統計
+    
+    按模組返回呼叫端入隊耗時、背景寫入耗時、限流略過與佇列丟棄條數
+    """
+    try:
+        overhead = get_logging_overhead()
+        overhead["modules"] = dict(sorted(
+            overhead["modules"].items(),
+            key=lambda item: item[1]["total_caller_ms"],
+            reverse=True
+        ))
+        return {
+            "success": True,
+            "data": overhead
+        }
+        
+    except Exception as e:
+        logger.error(f"獲取日誌開銷統計失敗: {e}")
+        raise HTTPException(status_code=500, detail=f"獲取日誌開銷統計失敗: {str(e)}")
+
 @router.post("/logs/restart-cleanup")
 async def restart_log_cleanup():
     """
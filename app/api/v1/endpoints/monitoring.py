@@ -15,6 +15,8 @@ import logging
 
 from app.services.unified_monitoring_manager import unified_monitoring
 from app.services.signal_quality_control_engine import SignalPriority, EPLAction
+from app.services.deadline_scheduler import deadline_scheduler
+from app.services.kline_cache import kline_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/monitoring", tags=["monitoring"])
@@ -362,3 +364,31 @@ async def get_websocket_status():
     except Exception as e:
         logger.error(f"❌ 獲取WebSocket狀態錯誤: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """獲取中央調度器狀態 (事件循環延遲、各週期任務的執行/合併/暫緩統計)"""
+    try:
+        return {
+            "success": True,
+            "data": deadline_scheduler.get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ 獲取調度器狀態錯誤: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/kline-cache")
+async def get_kline_cache_status():
+    """獲取共享K線快取統計 (命中、增量刷新、合併請求與淘汰次數)"""
+    try:
+        return {
+            "success": True,
+            "data": kline_cache.get_stats(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ 獲取K線快取狀態錯誤: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -225,9 +225,9 @@ async def get_scalping_signals():
                 if current_confidence > existing_confidence:
                     # 當前信號信心度更高，替換之
                     signal_map[symbol] = signal
-                    logger.info(f"🔄 {symbol} 信號篩選：保留信心度更高的信號 ({current_confidence:.1f}% > {existing_confidence:.1f}%)")
+                    logger.debug("🔄 %s 信號篩選：保留信心度更高的信號 (%.1f%% > %.1f%%)", symbol, current_confidence, existing_confidence)
                 else:
-                    logger.info(f"🔄 {symbol} 信號篩選：保留原有信號 ({existing_confidence:.1f}% >= {current_confidence:.1f}%)")
+                    logger.debug("🔄 %s 信號篩選：保留原有信號 (%.1f%% >= %.1f%%)", symbol, existing_confidence, current_confidence)
         
         all_signals = []
         
@@ -280,11 +280,11 @@ async def get_scalping_signals():
                         }
                         
                         all_signals.append(signal)
-                        logger.info(f"✅ 返回現有精準信號 {symbol}: {remaining_minutes:.1f}分鐘剩餘 (精準度: {precision_score:.3f})")
+                        logger.info("✅ 返回現有精準信號 %s: %.1f分鐘剩餘 (精準度: %.3f)", symbol, remaining_minutes, precision_score)
                         continue
                 
                 # 沒有活躍信號或已過期，使用精準篩選生成新信號
-                logger.info(f"🎯 為 {symbol} 執行精準篩選...")
+                logger.debug("🎯 為 %s 執行精準篩選...", symbol)
                 
                 # 使用精準篩選器
                 precision_signal = await precision_filter.execute_precision_selection(symbol)
@@ -326,14 +326,14 @@ async def get_scalping_signals():
                     }
                     
                     all_signals.append(signal)
-                    logger.info(f"🎯 生成精準信號 {symbol}: {precision_signal.strategy_name} (評分: {precision_signal.precision_score:.3f})")
+                    logger.info("🎯 生成精準信號 %s: %s (評分: %.3f)", symbol, precision_signal.strategy_name, precision_signal.precision_score)
                     
                 else:
                     # 未能生成精準信號
-                    logger.info(f"⚠️ {symbol} 當前市場條件不符合精準篩選標準")
+                    logger.info("⚠️ %s 當前市場條件不符合精準篩選標準", symbol)
                     
             except Exception as e:
-                logger.error(f"處理 {symbol} 信號時出錯: {str(e)}")
+                logger.error("處理 %s 信號時出錯: %s", symbol, e)
                 continue
         
         # 返回結果
@@ -237,7 +237,7 @@ class BinanceWebSocketClient:
             self.connection_health[connection_key]['status'] = 'disconnected'
             await self._handle_reconnection('ticker', symbols)
         except Exception as e:
-            logger.error(f"處理價格數據錯誤: {e}")
+            logger.error("處理價格數據錯誤: %s", e)
             self.connection_health[connection_key]['status'] = 'error'
             await self._handle_reconnection('ticker', symbols)
             
@@ -316,7 +316,7 @@ class BinanceWebSocketClient:
             self.connection_health[connection_key]['status'] = 'disconnected'
             await self._handle_reconnection('klines', symbols)
         except Exception as e:
-            logger.error(f"處理K線數據錯誤: {e}")
+            logger.error("處理K線數據錯誤: %s", e)
             self.connection_health[connection_key]['status'] = 'error'
             await self._handle_reconnection('klines', symbols)
             
@@ -339,7 +339,7 @@ class BinanceWebSocketClient:
         except websockets.exceptions.ConnectionClosed:
             logger.warning("深度數據連接已關閉")
         except Exception as e:
-            logger.error(f"處理深度數據錯誤: {e}")
+            logger.error("處理深度數據錯誤: %s", e)
             
     async def _process_ticker_data(self, data: Dict):
         """處理單個價格數據"""
@@ -362,7 +362,7 @@ class BinanceWebSocketClient:
                     try:
                         callback(ticker_data)
                     except Exception as e:
-                        logger.error(f"價格回調函數錯誤: {e}")
+                        logger.error("價格回調函數錯誤: %s", e)
             
             # 處理多流格式 (帶有 stream 屬性)
             elif 'stream' in data and data['stream'].endswith('@ticker'):
@@ -384,10 +384,10 @@ class BinanceWebSocketClient:
                     try:
                         callback(ticker_data)
                     except Exception as e:
-                        logger.error(f"價格回調函數錯誤: {e}")
+                        logger.error("價格回調函數錯誤: %s", e)
                         
         except Exception as e:
-            logger.error(f"處理價格數據錯誤: {e}")
+            logger.error("處理價格數據錯誤: %s", e)
             
     async def _process_kline_data(self, data: Dict):
         """處理單個 K線數據"""
@@ -418,7 +418,7 @@ class BinanceWebSocketClient:
                         try:
                             callback(kline_data)
                         except Exception as e:
-                            logger.error(f"K線回調函數錯誤: {e}")
+                            logger.error("K線回調函數錯誤: %s", e)
             
             # 處理多流格式 (帶有 stream 屬性)
             elif 'stream' in data and '@kline_' in data['stream']:
@@ -446,10 +446,10 @@ class BinanceWebSocketClient:
                         try:
                             callback(kline_data)
                         except Exception as e:
-                            logger.error(f"K線回調函數錯誤: {e}")
+                            logger.error("K線回調函數錯誤: %s", e)
                             
         except Exception as e:
-            logger.error(f"處理K線數據錯誤: {e}")
+            logger.error("處理K線數據錯誤: %s", e)
             
     async def _process_depth_data(self, data: Dict):
         """處理單個深度數據"""
@@ -468,7 +468,7 @@ class BinanceWebSocketClient:
                     try:
                         callback(depth_data)
                     except Exception as e:
-                        logger.error(f"深度回調函數錯誤: {e}")
+                        logger.error("深度回調函數錯誤: %s", e)
             
             # 處理多流格式 (帶有 stream 屬性)
             elif 'stream' in data and '@depth' in data['stream']:
@@ -486,10 +486,10 @@ class BinanceWebSocketClient:
                     try:
                         callback(depth_data)
                     except Exception as e:
-                        logger.error(f"深度回調函數錯誤: {e}")
+                        logger.error("深度回調函數錯誤: %s", e)
                         
         except Exception as e:
-            logger.error(f"處理深度數據錯誤: {e}")
+            logger.error("處理深度數據錯誤: %s", e)
 
 class BinanceDataCollector:
     """幣安數據收集器"""
@@ -84,6 +84,136 @@ class ConflictResolution:
     impact_adjustment: float
     resolution_timestamp: datetime
 
+class EventRelationGraph:
+    """增量事件關聯圖 - 時間桶/類別/標的索引 + 並查集連通分量"""
+    
+    def __init__(self, bucket_hours: float = 6.0, window_hours: float = 48.0):
+        self.bucket_seconds = bucket_hours * 3600
+        self.bucket_span = int(np.ceil(window_hours / bucket_hours))
+        
+        # 候選索引
+        self.time_buckets: Dict[int, Set[str]] = defaultdict(set)
+        self.category_index: Dict[str, Set[str]] = defaultdict(set)
+        self.symbol_index: Dict[str, Set[str]] = defaultdict(set)
+        self.known_partners: Dict[str, Set[str]] = defaultdict(set)  # 關聯數據庫中已知關聯的兩端
+        self.event_keys: Dict[str, Tuple[int, str, Tuple[str, ...]]] = {}
+        self.sequence: Dict[str, int] = {}   # 首次加入順序，決定關聯的來源/目標方向
+        self._next_sequence = 0
+        
+        # 活躍事件間的關聯 (無向鄰接，值為關聯本身)
+        self.adjacency: Dict[str, Dict[str, EventRelation]] = {}
+        
+        # 並查集
+        self.parent: Dict[str, str] = {}
+        self.members: Dict[str, Set[str]] = {}
+    
+    def add_event(self, event_id: str, event_time: datetime, category: str, symbols: List[str]):
+        """加入事件索引；已存在的事件先移除舊關聯再重新索引"""
+        sequence = self.sequence.get(event_id)
+        if event_id in self.event_keys:
+            self.remove_event(event_id)
+        if sequence is None:
+            sequence, self._next_sequence = self._next_sequence, self._next_sequence + 1
+        self.sequence[event_id] = sequence
+        
+        bucket = int(event_time.timestamp() // self.bucket_seconds)
+        symbols = tuple(set(symbols))
+        self.event_keys[event_id] = (bucket, category, symbols)
+        self.time_buckets[bucket].add(event_id)
+        self.category_index[category].add(event_id)
+        for symbol in symbols:
+            self.symbol_index[symbol].add(event_id)
+        
+        self.adjacency[event_id] = {}
+        self.parent[event_id] = event_id
+        self.members[event_id] = {event_id}
+    
+    def remove_event(self, event_id: str):
+        """移除事件及其關聯，並只重建其所在的連通分量"""
+        if event_id not in self.event_keys:
+            return
+        
+        bucket, category, symbols = self.event_keys.pop(event_id)
+        self.sequence.pop(event_id, None)
+        self._discard(self.time_buckets, bucket, event_id)
+        self._discard(self.category_index, category, event_id)
+        for symbol in symbols:
+            self._discard(self.symbol_index, symbol, event_id)
+        
+        for neighbour in self.adjacency.pop(event_id):
+            self.adjacency[neighbour].pop(event_id, None)
+        
+        # 並查集不支持刪除: 把原分量拆回單點後沿剩餘關聯重新合併
+        component = self.members.pop(self.find(event_id))
+        component.discard(event_id)
+        del self.parent[event_id]
+        for member in component:
+            self.parent[member] = member
+            self.members[member] = {member}
+        for member in component:
+            for neighbour in self.adjacency[member]:
+                self.union(member, neighbour)
+    
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], key: Any, event_id: str):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.discard(event_id)
+            if not bucket:
+                del index[key]
+    
+    def add_known_relation(self, source_event_id: str, target_event_id: str):
+        """登記關聯數據庫中的關聯端點；已知關聯不經相關性檢查直接成立"""
+        self.known_partners[source_event_id].add(target_event_id)
+        self.known_partners[target_event_id].add(source_event_id)
+    
+    def candidates(self, event_id: str) -> Set[str]:
+        """可能與事件建立關聯的候選：時間窗口內、同類別、共享標的或已有已知關聯的活躍事件"""
+        bucket, category, symbols = self.event_keys[event_id]
+        found = set(self.category_index.get(category, ()))
+        for offset in range(-self.bucket_span, self.bucket_span + 1):
+            found.update(self.time_buckets.get(bucket + offset, ()))
+        for symbol in symbols:
+            found.update(self.symbol_index.get(symbol, ()))
+        found.update(partner for partner in self.known_partners.get(event_id, ()) if partner in self.event_keys)
+        found.discard(event_id)
+        return found
+    
+    def add_relation(self, relation: EventRelation):
+        source, target = relation.source_event_id, relation.target_event_id
+        if source not in self.adjacency or target not in self.adjacency:
+            return
+        self.adjacency[source][target] = relation
+        self.adjacency[target][source] = relation
+        self.union(source, target)
+    
+    def find(self, event_id: str) -> str:
+        root = event_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[event_id] != root:
+            self.parent[event_id], event_id = root, self.parent[event_id]
+        return root
+    
+    def union(self, event_id_1: str, event_id_2: str):
+        root_1, root_2 = self.find(event_id_1), self.find(event_id_2)
+        if root_1 == root_2:
+            return
+        if len(self.members[root_1]) < len(self.members[root_2]):
+            root_1, root_2 = root_2, root_1
+        self.parent[root_2] = root_1
+        self.members[root_1].update(self.members.pop(root_2))
+    
+    def components(self, min_size: int = 2) -> List[Set[str]]:
+        return [members for members in self.members.values() if len(members) >= min_size]
+    
+    def relations_within(self, event_group: Set[str]) -> List[EventRelation]:
+        relations = {}
+        for event_id in event_group:
+            for relation in self.adjacency.get(event_id, {}).values():
+                relations[id(relation)] = relation
+        return list(relations.values())
+
 class CompositeEventProcessor:
     """複合事件處理器"""
     
@@ -91,6 +221,11 @@ class CompositeEventProcessor:
         # 事件關聯網路
         self.event_network = nx.DiGraph()
         
+        # 活躍事件的增量關聯圖與待處理的新邊（用於增量事件鏈檢測）
+        self.relation_graph = EventRelationGraph()
+        self._pending_chain_edges: List[Tuple[str, str]] = []
+        self._known_chain_paths: Set[Tuple[str, ...]] = set()
+        
         # 資料存儲
         self.active_events = {}           # 當前活躍事件
         self.composite_events = {}        # 複合事件
@@ -200,6 +335,7 @@ class CompositeEventProcessor:
         for relation in base_relations:
             relation_key = f"{relation.source_event_id}_{relation.target_event_id}"
             self.relation_database[relation_key] = relation
+            self.relation_graph.add_known_relation(relation.source_event_id, relation.target_event_id)
             
             # 添加到網路圖
             self.event_network.add_edge(
@@ -208,6 +344,7 @@ class CompositeEventProcessor:
                 relation_type=relation.relation_type,
                 weight=relation.correlation_strength
             )
+            self._pending_chain_edges.append((relation.source_event_id, relation.target_event_id))
         
         logger.info(f"🕸️ 初始化 {len(base_relations)} 個基礎事件關聯")
     
@@ -215,13 +352,13 @@ class CompositeEventProcessor:
         """處理事件並識別複合事件"""
         try:
             # 更新活躍事件
-            self._update_active_events(events)
+            new_event_ids = self._update_active_events(events)
             
-            # 識別事件關聯
-            detected_relations = await self._detect_event_relations()
+            # 識別新事件的關聯（結果直接寫入 relation_graph）
+            await self._detect_event_relations(new_event_ids)
             
             # 構建複合事件
-            composite_events = await self._build_composite_events(detected_relations)
+            composite_events = await self._build_composite_events()
             
             # 解決衝突
             resolved_composites = await self._resolve_conflicts(composite_events)
@@ -240,17 +377,32 @@ class CompositeEventProcessor:
             logger.error(f"❌ 複合事件處理失敗: {e}")
             return []
     
-    def _update_active_events(self, events: List[Dict]):
-        """更新活躍事件列表"""
+    @staticmethod
+    def _parse_event_time(event: Dict) -> datetime:
+        event_time = event.get("event_time", datetime.now())
+        if isinstance(event_time, str):
+            event_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+        return event_time
+    
+    def _update_active_events(self, events: List[Dict]) -> List[str]:
+        """更新活躍事件列表，返回新增或更新的事件ID"""
         current_time = datetime.now()
         
         # 添加新事件
+        new_event_ids = []
         for event in events:
             event_id = event.get("event_id", f"event_{len(self.active_events)}")
             self.active_events[event_id] = {
                 **event,
                 "last_updated": current_time
             }
+            self.relation_graph.add_event(
+                event_id,
+                self._parse_event_time(event),
+                event.get("event_category", "unknown"),
+                event.get("affected_symbols", [])
+            )
+            new_event_ids.append(event_id)
         
         # 清理過期事件
         expired_events = []
@@ -261,19 +413,38 @@ class CompositeEventProcessor:
         
         for event_id in expired_events:
             del self.active_events[event_id]
+            self.relation_graph.remove_event(event_id)
+        
+        return list(dict.fromkeys(new_event_ids))
     
-    async def _detect_event_relations(self) -> List[EventRelation]:
-        """檢測事件間關聯"""
+    async def _detect_event_relations(self, new_event_ids: List[str]) -> List[EventRelation]:
+        """檢測新事件與候選事件間的關聯（只比較索引給出的候選，而非所有事件對）"""
         try:
             detected_relations = []
-            active_event_ids = list(self.active_events.keys())
-            
-            # 檢查每對事件的關聯
-            for i, event_id_1 in enumerate(active_event_ids):
-                for event_id_2 in active_event_ids[i+1:]:
-                    relation = await self._analyze_event_pair(event_id_1, event_id_2)
+            order = self.relation_graph.sequence
+            # 不同類別且無共享標的、時間窗口外的事件對，計算出的相關性上限為 0.2；
+            # 關聯數據庫中的已知關聯不受閾值限制，由候選索引中的已知關聯端點覆蓋
+            scan_all = self.config["min_correlation_threshold"] <= 0.2
+            
+            analyzed = set()
+            for new_event_id in new_event_ids:
+                if new_event_id not in self.active_events:
+                    continue
+                candidates = self.active_events.keys() if scan_all else self.relation_graph.candidates(new_event_id)
+                
+                for candidate_id in candidates:
+                    if candidate_id == new_event_id:
+                        continue
+                    # 保持原有的先舊後新方向
+                    pair = tuple(sorted((new_event_id, candidate_id), key=order.__getitem__))
+                    if pair in analyzed:
+                        continue
+                    analyzed.add(pair)
+                    
+                    relation = await self._analyze_event_pair(*pair)
                     if relation:
                         detected_relations.append(relation)
+                        self.relation_graph.add_relation(relation)
             
             # 學習新關聯
             await self._learn_new_relations(detected_relations)
@@ -442,6 +613,7 @@ class CompositeEventProcessor:
                 if relation_key not in self.relation_database:
                     # 添加新關聯
                     self.relation_database[relation_key] = relation
+                    self.relation_graph.add_known_relation(relation.source_event_id, relation.target_event_id)
                     
                     # 更新網路圖
                     self.event_network.add_edge(
@@ -450,6 +622,7 @@ class CompositeEventProcessor:
                         relation_type=relation.relation_type,
                         weight=relation.correlation_strength
                     )
+                    self._pending_chain_edges.append((relation.source_event_id, relation.target_event_id))
                     
                     learned_count += 1
                 else:
@@ -469,26 +642,16 @@ class CompositeEventProcessor:
         except Exception as e:
             logger.error(f"❌ 關聯學習失敗: {e}")
     
-    async def _build_composite_events(self, relations: List[EventRelation]) -> List[CompositeEvent]:
-        """構建複合事件"""
+    async def _build_composite_events(self) -> List[CompositeEvent]:
+        """構建複合事件 - 每個至少含2個事件的連通分量構成一個候選"""
         try:
             composite_events = []
-            processed_events = set()
             
-            # 根據關聯構建複合事件
-            for relation in relations:
-                if relation.source_event_id in processed_events or \
-                   relation.target_event_id in processed_events:
-                    continue
-                
-                # 找到相關的事件組
-                event_group = self._find_connected_events(relation, relations)
-                
-                if len(event_group) >= 2:  # 至少需要2個事件
-                    composite = await self._create_composite_event(event_group, relations)
-                    if composite:
-                        composite_events.append(composite)
-                        processed_events.update(event_group)
+            for event_group in self.relation_graph.components(min_size=2):
+                relations = self.relation_graph.relations_within(event_group)
+                composite = await self._create_composite_event(event_group, relations)
+                if composite:
+                    composite_events.append(composite)
             
             return composite_events
             
@@ -496,39 +659,6 @@ class CompositeEventProcessor:
             logger.error(f"❌ 複合事件構建失敗: {e}")
             return []
     
-    def _find_connected_events(self, seed_relation: EventRelation, 
-                              all_relations: List[EventRelation]) -> Set[str]:
-        """找到連接的事件組"""
-        try:
-            connected_events = {seed_relation.source_event_id, seed_relation.target_event_id}
-            
-            # 廣度優先搜索找到所有連接的事件
-            to_explore = list(connected_events)
-            explored = set()
-            
-            while to_explore:
-                current_event = to_explore.pop(0)
-                if current_event in explored:
-                    continue
-                explored.add(current_event)
-                
-                # 找到與當前事件相關的所有關聯
-                for relation in all_relations:
-                    if relation.source_event_id == current_event:
-                        if relation.target_event_id not in connected_events:
-                            connected_events.add(relation.target_event_id)
-                            to_explore.append(relation.target_event_id)
-                    elif relation.target_event_id == current_event:
-                        if relation.source_event_id not in connected_events:
-                            connected_events.add(relation.source_event_id)
-                            to_explore.append(relation.source_event_id)
-            
-            return connected_events
-            
-        except Exception as e:
-            logger.error(f"❌ 連接事件查找失敗: {e}")
-            return set()
-    
     async def _create_composite_event(self, event_group: Set[str], 
                                     relations: List[EventRelation]) -> Optional[CompositeEvent]:
         """創建複合事件"""
@@ -803,36 +933,19 @@ class CompositeEventProcessor:
             return None
     
     async def _detect_event_chains(self) -> List[EventChain]:
-        """檢測事件鏈"""
+        """檢測事件鏈 - 只枚舉經過新增關聯邊的路徑"""
         try:
             event_chains = []
+            pending_edges, self._pending_chain_edges = self._pending_chain_edges, []
             
-            # 使用網路圖檢測路徑
-            if len(self.event_network.nodes) < 2:
-                return []
-            
-            # 找到所有可能的路徑
-            nodes = list(self.event_network.nodes)
-            for start_node in nodes:
-                for end_node in nodes:
-                    if start_node != end_node:
-                        try:
-                            # 找到所有簡單路徑
-                            paths = list(nx.all_simple_paths(
-                                self.event_network, 
-                                start_node, 
-                                end_node, 
-                                cutoff=self.config["chain_max_length"]
-                            ))
-                            
-                            for path in paths:
-                                if len(path) >= 3:  # 至少3個事件才組成鏈
-                                    chain = await self._create_event_chain(path)
-                                    if chain:
-                                        event_chains.append(chain)
-                                        
-                        except nx.NetworkXNoPath:
-                            continue
+            for source, target in pending_edges:
+                for path in self._paths_through_edge(source, target):
+                    if path in self._known_chain_paths:
+                        continue
+                    self._known_chain_paths.add(path)
+                    chain = await self._create_event_chain(list(path))
+                    if chain:
+                        event_chains.append(chain)
             
             # 保存事件鏈
             for chain in event_chains:
@@ -845,6 +958,40 @@ class CompositeEventProcessor:
             logger.error(f"❌ 事件鏈檢測失敗: {e}")
             return []
     
+    def _paths_through_edge(self, source: str, target: str) -> List[Tuple[str, ...]]:
+        """所有經過 source→target、至少3個事件且長度不超過 chain_max_length 的簡單路徑"""
+        cutoff = self.config["chain_max_length"]
+        
+        def walk(start: str, neighbours, limit: int, blocked: str) -> List[List[str]]:
+            paths = [[start]]
+            stack = [[start]]
+            while stack:
+                path = stack.pop()
+                if len(path) > limit:
+                    continue
+                for node in neighbours(path[-1]):
+                    if node != blocked and node not in path:
+                        extended = path + [node]
+                        paths.append(extended)
+                        stack.append(extended)
+            return paths
+        
+        if not self.event_network.has_edge(source, target):
+            return []
+        
+        # 向後延伸 source 的前驅路徑，向前延伸 target 的後繼路徑
+        heads = walk(source, self.event_network.predecessors, cutoff - 1, target)
+        tails = walk(target, self.event_network.successors, cutoff - 1, source)
+        
+        paths = []
+        for head in heads:
+            for tail in tails:
+                if len(head) + len(tail) < 3 or len(head) + len(tail) - 1 > cutoff:
+                    continue
+                if set(head).isdisjoint(tail):
+                    paths.append(tuple(reversed(head)) + tuple(tail))
+        return paths
+    
     async def _create_event_chain(self, event_path: List[str]) -> Optional[EventChain]:
         """創建事件鏈"""
         try:
@@ -876,7 +1023,7 @@ class CompositeEventProcessor:
             completion_probability = chain_confidence * 0.8  # 鏈越長完成概率越低
             
             chain = EventChain(
-                chain_id=f"chain_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(event_path)}",
+                chain_id=f"chain_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(event_path)}_{len(self._known_chain_paths)}",
                 event_sequence=event_path,
                 chain_confidence=chain_confidence,
                 total_expected_duration=total_duration,
@@ -899,6 +1046,7 @@ class CompositeEventProcessor:
                 "processor_status": "active",
                 "active_events_count": len(self.active_events),
                 "total_relations": len(self.relation_database),
+                "active_relation_components": len(self.relation_graph.components(min_size=2)),
                 "active_composite_events": self.stats["active_composite_events"],
                 "event_chains_active": len(self.event_chains),
                 "conflicts_resolved_today": self.stats["total_conflicts_resolved"],
@@ -0,0 +1,342 @@
+"""
+⏱️ 截止時間調度器 - 統一取代各服務各自的 while True + asyncio.sleep 輪詢循環
+
+所有週期性任務登記到一個最小堆，由單一驅動協程按截止時間喚醒：
+- 每個任務宣告週期、隨機抖動、優先級、失敗重試延遲與超時
+- 上一次執行尚未結束或錯過多個週期時合併 (coalesce)，不會堆積補跑
+- 驅動協程每次被計時器喚醒的延遲即為事件循環延遲 (lag)，以 EWMA 追蹤
+- 事件循環延遲過高時暫緩 LOW (及更嚴重時 NORMAL) 優先級任務，但不會無限期餓死
+- 每個任務的執行次數、耗時、失敗、合併與暫緩次數可透過 get_stats() 取得
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobPriority(IntEnum):
+    """任務優先級 - 數值越小越重要"""
+    CRITICAL = 0   # 永不暫緩
+    HIGH = 1       # 永不暫緩
+    NORMAL = 2     # 嚴重延遲時暫緩
+    LOW = 3        # 延遲超過閾值即暫緩
+
+
+@dataclass
+class ScheduledJob:
+    """已登記的週期任務"""
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    period: float
+    priority: JobPriority = JobPriority.NORMAL
+    jitter: float = 0.0                     # 每次排程額外加上的隨機延遲上限 (秒)
+    error_delay: Optional[float] = None     # 失敗後多久重試，None 表示按正常週期
+    timeout: Optional[float] = None
+    max_consecutive_sheds: int = 3          # 連續暫緩次數上限，超過後強制執行
+
+    # 排程狀態
+    anchor: float = 0.0                     # 不含抖動的下次截止時間 (loop.time)
+    next_run: float = 0.0
+    version: int = 0
+    running_task: Optional[asyncio.Task] = None
+    cancelled: bool = False
+    consecutive_sheds: int = 0
+
+    # 執行統計
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    coalesced: int = 0
+    shed: int = 0
+    total_runtime: float = 0.0
+    max_runtime: float = 0.0
+    last_runtime: float = 0.0
+    last_started_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    runtimes: deque = field(default_factory=lambda: deque(maxlen=100))
+
+    @property
+    def is_running(self) -> bool:
+        return self.running_task is not None and not self.running_task.done()
+
+    def to_stats(self, now: float) -> Dict[str, Any]:
+        recent = sorted(self.runtimes)
+        return {
+            'name': self.name,
+            'priority': self.priority.name,
+            'period_seconds': self.period,
+            'jitter_seconds': self.jitter,
+            'running': self.is_running,
+            'next_run_in_seconds': round(max(self.next_run - now, 0.0), 3),
+            'runs': self.runs,
+            'failures': self.failures,
+            'timeouts': self.timeouts,
+            'coalesced': self.coalesced,
+            'shed': self.shed,
+            'last_runtime_ms': round(self.last_runtime * 1000, 2),
+            'avg_runtime_ms': round(self.total_runtime / self.runs * 1000, 2) if self.runs else 0.0,
+            'p95_runtime_ms': round(recent[int(0.95 * (len(recent) - 1))] * 1000, 2) if recent else 0.0,
+            'max_runtime_ms': round(self.max_runtime * 1000, 2),
+            'last_started_at': self.last_started_at.isoformat() if self.last_started_at else None,
+            'last_error': self.last_error
+        }
+
+
+class DeadlineScheduler:
+    """截止時間調度器 - 最小堆 + 單一驅動協程 + 事件循環延遲監測"""
+
+    def __init__(self,
+                 lag_probe_interval: float = 0.5,
+                 shed_lag_threshold: float = 0.1,
+                 severe_lag_multiplier: float = 4.0,
+                 lag_ewma_alpha: float = 0.2):
+        self.lag_probe_interval = lag_probe_interval
+        self.shed_lag_threshold = shed_lag_threshold
+        self.severe_lag_multiplier = severe_lag_multiplier
+        self.lag_ewma_alpha = lag_ewma_alpha
+
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._driver_task: Optional[asyncio.Task] = None
+        self._wake_future: Optional[asyncio.Future] = None
+
+        # 事件循環延遲
+        self.loop_lag = 0.0
+        self.loop_lag_ewma = 0.0
+        self.loop_lag_max = 0.0
+        self.loop_lag_history: deque = deque(maxlen=600)
+
+    # ==================== 任務登記 ====================
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[Any]], period: float,
+                priority: JobPriority = JobPriority.NORMAL, jitter: float = 0.0,
+                initial_delay: float = 0.0, error_delay: Optional[float] = None,
+                timeout: Optional[float] = None) -> ScheduledJob:
+        """登記週期任務 (同名任務會被替換)；預設立即執行第一次，與原本的循環一致"""
+        self._ensure_started()
+        if name in self.jobs:
+            self.remove_job(name)
+
+        job = ScheduledJob(
+            name=name, func=func, period=period, priority=priority,
+            jitter=jitter, error_delay=error_delay, timeout=timeout
+        )
+        self.jobs[name] = job
+        self._schedule(job, self._loop.time() + initial_delay)
+        logger.debug("⏱️ 登記任務 %s (週期 %.0fs, 優先級 %s)", name, period, priority.name)
+        return job
+
+    def remove_job(self, name: str, cancel_running: bool = True) -> Optional[ScheduledJob]:
+        """移除任務；堆中的舊條目在彈出時丟棄"""
+        job = self.jobs.pop(name, None)
+        if job is None:
+            return None
+        job.cancelled = True
+        if cancel_running and job.is_running:
+            job.running_task.cancel()
+        return job
+
+    async def remove_jobs(self, names: List[str]):
+        """移除多個任務並等待其正在執行的部分結束"""
+        running = []
+        for name in names:
+            job = self.remove_job(name)
+            if job is not None and job.is_running:
+                running.append(job.running_task)
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def trigger(self, name: str) -> bool:
+        """立即執行一次任務 (不改變其後的週期)"""
+        job = self.jobs.get(name)
+        if job is None or job.is_running:
+            return False
+        self._start_run(job)
+        return True
+
+    def _schedule(self, job: ScheduledJob, anchor: float):
+        job.anchor = anchor
+        job.next_run = anchor + (random.uniform(0.0, job.jitter) if job.jitter > 0 else 0.0)
+        job.version += 1
+        heapq.heappush(self._heap, (job.next_run, next(self._sequence), job.version, job))
+        # 新的截止時間早於驅動協程正在等待的時間時提前喚醒
+        if self._wake_future is not None and not self._wake_future.done():
+            self._wake_future.set_result(False)
+
+    # ==================== 驅動協程 ====================
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._driver_task is not None and not self._driver_task.done():
+            return
+        # 首次使用或事件循環已更換時重建驅動協程，並重新排入既有任務
+        self._loop = loop
+        self._heap = []
+        for job in self.jobs.values():
+            job.running_task = None
+            self._schedule(job, loop.time())
+        self._driver_task = loop.create_task(self._drive())
+        logger.info("⏱️ 截止時間調度器已啟動")
+
+    async def _drive(self):
+        loop = self._loop
+        while True:
+            now = loop.time()
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, version, job = heapq.heappop(self._heap)
+                if job.cancelled or version != job.version:
+                    continue
+                self._dispatch(job, deadline, now)
+
+            deadline = now + self.lag_probe_interval
+            if self._heap:
+                deadline = min(deadline, self._heap[0][0])
+            if await self._sleep_until(deadline):
+                self._record_lag(loop.time() - deadline)
+
+    async def _sleep_until(self, deadline: float) -> bool:
+        """睡到截止時間；被計時器喚醒返回 True，被新任務提前喚醒返回 False"""
+        future = self._loop.create_future()
+        self._wake_future = future
+        handle = self._loop.call_at(deadline, lambda: future.done() or future.set_result(True))
+        try:
+            return await future
+        finally:
+            handle.cancel()
+            self._wake_future = None
+
+    def _record_lag(self, lag: float):
+        lag = max(lag, 0.0)
+        self.loop_lag = lag
+        self.loop_lag_ewma += self.lag_ewma_alpha * (lag - self.loop_lag_ewma)
+        self.loop_lag_max = max(self.loop_lag_max, lag)
+        self.loop_lag_history.append(lag)
+
+    def _should_shed(self, job: ScheduledJob) -> bool:
+        if job.consecutive_sheds >= job.max_consecutive_sheds:
+            return False
+        if job.priority >= JobPriority.LOW:
+            return self.loop_lag_ewma > self.shed_lag_threshold
+        if job.priority == JobPriority.NORMAL:
+            return self.loop_lag_ewma > self.shed_lag_threshold * self.severe_lag_multiplier
+        return False
+
+    def _dispatch(self, job: ScheduledJob, deadline: float, now: float):
+        if job.is_running:
+            # 上一次尚未結束：合併本次
+            job.coalesced += 1
+        elif self._should_shed(job):
+            job.shed += 1
+            job.consecutive_sheds += 1
+            logger.debug("⏱️ 事件循環延遲 %.0fms，暫緩任務 %s", self.loop_lag_ewma * 1000, job.name)
+        else:
+            job.consecutive_sheds = 0
+            self._start_run(job)
+
+        # 錯過多個週期時只保留下一個未來的截止時間
+        anchor = job.anchor + job.period
+        if anchor <= now:
+            missed = int((now - anchor) // job.period) + 1
+            job.coalesced += missed
+            anchor += missed * job.period
+        self._schedule(job, anchor)
+
+    def _start_run(self, job: ScheduledJob):
+        job.running_task = self._loop.create_task(self._run(job))
+
+    async def _run(self, job: ScheduledJob):
+        start = time.perf_counter()
+        job.last_started_at = datetime.now()
+        failed = False
+        try:
+            if job.timeout:
+                await asyncio.wait_for(job.func(), timeout=job.timeout)
+            else:
+                await job.func()
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            failed = True
+            job.timeouts += 1
+            job.last_error = f"超時 ({job.timeout}s)"
+            logger.warning(f"⚠️ 調度任務 {job.name} 執行超時 ({job.timeout}s)")
+        except Exception as e:
+            failed = True
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"❌ 調度任務 {job.name} 執行失敗: {e}")
+        finally:
+            runtime = time.perf_counter() - start
+            job.runs += 1
+            job.last_runtime = runtime
+            job.total_runtime += runtime
+            job.max_runtime = max(job.max_runtime, runtime)
+            job.runtimes.append(runtime)
+
+        # 失敗後按 error_delay 重試 (若早於正常的下次執行)
+        if failed and job.error_delay is not None and not job.cancelled:
+            retry_at = self._loop.time() + job.error_delay
+            if retry_at < job.anchor:
+                self._schedule(job, retry_at)
+
+    # ==================== 生命週期與監控 ====================
+
+    async def shutdown(self):
+        """停止驅動協程並取消所有正在執行的任務"""
+        await self.remove_jobs(list(self.jobs))
+        if self._driver_task is not None:
+            self._driver_task.cancel()
+            try:
+                await self._driver_task
+            except asyncio.CancelledError:
+                pass
+            self._driver_task = None
+        self._heap = []
+        logger.info("⏱️ 截止時間調度器已停止")
+
+    def get_loop_lag(self) -> Dict[str, float]:
+        history = sorted(self.loop_lag_history)
+        return {
+            'current_ms': round(self.loop_lag * 1000, 2),
+            'ewma_ms': round(self.loop_lag_ewma * 1000, 2),
+            'p99_ms': round(history[int(0.99 * (len(history) - 1))] * 1000, 2) if history else 0.0,
+            'max_ms': round(self.loop_lag_max * 1000, 2),
+            'shed_threshold_ms': self.shed_lag_threshold * 1000,
+            'shedding': 'NORMAL' if self.loop_lag_ewma > self.shed_lag_threshold * self.severe_lag_multiplier
+                        else 'LOW' if self.loop_lag_ewma > self.shed_lag_threshold else 'none'
+        }
+
+    def get_job_stats(self, name: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(name)
+        if job is None:
+            return None
+        return job.to_stats(self._loop.time() if self._loop is not None else 0.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = self._loop.time() if self._loop is not None else 0.0
+        jobs = sorted(self.jobs.values(), key=lambda job: (job.priority, job.name))
+        return {
+            'running': self._driver_task is not None and not self._driver_task.done(),
+            'job_count': len(self.jobs),
+            'running_jobs': sum(1 for job in jobs if job.is_running),
+            'heap_size': len(self._heap),
+            'loop_lag': self.get_loop_lag(),
+            'jobs': [job.to_stats(now) for job in jobs]
+        }
+
+
+# 全域調度器實例
+deadline_scheduler = DeadlineScheduler()
@@ -8,13 +8,27 @@ from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 import logging
-import asyncio
 import math
 from collections import defaultdict, deque
 import numpy as np
 
+from app.services.deadline_scheduler import deadline_scheduler
+
 logger = logging.getLogger(__name__)
 
+# 優化後的最小權重
+MIN_WEIGHT = 0.001
+
+# 目標函數使用的性能指標 (PerformanceMetrics 欄位，按矩陣欄位順序)
+OBJECTIVE_METRIC_FIELDS = (
+    'sharpe_ratio',
+    'win_rate',
+    'signal_accuracy',
+    'false_positive_rate',
+    'volatility',
+    'max_drawdown'
+)
+
 class ReallocationTrigger(Enum):
     """重分配觸發條件"""
     PERFORMANCE_DEGRADATION = "performance_degradation"    # 性能下降
@@ -140,7 +154,7 @@ class DynamicReallocationEngine:
         
         # 運行狀態
         self.is_monitoring = False
-        self.monitoring_task: Optional[asyncio.Task] = None
+        self.monitoring_job = None
         
         logger.info("⚙️ 動態重分配引擎初始化完成")
     
@@ -151,42 +165,30 @@ class DynamicReallocationEngine:
             return
         
         self.is_monitoring = True
-        self.monitoring_task = asyncio.create_task(self._monitoring_loop())
+        # 每5分鐘檢查一次，出錯後1分鐘重試
+        self.monitoring_job = deadline_scheduler.add_job(
+            "dynamic_reallocation.monitor",
+            self._check_reallocation_triggers,
+            period=300,
+            error_delay=60
+        )
         logger.info("🚀 動態重分配監控已啟動")
     
     async def stop_monitoring(self):
         """停止動態監控"""
         self.is_monitoring = False
-        if self.monitoring_task:
-            self.monitoring_task.cancel()
-            try:
-                await self.monitoring_task
-            except asyncio.CancelledError:
-                pass
+        if self.monitoring_job:
+            await deadline_scheduler.remove_jobs([self.monitoring_job.name])
+            self.monitoring_job = None
         logger.info("⏹️ 動態重分配監控已停止")
     
-    async def _monitoring_loop(self):
-        """監控循環"""
-        while self.is_monitoring:
-            try:
-                # 檢查所有活躍的交易對和時間框架
-                await self._check_reallocation_triggers()
-                
-                # 等待下次檢查 (每5分鐘)
-                await asyncio.sleep(300)
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ 監控循環錯誤: {e}")
-                await asyncio.sleep(60)
-    
     async def _check_reallocation_triggers(self):
-        """檢查重分配觸發條件"""
+        """檢查重分配觸發條件 - 觸發的交易對×時間框架一起批量優化"""
         # 模擬檢查多個交易對
         symbols = ["BTCUSDT", "ETHUSDT", "ADAUSDT"]
         timeframes = ["short", "medium", "long"]
         
+        requests = []
         for symbol in symbols:
             for timeframe in timeframes:
                 try:
@@ -200,12 +202,14 @@ class DynamicReallocationEngine:
                     
                     if trigger:
                         logger.info(f"🎯 檢測到重分配觸發: {symbol} {timeframe} - {trigger.value}")
-                        
-                        # 執行重分配
-                        await self.execute_reallocation(symbol, timeframe, trigger)
+                        requests.append((symbol, timeframe, trigger, None))
                         
                 except Exception as e:
                     logger.error(f"❌ 檢查 {symbol} {timeframe} 觸發條件失敗: {e}")
+        
+        # 執行重分配
+        if requests:
+            await self.execute_reallocations(requests)
     
     async def _get_performance_metrics(self, symbol: str, timeframe: str) -> Optional[PerformanceMetrics]:
         """獲取性能指標 (模擬實現)"""
@@ -294,63 +298,102 @@ class DynamicReallocationEngine:
                                  trigger: ReallocationTrigger,
                                  current_weights: Dict[str, float] = None) -> Optional[WeightOptimizationResult]:
         """執行權重重分配"""
+        results = await self.execute_reallocations([(symbol, timeframe, trigger, current_weights)])
+        return results[0]
+    
+    async def execute_reallocations(self, 
+                                  requests: List[Tuple[str, str, ReallocationTrigger, Optional[Dict[str, float]]]]
+                                  ) -> List[Optional[WeightOptimizationResult]]:
+        """批量執行權重重分配 - 所有 (交易對, 時間框架, 觸發條件, 當前權重) 的優化在一次向量化計算中完成"""
+        results: List[Optional[WeightOptimizationResult]] = [None] * len(requests)
+        prepared = []
+        
+        for index, (symbol, timeframe, trigger, current_weights) in enumerate(requests):
+            try:
+                # 獲取當前權重 (如果未提供)
+                if current_weights is None:
+                    current_weights = await self._get_current_weights(symbol, timeframe)
+                
+                # 獲取性能數據
+                performance_data = await self._get_performance_metrics(symbol, timeframe)
+                if not performance_data:
+                    logger.error(f"❌ 無法獲取 {symbol} {timeframe} 的性能數據")
+                    continue
+                
+                # 選擇優化方法
+                optimization_method = self._select_optimization_method(trigger, performance_data)
+                prepared.append((index, symbol, timeframe, trigger, current_weights, performance_data, optimization_method))
+                
+            except Exception as e:
+                logger.error(f"❌ 執行重分配失敗: {symbol} {timeframe} - {e}")
+        
+        if not prepared:
+            return results
+        
+        # 執行權重優化 (批量)
         try:
-            # 獲取當前權重 (如果未提供)
-            if current_weights is None:
-                current_weights = await self._get_current_weights(symbol, timeframe)
-            
-            # 獲取性能數據
-            performance_data = await self._get_performance_metrics(symbol, timeframe)
-            if not performance_data:
-                logger.error(f"❌ 無法獲取 {symbol} {timeframe} 的性能數據")
-                return None
-            
-            # 選擇優化方法
-            optimization_method = self._select_optimization_method(trigger, performance_data)
-            
-            # 執行權重優化
-            optimization_result = await self._optimize_weights(
-                symbol, timeframe, current_weights, performance_data, optimization_method
+            optimization_results = self._optimize_weights_batch(
+                [(weights, performance, method) for _, _, _, _, weights, performance, method in prepared]
             )
-            
-            if not optimization_result:
-                logger.warning(f"⚠️ {symbol} {timeframe} 權重優化失敗")
-                return None
-            
-            # 驗證優化結果
-            if optimization_result.expected_improvement < self.optimization_params["improvement_threshold"]:
-                logger.info(f"📊 {symbol} {timeframe} 優化改善不足，跳過重分配")
-                return optimization_result
-            
-            # 記錄重分配事件
-            event_id = f"{symbol}_{timeframe}_{int(datetime.now().timestamp())}"
-            reallocation_event = ReallocationEvent(
-                event_id=event_id,
-                trigger=trigger,
-                symbol=symbol,
-                timeframe=timeframe,
-                before_weights=current_weights,
-                after_weights=optimization_result.optimized_weights,
-                expected_impact=optimization_result.expected_improvement,
-                trigger_data={
-                    "performance_metrics": performance_data.__dict__,
-                    "optimization_method": optimization_method.value
-                }
-            )
-            
-            self.reallocation_history.append(reallocation_event)
-            
-            # 更新統計數據
-            self.stats["total_reallocations"] += 1
-            self.stats["last_reallocation"] = datetime.now()
-            
-            logger.info(f"✅ 完成權重重分配: {symbol} {timeframe} (預期改善: {optimization_result.expected_improvement:.2%})")
-            
-            return optimization_result
-            
         except Exception as e:
-            logger.error(f"❌ 執行重分配失敗: {symbol} {timeframe} - {e}")
+            logger.error(f"❌ 批量權重優化失敗 ({len(prepared)} 個問題): {e}")
+            return results
+        
+        for (index, symbol, timeframe, trigger, current_weights, performance_data, optimization_method), \
+                optimization_result in zip(prepared, optimization_results):
+            try:
+                results[index] = self._record_reallocation(
+                    symbol, timeframe, trigger, current_weights, performance_data,
+                    optimization_method, optimization_result
+                )
+            except Exception as e:
+                logger.error(f"❌ 執行重分配失敗: {symbol} {timeframe} - {e}")
+        
+        return results
+    
+    def _record_reallocation(self, 
+                           symbol: str,
+                           timeframe: str,
+                           trigger: ReallocationTrigger,
+                           current_weights: Dict[str, float],
+                           performance_data: PerformanceMetrics,
+                           optimization_method: OptimizationMethod,
+                           optimization_result: Optional[WeightOptimizationResult]) -> Optional[WeightOptimizationResult]:
+        """驗證優化結果並記錄重分配事件"""
+        if not optimization_result:
+            logger.warning(f"⚠️ {symbol} {timeframe} 權重優化失敗")
             return None
+        
+        # 驗證優化結果
+        if optimization_result.expected_improvement < self.optimization_params["improvement_threshold"]:
+            logger.info(f"📊 {symbol} {timeframe} 優化改善不足，跳過重分配")
+            return optimization_result
+        
+        # 記錄重分配事件
+        event_id = f"{symbol}_{timeframe}_{int(datetime.now().timestamp())}"
+        reallocation_event = ReallocationEvent(
+            event_id=event_id,
+            trigger=trigger,
+            symbol=symbol,
+            timeframe=timeframe,
+            before_weights=current_weights,
+            after_weights=optimization_result.optimized_weights,
+            expected_impact=optimization_result.expected_improvement,
+            trigger_data={
+                "performance_metrics": performance_data.__dict__,
+                "optimization_method": optimization_method.value
+            }
+        )
+        
+        self.reallocation_history.append(reallocation_event)
+        
+        # 更新統計數據
+        self.stats["total_reallocations"] += 1
+        self.stats["last_reallocation"] = datetime.now()
+        
+        logger.info(f"✅ 完成權重重分配: {symbol} {timeframe} (預期改善: {optimization_result.expected_improvement:.2%})")
+        
+        return optimization_result
     
     async def _get_current_weights(self, symbol: str, timeframe: str) -> Dict[str, float]:
         """獲取當前權重 (模擬實現)"""
@@ -393,174 +436,141 @@ class DynamicReallocationEngine:
             # 預設使用貝葉斯優化
             return OptimizationMethod.BAYESIAN_OPTIMIZATION
     
-    async def _optimize_weights(self, 
-                              symbol: str,
-                              timeframe: str,
-                              current_weights: Dict[str, float],
-                              performance_data: PerformanceMetrics,
-                              method: OptimizationMethod) -> Optional[WeightOptimizationResult]:
-        """權重優化核心算法"""
-        
-        # 將權重轉換為向量
-        weight_names = list(current_weights.keys())
-        current_vector = np.array([current_weights[name] for name in weight_names])
-        
-        # 根據方法執行優化
-        if method == OptimizationMethod.GRADIENT_ASCENT:
-            optimized_vector, iterations, converged = await self._gradient_ascent_optimization(
-                current_vector, performance_data
-            )
-        
-        elif method == OptimizationMethod.ADAPTIVE_MOMENTUM:
-            optimized_vector, iterations, converged = await self._adaptive_momentum_optimization(
-                current_vector, performance_data
-            )
-        
-        else:
-            # 簡化實現：使用梯度上升作為預設
-            optimized_vector, iterations, converged = await self._gradient_ascent_optimization(
-                current_vector, performance_data
-            )
-        
-        # 確保權重和為1
-        optimized_vector = optimized_vector / np.sum(optimized_vector)
-        
-        # 轉換回字典格式
-        optimized_weights = {
-            name: max(0.001, float(weight))  # 確保最小權重
-            for name, weight in zip(weight_names, optimized_vector)
-        }
-        
-        # 計算預期改善
-        current_score = self._calculate_objective_function(current_vector, performance_data)
-        optimized_score = self._calculate_objective_function(optimized_vector, performance_data)
-        expected_improvement = (optimized_score - current_score) / abs(current_score) if current_score != 0 else 0
-        
-        # 計算信心度
-        confidence_score = min(1.0, max(0.0, 0.5 + expected_improvement))
-        
-        return WeightOptimizationResult(
-            original_weights=current_weights,
-            optimized_weights=optimized_weights,
-            expected_improvement=expected_improvement,
-            confidence_score=confidence_score,
-            optimization_method=method,
-            iterations=iterations,
-            convergence_achieved=converged,
-            performance_projection=performance_data,  # 簡化實現
-            risk_assessment={"overall_risk": performance_data.volatility},
-            sensitivity_analysis={name: abs(optimized_weights[name] - current_weights[name]) 
-                                for name in weight_names},
-            explanation=f"使用 {method.value} 方法優化，經過 {iterations} 次迭代"
-        )
-    
-    async def _gradient_ascent_optimization(self, 
-                                          current_weights: np.ndarray,
-                                          performance_data: PerformanceMetrics) -> Tuple[np.ndarray, int, bool]:
-        """梯度上升優化"""
-        weights = current_weights.copy()
-        learning_rate = self.optimization_params["learning_rate"]
-        max_iterations = self.optimization_params["max_iterations"]
-        convergence_threshold = self.optimization_params["convergence_threshold"]
-        
-        for iteration in range(max_iterations):
-            # 計算梯度 (數值梯度)
-            gradient = np.zeros_like(weights)
-            epsilon = 1e-6
-            
-            current_score = self._calculate_objective_function(weights, performance_data)
+    def _optimize_weights_batch(self, 
+                              problems: List[Tuple[Dict[str, float], PerformanceMetrics, OptimizationMethod]]
+                              ) -> List[Optional[WeightOptimizationResult]]:
+        """權重優化核心算法 - 相同權重結構的問題堆疊成矩陣，一次求解"""
+        results: List[Optional[WeightOptimizationResult]] = [None] * len(problems)
+        
+        # 按權重名稱分組 (每組的權重向量長度與順序一致)
+        groups: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for index, (current_weights, _, _) in enumerate(problems):
+            groups[tuple(current_weights.keys())].append(index)
+        
+        for weight_names, indices in groups.items():
+            current_matrix = np.array([[problems[i][0][name] for name in weight_names] for i in indices], dtype=float)
+            metrics_matrix = self._metrics_matrix([problems[i][1] for i in indices])
             
-            for i in range(len(weights)):
-                weights_plus = weights.copy()
-                weights_plus[i] += epsilon
-                weights_plus = weights_plus / np.sum(weights_plus)  # 重新標準化
-                
-                score_plus = self._calculate_objective_function(weights_plus, performance_data)
-                gradient[i] = (score_plus - current_score) / epsilon
+            # 根據方法設定動量 (遺傳算法/粒子群/貝葉斯的簡化實現：使用梯度上升)
+            momentum = np.array([
+                self.optimization_params["momentum"] if problems[i][2] == OptimizationMethod.ADAPTIVE_MOMENTUM else 0.0
+                for i in indices
+            ])
             
-            # 更新權重
-            old_weights = weights.copy()
-            weights += learning_rate * gradient
+            optimized_matrix, iterations, converged = self._projected_gradient_batch(
+                current_matrix, metrics_matrix, momentum
+            )
             
-            # 確保權重為正且和為1
-            weights = np.maximum(weights, 0.001)
-            weights = weights / np.sum(weights)
+            # 計算預期改善
+            current_scores = self._calculate_objective_batch(current_matrix, metrics_matrix)
+            optimized_scores = self._calculate_objective_batch(optimized_matrix, metrics_matrix)
+            improvements = np.divide(optimized_scores - current_scores, np.abs(current_scores),
+                                     out=np.zeros_like(current_scores), where=current_scores != 0)
             
-            # 檢查收斂
-            if np.linalg.norm(weights - old_weights) < convergence_threshold:
-                return weights, iteration + 1, True
-        
-        return weights, max_iterations, False
+            for row, index in enumerate(indices):
+                current_weights, performance_data, method = problems[index]
+                optimized_weights = {name: float(weight) for name, weight in zip(weight_names, optimized_matrix[row])}
+                expected_improvement = float(improvements[row])
+                
+                results[index] = WeightOptimizationResult(
+                    original_weights=current_weights,
+                    optimized_weights=optimized_weights,
+                    expected_improvement=expected_improvement,
+                    confidence_score=min(1.0, max(0.0, 0.5 + expected_improvement)),
+                    optimization_method=method,
+                    iterations=int(iterations[row]),
+                    convergence_achieved=bool(converged[row]),
+                    performance_projection=performance_data,  # 簡化實現
+                    risk_assessment={"overall_risk": performance_data.volatility},
+                    sensitivity_analysis={name: abs(optimized_weights[name] - current_weights[name]) 
+                                        for name in weight_names},
+                    explanation=f"使用 {method.value} 方法優化，經過 {int(iterations[row])} 次迭代"
+                )
+        
+        return results
     
-    async def _adaptive_momentum_optimization(self, 
-                                            current_weights: np.ndarray,
-                                            performance_data: PerformanceMetrics) -> Tuple[np.ndarray, int, bool]:
-        """自適應動量優化"""
-        weights = current_weights.copy()
-        velocity = np.zeros_like(weights)
-        
+    def _projected_gradient_batch(self, 
+                                current_weights: np.ndarray,
+                                metrics: np.ndarray,
+                                momentum: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """批量投影梯度上升 (momentum 為 0 的行即普通梯度上升)
+        
+        每行是一個 (交易對, 時間框架) 問題；每步後投影回 {w >= 最小權重, sum(w) = 1}，
+        已收斂的行不再更新。返回 (權重矩陣, 每行迭代次數, 每行是否收斂)。
+        """
         learning_rate = self.optimization_params["learning_rate"]
-        momentum = self.optimization_params["momentum"]
         max_iterations = self.optimization_params["max_iterations"]
         convergence_threshold = self.optimization_params["convergence_threshold"]
         
+        weights = self._project_to_simplex(current_weights, MIN_WEIGHT)
+        velocity = np.zeros_like(weights)
+        iterations = np.full(len(weights), max_iterations)
+        converged = np.zeros(len(weights), dtype=bool)
+        active = np.ones(len(weights), dtype=bool)
+        
         for iteration in range(max_iterations):
-            # 計算梯度
-            gradient = np.zeros_like(weights)
-            epsilon = 1e-6
-            current_score = self._calculate_objective_function(weights, performance_data)
-            
-            for i in range(len(weights)):
-                weights_plus = weights.copy()
-                weights_plus[i] += epsilon
-                weights_plus = weights_plus / np.sum(weights_plus)
-                
-                score_plus = self._calculate_objective_function(weights_plus, performance_data)
-                gradient[i] = (score_plus - current_score) / epsilon
+            rows = np.flatnonzero(active)
+            gradient = self._objective_gradient_batch(weights[rows])
+            velocity[rows] = momentum[rows, None] * velocity[rows] + learning_rate * gradient
             
-            # 更新速度和權重
-            velocity = momentum * velocity + learning_rate * gradient
-            old_weights = weights.copy()
-            weights += velocity
-            
-            # 確保權重為正且和為1
-            weights = np.maximum(weights, 0.001)
-            weights = weights / np.sum(weights)
+            updated = self._project_to_simplex(weights[rows] + velocity[rows], MIN_WEIGHT)
+            step = np.linalg.norm(updated - weights[rows], axis=1)
+            weights[rows] = updated
             
             # 檢查收斂
-            if np.linalg.norm(weights - old_weights) < convergence_threshold:
-                return weights, iteration + 1, True
+            done = rows[step < convergence_threshold]
+            iterations[done] = iteration + 1
+            converged[done] = True
+            active[done] = False
+            if not active.any():
+                break
         
-        return weights, max_iterations, False
+        return weights, iterations, converged
+    
+    @staticmethod
+    def _project_to_simplex(vectors: np.ndarray, floor: float) -> np.ndarray:
+        """逐行歐氏投影到 {w >= floor, sum(w) = 1} (排序法)"""
+        n = vectors.shape[1]
+        floor = min(floor, 0.5 / n)
+        radius = 1.0 - n * floor
+        
+        shifted = vectors - floor
+        descending = -np.sort(-shifted, axis=1)
+        excess = np.cumsum(descending, axis=1) - radius
+        positive = descending - excess / np.arange(1, n + 1) > 0
+        # 最後一個滿足條件的位置 (第一個位置必定滿足)
+        rho = n - 1 - np.argmax(positive[:, ::-1], axis=1)
+        theta = excess[np.arange(len(vectors)), rho] / (rho + 1)
+        
+        return np.maximum(shifted - theta[:, None], 0.0) + floor
     
-    def _calculate_objective_function(self, 
-                                    weights: np.ndarray, 
-                                    performance_data: PerformanceMetrics) -> float:
-        """計算目標函數 (風險調整收益)"""
+    @staticmethod
+    def _metrics_matrix(metrics_list: List[PerformanceMetrics]) -> np.ndarray:
+        """性能指標轉為矩陣 (每行一個問題，欄位順序見 OBJECTIVE_METRIC_FIELDS)"""
+        return np.array([[getattr(m, name) for name in OBJECTIVE_METRIC_FIELDS] for m in metrics_list], dtype=float)
+    
+    def _calculate_objective_batch(self, weights: np.ndarray, metrics: np.ndarray) -> np.ndarray:
+        """計算目標函數 (風險調整收益)，weights 與 metrics 逐行對應"""
         # 簡化的目標函數：夏普比率 + 勝率 - 風險懲罰
         risk_penalty = self.optimization_params["risk_penalty"]
+        sharpe_ratio, win_rate, signal_accuracy, false_positive_rate, volatility, max_drawdown = metrics.T
         
         # 基礎分數：夏普比率和勝率的加權組合
-        base_score = (
-            performance_data.sharpe_ratio * 0.4 +
-            performance_data.win_rate * 0.3 +
-            performance_data.signal_accuracy * 0.2 +
-            (1.0 - performance_data.false_positive_rate) * 0.1
-        )
+        base_score = sharpe_ratio * 0.4 + win_rate * 0.3 + signal_accuracy * 0.2 + (1.0 - false_positive_rate) * 0.1
         
         # 風險懲罰：基於波動率和最大回撤
-        risk_score = (
-            performance_data.volatility * 0.6 +
-            abs(performance_data.max_drawdown) * 0.4
-        )
+        risk_score = volatility * 0.6 + np.abs(max_drawdown) * 0.4
         
         # 權重分散度獎勵 (避免過度集中)
-        entropy = -np.sum(weights * np.log(weights + 1e-10))
-        diversity_bonus = entropy / np.log(len(weights)) * 0.1
+        entropy = -np.sum(weights * np.log(weights + 1e-10), axis=1)
+        diversity_bonus = entropy / np.log(max(weights.shape[1], 2)) * 0.1
         
-        final_score = base_score - risk_penalty * risk_score + diversity_bonus
-        
-        return final_score
+        return base_score - risk_penalty * risk_score + diversity_bonus
+    
+    @staticmethod
+    def _objective_gradient_batch(weights: np.ndarray) -> np.ndarray:
+        """目標函數對權重的解析梯度 (只有分散度獎勵項與權重有關)"""
+        return -(np.log(weights + 1e-10) + weights / (weights + 1e-10)) * (0.1 / np.log(max(weights.shape[1], 2)))
     
     def get_reallocation_history(self, hours_back: int = 168) -> List[ReallocationEvent]:
         """獲取重分配歷史"""
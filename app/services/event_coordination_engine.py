@@ -20,6 +20,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 import logging
 from collections import defaultdict, deque
+from bisect import bisect_left, bisect_right
 import uuid
 import json
 
@@ -89,6 +90,7 @@ class EventSchedule:
     schedule_rationale: str = ""
     resource_allocation: Dict[str, float] = field(default_factory=dict)
     risk_assessment: Dict[str, float] = field(default_factory=dict)
+    peak_concurrent_events: int = 0  # 同一時刻最多重疊的事件數
     
     # 執行狀態
     is_active: bool = False
@@ -118,6 +120,58 @@ class CoordinationResult:
     recommendations: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
 
+class ResourceUsageSegmentTree:
+    """資源使用線段樹 - 區間加權 + 區間最大值（座標壓縮後的時間軸）"""
+    
+    def __init__(self, boundaries: List[float]):
+        # boundaries 為排序後的時間點，葉節點 k 代表 [boundaries[k], boundaries[k+1])
+        self.boundaries = boundaries
+        self.size = max(len(boundaries) - 1, 1)
+        self.max_load = [0.0] * (4 * self.size)
+        self.pending = [0.0] * (4 * self.size)
+    
+    def _update(self, node: int, lo: int, hi: int, left: int, right: int, value: float):
+        if right < lo or hi < left:
+            return
+        if left <= lo and hi <= right:
+            self.max_load[node] += value
+            self.pending[node] += value
+            return
+        mid = (lo + hi) // 2
+        self._update(2 * node, lo, mid, left, right, value)
+        self._update(2 * node + 1, mid + 1, hi, left, right, value)
+        self.max_load[node] = self.pending[node] + max(self.max_load[2 * node], self.max_load[2 * node + 1])
+    
+    def _query(self, node: int, lo: int, hi: int, left: int, right: int) -> float:
+        if right < lo or hi < left:
+            return float('-inf')
+        if left <= lo and hi <= right:
+            return self.max_load[node]
+        mid = (lo + hi) // 2
+        return self.pending[node] + max(
+            self._query(2 * node, lo, mid, left, right),
+            self._query(2 * node + 1, mid + 1, hi, left, right)
+        )
+    
+    def _leaf_range(self, start: float, end: float) -> Tuple[int, int]:
+        return bisect_right(self.boundaries, start) - 1, bisect_left(self.boundaries, end) - 1
+    
+    def add_interval(self, start: float, end: float, value: float = 1.0):
+        """在 [start, end) 期間增加資源使用量"""
+        left, right = self._leaf_range(start, end)
+        if left <= right:
+            self._update(1, 0, self.size - 1, max(left, 0), min(right, self.size - 1), value)
+    
+    def peak(self, start: Optional[float] = None, end: Optional[float] = None) -> float:
+        """[start, end) 期間的最大資源使用量（默認整條時間軸）"""
+        if start is None or end is None:
+            return max(self.max_load[1], 0.0)
+        left, right = self._leaf_range(start, end)
+        left, right = max(left, 0), min(right, self.size - 1)
+        if left > right:
+            return 0.0
+        return max(self._query(1, 0, self.size - 1, left, right), 0.0)
+
 class EventCoordinationEngine:
     """事件協調引擎"""
     
@@ -126,6 +180,7 @@ class EventCoordinationEngine:
         self.coordination_history: Dict[str, CoordinationResult] = {}
         self.conflict_history: List[EventConflict] = []
         self.active_schedules: Dict[str, EventSchedule] = {}
+        self.resource_usage: Optional[ResourceUsageSegmentTree] = None  # 最近一次調度的資源使用
         
         # 配置參數
         self.max_concurrent_events = 5
@@ -247,27 +302,28 @@ class EventCoordinationEngine:
             )
     
     async def _detect_conflicts(self, event_ids: List[str]) -> List[EventConflict]:
-        """檢測事件間的衝突"""
+        """檢測事件間的衝突 - 以時間排序的掃描線只檢查可能衝突的事件對"""
         conflicts = []
         
         try:
-            # 獲取事件信息
-            events_data = {eid: self.active_events.get(eid) for eid in event_ids}
-            
-            # 兩兩檢查衝突
-            for i, event_id1 in enumerate(event_ids):
-                for event_id2 in event_ids[i+1:]:
-                    event1 = events_data[event_id1]
-                    event2 = events_data[event_id2]
-                    
-                    if not event1 or not event2:
-                        continue
-                    
-                    # 檢測各種類型的衝突
-                    detected_conflicts = await self._check_event_pair_conflicts(
-                        event_id1, event1, event_id2, event2
-                    )
-                    conflicts.extend(detected_conflicts)
+            # 獲取事件信息並按時間建立時間線
+            events_data = {}
+            for index, event_id in enumerate(event_ids):
+                event = self.active_events.get(event_id)
+                event_time = self._parse_event_time(event.get('event_time')) if event else None
+                if event_time is not None and event_id not in events_data:
+                    events_data[event_id] = (index, event, event_time.timestamp())
+            
+            candidate_pairs = self._find_candidate_pairs(events_data)
+            
+            # 按原始順序檢查候選事件對
+            for event_id1, event_id2 in sorted(
+                candidate_pairs, key=lambda pair: (events_data[pair[0]][0], events_data[pair[1]][0])
+            ):
+                detected_conflicts = await self._check_event_pair_conflicts(
+                    event_id1, events_data[event_id1][1], event_id2, events_data[event_id2][1]
+                )
+                conflicts.extend(detected_conflicts)
             
             return conflicts
             
@@ -275,6 +331,70 @@ class EventCoordinationEngine:
             logger.error(f"衝突檢測失敗: {e}")
             return []
     
+    def _parse_event_time(self, event_time: Any) -> Optional[datetime]:
+        """解析事件時間，無法解析時返回 None"""
+        if isinstance(event_time, datetime):
+            return event_time
+        try:
+            return datetime.fromisoformat(str(event_time).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    
+    def _find_candidate_pairs(
+        self,
+        events_data: Dict[str, Tuple[int, Dict[str, Any], float]]
+    ) -> Set[Tuple[str, str]]:
+        """
+        找出可能衝突的事件對（按輸入順序排列的 ID 對）
+        
+        - 時間衝突: 全體時間線上 2 小時內的事件
+        - 資源衝突: 同一標的時間線上 4 小時內的事件
+        - 方向衝突: 對立方向時間線之間、衝突檢測窗口內的事件
+        """
+        timeline = []
+        symbol_timelines = defaultdict(list)
+        direction_timelines = defaultdict(list)
+        for event_id, (index, event, timestamp) in events_data.items():
+            entry = (timestamp, index, event_id)
+            timeline.append(entry)
+            for symbol in set(event.get('affected_symbols', [])):
+                symbol_timelines[symbol].append(entry)
+            direction_timelines[event.get('direction', 'NEUTRAL')].append(entry)
+        
+        pairs = set()
+        self._collect_window_pairs(timeline, timeline, 2 * 3600, pairs)
+        for entries in symbol_timelines.values():
+            self._collect_window_pairs(entries, entries, 4 * 3600, pairs)
+        for direction1, direction2 in (('BULLISH', 'BEARISH'), ('VOLATILE', 'NEUTRAL')):
+            self._collect_window_pairs(
+                direction_timelines.get(direction1, []),
+                direction_timelines.get(direction2, []),
+                self.conflict_detection_window_hours * 3600,
+                pairs
+            )
+        return pairs
+    
+    @staticmethod
+    def _collect_window_pairs(
+        left: List[Tuple[float, int, str]],
+        right: List[Tuple[float, int, str]],
+        window_seconds: float,
+        pairs: Set[Tuple[str, str]]
+    ):
+        """收集 left × right 中時間差小於窗口的事件對（略放寬窗口，精確判斷交給事件對檢查）"""
+        if not left or not right:
+            return
+        window_seconds += 1e-3
+        same = left is right
+        right = sorted(right)
+        right_times = [entry[0] for entry in right]
+        
+        for position, (timestamp, index, event_id) in enumerate(sorted(left) if not same else right):
+            start = position + 1 if same else bisect_right(right_times, timestamp - window_seconds)
+            end = bisect_left(right_times, timestamp + window_seconds)
+            for _, other_index, other_id in right[start:end]:
+                pairs.add((event_id, other_id) if index < other_index else (other_id, event_id))
+    
     async def _check_event_pair_conflicts(
         self,
         event_id1: str, event1: Dict[str, Any],
@@ -312,7 +432,8 @@ class EventCoordinationEngine:
             direction1 = event1.get('direction', 'NEUTRAL')
             direction2 = event2.get('direction', 'NEUTRAL')
             
-            if self._is_direction_conflict(direction1, direction2):
+            if self._is_direction_conflict(direction1, direction2) and \
+               time_diff < self.conflict_detection_window_hours:
                 severity = 0.8 if time_diff < 6 else 0.4
                 conflict = EventConflict(
                     conflict_id=f"direction_{event_id1}_{event_id2}",
@@ -646,6 +767,9 @@ class EventCoordinationEngine:
             # 計算總執行時間
             total_duration = await self._calculate_schedule_duration(sorted_events)
             
+            # 建立資源使用線段樹
+            self.resource_usage = self._build_resource_usage(sorted_events)
+            
             # 生成調度
             schedule = EventSchedule(
                 schedule_id=f"schedule_{int(datetime.now().timestamp())}",
@@ -654,7 +778,8 @@ class EventCoordinationEngine:
                 total_duration=total_duration,
                 schedule_rationale=f"基於 {mode.value} 模式生成的事件調度",
                 resource_allocation=await self._calculate_resource_allocation(sorted_events),
-                risk_assessment=await self._assess_schedule_risks(sorted_events)
+                risk_assessment=await self._assess_schedule_risks(sorted_events),
+                peak_concurrent_events=int(round(self.resource_usage.peak())) if self.resource_usage else 0
             )
             
             return schedule
@@ -667,6 +792,7 @@ class EventCoordinationEngine:
         """為調度排序事件"""
         try:
             event_scores = []
+            now = datetime.now()
             
             for event_id in event_ids:
                 event = self.active_events.get(event_id)
@@ -676,7 +802,7 @@ class EventCoordinationEngine:
                     if isinstance(event_time, str):
                         event_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
                     
-                    time_urgency = 1.0 / max(1, (event_time - datetime.now()).total_seconds() / 3600)
+                    time_urgency = 1.0 / max(1, (event_time - now).total_seconds() / 3600)
                     severity_score = self._get_severity_score(event.get('severity', 'MEDIUM'))
                     confidence = event.get('confidence', 0.5)
                     
@@ -699,20 +825,7 @@ class EventCoordinationEngine:
             for event_id in event_ids:
                 event = self.active_events.get(event_id)
                 if event:
-                    # 估算事件處理時間
-                    severity = event.get('severity', 'MEDIUM')
-                    affected_count = len(event.get('affected_symbols', []))
-                    
-                    base_duration = {
-                        'CRITICAL': 4.0,
-                        'HIGH': 2.0,
-                        'MEDIUM': 1.0,
-                        'LOW': 0.5
-                    }.get(severity, 1.0)
-                    
-                    # 根據影響範圍調整
-                    duration = base_duration * (1 + affected_count * 0.1)
-                    total_hours += duration
+                    total_hours += self._estimate_event_duration(event)
             
             return total_hours
             
@@ -720,6 +833,45 @@ class EventCoordinationEngine:
             logger.error(f"調度時間計算失敗: {e}")
             return 0.0
     
+    def _estimate_event_duration(self, event: Dict[str, Any]) -> float:
+        """估算事件處理時間（小時）"""
+        severity = event.get('severity', 'MEDIUM')
+        affected_count = len(event.get('affected_symbols', []))
+        
+        base_duration = {
+            'CRITICAL': 4.0,
+            'HIGH': 2.0,
+            'MEDIUM': 1.0,
+            'LOW': 0.5
+        }.get(severity, 1.0)
+        
+        # 根據影響範圍調整
+        return base_duration * (1 + affected_count * 0.1)
+    
+    def _build_resource_usage(self, event_ids: List[str]) -> Optional[ResourceUsageSegmentTree]:
+        """以 [事件時間, 事件時間 + 處理時間) 為區間建立並發使用線段樹"""
+        try:
+            intervals = []
+            for event_id in event_ids:
+                event = self.active_events.get(event_id)
+                event_time = self._parse_event_time(event.get('event_time')) if event else None
+                if event_time is not None:
+                    start = event_time.timestamp()
+                    intervals.append((start, start + self._estimate_event_duration(event) * 3600))
+            
+            if not intervals:
+                return None
+            
+            boundaries = sorted({point for interval in intervals for point in interval})
+            usage = ResourceUsageSegmentTree(boundaries)
+            for start, end in intervals:
+                usage.add_interval(start, end)
+            return usage
+            
+        except Exception as e:
+            logger.error(f"資源使用統計失敗: {e}")
+            return None
+    
     async def _calculate_resource_allocation(self, event_ids: List[str]) -> Dict[str, float]:
         """計算資源分配"""
         try:
@@ -885,6 +1037,11 @@ class EventCoordinationEngine:
             
             # 基於調度的建議
             if schedule:
+                if schedule.peak_concurrent_events > self.max_concurrent_events:
+                    warnings.append(f"同時進行的事件過多: 峰值 {schedule.peak_concurrent_events} 個 "
+                                    f"(上限 {self.max_concurrent_events})")
+                    recommendations.append("建議錯開重疊事件的執行時段")
+                
                 if schedule.total_duration > 12:
                     warnings.append(f"調度執行時間較長: {schedule.total_duration:.1f} 小時")
                     recommendations.append("考慮分批執行或並行處理部分事件")
@@ -971,6 +1128,7 @@ class EventCoordinationEngine:
                     "events_count": len(schedule.events),
                     "coordination_mode": schedule.coordination_mode.value,
                     "total_duration": schedule.total_duration,
+                    "peak_concurrent_events": schedule.peak_concurrent_events,
                     "is_active": schedule.is_active
                 }
                 for schedule in self.active_schedules.values()
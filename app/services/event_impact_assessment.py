@@ -23,6 +23,7 @@ from scipy import stats
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.linear_model import LinearRegression
+from app.services.event_similarity_index import EventSimilarityIndex
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -114,7 +115,7 @@ class ImpactAssessment:
 class EventImpactAssessment:
     """事件影響評估引擎"""
     
-    def __init__(self):
+    def __init__(self, similar_event_count: int = 5):
         self.assessment_history: Dict[str, ImpactAssessment] = {}
         self.sensitivity_cache: Dict[str, AssetSensitivity] = {}
         self.model_cache: Dict[str, Any] = {}
@@ -125,6 +126,10 @@ class EventImpactAssessment:
             "last_assessment_time": None
         }
         
+        # 歷史相似事件索引（首次查詢時從 extreme_events.db 載入）
+        self.similarity_index = EventSimilarityIndex()
+        self.similar_event_count = similar_event_count
+        
         # 初始化機器學習模型
         self._initialize_models()
         
@@ -356,29 +361,44 @@ class EventImpactAssessment:
             return 0.7
     
     async def _find_similar_events(self, event_features: Dict[str, float]) -> List[Dict[str, Any]]:
-        """尋找歷史相似事件"""
+        """尋找歷史相似事件 - 標準化特徵空間上的 k 近鄰"""
         try:
-            # 這是一個簡化的實現
-            # 在生產環境中，這應該查詢歷史數據庫
-            similar_events = []
-            
-            # 模擬相似事件
-            for i in range(3):
-                similar_event = {
-                    'event_id': f'historical_{i}',
-                    'similarity_score': np.random.uniform(0.6, 0.9),
-                    'price_impact': np.random.uniform(-0.15, 0.15),
-                    'volatility_impact': np.random.uniform(0.1, 0.5),
-                    'duration_hours': np.random.uniform(2, 48)
-                }
-                similar_events.append(similar_event)
+            if not self.similarity_index.loaded:
+                # 首次載入涉及資料庫讀取，放到執行緒中避免阻塞事件循環
+                await asyncio.get_running_loop().run_in_executor(None, self.similarity_index.load)
             
-            return similar_events
+            return self.similarity_index.query(event_features, k=self.similar_event_count)
             
         except Exception as e:
             logger.error(f"相似事件搜尋失敗: {e}")
             return []
     
+    def record_event_outcome(
+        self,
+        event_id: str,
+        event_features: Dict[str, float],
+        price_impact: float,
+        volatility_impact: float,
+        duration_hours: float
+    ) -> bool:
+        """
+        記錄事件的實際影響，增量加入歷史相似事件索引
+        
+        Args:
+            event_id: 事件ID
+            event_features: _extract_event_features 產生的特徵
+            price_impact: 實際價格影響（比例，例如 -0.05）
+            volatility_impact: 實際波動率影響
+            duration_hours: 影響持續時間（小時）
+        """
+        try:
+            return self.similarity_index.add_event(
+                event_id, event_features, price_impact, volatility_impact, duration_hours
+            )
+        except Exception as e:
+            logger.error(f"事件影響記錄失敗 {event_id}: {e}")
+            return False
+    
     async def _calculate_overall_impact(
         self,
         event_features: Dict[str, float],
@@ -389,9 +409,11 @@ class EventImpactAssessment:
         try:
             # 基於歷史相似事件計算影響
             if similar_events:
-                avg_price_impact = np.mean([e['price_impact'] for e in similar_events])
-                avg_volatility_impact = np.mean([e['volatility_impact'] for e in similar_events])
-                avg_duration = np.mean([e['duration_hours'] for e in similar_events])
+                # 以相似度加權，越接近的歷史事件影響越大
+                weights = [e['similarity_score'] for e in similar_events]
+                avg_price_impact = np.average([e['price_impact'] for e in similar_events], weights=weights)
+                avg_volatility_impact = np.average([e['volatility_impact'] for e in similar_events], weights=weights)
+                avg_duration = np.average([e['duration_hours'] for e in similar_events], weights=weights)
             else:
                 # 如果沒有相似事件，使用基於特徵的估算
                 severity = event_features.get('severity_score', 0.5)
@@ -782,7 +804,8 @@ class EventImpactAssessment:
                 for assessment in self.get_recent_assessments(5)
             ],
             "sensitivity_cache_size": len(self.sensitivity_cache),
-            "assessment_history_size": len(self.assessment_history)
+            "assessment_history_size": len(self.assessment_history),
+            "similarity_index": self.similarity_index.get_stats()
         }
 
 # 全局實例
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Event Similarity Index
+歷史事件相似度索引 - 事件影響評估的 k-NN 檢索
+
+這個模組把歷史事件的特徵向量與實際影響持久化到 extreme_events.db，
+並在標準化特徵空間上以 KD-tree 做 k 近鄰搜索：
+- 事件特徵與 EventImpactAssessment._extract_event_features 一致
+- 支援增量插入（新事件先進入暴力搜索的尾部緩衝，累積到一定比例後重建樹）
+- 首次載入時從 crash_detection 表匯入已記錄的閃崩事件
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+# 索引使用的特徵（排除 time_to_event_hours / is_future 這類相對於查詢時刻的特徵）
+INDEX_FEATURE_NAMES = (
+    'event_type_numeric',
+    'severity_score',
+    'confidence',
+    'is_immediate',
+    'market_volatility',
+    'market_sentiment',
+    'liquidity_condition',
+    'affected_count',
+    'includes_btc',
+    'includes_eth'
+)
+
+# 每個鄰居返回的實際影響欄位
+OUTCOME_NAMES = ('price_impact', 'volatility_impact', 'duration_hours')
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / "data" / "databases" / "extreme_events.db"
+
+
+class EventSimilarityIndex:
+    """歷史事件 k-NN 索引 - 持久化特徵 + KD-tree + 增量尾部緩衝"""
+
+    def __init__(self,
+                 db_path: Optional[Path] = None,
+                 feature_names: Sequence[str] = INDEX_FEATURE_NAMES,
+                 rebuild_ratio: float = 0.1,
+                 min_tail_rebuild: int = 1024):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.feature_names = tuple(feature_names)
+        self.rebuild_ratio = rebuild_ratio
+        self.min_tail_rebuild = min_tail_rebuild
+
+        dims = len(self.feature_names)
+        self._features = np.empty((0, dims))
+        self._outcomes = np.empty((0, len(OUTCOME_NAMES)))
+        self._event_ids: List[str] = []
+        self._id_set = set()
+        self._size = 0
+
+        # 樹只覆蓋前 _tree_size 筆；之後的新事件暴力搜索
+        self._tree: Optional[cKDTree] = None
+        self._tree_size = 0
+        self._mean = np.zeros(dims)
+        self._scale = np.ones(dims)
+
+        self._lock = threading.Lock()
+        self._loaded = False
+
+        self.stats = {
+            'queries': 0,
+            'inserts': 0,
+            'rebuilds': 0,
+            'imported_crash_events': 0,
+            'last_query_ms': 0.0,
+            'last_rebuild_ms': 0.0
+        }
+
+    # ==================== 持久化 ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS event_feature_index (
+                event_id TEXT PRIMARY KEY,
+                features TEXT NOT NULL,
+                price_impact REAL NOT NULL,
+                volatility_impact REAL NOT NULL,
+                duration_hours REAL NOT NULL,
+                recorded_at TEXT NOT NULL
+            )
+        """)
+        return conn
+
+    def load(self):
+        """從資料庫載入索引（首次使用時自動呼叫）"""
+        with self._lock:
+            if self._loaded:
+                return
+            start_time = time.perf_counter()
+            try:
+                with self._connect() as conn:
+                    self._import_crash_detections(conn)
+                    rows = conn.execute(
+                        "SELECT event_id, features, price_impact, volatility_impact, duration_hours "
+                        "FROM event_feature_index ORDER BY recorded_at"
+                    ).fetchall()
+            except Exception as e:
+                logger.error(f"歷史事件索引載入失敗: {e}")
+                rows = []
+
+            if rows:
+                features = np.array([self._vectorize(json.loads(row[1])) for row in rows])
+                outcomes = np.array([row[2:5] for row in rows], dtype=float)
+                self._append_rows([row[0] for row in rows], features, outcomes)
+                self._rebuild()
+
+            self._loaded = True
+            logger.info(f"歷史事件索引載入完成: {self._size} 個事件, "
+                        f"耗時 {(time.perf_counter() - start_time) * 1000:.0f}ms")
+
+    def _import_crash_detections(self, conn: sqlite3.Connection):
+        """把 crash_detection 表中尚未索引的閃崩事件轉為索引樣本"""
+        exists = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='crash_detection'"
+        ).fetchone()
+        if not exists:
+            return
+
+        rows = conn.execute("""
+            SELECT c.event_id, c.symbol, c.drop_percentage, c.price_before, c.price_lowest,
+                   c.volume_multiplier, c.detection_duration_minutes, c.recovery_duration_minutes,
+                   c.detected_at
+            FROM crash_detection c
+            LEFT JOIN event_feature_index i ON i.event_id = 'crash_' || c.event_id
+            WHERE i.event_id IS NULL AND (c.false_alarm IS NULL OR c.false_alarm = 0)
+        """).fetchall()
+
+        records = []
+        for (event_id, symbol, drop_pct, price_before, price_lowest,
+             volume_multiplier, detection_minutes, recovery_minutes, detected_at) in rows:
+            drop = abs(drop_pct or 0.0) / 100
+            swing = (price_before - price_lowest) / price_before if price_before else drop
+            features = {
+                'event_type_numeric': 0.85,  # FLASH_CRASH
+                'severity_score': 1.0 if drop >= 0.15 else 0.8 if drop >= 0.07 else 0.5 if drop >= 0.03 else 0.2,
+                'confidence': 1.0,
+                'is_immediate': 1.0,
+                'market_volatility': min(max(swing * 5, 0.0), 1.0),
+                'liquidity_condition': 1.0 / max(volume_multiplier or 1.0, 1.0),
+                'affected_count': 1.0,
+                'includes_btc': 1.0 if symbol == 'BTCUSDT' else 0.0,
+                'includes_eth': 1.0 if symbol == 'ETHUSDT' else 0.0
+            }
+            duration_minutes = recovery_minutes or detection_minutes or 60
+            records.append((
+                f"crash_{event_id}", json.dumps(features), -drop, max(swing, drop),
+                duration_minutes / 60, str(detected_at or datetime.now().isoformat())
+            ))
+
+        if records:
+            conn.executemany("INSERT OR IGNORE INTO event_feature_index VALUES (?, ?, ?, ?, ?, ?)", records)
+            self.stats['imported_crash_events'] += len(records)
+            logger.info(f"已從 crash_detection 匯入 {len(records)} 個歷史事件")
+
+    # ==================== 索引維護 ====================
+
+    def _vectorize(self, features: Dict[str, float]) -> np.ndarray:
+        """缺失特徵記為 NaN，查詢時以均值（標準化後為 0）填補"""
+        return np.array([float(features[name]) if name in features else np.nan
+                         for name in self.feature_names])
+
+    def _append_rows(self, event_ids: List[str], features: np.ndarray, outcomes: np.ndarray):
+        needed = self._size + len(event_ids)
+        if needed > self._features.shape[0]:
+            capacity = max(needed, 2 * self._features.shape[0], 256)
+            grown = np.empty((capacity, self._features.shape[1]))
+            grown[:self._size] = self._features[:self._size]
+            self._features = grown
+            grown = np.empty((capacity, self._outcomes.shape[1]))
+            grown[:self._size] = self._outcomes[:self._size]
+            self._outcomes = grown
+
+        self._features[self._size:needed] = features
+        self._outcomes[self._size:needed] = outcomes
+        self._event_ids.extend(event_ids)
+        self._id_set.update(event_ids)
+        self._size = needed
+
+    def _standardize(self, features: np.ndarray) -> np.ndarray:
+        return np.nan_to_num((features - self._mean) / self._scale, nan=0.0)
+
+    def _rebuild(self):
+        """以當前全部事件重新擬合標準化參數並重建 KD-tree"""
+        start_time = time.perf_counter()
+        features = self._features[:self._size]
+        self._mean = np.nan_to_num(np.nanmean(features, axis=0), nan=0.0)
+        scale = np.nan_to_num(np.nanstd(features, axis=0), nan=0.0)
+        self._scale = np.where(scale > 1e-9, scale, 1.0)
+        self._tree = cKDTree(self._standardize(features))
+        self._tree_size = self._size
+
+        self.stats['rebuilds'] += 1
+        self.stats['last_rebuild_ms'] = (time.perf_counter() - start_time) * 1000
+
+    def add_event(self, event_id: str, event_features: Dict[str, float], price_impact: float,
+                  volatility_impact: float, duration_hours: float) -> bool:
+        """增量插入一個已實現影響的事件；重複的 event_id 會被忽略"""
+        self.load()
+        with self._lock:
+            if event_id in self._id_set:
+                return False
+
+            features = {name: float(event_features[name]) for name in self.feature_names if name in event_features}
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO event_feature_index VALUES (?, ?, ?, ?, ?, ?)",
+                        (event_id, json.dumps(features), float(price_impact), float(volatility_impact),
+                         float(duration_hours), datetime.now().isoformat())
+                    )
+            except Exception as e:
+                logger.error(f"歷史事件持久化失敗 {event_id}: {e}")
+
+            self._append_rows(
+                [event_id],
+                self._vectorize(features)[None, :],
+                np.array([[price_impact, volatility_impact, duration_hours]], dtype=float)
+            )
+            self.stats['inserts'] += 1
+
+            tail = self._size - self._tree_size
+            if tail >= max(self.min_tail_rebuild, self._tree_size * self.rebuild_ratio) or self._tree is None:
+                self._rebuild()
+            return True
+
+    # ==================== 查詢 ====================
+
+    def query(self, event_features: Dict[str, float], k: int = 5) -> List[Dict[str, Any]]:
+        """返回 k 個最相似的歷史事件及其實際價格/波動率影響"""
+        self.load()
+        with self._lock:
+            if self._size == 0 or self._tree is None:
+                return []
+
+            start_time = time.perf_counter()
+            point = self._standardize(self._vectorize(event_features))
+            k = min(k, self._size)
+
+            distances, indices = self._tree.query(point, k=min(k, self._tree_size))
+            distances = np.atleast_1d(distances)
+            indices = np.atleast_1d(indices)
+
+            # 尚未進樹的尾部事件暴力搜索後合併
+            if self._size > self._tree_size:
+                tail = self._standardize(self._features[self._tree_size:self._size])
+                tail_distances = np.sqrt(((tail - point) ** 2).sum(axis=1))
+                distances = np.concatenate((distances, tail_distances))
+                indices = np.concatenate((indices, np.arange(self._tree_size, self._size)))
+                order = np.argsort(distances)[:k]
+                distances, indices = distances[order], indices[order]
+
+            neighbours = []
+            for distance, index in zip(distances, indices):
+                price_impact, volatility_impact, duration_hours = self._outcomes[index]
+                neighbours.append({
+                    'event_id': self._event_ids[index],
+                    'similarity_score': float(1.0 / (1.0 + distance)),
+                    'distance': float(distance),
+                    'price_impact': float(price_impact),
+                    'volatility_impact': float(volatility_impact),
+                    'duration_hours': float(duration_hours)
+                })
+
+            self.stats['queries'] += 1
+            self.stats['last_query_ms'] = (time.perf_counter() - start_time) * 1000
+            return neighbours
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'indexed_events': self._size,
+            'tree_events': self._tree_size,
+            'pending_events': self._size - self._tree_size
+        }
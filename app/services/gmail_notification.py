@@ -6,11 +6,12 @@ from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-import asyncio
 import logging
 from dataclasses import asdict
 import json
 
+from app.services.smtp_mail_worker import SmtpMailWorker
+
 logger = logging.getLogger(__name__)
 
 class GmailNotificationService:
@@ -19,7 +20,10 @@ class GmailNotificationService:
     def __init__(self, 
                  sender_email: str, 
                  sender_password: str, 
-                 recipient_email: str):
+                 recipient_email: str,
+                 smtp_server: str = "smtp.gmail.com",
+                 smtp_port: int = 587,
+                 use_tls: bool = True):
         """
         初始化 Gmail 通知服務
         
@@ -27,12 +31,17 @@ class GmailNotificationService:
             sender_email: 發送者郵箱 (您的Gmail帳號)
             sender_password: 應用程式密碼 (Gmail App Password)
             recipient_email: 接收者郵箱 (您要接收通知的郵箱)
+            smtp_server / smtp_port / use_tls: SMTP 伺服器設定 (本地測試可指向 aiosmtpd)
         """
         self.sender_email = sender_email
         self.sender_password = sender_password
         self.recipient_email = recipient_email
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.use_tls = use_tls
+        
+        # 專用郵件工作器（持久 SMTP 會話，首次發送時建立）
+        self.mail_worker: Optional[SmtpMailWorker] = None
         
         # 通知設定
         self.enabled = True
@@ -363,20 +372,43 @@ class GmailNotificationService:
         
         return text.strip()
     
-    async def _send_email(self, message: MIMEMultipart) -> bool:
-        """異步發送郵件"""
+    def _get_mail_worker(self) -> SmtpMailWorker:
+        """取得郵件工作器（首次使用時建立）"""
+        if self.mail_worker is None:
+            self.mail_worker = SmtpMailWorker(
+                sender_email=self.sender_email,
+                sender_password=self.sender_password,
+                recipient_email=self.recipient_email,
+                host=self.smtp_server,
+                port=self.smtp_port,
+                use_tls=self.use_tls
+            )
+        return self.mail_worker
+    
+    async def _send_email(self, message: MIMEMultipart, digest_key: Optional[str] = None,
+                          digest_title: str = "", digest_body: str = "",
+                          max_attempts: Optional[int] = None) -> bool:
+        """異步發送郵件 - 經由郵件工作器排隊，重用 SMTP 會話並按退避時間表重試"""
         try:
-            # 在線程池中執行同步的郵件發送
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._send_email_sync, message)
-            return result
+            return await self._get_mail_worker().submit(
+                message,
+                digest_key=digest_key,
+                digest_title=digest_title,
+                digest_body=digest_body,
+                max_attempts=max_attempts
+            )
             
         except Exception as e:
             logger.error(f"❌ 異步發送郵件失敗: {e}")
             return False
     
+    async def close(self):
+        """關閉郵件工作器與 SMTP 會話"""
+        if self.mail_worker is not None:
+            await self.mail_worker.close()
+    
     def _send_email_sync(self, message: MIMEMultipart) -> bool:
-        """同步發送郵件"""
+        """同步發送郵件（單次連線，供非異步環境使用）"""
         try:
             # 創建SSL上下文
             context = ssl.create_default_context()
@@ -431,7 +463,8 @@ class GmailNotificationService:
                 return {
                     'total_notifications': 0,
                     'enabled': self.enabled,
-                    'recent_notifications': []
+                    'recent_notifications': [],
+                    'mail_worker': self.mail_worker.get_metrics() if self.mail_worker else None
                 }
             
             # 按信號類型統計
@@ -457,7 +490,8 @@ class GmailNotificationService:
                     for record in recent_notifications
                 ],
                 'min_confidence_threshold': self.min_confidence_threshold,
-                'cooldown_minutes': self.cooldown_minutes
+                'cooldown_minutes': self.cooldown_minutes,
+                'mail_worker': self.mail_worker.get_metrics() if self.mail_worker else None
             }
             
         except Exception as e:
@@ -539,12 +573,16 @@ class GmailNotificationService:
             logger.error(f"❌ 發送測試通知時發生錯誤: {e}")
             return False
 
-    async def send_sniper_signal_notification_async(self, signal_info: Dict[str, Any]) -> bool:
+    async def send_sniper_signal_notification_async(self, signal_info: Dict[str, Any],
+                                                    max_attempts: Optional[int] = None) -> bool:
         """
         🎯 方案C：狙擊手專用信號通知（優化版Email模板）
         
+        突發的多個信號在彙總窗口內會合併為一封彙總郵件。
+        
         Args:
             signal_info: 包含信號詳細信息的字典
+            max_attempts: 最多發送次數（含重試），默認使用郵件工作器的退避時間表
             
         Returns:
             bool: 是否成功發送
@@ -653,8 +691,14 @@ class GmailNotificationService:
             
             message.attach(MIMEText(email_body, "plain", "utf-8"))
             
-            # 發送郵件
-            success = await self._send_email(message)
+            # 發送郵件 - 同一彙總窗口內的狙擊手信號合併發送
+            success = await self._send_email(
+                message,
+                digest_key="sniper",
+                digest_title=message["Subject"],
+                digest_body=email_body,
+                max_attempts=max_attempts
+            )
             
             if success:
                 logger.info(f"✅ 狙擊手信號Email發送成功: {symbol} {signal_type} (優先級: {priority})")
@@ -0,0 +1,237 @@
+"""
+🕯️ K線共享快取 - 以 (交易所, 交易對, 時間框架) 為鍵的歷史K線快取
+
+多個分析器在數秒內對同一交易對重複抓取相同的歷史K線，這裡統一提供：
+- 快取未過期時直接返回最近 limit 根K線，不發出請求
+- 過期時只抓取快取中最後一根K線 (可能尚未收盤) 之後的新K線並接到尾部
+- 同一個鍵的並發請求合併為一次抓取
+- 以 LRU 淘汰控制快取的鍵數與K線總數
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_TIMEFRAME_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000}
+
+CacheKey = Tuple[str, str, str]
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """'5m' / '1h' / '1d' 等時間框架轉為秒數"""
+    return int(timeframe[:-1]) * _TIMEFRAME_UNITS[timeframe[-1]]
+
+
+@dataclass
+class _KlineEntry:
+    """一個鍵的快取K線"""
+    frame: pd.DataFrame
+    depth: int              # 保留的K線根數 (該鍵被請求過的最大 limit)
+    refreshed_at: float     # 最近一次成功刷新的 monotonic 時間
+
+
+@dataclass
+class _PendingRefresh:
+    """進行中的抓取 - 同鍵請求等待同一個任務"""
+    task: asyncio.Future
+    limit: int
+
+
+class KlineCache:
+    """K線共享快取 - 尾部增量刷新 + 並發合併 + LRU 淘汰"""
+
+    def __init__(self,
+                 market_service=None,
+                 max_entries: int = 256,
+                 max_total_bars: int = 200000,
+                 ttl_ratio: float = 0.05,
+                 min_ttl: float = 2.0,
+                 max_ttl: float = 60.0):
+        self._market_service = market_service
+        self.max_entries = max_entries
+        self.max_total_bars = max_total_bars
+        # 新鮮度窗口 = 時間框架長度 × ttl_ratio，限制在 [min_ttl, max_ttl] 秒
+        self.ttl_ratio = ttl_ratio
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+
+        self._entries: "OrderedDict[CacheKey, _KlineEntry]" = OrderedDict()
+        self._pending: Dict[CacheKey, _PendingRefresh] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._total_bars = 0
+
+        self.stats = {
+            'hits': 0,
+            'full_fetches': 0,
+            'tail_refreshes': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'fetch_errors': 0,
+            'stale_served': 0,
+            'fetched_bars': 0
+        }
+
+    @property
+    def market_service(self):
+        # 延遲建立，避免導入本模組時就初始化交易所連接
+        if self._market_service is None:
+            from app.services.market_data import MarketDataService
+            self._market_service = MarketDataService()
+        return self._market_service
+
+    def _ttl(self, timeframe: str) -> float:
+        return min(max(timeframe_seconds(timeframe) * self.ttl_ratio, self.min_ttl), self.max_ttl)
+
+    # ==================== 查詢 ====================
+
+    async def get_klines(self, symbol: str, timeframe: str, limit: int = 500,
+                         exchange: str = 'binance') -> pd.DataFrame:
+        """返回最近 limit 根K線；與 MarketDataService.get_historical_data 相同的欄位，失敗時返回空表"""
+        key = (exchange, symbol, timeframe)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 事件循環更換後舊循環的抓取任務不可再等待
+            self._loop = loop
+            self._pending = {}
+
+        # 最多兩輪：進行中的抓取根數不足時，等它結束後再以更大的 limit 抓一次
+        for _ in range(2):
+            entry = self._entries.get(key)
+            if entry is not None and entry.depth >= limit and \
+                    time.monotonic() - entry.refreshed_at < self._ttl(timeframe):
+                self.stats['hits'] += 1
+                self._entries.move_to_end(key)
+                return self._slice(entry, limit)
+
+            pending = self._pending.get(key)
+            if pending is None:
+                depth = max(limit, entry.depth) if entry is not None else limit
+                pending = _PendingRefresh(task=loop.create_task(self._refresh(key, depth)), limit=depth)
+                self._pending[key] = pending
+                pending.task.add_done_callback(lambda _, key=key, pending=pending: self._clear_pending(key, pending))
+            else:
+                self.stats['coalesced'] += 1
+
+            # shield: 某個等待者被取消時不影響其他等待同一抓取的呼叫端
+            await asyncio.shield(pending.task)
+            if pending.limit >= limit:
+                break
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return pd.DataFrame()
+        self._entries.move_to_end(key)
+        return self._slice(entry, limit)
+
+    def _slice(self, entry: _KlineEntry, limit: int) -> pd.DataFrame:
+        # 返回副本，避免呼叫端增加欄位時修改快取
+        return entry.frame.iloc[-limit:].reset_index(drop=True).copy()
+
+    def _clear_pending(self, key: CacheKey, pending: _PendingRefresh):
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+
+    # ==================== 刷新 ====================
+
+    async def _refresh(self, key: CacheKey, depth: int):
+        exchange, symbol, timeframe = key
+        entry = self._entries.get(key)
+        try:
+            frame = None
+            if entry is not None and not entry.frame.empty and entry.depth >= depth:
+                frame = await self._fetch_tail(entry, symbol, timeframe, exchange)
+            if frame is None:
+                frame = await self._fetch_full(symbol, timeframe, depth, exchange)
+        except Exception as e:
+            logger.error(f"❌ K線快取刷新失敗 {symbol} {timeframe}: {e}")
+            frame = pd.DataFrame()
+
+        if frame.empty:
+            # 抓取失敗時保留舊數據 (不更新刷新時間)，下一個請求會再嘗試
+            self.stats['fetch_errors'] += 1
+            if entry is not None:
+                self.stats['stale_served'] += 1
+            return
+
+        self._store(key, _KlineEntry(frame=frame, depth=depth, refreshed_at=time.monotonic()))
+
+    async def _fetch_full(self, symbol: str, timeframe: str, depth: int, exchange: str) -> pd.DataFrame:
+        frame = await self.market_service.get_historical_data(
+            symbol=symbol, timeframe=timeframe, limit=depth, exchange=exchange
+        )
+        if frame is None:
+            return pd.DataFrame()
+        self.stats['full_fetches'] += 1
+        self.stats['fetched_bars'] += len(frame)
+        return frame.reset_index(drop=True)
+
+    async def _fetch_tail(self, entry: _KlineEntry, symbol: str, timeframe: str,
+                          exchange: str) -> Optional[pd.DataFrame]:
+        """只抓取最後一根快取K線之後的數據；缺口過大或無法銜接時返回 None 改為全量抓取"""
+        cached = entry.frame
+        last_open = cached['timestamp'].iloc[-1]
+        last_open_ms = int(last_open.value // 1_000_000)
+        bar_ms = timeframe_seconds(timeframe) * 1000
+
+        # 最後一根K線 (可能已收盤) + 之後新開的K線 + 1 根餘量
+        missing = max(int((time.time() * 1000 - last_open_ms) // bar_ms), 0) + 2
+        if missing >= entry.depth:
+            return None
+
+        tail = await self.market_service.get_historical_data(
+            symbol=symbol, timeframe=timeframe, limit=missing, exchange=exchange, since=last_open_ms
+        )
+        if tail is None or tail.empty:
+            return pd.DataFrame()
+        if tail['timestamp'].iloc[0] > last_open:
+            return None
+
+        self.stats['tail_refreshes'] += 1
+        self.stats['fetched_bars'] += len(tail)
+        merged = pd.concat([cached[cached['timestamp'] < tail['timestamp'].iloc[0]], tail], ignore_index=True)
+        return merged.iloc[-entry.depth:].reset_index(drop=True)
+
+    def _store(self, key: CacheKey, entry: _KlineEntry):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._total_bars -= len(old.frame)
+        self._entries[key] = entry
+        self._total_bars += len(entry.frame)
+
+        # LRU 淘汰 (至少保留剛寫入的鍵)
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                          or self._total_bars > self.max_total_bars):
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bars -= len(evicted.frame)
+            self.stats['evictions'] += 1
+
+    # ==================== 維護與監控 ====================
+
+    def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """丟棄快取 (可按交易對 / 時間框架過濾)"""
+        for key in [k for k in self._entries
+                    if (symbol is None or k[1] == symbol) and (timeframe is None or k[2] == timeframe)]:
+            self._total_bars -= len(self._entries.pop(key).frame)
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats['hits'] + self.stats['full_fetches'] + self.stats['tail_refreshes'] + self.stats['coalesced']
+        return {
+            **self.stats,
+            'hit_rate': (self.stats['hits'] + self.stats['coalesced']) / requests if requests else 0.0,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'total_bars': self._total_bars,
+            'max_total_bars': self.max_total_bars,
+            'in_flight': len(self._pending)
+        }
+
+
+# 全局K線快取實例
+kline_cache = KlineCache()
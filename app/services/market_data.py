@@ -87,9 +87,9 @@ class MarketDataService:
                 'timestamp': ticker.timestamp.isoformat()
             }
             self.realtime_data['last_updated'][ticker.symbol] = datetime.now()
-            logger.debug(f"價格更新: {ticker.symbol} = ${ticker.price:.4f}")
+            logger.debug("價格更新: %s = $%.4f", ticker.symbol, ticker.price)
         except Exception as e:
-            logger.error(f"處理價格更新錯誤: {e}")
+            logger.error("處理價格更新錯誤: %s", e)
     
     def _on_kline_update(self, kline: KlineData):
         """處理 K線更新 - 使用增強存儲"""
@@ -127,9 +127,9 @@ class MarketDataService:
                 if len(self.data_buffer) >= self.buffer_size:
                     asyncio.create_task(self._flush_data_buffer())
             
-            logger.debug(f"K線更新: {kline.symbol} {kline.interval} 收盤: ${kline.close_price:.4f}")
+            logger.debug("K線更新: %s %s 收盤: $%.4f", kline.symbol, kline.interval, kline.close_price)
         except Exception as e:
-            logger.error(f"處理K線更新錯誤: {e}")
+            logger.error("處理K線更新錯誤: %s", e)
     
     async def _flush_data_buffer(self):
         """清空數據緩衝區並存儲"""
@@ -166,7 +166,7 @@ class MarketDataService:
                 'asks': depth.asks[:10],  # 保留前10檔
                 'timestamp': depth.timestamp.isoformat()
             }
-            logger.debug(f"深度更新: {depth.symbol}")
+            logger.debug("深度更新: %s", depth.symbol)
         except Exception as e:
             logger.error(f"處理深度更新錯誤: {e}")
     
@@ -180,15 +180,19 @@ class MarketDataService:
         symbol: str,
         timeframe: str = "1h",
         limit: int = 1000,
-        exchange: str = "binance"
+        exchange: str = "binance",
+        since: Optional[int] = None
     ) -> pd.DataFrame:
-        """獲取歷史K線數據"""
+        """獲取歷史K線數據 (since 為毫秒時間戳，只取該時間之後的K線)"""
         try:
             if exchange not in self.exchanges:
                 raise ValueError(f"不支援的交易所: {exchange}")
             
             exchange_obj = self.exchanges[exchange]
-            ohlcv = exchange_obj.fetch_ohlcv(symbol, timeframe, limit=limit)
+            # ccxt 同步客戶端會阻塞事件循環，放到執行緒中抓取，讓多個交易對的並發請求真正重疊
+            ohlcv = await asyncio.to_thread(
+                exchange_obj.fetch_ohlcv, symbol, timeframe, since=since, limit=limit
+            )
             
             df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
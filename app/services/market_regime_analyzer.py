@@ -19,6 +19,7 @@ import numpy as np
 import pandas as pd
 
 from app.services.market_data import MarketDataService
+from app.services.kline_cache import kline_cache
 from app.utils.time_utils import get_taiwan_now_naive
 
 logger = logging.getLogger(__name__)
@@ -156,33 +157,28 @@ class MarketRegimeAnalyzer:
             raise e
     
     async def _gather_multi_timeframe_data(self, symbol: str) -> Dict[str, pd.DataFrame]:
-        """收集多時間框架數據"""
-        timeframe_data = {}
+        """收集多時間框架數據 (經由共享K線快取並行抓取)"""
+        limits = {
+            "1m": 300,   # 5 小時
+            "5m": 288,   # 24 小時
+            "15m": 192,  # 48 小時
+            "1h": 168    # 7 天
+        }
+        results = await asyncio.gather(
+            *(kline_cache.get_klines(symbol, timeframe, limit=limits[timeframe], exchange='binance')
+              for timeframe in self.timeframes),
+            return_exceptions=True
+        )
         
-        for timeframe in self.timeframes:
-            try:
-                limit = {
-                    "1m": 300,   # 5 小時
-                    "5m": 288,   # 24 小時
-                    "15m": 192,  # 48 小時
-                    "1h": 168    # 7 天
-                }[timeframe]
-                
-                df = await self.market_service.get_historical_data(
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    limit=limit,
-                    exchange='binance'
-                )
-                
-                if df is not None and len(df) >= 50:
-                    timeframe_data[timeframe] = df
-                    logger.info(f"✅ {symbol} {timeframe}: {len(df)} 根K線")
-                else:
-                    logger.warning(f"⚠️ {symbol} {timeframe}: 數據不足")
-                    
-            except Exception as e:
-                logger.error(f"❌ 獲取 {symbol} {timeframe} 數據失敗: {e}")
+        timeframe_data = {}
+        for timeframe, df in zip(self.timeframes, results):
+            if isinstance(df, Exception):
+                logger.error(f"❌ 獲取 {symbol} {timeframe} 數據失敗: {df}")
+            elif df is not None and len(df) >= 50:
+                timeframe_data[timeframe] = df
+                logger.info(f"✅ {symbol} {timeframe}: {len(df)} 根K線")
+            else:
+                logger.warning(f"⚠️ {symbol} {timeframe}: 數據不足")
         
         return timeframe_data
     
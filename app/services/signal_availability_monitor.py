@@ -12,6 +12,8 @@ import time
 import logging
 from collections import defaultdict, deque
 
+from app.services.deadline_scheduler import deadline_scheduler, JobPriority
+
 logger = logging.getLogger(__name__)
 
 class SignalStatus(Enum):
@@ -82,7 +84,7 @@ class SignalAvailabilityMonitor:
         self.alert_history: List[MonitoringAlert] = []
         
         # 監控任務
-        self.monitoring_tasks: Dict[str, asyncio.Task] = {}
+        self.monitoring_jobs: List[str] = []
         self.is_running = False
         
         # 統計數據
@@ -154,21 +156,28 @@ class SignalAvailabilityMonitor:
         self.is_running = True
         logger.info("🚀 啟動信號可用性監控系統")
         
-        # 為每個信號啟動監控任務
+        # 為每個信號登記監控任務 (加入抖動避免同週期的檢查同時觸發)
         for signal_name, config in self.monitoring_configs.items():
-            task = asyncio.create_task(
-                self._monitor_signal_loop(signal_name, config)
+            job = deadline_scheduler.add_job(
+                f"signal_monitor.{signal_name}",
+                lambda signal_name=signal_name, config=config: self._monitor_signal_once(signal_name, config),
+                period=config.check_interval_seconds,
+                priority=JobPriority.NORMAL,
+                jitter=config.check_interval_seconds * 0.1,
+                error_delay=min(config.check_interval_seconds, 60)
             )
-            self.monitoring_tasks[signal_name] = task
+            self.monitoring_jobs.append(job.name)
             logger.info(f"📡 啟動 {signal_name} 監控任務 (間隔: {config.check_interval_seconds}s)")
         
-        # 啟動統計和清理任務
-        self.monitoring_tasks["stats_updater"] = asyncio.create_task(
-            self._update_stats_loop()
-        )
-        self.monitoring_tasks["alert_cleaner"] = asyncio.create_task(
-            self._cleanup_alerts_loop()
-        )
+        # 登記統計和清理任務
+        self.monitoring_jobs.append(deadline_scheduler.add_job(
+            "signal_monitor.stats_updater", self._update_stats_once,
+            period=3600, priority=JobPriority.LOW, error_delay=300
+        ).name)
+        self.monitoring_jobs.append(deadline_scheduler.add_job(
+            "signal_monitor.alert_cleaner", self._cleanup_alerts_once,
+            period=3600, priority=JobPriority.LOW, error_delay=300
+        ).name)
     
     async def stop_monitoring(self):
         """停止監控系統"""
@@ -178,41 +187,23 @@ class SignalAvailabilityMonitor:
         self.is_running = False
         logger.info("🛑 停止信號可用性監控系統")
         
-        # 取消所有監控任務
-        for signal_name, task in self.monitoring_tasks.items():
-            if not task.cancelled():
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-        
-        self.monitoring_tasks.clear()
+        # 移除所有監控任務
+        await deadline_scheduler.remove_jobs(self.monitoring_jobs)
+        self.monitoring_jobs.clear()
         logger.info("✅ 所有監控任務已停止")
     
-    async def _monitor_signal_loop(self, signal_name: str, config: SignalMonitorConfig):
-        """信號監控循環"""
-        while self.is_running:
-            try:
-                start_time = time.time()
-                
-                # 執行信號檢查
-                check_result = await self._check_signal_health(signal_name, config)
-                
-                # 更新健康指標
-                await self._update_health_metrics(signal_name, check_result, start_time)
-                
-                # 檢查是否需要發送告警
-                await self._check_and_send_alerts(signal_name)
-                
-                # 等待下次檢查
-                await asyncio.sleep(config.check_interval_seconds)
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ {signal_name} 監控循環錯誤: {e}")
-                await asyncio.sleep(min(config.check_interval_seconds, 60))
+    async def _monitor_signal_once(self, signal_name: str, config: SignalMonitorConfig):
+        """單次信號監控 - 由中央調度器按 check_interval_seconds 呼叫"""
+        start_time = time.time()
+        
+        # 執行信號檢查
+        check_result = await self._check_signal_health(signal_name, config)
+        
+        # 更新健康指標
+        await self._update_health_metrics(signal_name, check_result, start_time)
+        
+        # 檢查是否需要發送告警
+        await self._check_and_send_alerts(signal_name)
     
     async def _check_signal_health(self, signal_name: str, config: SignalMonitorConfig) -> Dict[str, Any]:
         """檢查信號健康狀態"""
@@ -413,28 +404,18 @@ class SignalAvailabilityMonitor:
             
             logger.warning(f"🚨 [{alert.alert_level.value.upper()}] {alert.message}")
     
-    async def _update_stats_loop(self):
-        """更新統計數據循環"""
-        while self.is_running:
-            try:
-                # 清理24小時前的錯誤計數
-                current_time = datetime.now()
-                for metrics in self.signal_health_metrics.values():
-                    # 清理過期的錯誤歷史
-                    cutoff_time = current_time - timedelta(hours=24)
-                    metrics.error_history = deque([
-                        error for error in metrics.error_history 
-                        if error["timestamp"] > cutoff_time
-                    ], maxlen=50)
-                    metrics.error_count_24h = len(metrics.error_history)
-                
-                await asyncio.sleep(3600)  # 每小時執行一次
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ 統計更新錯誤: {e}")
-                await asyncio.sleep(300)
+    async def _update_stats_once(self):
+        """更新統計數據 - 每小時執行一次"""
+        # 清理24小時前的錯誤計數
+        current_time = datetime.now()
+        for metrics in self.signal_health_metrics.values():
+            # 清理過期的錯誤歷史
+            cutoff_time = current_time - timedelta(hours=24)
+            metrics.error_history = deque([
+                error for error in metrics.error_history 
+                if error["timestamp"] > cutoff_time
+            ], maxlen=50)
+            metrics.error_count_24h = len(metrics.error_history)
     
     def record_signal_check(self, signal_name: str, success: bool, latency_ms: float, timestamp: datetime) -> str:
         """
@@ -525,35 +506,25 @@ class SignalAvailabilityMonitor:
             
             return f"❌ {signal_name} 檢查失敗 (延遲: {latency_ms:.1f}ms)"
 
-    async def _cleanup_alerts_loop(self):
-        """清理告警循環"""
-        while self.is_running:
-            try:
-                current_time = datetime.now()
-                cutoff_time = current_time - timedelta(hours=72)  # 保留72小時
-                
-                # 清理舊告警
-                self.alert_history = [
-                    alert for alert in self.alert_history 
-                    if alert.timestamp > cutoff_time
-                ]
-                
-                # 清理已解決的活躍告警
-                resolved_alerts = [
-                    alert_id for alert_id, alert in self.active_alerts.items()
-                    if alert.resolved and alert.resolved_time and alert.resolved_time < cutoff_time
-                ]
-                
-                for alert_id in resolved_alerts:
-                    del self.active_alerts[alert_id]
-                
-                await asyncio.sleep(3600)  # 每小時執行一次
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ 告警清理錯誤: {e}")
-                await asyncio.sleep(300)
+    async def _cleanup_alerts_once(self):
+        """清理告警 - 每小時執行一次"""
+        current_time = datetime.now()
+        cutoff_time = current_time - timedelta(hours=72)  # 保留72小時
+        
+        # 清理舊告警
+        self.alert_history = [
+            alert for alert in self.alert_history 
+            if alert.timestamp > cutoff_time
+        ]
+        
+        # 清理已解決的活躍告警
+        resolved_alerts = [
+            alert_id for alert_id, alert in self.active_alerts.items()
+            if alert.resolved and alert.resolved_time and alert.resolved_time < cutoff_time
+        ]
+        
+        for alert_id in resolved_alerts:
+            del self.active_alerts[alert_id]
     
     def register_custom_check(self, signal_name: str, check_function: Callable):
         """註冊自定義檢查函數"""
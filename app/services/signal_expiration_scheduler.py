@@ -3,11 +3,11 @@
 自動化處理基於智能時間分層動態計算的信號過期
 """
 
-import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from app.services.signal_expiration_service import signal_expiration_service
+from app.services.deadline_scheduler import deadline_scheduler, JobPriority
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,7 @@ class SignalExpirationScheduler:
     
     def __init__(self):
         self.is_running = False
-        self.task = None
+        self.job = None
         self.check_interval = 300  # 5分鐘檢查一次
         
     async def start_scheduler(self):
@@ -28,8 +28,14 @@ class SignalExpirationScheduler:
         self.is_running = True
         logger.info(f"🎯 啟動狙擊手信號過期調度器 (檢查間隔: {self.check_interval}秒)")
         
-        # 創建後台任務
-        self.task = asyncio.create_task(self._scheduler_loop())
+        # 登記到中央調度器 (失敗後 60 秒重試)
+        self.job = deadline_scheduler.add_job(
+            "signal_expiration_check",
+            self._scheduled_check,
+            period=self.check_interval,
+            priority=JobPriority.HIGH,
+            error_delay=60
+        )
         
     async def stop_scheduler(self):
         """停止定時調度器"""
@@ -37,39 +43,21 @@ class SignalExpirationScheduler:
             return
             
         self.is_running = False
-        if self.task:
-            self.task.cancel()
-            try:
-                await self.task
-            except asyncio.CancelledError:
-                pass
+        if self.job:
+            await deadline_scheduler.remove_jobs([self.job.name])
+            self.job = None
         
         logger.info("🎯 狙擊手信號過期調度器已停止")
         
-    async def _scheduler_loop(self):
-        """調度器主循環"""
-        logger.info("🎯 狙擊手信號過期調度器開始運行")
+    async def _scheduled_check(self):
+        """定時過期檢查 - 由中央調度器按 check_interval 呼叫"""
+        # 執行過期檢查和處理
+        result = await self._execute_expiration_check()
         
-        while self.is_running:
-            try:
-                # 執行過期檢查和處理
-                result = await self._execute_expiration_check()
-                
-                if result['expired_count'] > 0:
-                    logger.info(f"🎯 定時處理完成: 處理了 {result['expired_count']} 個過期信號")
-                else:
-                    logger.debug("🎯 定時檢查: 無過期信號需要處理")
-                
-                # 等待下次檢查
-                await asyncio.sleep(self.check_interval)
-                
-            except asyncio.CancelledError:
-                logger.info("🎯 調度器收到取消信號，準備停止")
-                break
-            except Exception as e:
-                logger.error(f"❌ 調度器執行過程中發生錯誤: {e}")
-                # 發生錯誤時等待較短時間後重試
-                await asyncio.sleep(60)
+        if result['expired_count'] > 0:
+            logger.info(f"🎯 定時處理完成: 處理了 {result['expired_count']} 個過期信號")
+        else:
+            logger.debug("🎯 定時檢查: 無過期信號需要處理")
                 
     async def _execute_expiration_check(self) -> Dict[str, Any]:
         """執行過期檢查"""
@@ -99,11 +87,13 @@ class SignalExpirationScheduler:
     
     def get_status(self) -> Dict[str, Any]:
         """獲取調度器狀態"""
+        job_stat = deadline_scheduler.get_job_stats(self.job.name) if self.job else None
         return {
             'is_running': self.is_running,
             'check_interval_seconds': self.check_interval,
-            'next_check': datetime.now() + timedelta(seconds=self.check_interval) if self.is_running else None,
-            'task_status': 'running' if self.task and not self.task.done() else 'stopped'
+            'next_check': datetime.now() + timedelta(seconds=job_stat['next_run_in_seconds']) if job_stat else None,
+            'task_status': 'running' if job_stat else 'stopped',
+            'job_stats': job_stat
         }
 
 # 創建全域調度器實例
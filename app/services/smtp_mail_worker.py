@@ -0,0 +1,311 @@
+"""
+📮 SMTP 郵件工作器 - 持久連線 + 有界佇列 + 突發彙總 + 退避重試
+
+所有 SMTP I/O 在專用的單執行緒中進行，重用已認證的 SMTP 會話；
+異步端只把郵件放入有界佇列並等待結果。短時間內湧入的同類郵件會合併為一封彙總郵件，
+失敗的郵件按退避時間表重新排隊，不阻塞佇列中的其他郵件。
+
+本地測試可指向 aiosmtpd：SmtpMailWorker(host="127.0.0.1", port=8025, use_tls=False)
+（未提供密碼或伺服器不支援 AUTH 時自動跳過登入）。
+"""
+
+import asyncio
+import logging
+import smtplib
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboundMail:
+    """佇列中的一封待發郵件"""
+    message: Message
+    future: asyncio.Future
+    digest_key: Optional[str] = None      # 同 key 的突發郵件可合併為彙總
+    digest_title: str = ""
+    digest_body: str = ""
+    max_attempts: int = 4
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class SmtpMailWorker:
+    """SMTP 郵件工作器 - 單一持久會話的異步發送佇列"""
+
+    def __init__(self,
+                 sender_email: str,
+                 sender_password: Optional[str],
+                 recipient_email: str,
+                 host: str = "smtp.gmail.com",
+                 port: int = 587,
+                 use_tls: bool = True,
+                 queue_size: int = 200,
+                 enqueue_timeout: float = 5.0,
+                 digest_window: float = 2.0,
+                 max_digest_size: int = 20,
+                 retry_delays: Tuple[float, ...] = (2.0, 8.0, 30.0),
+                 idle_check_seconds: float = 60.0,
+                 timeout: float = 30.0):
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.recipient_email = recipient_email
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.digest_window = digest_window
+        self.max_digest_size = max_digest_size
+        self.retry_delays = retry_delays
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+
+        # SMTP 會話只在專用執行緒內使用
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SmtpMailWorker")
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._retry_handles: Dict[asyncio.TimerHandle, OutboundMail] = {}
+
+        self.metrics = {
+            'sent_messages': 0,
+            'sent_mails': 0,
+            'digests_sent': 0,
+            'failed_mails': 0,
+            'retries_scheduled': 0,
+            'rejected_queue_full': 0,
+            'connections_opened': 0,
+            'last_error': None,
+            'last_sent_at': None
+        }
+
+    # ==================== 異步端 ====================
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._consumer_task is not None and not self._consumer_task.done():
+            return
+        # 首次使用或事件循環已更換（例如多次 asyncio.run）時重建佇列與消費者
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._consumer_task = loop.create_task(self._consume())
+        logger.info(f"📮 SMTP 郵件工作器已啟動: {self.host}:{self.port}, 佇列上限 {self.queue_size}")
+
+    async def submit(self, message: Message, digest_key: Optional[str] = None,
+                     digest_title: str = "", digest_body: str = "",
+                     max_attempts: Optional[int] = None) -> bool:
+        """排隊發送郵件並等待最終結果（含重試）"""
+        try:
+            self._ensure_started()
+            item = OutboundMail(
+                message=message,
+                future=self._loop.create_future(),
+                digest_key=digest_key,
+                digest_title=digest_title,
+                digest_body=digest_body,
+                max_attempts=max_attempts or 1 + len(self.retry_delays)
+            )
+            try:
+                await asyncio.wait_for(self._queue.put(item), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.metrics['rejected_queue_full'] += 1
+                logger.warning(f"⚠️ 郵件佇列已滿 ({self.queue_size})，放棄發送: {message.get('Subject', '')}")
+                return False
+
+            return await item.future
+
+        except Exception as e:
+            logger.error(f"❌ 郵件排隊失敗: {e}")
+            return False
+
+    async def _consume(self):
+        while True:
+            item = await self._queue.get()
+            batch = [item]
+            try:
+                if item.digest_key is not None and self.digest_window > 0:
+                    batch = await self._collect_digest(item)
+                await self._deliver(batch)
+            except asyncio.CancelledError:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_result(False)
+                raise
+            except Exception as e:
+                logger.error(f"❌ 郵件工作器處理異常: {e}")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_result(False)
+
+    async def _collect_digest(self, first: OutboundMail) -> List[OutboundMail]:
+        """在彙總窗口內收集同 key 的郵件；不同 key 的郵件放回佇列"""
+        batch = [first]
+        others = []
+        deadline = self._loop.time() + self.digest_window
+        while len(batch) < self.max_digest_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            (batch if item.digest_key == first.digest_key else others).append(item)
+
+        for item in others:
+            self._requeue(item)
+        return batch
+
+    async def _deliver(self, batch: List[OutboundMail]):
+        message = batch[0].message if len(batch) == 1 else self._build_digest(batch)
+        for item in batch:
+            item.attempts += 1
+
+        error = await self._loop.run_in_executor(self._executor, self._send_sync, message)
+
+        if error is None:
+            self.metrics['sent_messages'] += 1
+            self.metrics['sent_mails'] += len(batch)
+            self.metrics['last_sent_at'] = datetime.now().isoformat()
+            if len(batch) > 1:
+                self.metrics['digests_sent'] += 1
+                logger.info(f"📬 彙總郵件已發送: {len(batch)} 封合併為 1 封")
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_result(True)
+            return
+
+        self.metrics['last_error'] = error
+        for item in batch:
+            if item.attempts < item.max_attempts:
+                delay = self.retry_delays[min(item.attempts - 1, len(self.retry_delays) - 1)] if self.retry_delays else 0.0
+                self.metrics['retries_scheduled'] += 1
+                logger.warning(f"⚠️ 郵件發送失敗 (第 {item.attempts} 次)，{delay:.0f} 秒後重試: {error}")
+                self._schedule_retry(item, delay)
+            else:
+                self.metrics['failed_mails'] += 1
+                logger.error(f"❌ 郵件發送徹底失敗 (共 {item.attempts} 次): {error}")
+                if not item.future.done():
+                    item.future.set_result(False)
+
+    def _schedule_retry(self, item: OutboundMail, delay: float):
+        def fire():
+            self._retry_handles.pop(handle, None)
+            self._requeue(item)
+
+        handle = self._loop.call_later(delay, fire)
+        self._retry_handles[handle] = item
+
+    def _requeue(self, item: OutboundMail):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.metrics['rejected_queue_full'] += 1
+            logger.warning("⚠️ 郵件佇列已滿，重試郵件被丟棄")
+            if not item.future.done():
+                item.future.set_result(False)
+
+    def _build_digest(self, batch: List[OutboundMail]) -> MIMEMultipart:
+        """將多封同類郵件合併為一封彙總郵件"""
+        message = MIMEMultipart()
+        message["From"] = self.sender_email
+        message["To"] = self.recipient_email
+        message["Subject"] = f"📬 Trading-X 信號彙總 - {len(batch)} 個信號"
+
+        sections = [f"【{i}】{item.digest_title}\n{item.digest_body.strip()}" for i, item in enumerate(batch, 1)]
+        body = f"📬 Trading-X 信號彙總 ({len(batch)} 個信號)\n\n" + "\n\n".join(sections)
+        message.attach(MIMEText(body, "plain", "utf-8"))
+        return message
+
+    # ==================== SMTP 執行緒 ====================
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if self.use_tls:
+            server.starttls(context=ssl.create_default_context())
+            server.ehlo()
+        if self.sender_password and server.has_extn("auth"):
+            server.login(self.sender_email, self.sender_password)
+        self.metrics['connections_opened'] += 1
+        logger.info(f"📮 SMTP 會話已建立: {self.host}:{self.port}")
+        return server
+
+    def _close_session(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                try:
+                    self._smtp.close()
+                except Exception:
+                    pass
+            self._smtp = None
+
+    def _session(self) -> smtplib.SMTP:
+        """取得可用會話；閒置過久時先以 NOOP 探測，失效則重連"""
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_check_seconds:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self._close_session()
+            except smtplib.SMTPException:
+                self._close_session()
+            except OSError:
+                self._close_session()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def _send_sync(self, message: Message) -> Optional[str]:
+        """在專用執行緒中發送；返回錯誤訊息，成功時返回 None"""
+        try:
+            try:
+                self._session().sendmail(self.sender_email, self.recipient_email, message.as_string())
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # 會話被伺服器關閉：重連後立即重發一次
+                self._close_session()
+                self._session().sendmail(self.sender_email, self.recipient_email, message.as_string())
+            self._last_used = time.monotonic()
+            return None
+        except Exception as e:
+            self._close_session()
+            return str(e) or e.__class__.__name__
+
+    # ==================== 生命週期與監控 ====================
+
+    async def close(self):
+        """停止消費者並關閉 SMTP 會話"""
+        for handle, item in self._retry_handles.items():
+            handle.cancel()
+            if not item.future.done():
+                item.future.set_result(False)
+        self._retry_handles = {}
+        if self._consumer_task is not None:
+            self._consumer_task.cancel()
+            try:
+                await self._consumer_task
+            except asyncio.CancelledError:
+                pass
+            self._consumer_task = None
+        if self._loop is not None:
+            await self._loop.run_in_executor(self._executor, self._close_session)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'queue_size': self.queue_size,
+            'session_open': self._smtp is not None
+        }
@@ -285,6 +285,8 @@ class SniperEmailManager:
                 best_signals = list(unique_signals.values())
                 logger.info(f"📧 找到 {len(best_signals)} 個幣種的最優信號 (已去重)")
                 
+                # 第一階段：篩選並標記為發送中（共用同一資料庫會話，逐筆執行）
+                sending = []
                 for signal in best_signals:
                     try:
                         # 🛡️ 檢查今日是否已發送該幣種信號
@@ -300,11 +302,25 @@ class SniperEmailManager:
                         
                         # 更新狀態為發送中
                         await self._update_email_status(db, signal.signal_id, EmailStatus.SENDING)
+                        sending.append((signal, symbol_key))
                         
-                        # 嘗試發送
-                        success = await self._attempt_send_email(signal, max_retries=3)
-                        
-                        if success:
+                    except Exception as e:
+                        logger.error(f"❌ 處理信號 {signal.signal_id} 時異常: {e}")
+                        continue
+                
+                if not sending:
+                    return
+                
+                # 第二階段：同時排入郵件工作器 - 同一批信號合併為彙總郵件，重試由工作器按退避時間表處理
+                results = await asyncio.gather(
+                    *(self._attempt_send_email(signal, max_retries=3) for signal, _ in sending),
+                    return_exceptions=True
+                )
+                
+                # 第三階段：依結果更新狀態
+                for (signal, symbol_key), success in zip(sending, results):
+                    try:
+                        if success is True:
                             await self._update_email_status(db, signal.signal_id, EmailStatus.SENT,
                                                           sent_at=datetime.utcnow())
                             
@@ -327,9 +343,6 @@ class SniperEmailManager:
                                                               error_msg=f"發送失敗，30秒後重試 (次數: {current_retry_count})")
                                 logger.warning(f"❌ 發送失敗: {signal.symbol} {signal.signal_id}，30秒後重試 (次數: {current_retry_count})")
                         
-                        # 發送間隔 - 避免過於頻繁
-                        await asyncio.sleep(3)
-                        
                     except Exception as e:
                         logger.error(f"❌ 處理信號 {signal.signal_id} 時異常: {e}")
                         continue
@@ -468,42 +481,36 @@ class SniperEmailManager:
             return False
     
     async def _attempt_send_email(self, signal: SniperSignalDetails, max_retries: int = 3) -> bool:
-        """嘗試發送 Email (帶重試機制)"""
-        for attempt in range(max_retries):
-            try:
-                # 構建信號資訊
-                signal_info = {
-                    'symbol': signal.symbol,
-                    'signal_type': signal.signal_type,
-                    'entry_price': signal.entry_price,
-                    'stop_loss': signal.stop_loss_price,
-                    'take_profit': signal.take_profit_price,
-                    'confidence': signal.signal_strength,
-                    'quality_score': signal.signal_strength * 10,  # 轉換為1-10分
-                    'timeframe': signal.timeframe.value if signal.timeframe else '1h',
-                    'reasoning': signal.reasoning or '狙擊手智能分層信號',
-                    'created_at': signal.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'update_type': 'REGULAR',
-                    'priority': 'HIGH' if signal.signal_strength >= 0.7 else 'MEDIUM',
-                    'risk_reward_ratio': signal.risk_reward_ratio
-                }
-                
-                # 發送 Email
-                success = await self.gmail_service.send_sniper_signal_notification_async(signal_info)
-                
-                if success:
-                    return True
-                else:
-                    logger.warning(f"第 {attempt + 1} 次發送失敗: {signal.signal_id}")
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(2 ** attempt)  # 指數退避
-                    
-            except Exception as e:
-                logger.error(f"第 {attempt + 1} 次發送異常: {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                    
-        return False
+        """嘗試發送 Email - 重試與指數退避由郵件工作器處理，不佔用呼叫端"""
+        try:
+            # 構建信號資訊
+            signal_info = {
+                'symbol': signal.symbol,
+                'signal_type': signal.signal_type,
+                'entry_price': signal.entry_price,
+                'stop_loss': signal.stop_loss_price,
+                'take_profit': signal.take_profit_price,
+                'confidence': signal.signal_strength,
+                'quality_score': signal.signal_strength * 10,  # 轉換為1-10分
+                'timeframe': signal.timeframe.value if signal.timeframe else '1h',
+                'reasoning': signal.reasoning or '狙擊手智能分層信號',
+                'created_at': signal.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'update_type': 'REGULAR',
+                'priority': 'HIGH' if signal.signal_strength >= 0.7 else 'MEDIUM',
+                'risk_reward_ratio': signal.risk_reward_ratio
+            }
+            
+            # 發送 Email
+            success = await self.gmail_service.send_sniper_signal_notification_async(
+                signal_info, max_attempts=max_retries
+            )
+            if not success:
+                logger.warning(f"發送失敗 (共嘗試 {max_retries} 次): {signal.signal_id}")
+            return success
+            
+        except Exception as e:
+            logger.error(f"發送異常: {e}")
+            return False
     
     async def _update_email_status(self, db: AsyncSession, signal_id: str, status: EmailStatus, 
                                   sent_at: Optional[datetime] = None, error_msg: Optional[str] = None):
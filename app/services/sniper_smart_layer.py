@@ -21,6 +21,7 @@ from app.core.database import db_manager
 from app.models.sniper_signal_history import SniperSignalDetails, SignalStatus, TradingTimeframe, EmailStatus
 from sqlalchemy import select, func, and_
 from app.core.database import get_db
+from app.services.deadline_scheduler import deadline_scheduler, JobPriority
 
 logger = logging.getLogger(__name__)
 
@@ -394,8 +395,15 @@ class SniperSmartLayerSystem:
         
         logger.info("🚀 SniperSmartLayerSystem 第三波優化初始化完成 - 整合Phase策略系統")
         
-        # 啟動信號狀態監控任務
-        asyncio.create_task(self._start_signal_monitoring_loop())
+        # 啟動信號狀態監控任務 - 每5分鐘檢查一次 (等待系統啟動完成10秒，錯誤時1分鐘後重試)
+        deadline_scheduler.add_job(
+            "sniper.signal_status_monitor",
+            self._monitor_signal_status,
+            period=300,
+            priority=JobPriority.HIGH,
+            initial_delay=10,
+            error_delay=60
+        )
         
         # 初始化符號配置 - 使用Phase策略動態參數
         self._init_symbol_configs_with_phase_strategy()
@@ -703,50 +711,23 @@ class SniperSmartLayerSystem:
             logger.error(f"❌ 初始化 {symbol} 信號失敗: {e}")
     
     async def _start_regular_update_tasks(self):
-        """啟動定期更新任務"""
-        # 為每個時間框架分類創建更新任務
-        tasks = []
-        
-        # 短線更新任務 (5分鐘)
-        short_term_symbols = [s for s, c in self.symbol_configs.items() 
-                             if c["category"] == TimeframeCategory.SHORT_TERM]
-        if short_term_symbols:
-            task = asyncio.create_task(
-                self._regular_update_loop(short_term_symbols, 5 * 60)  # 5分鐘
-            )
-            tasks.append(task)
-        
-        # 中線更新任務 (15分鐘) - 配合8-48小時持倉週期
-        medium_term_symbols = [s for s, c in self.symbol_configs.items() 
-                              if c["category"] == TimeframeCategory.MEDIUM_TERM]
-        if medium_term_symbols:
-            task = asyncio.create_task(
-                self._regular_update_loop(medium_term_symbols, 15 * 60)  # 15分鐘
-            )
-            tasks.append(task)
-        
-        # 長線更新任務 (30分鐘) - 配合24-120小時持倉週期
-        long_term_symbols = [s for s, c in self.symbol_configs.items() 
-                            if c["category"] == TimeframeCategory.LONG_TERM]
-        if long_term_symbols:
-            task = asyncio.create_task(
-                self._regular_update_loop(long_term_symbols, 30 * 60)  # 30分鐘
+        """登記定期更新任務 - 每個時間框架分類一個調度任務"""
+        categories = [
+            (TimeframeCategory.SHORT_TERM, 5 * 60),    # 短線 5分鐘
+            (TimeframeCategory.MEDIUM_TERM, 15 * 60),  # 中線 15分鐘 - 配合8-48小時持倉週期
+            (TimeframeCategory.LONG_TERM, 30 * 60)     # 長線 30分鐘 - 配合24-120小時持倉週期
+        ]
+        
+        for category, interval_seconds in categories:
+            symbols = [s for s, c in self.symbol_configs.items() if c["category"] == category]
+            if not symbols:
+                continue
+            deadline_scheduler.add_job(
+                f"sniper.regular_update.{interval_seconds // 60}m",
+                lambda symbols=symbols, interval_seconds=interval_seconds: self._regular_update_once(symbols, interval_seconds),
+                period=interval_seconds,
+                error_delay=60  # 錯誤時等待1分鐘再重試
             )
-            tasks.append(task)
-        
-        await asyncio.gather(*tasks)
-    
-    async def _start_signal_monitoring_loop(self):
-        """啟動信號狀態監控循環 - 每5分鐘檢查一次"""
-        await asyncio.sleep(10)  # 等待系統啟動完成
-        
-        while True:
-            try:
-                await self._monitor_signal_status()
-                await asyncio.sleep(300)  # 5分鐘檢查一次
-            except Exception as e:
-                logger.error(f"❌ 信號監控循環錯誤: {e}")
-                await asyncio.sleep(60)  # 錯誤時等待1分鐘
     
     async def _monitor_signal_status(self):
         """監控信號狀態並更新結果"""
@@ -1129,79 +1110,67 @@ class SniperSmartLayerSystem:
             else:
                 stats['win_rate'] = 0.0
     
-    async def _regular_update_loop(self, symbols: List[str], interval_seconds: int):
-        """定期更新循環"""
-        while True:
-            try:
-                logger.info(f"🔄 開始定期更新: {symbols} (間隔: {interval_seconds//60}分鐘)")
-                
-                # 並行更新所有符號
-                tasks = []
-                for symbol in symbols:
-                    task = asyncio.create_task(self._update_symbol_signal(symbol, 'REGULAR'))
-                    tasks.append(task)
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # 檢查更新結果
-                success_count = sum(1 for r in results if not isinstance(r, Exception))
-                logger.info(f"✅ 定期更新完成: {success_count}/{len(symbols)} 成功")
-                
-                # 等待下一次更新
-                await asyncio.sleep(interval_seconds)
-                
-            except Exception as e:
-                logger.error(f"❌ 定期更新循環錯誤: {e}")
-                await asyncio.sleep(60)  # 錯誤時等待1分鐘再重試
+    async def _regular_update_once(self, symbols: List[str], interval_seconds: int):
+        """定期更新 - 由中央調度器按間隔呼叫"""
+        logger.info(f"🔄 開始定期更新: {symbols} (間隔: {interval_seconds//60}分鐘)")
+        
+        # 並行更新所有符號
+        tasks = []
+        for symbol in symbols:
+            task = asyncio.create_task(self._update_symbol_signal(symbol, 'REGULAR'))
+            tasks.append(task)
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # 檢查更新結果
+        success_count = sum(1 for r in results if not isinstance(r, Exception))
+        logger.info(f"✅ 定期更新完成: {success_count}/{len(symbols)} 成功")
     
     async def _update_symbol_signal(self, symbol: str, update_type: str = 'REGULAR'):
         """更新單個幣種的信號"""
         try:
             async with self.update_locks[symbol]:
-                logger.info(f"🔍 開始更新 {symbol} 信號 (類型: {update_type})")
+                logger.debug("🔍 開始更新 %s 信號 (類型: %s)", symbol, update_type)
                 
                 # 生成新的最佳信號
                 new_signal = await self._generate_best_signal_for_symbol(symbol)
                 
                 if not new_signal:
-                    logger.info(f"⚠️ {symbol} 無符合條件的新信號")
+                    logger.info("⚠️ %s 無符合條件的新信號", symbol)
                     return
                 
-                logger.info(f"🎯 {symbol} 生成新信號: {new_signal.signal_type}, 品質: {new_signal.quality_score:.2f}")
+                logger.info("🎯 %s 生成新信號: %s, 品質: %.2f", symbol, new_signal.signal_type, new_signal.quality_score)
                 
                 # 比較與現有信號
                 current_signal = self.active_signals.get(symbol)
-                logger.info(f"📊 {symbol} 當前信號狀態: {'有' if current_signal else '無'}")
+                logger.debug("📊 %s 當前信號狀態: %s", symbol, '有' if current_signal else '無')
                 
                 should_replace, decision_reason = self._should_replace_signal(current_signal, new_signal)
                 if should_replace:
                     # 將決策原因添加到新信號中
                     new_signal.decision_reason = decision_reason
-                    logger.info(f"✅ {symbol} 決定採用新信號: {decision_reason}")
+                    logger.info("✅ %s 決定採用新信號: %s", symbol, decision_reason)
                     
                     # 🎯 改進邏輯：立即保存到資料庫，確保前端能獲取到最新信號
                     await self._save_signal_to_history(new_signal)
-                    logger.info(f"💾 {symbol} 新信號已立即保存到資料庫")
+                    logger.debug("💾 %s 新信號已立即保存到資料庫", symbol)
                     
                     # 更新內存中的活躍信號（作為快取）
                     old_quality = current_signal.quality_score if current_signal else 0
                     self.active_signals[symbol] = new_signal
                     
-                    logger.info(f"🎯 {symbol} 信號更新: {new_signal.signal_type} "
-                              f"(品質: {old_quality:.2f} → {new_signal.quality_score:.2f})")
-                    logger.info(f"📈 活躍信號總數: {len(self.active_signals)}")
+                    logger.info("🎯 %s 信號更新: %s (品質: %.2f → %.2f)",
+                                symbol, new_signal.signal_type, old_quality, new_signal.quality_score)
+                    logger.info("📈 活躍信號總數: %d", len(self.active_signals))
                     
                     # 通知前端（WebSocket推送）
                     await self._notify_signal_update(symbol, new_signal, update_type)
                 else:
-                    logger.info(f"⚪ {symbol} 信號保持不變 "
-                              f"(當前品質: {current_signal.quality_score:.2f} >= "
-                              f"新信號: {new_signal.quality_score:.2f})")
+                    logger.info("⚪ %s 信號保持不變 (當前品質: %.2f >= 新信號: %.2f)",
+                                symbol, current_signal.quality_score, new_signal.quality_score)
                 
         except Exception as e:
-            logger.error(f"❌ 更新 {symbol} 信號失敗: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("❌ 更新 %s 信號失敗: %s", symbol, e, exc_info=True)
     
     async def _generate_best_signal_for_symbol(self, symbol: str) -> Optional[SmartSignal]:
         """為指定幣種生成最佳信號"""
@@ -1230,7 +1199,7 @@ class SniperSmartLayerSystem:
             # 只有品質評分超過閾值才生成信號 (使用市場校準閾值)
             quality_threshold = self._get_quality_threshold(config['category'], market_volatility)
             if quality_score < quality_threshold:
-                logger.info(f"⚠️ {symbol} 品質評分 {quality_score:.2f} 低於閾值 {quality_threshold:.2f} (市場校準)")
+                logger.info("⚠️ %s 品質評分 %.2f 低於閾值 %.2f (市場校準)", symbol, quality_score, quality_threshold)
                 return None
             
             # 創建智能信號
@@ -1496,9 +1465,7 @@ class SniperSmartLayerSystem:
             
             # 📊 調用統一數據層進行真實分析
             from sniper_unified_data_layer import snipe_unified_layer
-            from app.services.market_data import MarketDataService
-            
-            market_service = MarketDataService()
+            from app.services.kline_cache import kline_cache
             
             # 獲取真實市場數據
             timeframe_map = {
@@ -1508,7 +1475,7 @@ class SniperSmartLayerSystem:
             }
             
             timeframe = timeframe_map.get(config['category'], "1h")
-            df = await market_service.get_historical_data(
+            df = await kline_cache.get_klines(
                 symbol=symbol,
                 timeframe=timeframe,
                 limit=200,
@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from app.services.market_data import MarketDataService
+from app.services.kline_cache import kline_cache
 from app.services.technical_indicators import TechnicalIndicatorsService, IndicatorResult
 from app.services.candlestick_patterns import analyze_candlestick_patterns, PatternResult, PatternType
 from app.core.config import settings
@@ -315,8 +316,10 @@ class StrategyEngine:
         """分析市場趨勢 - 牛熊市判斷"""
         try:
             # 獲取長期歷史數據進行趨勢分析
-            daily_data = await self.market_service.get_historical_data(symbol, '1d', limit=90)  # 90天數據
-            weekly_data = await self.market_service.get_historical_data(symbol, '1w', limit=26) # 26週數據
+            daily_data, weekly_data = await asyncio.gather(
+                kline_cache.get_klines(symbol, '1d', limit=90),  # 90天數據
+                kline_cache.get_klines(symbol, '1w', limit=26)   # 26週數據
+            )
             
             if daily_data.empty or weekly_data.empty:
                 return MarketCondition(
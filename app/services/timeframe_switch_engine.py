@@ -8,10 +8,11 @@ from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 import logging
-import asyncio
 from collections import deque
 import math
 
+from app.services.deadline_scheduler import deadline_scheduler
+
 logger = logging.getLogger(__name__)
 
 class SwitchTrigger(Enum):
@@ -169,7 +170,7 @@ class TimeframeSwitchEngine:
         
         # 運行狀態
         self.is_monitoring = False
-        self.monitoring_task: Optional[asyncio.Task] = None
+        self.monitoring_job = None
         
         # 初始化時間框架性能檔案
         self._initialize_timeframe_profiles()
@@ -246,38 +247,30 @@ class TimeframeSwitchEngine:
             return
         
         self.is_monitoring = True
-        self.monitoring_task = asyncio.create_task(self._monitoring_loop())
+        # 每10分鐘檢查一次，出錯後2分鐘重試
+        self.monitoring_job = deadline_scheduler.add_job(
+            "timeframe_switch.monitor",
+            self._monitoring_once,
+            period=600,
+            error_delay=120
+        )
         logger.info("🚀 時間框架切換監控已啟動")
     
     async def stop_monitoring(self):
         """停止切換監控"""
         self.is_monitoring = False
-        if self.monitoring_task:
-            self.monitoring_task.cancel()
-            try:
-                await self.monitoring_task
-            except asyncio.CancelledError:
-                pass
+        if self.monitoring_job:
+            await deadline_scheduler.remove_jobs([self.monitoring_job.name])
+            self.monitoring_job = None
         logger.info("⏹️ 時間框架切換監控已停止")
     
-    async def _monitoring_loop(self):
-        """監控循環"""
-        while self.is_monitoring:
-            try:
-                # 檢查所有交易對的切換條件
-                await self._check_switch_conditions()
-                
-                # 清理過期的切換事件
-                self._cleanup_expired_switches()
-                
-                # 等待下次檢查 (每10分鐘)
-                await asyncio.sleep(600)
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"❌ 切換監控循環錯誤: {e}")
-                await asyncio.sleep(120)
+    async def _monitoring_once(self):
+        """單次監控 - 由中央調度器每10分鐘呼叫"""
+        # 檢查所有交易對的切換條件
+        await self._check_switch_conditions()
+        
+        # 清理過期的切換事件
+        self._cleanup_expired_switches()
     
     async def _check_switch_conditions(self):
         """檢查切換條件"""
@@ -26,6 +26,11 @@ from .log_manager import (
     manual_cleanup
 )
 
+from .async_logging import (
+    async_log_sink,
+    get_logging_overhead
+)
+
 __all__ = [
     'get_taiwan_now',
     'get_taiwan_now_naive',
@@ -44,5 +49,7 @@ __all__ = [
     'start_log_management',
     'stop_log_management',
     'get_log_stats',
-    'manual_cleanup'
+    'manual_cleanup',
+    'async_log_sink',
+    'get_logging_overhead'
 ]
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+異步日誌子系統 - 佇列日誌處理器 + 延遲格式化 + 呼叫點限流 + 開銷統計
+
+熱路徑 (每個 tick / 每個交易對) 的日誌原本在事件循環中格式化並同步寫文件。
+這裡把所有處理器移到 QueueListener 的背景執行緒：
+- 呼叫端只建立 LogRecord 並放入佇列；%-風格參數延遲到背景執行緒才格式化
+- CallSiteRateLimitFilter 按呼叫點 (模組 + 行號) 限流，超出突發量後按比例取樣
+- 被略過的條數會附在該呼叫點下一條輸出的日誌後面
+- LoggingOverheadStats 按模組統計呼叫端入隊耗時與背景寫入耗時
+"""
+
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 延遲格式化時可以安全保留引用的參數類型 (不可變)
+_IMMUTABLE_ARG_TYPES = (str, int, float, bool, type(None), bytes)
+
+# 預設的熱路徑模組 (每個 tick / 每個交易對都會記錄日誌)
+HOT_PATH_LOGGERS = (
+    'app.services.market_data',
+    'app.services.binance_websocket',
+    'app.services.sniper_smart_layer',
+    'app.api.v1.endpoints.scalping_precision'
+)
+
+
+class LoggingOverheadStats:
+    """按模組統計日誌開銷 - 計數不加鎖，多執行緒同時記錄時僅為近似值"""
+
+    def __init__(self):
+        self.enqueued = defaultdict(int)
+        self.enqueue_ns = defaultdict(int)
+        self.emitted = defaultdict(int)
+        self.emit_ns = defaultdict(int)
+        self.suppressed = defaultdict(int)
+        self.dropped = defaultdict(int)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        modules = set(self.enqueued) | set(self.suppressed) | set(self.dropped)
+        result = {}
+        for name in sorted(modules):
+            enqueued = self.enqueued.get(name, 0)
+            emitted = self.emitted.get(name, 0)
+            result[name] = {
+                'enqueued': enqueued,
+                'emitted': emitted,
+                'suppressed': self.suppressed.get(name, 0),
+                'dropped': self.dropped.get(name, 0),
+                'avg_caller_us': self.enqueue_ns.get(name, 0) / enqueued / 1000 if enqueued else 0.0,
+                'total_caller_ms': self.enqueue_ns.get(name, 0) / 1e6,
+                'avg_writer_us': self.emit_ns.get(name, 0) / emitted / 1000 if emitted else 0.0,
+                'total_writer_ms': self.emit_ns.get(name, 0) / 1e6
+            }
+        return result
+
+
+class CallSiteRateLimitFilter(logging.Filter):
+    """呼叫點限流過濾器
+
+    每個呼叫點在 interval 秒內最多放行 burst 條；超出後每 sample_every 條放行 1 條。
+    WARNING 以上的記錄不限流。只看 LogRecord 的欄位，不會觸發消息格式化。
+    """
+
+    def __init__(self, burst: int = 5, interval: float = 10.0, sample_every: int = 100,
+                 min_level: int = logging.WARNING, stats: Optional[LoggingOverheadStats] = None):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self.min_level = min_level
+        self.stats = stats
+        # 呼叫點 → [窗口開始時間, 窗口內計數, 未輸出條數]
+        self._sites: Dict[tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level:
+            return True
+
+        key = (record.name, record.lineno)
+        now = record.created
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.interval:
+                suppressed = site[2] if site is not None else 0
+                site = self._sites[key] = [now, 0, 0]
+            else:
+                suppressed = site[2]
+            site[1] += 1
+            count = site[1]
+            allowed = count <= self.burst or (self.sample_every > 0 and (count - self.burst) % self.sample_every == 0)
+            if allowed:
+                site[2] = 0
+            else:
+                site[2] += 1
+
+        if not allowed:
+            if self.stats is not None:
+                self.stats.suppressed[record.name] += 1
+            return False
+        if suppressed:
+            record.suppressed_count = suppressed
+        return True
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """佇列處理器 - 參數皆為不可變類型時把格式化留給背景執行緒"""
+
+    def __init__(self, log_queue: queue.Queue, stats: LoggingOverheadStats):
+        super().__init__(log_queue)
+        self.stats = stats
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 異常堆疊在呼叫端展開，避免 traceback 物件跨執行緒延長生命週期
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARG_TYPES) for arg in args)):
+            # 可變參數可能在寫入前被修改，這種情況仍在呼叫端格式化
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.stats.dropped[record.name] += 1
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        start = time.perf_counter_ns()
+        result = super().handle(record)
+        if result:
+            self.stats.enqueued[record.name] += 1
+            self.stats.enqueue_ns[record.name] += time.perf_counter_ns() - start
+        return result
+
+
+class _TimedQueueListener(logging.handlers.QueueListener):
+    """背景執行緒 - 格式化並寫出，附加限流略過數，統計寫入耗時"""
+
+    def __init__(self, log_queue: queue.Queue, handlers: Iterable[logging.Handler], stats: LoggingOverheadStats):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.stats = stats
+
+    def handle(self, record: logging.LogRecord):
+        start = time.perf_counter_ns()
+        suppressed = getattr(record, 'suppressed_count', 0)
+        if suppressed:
+            record.msg = f"{record.getMessage()} (同一呼叫點已略過 {suppressed} 條)"
+            record.args = None
+        super().handle(record)
+        self.stats.emitted[record.name] += 1
+        self.stats.emit_ns[record.name] += time.perf_counter_ns() - start
+
+
+class AsyncLogSink:
+    """異步日誌出口 - 根日誌器只掛一個佇列處理器，實際處理器在背景執行緒中運行"""
+
+    def __init__(self, max_queue_size: int = 10000):
+        self.stats = LoggingOverheadStats()
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self.queue_handler = LazyQueueHandler(self.queue, self.stats)
+        self.handlers: List[logging.Handler] = []
+        self.rate_limiter: Optional[CallSiteRateLimitFilter] = None
+        self._limited_loggers: List[str] = []
+        self._listener: Optional[_TimedQueueListener] = None
+
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+
+    def start(self, handlers: Iterable[logging.Handler], level: int = logging.INFO,
+              hot_path_loggers: Iterable[str] = HOT_PATH_LOGGERS, **rate_limit_options):
+        """替換根日誌器的處理器並啟動背景寫入執行緒"""
+        if self._listener is not None:
+            self.stop()
+
+        root_logger = logging.getLogger()
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+
+        self.handlers = list(handlers)
+        self._listener = _TimedQueueListener(self.queue, self.handlers, self.stats)
+        self._listener.start()
+        root_logger.addHandler(self.queue_handler)
+        root_logger.setLevel(level)
+
+        # 限流過濾器掛在熱路徑模組的日誌器上 (在建立記錄後、入隊前執行)
+        self.rate_limiter = CallSiteRateLimitFilter(stats=self.stats, **rate_limit_options)
+        self._limited_loggers = list(hot_path_loggers)
+        for name in self._limited_loggers:
+            logging.getLogger(name).addFilter(self.rate_limiter)
+
+    def stop(self):
+        """停止背景執行緒並寫出佇列中剩餘的記錄"""
+        if self._listener is None:
+            return
+        root_logger = logging.getLogger()
+        root_logger.removeHandler(self.queue_handler)
+        for name in self._limited_loggers:
+            logging.getLogger(name).removeFilter(self.rate_limiter)
+        self._listener.stop()
+        self._listener = None
+        for handler in self.handlers:
+            handler.close()
+
+    def get_overhead(self) -> Dict[str, Any]:
+        """按模組統計的日誌開銷"""
+        modules = self.stats.snapshot()
+        return {
+            'running': self.running,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'total_suppressed': sum(m['suppressed'] for m in modules.values()),
+            'total_dropped': sum(m['dropped'] for m in modules.values()),
+            'total_caller_ms': sum(m['total_caller_ms'] for m in modules.values()),
+            'modules': modules
+        }
+
+
+def build_file_handler(path: Path, formatter: logging.Formatter, level: int = logging.INFO) -> logging.Handler:
+    """文件處理器 - WatchedFileHandler 在 LogManager 輪轉 (移動) 文件後自動重新開啟"""
+    handler = logging.handlers.WatchedFileHandler(str(path), encoding='utf-8')
+    handler.setLevel(level)
+    handler.setFormatter(formatter)
+    return handler
+
+
+# 全局異步日誌出口
+async_log_sink = AsyncLogSink()
+
+
+def get_logging_overhead() -> Dict[str, Any]:
+    """獲取日誌開銷統計"""
+    return async_log_sink.get_overhead()
@@ -12,6 +12,8 @@ from pathlib import Path
 from typing import List, Optional
 import shutil
 
+from app.utils.async_logging import async_log_sink
+
 logger = logging.getLogger(__name__)
 
 class LogManager:
@@ -229,6 +231,15 @@ class LogManager:
             stats["total_size_mb"] = round(stats["total_size_mb"], 2)
             stats["backup_count"] = len(backup_files)
             
+            # 異步日誌出口狀態 (文件處理器為 WatchedFileHandler，輪轉後自動重新開啟)
+            overhead = async_log_sink.get_overhead()
+            stats["async_sink"] = {
+                "running": overhead["running"],
+                "queue_depth": overhead["queue_depth"],
+                "total_suppressed": overhead["total_suppressed"],
+                "total_dropped": overhead["total_dropped"]
+            }
+            
             return stats
             
         except Exception as e:
@@ -3,8 +3,10 @@
 """
 
 import logging
-import re
-from typing import Set
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.utils.async_logging import async_log_sink, build_file_handler
 
 class RealtimeStrategyLogFilter(logging.Filter):
     """實時交易策略日誌過濾器"""
@@ -48,17 +50,23 @@ class RealtimeStrategyLogFilter(logging.Filter):
             'cleanup',
             'log_management'
         }
+        
+        # 日誌器名稱 → 是否允許 (避免每條記錄都掃描模組列表)
+        self._module_decisions: Dict[str, bool] = {}
     
     def filter(self, record):
-        """過濾日誌記錄"""
+        """過濾日誌記錄 - 先做不需要格式化消息的檢查"""
         
         # 檢查模組名稱
-        if hasattr(record, 'name'):
-            module_name = record.name
-            
-            # 只允許特定模組的日誌
-            if not any(allowed in module_name for allowed in self.allowed_modules):
-                return False
+        module_name = record.name
+        allowed = self._module_decisions.get(module_name)
+        if allowed is None:
+            allowed = any(module in module_name for module in self.allowed_modules)
+            self._module_decisions[module_name] = allowed
+        
+        # 只允許特定模組的日誌
+        if not allowed:
+            return False
         
         # 檢查日誌消息內容
         message = record.getMessage()
@@ -77,15 +85,12 @@ class RealtimeStrategyLogFilter(logging.Filter):
         
         return False
 
-def setup_realtime_logging():
-    """設置實時交易策略日誌"""
-    
-    # 獲取根日誌記录器
-    root_logger = logging.getLogger()
+def setup_realtime_logging(log_file: Optional[Path] = None, **rate_limit_options):
+    """設置實時交易策略日誌
     
-    # 移除現有的處理器
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
+    處理器在異步日誌出口的背景執行緒中運行；熱路徑模組按呼叫點限流
+    (rate_limit_options 轉交 CallSiteRateLimitFilter，例如 burst / interval / sample_every)。
+    """
     
     # 創建新的處理器
     console_handler = logging.StreamHandler()
@@ -102,9 +107,12 @@ def setup_realtime_logging():
     realtime_filter = RealtimeStrategyLogFilter()
     console_handler.addFilter(realtime_filter)
     
-    # 添加處理器
-    root_logger.addHandler(console_handler)
-    root_logger.setLevel(logging.INFO)
+    handlers = [console_handler]
+    if log_file is not None:
+        handlers.append(build_file_handler(Path(log_file), formatter))
+    
+    # 替換根日誌器的處理器並啟動背景寫入
+    async_log_sink.start(handlers, level=logging.INFO, **rate_limit_options)
     
     print("✅ 實時交易策略日誌過濾器已啟用 - 只顯示 pandas+WebSocket 核心流程")
 
@@ -53,6 +53,12 @@ except ImportError:
         QuantumBlockchainExtractor,
     )
 
+# ⚛️ 預取量子熵池
+try:
+    from .quantum_entropy_pool import get_entropy_pool
+except ImportError:
+    from quantum_entropy_pool import get_entropy_pool
+
 # Qiskit 量子計算 - 兼容 Qiskit 2.x
 try:
     from qiskit import ClassicalRegister, QuantumCircuit, transpile
@@ -194,6 +200,9 @@ QUANTUM_CONFIG = {
     'ENCODING': 'multi-scale',  # 'angle' | 'amplitude' | 'multi-scale'
     'USE_STATEVECTOR': False,
     'SHOTS': 2048,
+    'BATCHED_INFERENCE': True,  # 預測使用快取模板 + 多參數 PUB
+    'PREDICT_BATCH_SIZE': 4096,  # 每個 PUB 的最大樣本數
+    'GRADIENT_TERM_BATCH_SIZE': None,  # 梯度小批量 Pauli 項數 (None = 完整 Hamiltonian)
     'NOISE_MODEL': True,
     'DEPOLARIZING_PROB': 0.002,
     'THERMAL_PARAMS': {'T1': 50e3, 'T2': 70e3, 'time': 50},
@@ -651,6 +660,269 @@ def evaluate_quantum_circuit(theta: np.ndarray, feature_vec: np.ndarray, h: np.n
         raise RuntimeError(f"❌ 量子電路評估失敗: {e}")  # 不允許任何回退邏輯
 
 
+# ---------------------------
+# 批量參數化電路推論
+# ---------------------------
+
+# 參數化模板快取: (n_feature_qubits, n_readout, n_ansatz_layers, encoding, measured) -> 模板
+_BATCHED_TEMPLATE_CACHE: Dict[Tuple[int, int, int, str, bool], Dict[str, Any]] = {}
+_BATCHED_PRIMITIVE_CACHE: Dict[Tuple[str, int], Any] = {}
+
+BATCHED_ENCODINGS = ('angle', 'multi-scale')
+
+def _encoding_plan(encoding: str, n_feature_qubits: int) -> List[Tuple[int, int, float]]:
+    """特徵編碼計劃 [(qubit, feature_index, scale)] - 與 angle_encoding / multi_scale_encoding 對應"""
+    if encoding == 'angle' or (encoding == 'multi-scale' and n_feature_qubits < 2):
+        return [(q, q, 1.0) for q in range(n_feature_qubits)]
+    
+    if encoding == 'multi-scale':
+        plan = []
+        group_size = n_feature_qubits // 3
+        for i, start_idx in enumerate([0, group_size, 2 * group_size]):
+            end_idx = start_idx + group_size if i < 2 else n_feature_qubits
+            group_qubits = list(range(start_idx, end_idx))
+            offset = i * len(group_qubits)
+            for k, q in enumerate(group_qubits):
+                plan.append((q, offset + k, 0.5 * (i + 1)))
+        return plan
+    
+    raise ValueError(f"❌ 批量推論不支援的編碼方式: {encoding}")
+
+def build_batched_inference_template(n_feature_qubits: int, n_readout: int, n_ansatz_layers: int,
+                                     encoding: str, measured: bool) -> Dict[str, Any]:
+    """構建並轉譯參數化推論模板 (特徵、時間演化係數與 ansatz 參數全部為 Parameter)
+    
+    與 evaluate_quantum_circuit 的電路結構一致；ZZ 項恆定包含 (係數為 0 時等價於恆等)。
+    """
+    key = (n_feature_qubits, n_readout, n_ansatz_layers, encoding, measured)
+    template = _BATCHED_TEMPLATE_CACHE.get(key)
+    if template is not None:
+        return template
+    
+    total_qubits = n_feature_qubits + n_readout
+    plan = _encoding_plan(encoding, n_feature_qubits)
+    pairs = [(i, j) for i in range(n_feature_qubits) for j in range(i + 1, n_feature_qubits)]
+    
+    x_params = ParameterVector('x', length=len(plan))
+    h_params = ParameterVector('h', length=n_feature_qubits)
+    j_params = ParameterVector('J', length=len(pairs))
+    
+    qc = QuantumCircuit(total_qubits)
+    for p_idx, (q, _, _) in enumerate(plan):
+        qc.ry(x_params[p_idx], q)
+    for i in range(n_feature_qubits):
+        qc.rz(h_params[i], i)
+    for p_idx, (i, j) in enumerate(pairs):
+        qc.cx(i, j)
+        qc.rz(j_params[p_idx], j)
+        qc.cx(i, j)
+    
+    ansatz, theta_params = build_param_ansatz(n_readout, n_ansatz_layers)
+    qc = qc.compose(ansatz, qubits=list(range(n_readout)))
+    
+    if measured:
+        qc.add_register(ClassicalRegister(n_readout, 'meas'))
+        qc.measure(list(range(n_feature_qubits, total_qubits)), list(range(n_readout)))
+    
+    transpiled = transpile(qc, basis_gates=['ry', 'rz', 'cx', 'measure'], optimization_level=1)
+    column_index = {param: col for col, param in enumerate(transpiled.parameters)}
+    
+    observables = []
+    if not measured:
+        for i in range(n_readout):
+            pauli_str = ['I'] * total_qubits
+            pauli_str[n_feature_qubits + i] = 'Z'
+            observable = SparsePauliOp.from_list([(''.join(pauli_str), 1.0)])
+            if transpiled.layout is not None:
+                observable = observable.apply_layout(transpiled.layout)
+            observables.append([observable])
+    
+    template = {
+        'circuit': transpiled,
+        'plan': plan,
+        'pairs': pairs,
+        'columns': {
+            'x': [column_index[p] for p in x_params if p in column_index],
+            'h': [column_index[p] for p in h_params if p in column_index],
+            'J': [column_index[p] for p in j_params if p in column_index],
+            'theta': [column_index[p] for p in theta_params if p in column_index]
+        },
+        'present': {
+            'x': [p in column_index for p in x_params],
+            'h': [p in column_index for p in h_params],
+            'J': [p in column_index for p in j_params],
+            'theta': [p in column_index for p in theta_params]
+        },
+        'n_parameters': len(column_index),
+        'observables': observables
+    }
+    _BATCHED_TEMPLATE_CACHE[key] = template
+    logger.info(f"🧩 已構建批量推論模板 {key}: {len(column_index)} 個參數, 深度 {transpiled.depth()}")
+    return template
+
+def batched_feature_to_hJ(X: np.ndarray, n_qubits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """向量化 feature_to_hJ_advanced - 返回 h (N, n) 與 J (N, n, n)"""
+    V = np.zeros((X.shape[0], n_qubits))
+    width = min(X.shape[1], n_qubits)
+    V[:, :width] = X[:, :width]
+    
+    norms = np.linalg.norm(V, axis=1, keepdims=True)
+    V = np.where(norms > 1e-12, V / np.where(norms > 1e-12, norms, 1.0), V)
+    
+    h = 0.6 * V + 0.4 * np.tanh(V)
+    idx = np.arange(n_qubits)
+    decay = np.exp(-0.5 * np.abs(idx[:, None] - idx[None, :]))
+    J = V[:, :, None] * V[:, None, :] * 0.25 * decay
+    J[:, idx, idx] = 0.0
+    return h, J
+
+def _batched_parameter_values(template: Dict[str, Any], theta: np.ndarray, X: np.ndarray,
+                              n_feature_qubits: int, dt: float = 0.1) -> np.ndarray:
+    """組裝 (N, n_parameters) 參數值矩陣"""
+    n_samples = X.shape[0]
+    values = np.zeros((n_samples, template['n_parameters']))
+    
+    def assign(name: str, block: np.ndarray):
+        mask = np.asarray(template['present'][name], dtype=bool)
+        if mask.any():
+            values[:, template['columns'][name]] = block[:, mask]
+    
+    # 特徵編碼角度 (超出特徵維度的位置綁定 0，等價於不加門)
+    x_block = np.zeros((n_samples, len(template['plan'])))
+    for p_idx, (_, feature_index, scale) in enumerate(template['plan']):
+        if feature_index < X.shape[1]:
+            x_block[:, p_idx] = X[:, feature_index] * scale
+    assign('x', x_block)
+    
+    # 時間演化係數
+    h, J = batched_feature_to_hJ(X, n_feature_qubits)
+    assign('h', 2 * h * dt)
+    if template['pairs']:
+        rows, cols = zip(*template['pairs'])
+        assign('J', 2 * J[:, list(rows), list(cols)] * dt)
+    
+    # ansatz 參數對所有樣本相同
+    n_theta = len(template['present']['theta'])
+    if len(theta) < n_theta:
+        raise ValueError(f"❌ 參數數量不足: 需要 {n_theta}，但只有 {len(theta)}")
+    assign('theta', np.broadcast_to(np.asarray(theta[:n_theta], dtype=float), (n_samples, n_theta)))
+    
+    return values
+
+def _get_batched_primitive(kind: str, shots: int = 0):
+    """取得 (並快取) Aer V2 primitive"""
+    key = (kind, shots)
+    primitive = _BATCHED_PRIMITIVE_CACHE.get(key)
+    if primitive is None:
+        if kind == 'estimator':
+            primitive = EstimatorV2(options={'backend_options': {'method': 'statevector'}})
+        else:
+            primitive = SamplerV2(default_shots=shots)
+        _BATCHED_PRIMITIVE_CACHE[key] = primitive
+    return primitive
+
+def evaluate_quantum_circuit_batch(theta: np.ndarray, X: np.ndarray, n_feature_qubits: int, n_readout: int,
+                                   n_ansatz_layers: int, encoding: str, use_statevector: bool, shots: int,
+                                   max_batch_size: int = 4096) -> np.ndarray:
+    """批量評估量子電路 - 每個分塊作為一個多參數 PUB，一次提交 (返回 (N, n_readout) 期望值)
+    
+    期望值口徑與 evaluate_quantum_circuit 一致: statevector 模式為 <Z>，採樣模式為 P(1) - P(0)。
+    """
+    if not PRIMITIVES_V2_AVAILABLE:
+        raise RuntimeError("❌ Qiskit Aer Primitives V2 不可用，無法進行批量量子推論")
+    if encoding not in BATCHED_ENCODINGS:
+        raise ValueError(f"❌ 批量推論不支援的編碼方式: {encoding}")
+    
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    template = build_batched_inference_template(
+        n_feature_qubits, n_readout, n_ansatz_layers, encoding, measured=not use_statevector
+    )
+    values = _batched_parameter_values(template, np.asarray(theta), X, n_feature_qubits)
+    chunks = [values[start:start + max_batch_size] for start in range(0, len(values), max_batch_size)]
+    circuit = template['circuit']
+    
+    if use_statevector:
+        estimator = _get_batched_primitive('estimator')
+        result = estimator.run([(circuit, template['observables'], chunk) for chunk in chunks]).result()
+        # 每個 PUB 的 evs 形狀為 (n_readout, chunk)
+        return np.concatenate([np.asarray(pub_result.data.evs).T for pub_result in result], axis=0)
+    
+    sampler = _get_batched_primitive('sampler', shots)
+    result = sampler.run([(circuit, chunk) for chunk in chunks], shots=shots).result()
+    expectations = []
+    for pub_result in result:
+        # BitArray: (chunk, shots, bytes)，大端序，經典位 0 位於最後一個字節的最低位
+        bits = np.unpackbits(pub_result.data.meas.array, axis=-1)[..., ::-1][..., :n_readout]
+        expectations.append(2.0 * bits.mean(axis=1) - 1.0)
+    return np.concatenate(expectations, axis=0)
+
+
+# ---------------------------
+# 參數平移梯度引擎
+# ---------------------------
+
+class ParameterShiftGradientEngine:
+    """參數平移批量梯度 - 每步所有平移參數集合併為單一 Estimator PUB
+    
+    適用於每個參數只出現在單一 Pauli 旋轉門中的 ansatz (如 RealAmplitudes)，
+    此時 ∂E/∂θᵢ = [E(θ + s·eᵢ) - E(θ - s·eᵢ)] / (2 sin s)，s = π/2 時為精確梯度。
+    可選小批量模式: 每步循環取 Hamiltonian 的一個 Pauli 項窗口並按比例縮放 (不使用隨機數)。
+    """
+    
+    def __init__(self, ansatz, hamiltonian, estimator, shift: float = np.pi / 2,
+                 term_batch_size: Optional[int] = None):
+        self.estimator = estimator
+        self.shift = shift
+        self.hamiltonian = hamiltonian
+        self.term_batch_size = term_batch_size
+        self._term_cursor = 0
+        
+        # 轉譯一次並在所有迭代中重用 (optimization_level=0 保持每個參數對應單一旋轉門)
+        self.circuit = transpile(ansatz, basis_gates=['ry', 'rz', 'cx'], optimization_level=0)
+        self.num_parameters = self.circuit.num_parameters
+        if self.circuit.layout is not None:
+            self.hamiltonian = hamiltonian.apply_layout(self.circuit.layout)
+    
+    def _next_observable(self):
+        """返回本步使用的觀測量 (完整 Hamiltonian 或循環小批量)"""
+        n_terms = len(self.hamiltonian)
+        if not self.term_batch_size or self.term_batch_size >= n_terms:
+            return self.hamiltonian
+        
+        indices = [(self._term_cursor + k) % n_terms for k in range(self.term_batch_size)]
+        self._term_cursor = (self._term_cursor + self.term_batch_size) % n_terms
+        subset = self.hamiltonian[indices]
+        return subset * (n_terms / self.term_batch_size)
+    
+    def shifted_parameter_sets(self, params: np.ndarray, include_center: bool = False) -> np.ndarray:
+        """構建 (2P [+1], P) 的平移參數矩陣: 前 P 行 +s，後 P 行 -s，可選最後一行為原參數"""
+        params = np.asarray(params, dtype=float)
+        shifts = np.eye(self.num_parameters) * self.shift
+        blocks = [params + shifts, params - shifts]
+        if include_center:
+            blocks.append(params[None, :])
+        return np.vstack(blocks)
+    
+    def energy_and_gradient(self, params: np.ndarray) -> Tuple[float, np.ndarray]:
+        """單次提交計算能量與梯度"""
+        values = self.shifted_parameter_sets(params, include_center=True)
+        job = self.estimator.run([(self.circuit, self._next_observable(), values)])
+        evs = np.asarray(job.result()[0].data.evs, dtype=float).reshape(-1)
+        
+        p = self.num_parameters
+        gradient = (evs[:p] - evs[p:2 * p]) / (2 * np.sin(self.shift))
+        return float(evs[-1]), gradient
+    
+    def gradient(self, params: np.ndarray) -> np.ndarray:
+        """單次提交計算梯度 (2P 個平移電路在同一 PUB 中)"""
+        values = self.shifted_parameter_sets(params)
+        job = self.estimator.run([(self.circuit, self._next_observable(), values)])
+        evs = np.asarray(job.result()[0].data.evs, dtype=float).reshape(-1)
+        
+        p = self.num_parameters
+        return (evs[:p] - evs[p:]) / (2 * np.sin(self.shift))
+
+
 # ---------------------------
 # 真實量子後端管理器
 # ---------------------------
@@ -846,140 +1118,17 @@ class QuantumBackendManager:
             raise RuntimeError("❌ Qiskit 2.x Primitives API 不可用 - 需要 qiskit.primitives 模組")
         
         try:
-            from qiskit import QuantumCircuit
-            from qiskit_aer.primitives import Sampler
-
-            # 每次最多可並行生成的 qubits (避免過大的電路)
-            n_qubits = min(n_bits, 20)  
-            quantum_bits = []
-
-            while len(quantum_bits) < n_bits:
-                current_batch = min(n_qubits, n_bits - len(quantum_bits))
-                
-                # 創建量子電路
-                qc = QuantumCircuit(current_batch, current_batch)
-
-                # 對每個 qubit 施加 Hadamard 門，進入均勻疊加
-                qc.h(range(current_batch))
-
-                # 測量所有量子位
-                qc.measure(range(current_batch), range(current_batch))
-
-                # 使用 Qiskit 2.x SamplerV2 - 簡化和穩定的實現
-                if PRIMITIVES_V2_AVAILABLE:
-                    from qiskit_aer.primitives import SamplerV2
-
-                    # 使用穩定的 SamplerV2
-                    sampler = SamplerV2()
-                    
-                    # Qiskit 2.x V2 正確的 PUB 格式調用 - 增加 shots 確保測量準確
-                    job = sampler.run([(qc,)], shots=1024)
-                    result = job.result()
-                    
-                    # SamplerV2 結果處理 - 增強版解析
-                    pub_result = result[0]
-                    measured_bitstring = None
-                    
-                    try:
-                        # 嘗試所有可能的數據路徑
-                        data_paths = [
-                            ('data', 'meas'),
-                            ('data', 'c'),  
-                            ('data', 'measurement'),
-                            ('data', 'classical'),
-                        ]
-                        
-                        for path in data_paths:
-                            if measured_bitstring is not None:
-                                break
-                                
-                            try:
-                                obj = pub_result
-                                for attr in path:
-                                    if hasattr(obj, attr):
-                                        obj = getattr(obj, attr)
-                                    else:
-                                        obj = None
-                                        break
-                                
-                                if obj is not None:
-                                    # 處理 Counts 對象
-                                    if hasattr(obj, 'get_counts'):
-                                        counts = obj.get_counts()
-                                        if counts:
-                                            # 獲取最頻繁的測量結果
-                                            most_frequent = max(counts.items(), key=lambda x: x[1])
-                                            measured_bitstring = most_frequent[0]
-                                            break
-                                    
-                                    # 處理數組或列表
-                                    elif hasattr(obj, '__iter__') and hasattr(obj, '__len__') and len(obj) > 0:
-                                        if isinstance(obj, dict):
-                                            # 如果是字典格式的計數結果
-                                            if obj:
-                                                most_frequent = max(obj.items(), key=lambda x: x[1])
-                                                measured_bitstring = most_frequent[0]
-                                                break
-                                        else:
-                                            # 如果是測量數組
-                                            first_measurement = obj[0]
-                                            if isinstance(first_measurement, (list, tuple, np.ndarray)):
-                                                measured_bitstring = ''.join(str(int(b)) for b in first_measurement)
-                                                break
-                                            elif isinstance(first_measurement, str):
-                                                measured_bitstring = first_measurement
-                                                break
-                            except Exception:
-                                continue
-                        
-                        # 最後嘗試直接從結果對象獲取
-                        if measured_bitstring is None:
-                            result_attrs = ['get_counts', 'counts', 'data', 'measurements']
-                            for attr in result_attrs:
-                                if hasattr(pub_result, attr):
-                                    try:
-                                        val = getattr(pub_result, attr)
-                                        if callable(val):
-                                            val = val()
-                                        if isinstance(val, dict) and val:
-                                            most_frequent = max(val.items(), key=lambda x: x[1])
-                                            measured_bitstring = most_frequent[0]
-                                            break
-                                    except Exception:
-                                        continue
-                        
-                    except Exception as parse_error:
-                        raise RuntimeError(f"❌ SamplerV2 結果解析嚴重錯誤: {parse_error}")
-                    
-                    # 嚴格要求真實量子測量 - 絕不允許任何模擬
-                    if measured_bitstring is None:
-                        # 提供詳細的調試信息
-                        debug_info = f"PUB結果屬性: {dir(pub_result)}"
-                        if hasattr(pub_result, 'data'):
-                            debug_info += f", data屬性: {dir(pub_result.data)}"
-                        raise RuntimeError(f"❌ 量子測量結果解析完全失敗，無法獲得真實量子隨機數。{debug_info}")
-                
-                else:
-                    raise RuntimeError("❌ Qiskit 2.x Primitives V2 不可用，無法生成量子隨機數")
-                
-                # 確保 bitstring 有效且長度正確
-                if not measured_bitstring or not all(c in '01' for c in measured_bitstring):
-                    raise RuntimeError(f"❌ 獲得無效的測量結果: {measured_bitstring}")
-                
-                # 填充到正確長度
-                if len(measured_bitstring) < current_batch:
-                    measured_bitstring = measured_bitstring.zfill(current_batch)
-                
-                # 轉為 list[int]，注意 Qiskit 的比特順序
-                bits = [int(b) for b in measured_bitstring[::-1]]  # 反向讀取
-                quantum_bits.extend(bits[:current_batch])
-
-            final_bits = quantum_bits[:n_bits]
-            logger.debug(f"✅ Qiskit 2.x Primitives 量子隨機比特生成: {len(final_bits)} 個")
+            # 從預取量子熵池取用 (背景以大批量電路補充)
+            final_bits = get_entropy_pool().draw_bits(n_bits).tolist()
+            logger.debug(f"✅ 量子熵池隨機比特: {len(final_bits)} 個")
             return final_bits
             
         except Exception as e:
             raise RuntimeError(f"❌ Qiskit 2.x Primitives 量子隨機比特生成失敗: {e}")
+    
+    def get_entropy_pool_metrics(self) -> Dict[str, Any]:
+        """量子熵池深度與補充延遲指標"""
+        return get_entropy_pool().get_metrics()
 
 # 全局量子後端管理器實例
 quantum_backend_manager = QuantumBackendManager()
@@ -1966,43 +2115,41 @@ class BTCQuantumUltimateModel:
                 return SparsePauliOp.from_list([('Z' + 'I' * (num_qubits-1), 1.0)])
 
     def _compute_numerical_gradient(self, ansatz, params, hamiltonian, estimator):
-        """計算數值梯度"""
+        """計算梯度 - 參數平移規則，每步 2P 個平移電路作為單一 PUB 提交"""
         try:
-            gradient = np.zeros_like(params)
-            epsilon = 0.01
-            
-            for i in range(len(params)):
-                # 前向差分
-                params_plus = params.copy()
-                params_plus[i] += epsilon
-                
-                params_minus = params.copy()
-                params_minus[i] -= epsilon
-                
-                try:
-                    # 純量子梯度計算 - 必須使用量子後端
-                    circuit_plus = ansatz.assign_parameters(params_plus)
-                    circuit_minus = ansatz.assign_parameters(params_minus)
-                    
-                    # 使用 Qiskit 2.x primitives pub 格式: (circuit, observables)
-                    job_plus = estimator.run([(circuit_plus, hamiltonian)])
-                    job_minus = estimator.run([(circuit_minus, hamiltonian)])
-                    
-                    # Qiskit 2.x: 結果在 pub_result.data.evs 中，轉為標量
-                    energy_plus = float(job_plus.result()[0].data.evs.item())
-                    energy_minus = float(job_minus.result()[0].data.evs.item())
-                    
-                    gradient[i] = (energy_plus - energy_minus) / (2 * epsilon)
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ 梯度計算失敗 (參數 {i}): {e}")
-                    gradient[i] = 0.0
+            engine = getattr(self, '_gradient_engine', None)
+            if (engine is None or engine.estimator is not estimator or
+                    getattr(self, '_gradient_engine_key', None) != (id(ansatz), id(hamiltonian))):
+                engine = ParameterShiftGradientEngine(
+                    ansatz, hamiltonian, estimator,
+                    term_batch_size=self.config.get('GRADIENT_TERM_BATCH_SIZE')
+                )
+                self._gradient_engine = engine
+                self._gradient_engine_key = (id(ansatz), id(hamiltonian))
             
-            return gradient
+            return engine.gradient(params)
             
         except Exception as e:
-            logger.warning(f"⚠️ 數值梯度計算失敗: {e}")
+            logger.warning(f"⚠️ 參數平移梯度計算失敗: {e}")
             return np.zeros_like(params)
+    
+    @staticmethod
+    def _compute_finite_difference_gradient(ansatz, params, hamiltonian, estimator, epsilon: float = 0.01):
+        """逐參數中心差分梯度 (2P 次獨立提交) - 保留作為基準比較"""
+        gradient = np.zeros_like(params)
+        for i in range(len(params)):
+            params_plus = params.copy()
+            params_plus[i] += epsilon
+            params_minus = params.copy()
+            params_minus[i] -= epsilon
+            
+            job_plus = estimator.run([(ansatz.assign_parameters(params_plus), hamiltonian)])
+            job_minus = estimator.run([(ansatz.assign_parameters(params_minus), hamiltonian)])
+            energy_plus = float(job_plus.result()[0].data.evs.item())
+            energy_minus = float(job_minus.result()[0].data.evs.item())
+            gradient[i] = (energy_plus - energy_minus) / (2 * epsilon)
+        
+        return gradient
 
     def _generate_quantum_random_parameters(self, n_params: int) -> np.ndarray:
         """使用 Qiskit 2.x 標準量子隨機數生成器生成參數"""
@@ -2011,25 +2158,9 @@ class BTCQuantumUltimateModel:
             raise RuntimeError("❌ 量子隨機數生成器未啟用，違反量子計算原則")
         
         try:
-            # 使用量子後端管理器的標準方法生成隨機比特
-            # 每個參數需要 16 位精度
-            required_bits = n_params * 16
-            quantum_bits = self.quantum_backend_manager.generate_quantum_random_bits(required_bits)
-            
-            # 將量子比特轉換為 [-π, π] 範圍的參數
-            random_values = []
-            for i in range(n_params):
-                # 提取該參數的 16 位
-                bit_slice = quantum_bits[i*16:(i+1)*16]
-                
-                # 轉換為整數值 [0, 65535]
-                int_value = sum(bit * (2**j) for j, bit in enumerate(bit_slice))
-                
-                # 歸一化到 [-π, π] 範圍
-                normalized_value = (int_value / 65535.0) * 2 * np.pi - np.pi
-                random_values.append(normalized_value)
-            
-            quantum_params = np.array(random_values)
+            # 每個參數由 16 個量子比特組成 [0, 65535]，歸一化到 [-π, π] 範圍
+            int_values = get_entropy_pool().draw_integers(n_params, bits_per_value=16)
+            quantum_params = (int_values / 65535.0) * 2 * np.pi - np.pi
             logger.info(f"✅ Qiskit 2.x 量子隨機數生成成功: {n_params} 個參數")
             return quantum_params
             
@@ -2041,23 +2172,9 @@ class BTCQuantumUltimateModel:
     def _generate_quantum_bernoulli(self, n: int) -> np.ndarray:
         """使用量子計算生成 Bernoulli 隨機變數"""
         try:
-            qrng_circuit = QuantumCircuit(1, 1)
-            qrng_circuit.h(0)  # 創建 |+⟩ 態
-            qrng_circuit.measure(0, 0)
-            
-            bernoulli_values = []
-            for _ in range(n):
-                job = self.quantum_backend.run(qrng_circuit, shots=1)
-                result = job.result()
-                counts = result.get_counts()
-                
-                # 從測量結果提取 ±1
-                if '0' in counts:
-                    bernoulli_values.append(1.0)
-                else:
-                    bernoulli_values.append(-1.0)
-            
-            return np.array(bernoulli_values)
+            # |+⟩ 態測量比特: 0 → +1, 1 → -1
+            bits = get_entropy_pool().draw_bits(n)
+            return np.where(bits == 0, 1.0, -1.0)
             
         except Exception as e:
             logger.error(f"量子 Bernoulli 生成失敗: {e}")
@@ -2105,26 +2222,8 @@ class BTCQuantumUltimateModel:
     def _generate_quantum_uniform_single(self) -> float:
         """生成單個量子均勻分佈隨機數 [0, 1)"""
         try:
-            # 使用多位量子隨機數提高精度
-            n_qubits = 8  # 8位精度
-            qrng_circuit = QuantumCircuit(n_qubits, n_qubits)
-            
-            for i in range(n_qubits):
-                qrng_circuit.h(i)
-            qrng_circuit.measure_all()
-            
-            job = self.quantum_backend.run(qrng_circuit, shots=1)
-            result = job.result()
-            counts = result.get_counts()
-            
-            # 提取第一個測量結果
-            bitstring = list(counts.keys())[0].replace(' ', '')
-            
-            # 轉換為 [0, 1) 範圍的浮點數
-            binary_value = int(bitstring, 2)
-            uniform_value = binary_value / (2**n_qubits)
-            
-            return uniform_value
+            # 8 位精度量子均勻隨機數
+            return float(get_entropy_pool().draw_uniform(1, bits_per_value=8)[0])
             
         except Exception as e:
             logger.error(f"量子均勻隨機數生成失敗: {e}")
@@ -2321,6 +2420,10 @@ class BTCQuantumUltimateModel:
             raise RuntimeError("❌ 量子後端未初始化")
         
         X_processed = self.preprocess_features(X, fit=False)
+        
+        if self.config.get('BATCHED_INFERENCE', True) and self.config['ENCODING'] in BATCHED_ENCODINGS:
+            return self._predict_batched(X_processed)
+        
         predictions = []
         probabilities = []
         
@@ -2362,6 +2465,41 @@ class BTCQuantumUltimateModel:
         
         return np.array(predictions), np.array(probabilities)
     
+    def _predict_batched(self, X_processed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """批量量子預測 - 快取的參數化模板 + 單次多參數 PUB 提交"""
+        logger.info(f"🔮 開始批量量子預測 ({len(X_processed)} 個樣本)...")
+        start_time = time.time()
+        
+        try:
+            expectations = evaluate_quantum_circuit_batch(
+                self.theta, X_processed,
+                self.config['N_FEATURE_QUBITS'], self.config['N_READOUT'],
+                self.config['N_ANSATZ_LAYERS'], self.config['ENCODING'],
+                self.config['USE_STATEVECTOR'], self.config['SHOTS'],
+                max_batch_size=self.config.get('PREDICT_BATCH_SIZE', 4096)
+            )
+        except Exception as e:
+            logger.error(f"批量量子預測失敗: {e}")
+            raise RuntimeError(f"❌ 量子預測失敗，純量子系統無法繼續: {e}")
+        
+        # 檢查期望值是否為 NaN 或無窮大（真正的錯誤情況）
+        if not np.all(np.isfinite(expectations)):
+            raise RuntimeError("❌ 量子期望值包含 NaN 或無窮大 - 量子電路執行失敗")
+        
+        shifted = np.exp(expectations - expectations.max(axis=1, keepdims=True))
+        probabilities = shifted / (shifted.sum(axis=1, keepdims=True) + 1e-12)
+        
+        # 檢查是否為無效的均勻分佈（表示量子電路失敗）
+        uniform = np.all(np.abs(probabilities - 1.0 / probabilities.shape[1]) <= 1e-6, axis=1)
+        if np.any(uniform):
+            raise RuntimeError(f"❌ 量子電路產生均勻分佈，疑似量子計算失敗 (樣本 {int(np.argmax(uniform))})")
+        
+        predictions = np.argmax(probabilities, axis=1)
+        elapsed = time.time() - start_time
+        logger.info(f"✅ 批量量子預測完成: {len(predictions)} 個樣本, {elapsed:.2f}s "
+                    f"({len(predictions) / max(elapsed, 1e-9):.0f} 樣本/秒)")
+        return predictions, probabilities
+    
     def predict_single(self, feature_vec: np.ndarray) -> Tuple[int, np.ndarray]:
         """單一真實量子預測"""
         if not self.is_fitted:
@@ -2866,9 +3004,9 @@ class BTCQuantumUltimateModel:
                 'error': str(e)
             }
 
-    def save_model(self, filepath: str):
-        """保存模型 (Phase 2: 支援多幣種量子模型)"""
-        model_data = {
+    def export_model_data(self) -> Dict[str, Any]:
+        """導出模型數據 (save_model 與模型註冊表共用)"""
+        return {
             'config': self.config,
             'theta': self.theta,
             'scaler': self.scaler,
@@ -2881,6 +3019,10 @@ class BTCQuantumUltimateModel:
             'quantum_entanglement_matrix': self.quantum_entanglement_matrix,
             'quantum_voting_enabled': self.quantum_voting_enabled
         }
+
+    def save_model(self, filepath: str):
+        """保存模型 (Phase 2: 支援多幣種量子模型)"""
+        model_data = self.export_model_data()
         
         with open(filepath, 'wb') as f:
             pickle.dump(model_data, f)
@@ -4610,6 +4752,46 @@ def production_demo_comprehensive_with_phase5():
         comprehensive_results['error'] = str(e)
         return comprehensive_results
 
+def benchmark_gradient_engines(num_qubits: int = 6, layers: int = 3, iterations: int = 3) -> Dict[str, float]:
+    """梯度引擎基準: 逐參數中心差分 vs 參數平移單 PUB (CPU Aer EstimatorV2)"""
+    logger.info(f"⏱️ 梯度引擎基準測試: {num_qubits} qubits, {layers} 層, {iterations} 次迭代")
+    
+    ansatz = RealAmplitudes(num_qubits, reps=layers)
+    pauli_list = []
+    for i in range(num_qubits):
+        pauli_list.append(('I' * i + 'Z' + 'I' * (num_qubits - i - 1), 1.0 / (i + 1)))
+        pauli_list.append(('I' * i + 'X' + 'I' * (num_qubits - i - 1), 0.5 / (i + 1)))
+    hamiltonian = SparsePauliOp.from_list(pauli_list)
+    estimator = EstimatorV2(options={'backend_options': {'method': 'statevector'}})
+    params = np.linspace(-np.pi / 2, np.pi / 2, ansatz.num_parameters)
+    
+    start_time = time.time()
+    for _ in range(iterations):
+        finite_difference = BTCQuantumUltimateModel._compute_finite_difference_gradient(
+            ansatz, params, hamiltonian, estimator
+        )
+    finite_difference_time = (time.time() - start_time) / iterations
+    
+    engine = ParameterShiftGradientEngine(ansatz, hamiltonian, estimator)
+    start_time = time.time()
+    for _ in range(iterations):
+        parameter_shift = engine.gradient(params)
+    parameter_shift_time = (time.time() - start_time) / iterations
+    
+    results = {
+        'num_parameters': ansatz.num_parameters,
+        'finite_difference_seconds_per_iteration': finite_difference_time,
+        'parameter_shift_seconds_per_iteration': parameter_shift_time,
+        'speedup': finite_difference_time / max(parameter_shift_time, 1e-9),
+        'max_gradient_difference': float(np.max(np.abs(finite_difference - parameter_shift)))
+    }
+    logger.info(f"   參數數量: {results['num_parameters']}")
+    logger.info(f"   中心差分: {finite_difference_time:.3f}s/迭代")
+    logger.info(f"   參數平移: {parameter_shift_time:.3f}s/迭代 (加速 {results['speedup']:.1f}x)")
+    logger.info(f"   梯度最大差異: {results['max_gradient_difference']:.2e}")
+    return results
+
+
 if __name__ == "__main__":
     """真實量子計算主程序（包含 Phase 1-5 完整架構）"""
     import argparse
@@ -4623,10 +4805,13 @@ if __name__ == "__main__":
     parser.add_argument('--phase5', action='store_true', help='運行 Phase 5 基準驗證與模型評估')
     parser.add_argument('--comprehensive', action='store_true', help='運行全階段綜合示範 (Phase 2-4)')
     parser.add_argument('--full', action='store_true', help='運行完整架構示範 (Phase 1-5)')
+    parser.add_argument('--gradient-benchmark', action='store_true', help='運行梯度引擎基準測試 (CPU Aer)')
     
     args = parser.parse_args()
     
-    if args.phase4:
+    if args.gradient_benchmark:
+        benchmark_gradient_engines()
+    elif args.phase4:
         logger.info("🚀 啟動 Phase 4 電路效能優化示範...")
         production_demo_phase_4()
     elif args.phase5:
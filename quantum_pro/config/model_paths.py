@@ -28,6 +28,24 @@ def get_model_directory() -> str:
     """獲取模型目錄路徑"""
     return str(MODELS_DIR)
 
+# 模型註冊表: 每個幣種一個版本目錄，參數以 .npy 保存 (memory-map 載入)
+MODEL_REGISTRY_DIR = MODELS_DIR / "registry"
+
+# 每個進程最多保留的反序列化模型 / 預編譯電路數量 (LRU)
+MODEL_REGISTRY_CACHE_SIZE = int(os.environ.get("QUANTUM_MODEL_CACHE_SIZE", "8"))
+
+# 熱重載檢查間隔 (秒)
+MODEL_REGISTRY_RELOAD_INTERVAL = float(os.environ.get("QUANTUM_MODEL_RELOAD_INTERVAL", "5"))
+
+def get_coin_registry_dir(coin_symbol: str) -> Path:
+    """獲取幣種模型註冊目錄"""
+    coin = coin_symbol.upper().replace("USDT", "")
+    return MODEL_REGISTRY_DIR / coin.lower()
+
+def get_model_manifest_path(coin_symbol: str) -> Path:
+    """獲取幣種模型版本清單 (manifest.json) 路徑"""
+    return get_coin_registry_dir(coin_symbol) / "manifest.json"
+
 # 預定義常用幣種的模型路徑
 COIN_MODEL_PATHS = {
     "BTC": get_quantum_model_path("BTCUSDT"),
@@ -15,7 +15,6 @@
 
 import asyncio
 import logging
-import pickle
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -47,6 +46,11 @@ except ImportError as e:
     logger.error(f"❌ Qiskit 2.x 導入失敗: {e}")
     raise ImportError("量子自適應引擎需要 Qiskit 2.x 環境")
 
+try:
+    from ..model_registry import get_model_registry
+except ImportError:
+    from model_registry import get_model_registry
+
 class QuantumState:
     """量子狀態容器"""
     def __init__(self, symbol: str):
@@ -65,6 +69,8 @@ class QuantumAdaptiveSignalEngine:
         self.sampler = SamplerV2()  # Qiskit 2.x V2 Sampler
         self.estimator = EstimatorV2()  # Qiskit 2.x V2 Estimator
         
+        # 模型由註冊表延遲載入 (LRU 暖快取 + 熱重載)，以下為兼容字典用法的視圖
+        self.model_registry = get_model_registry()
         self.trained_models = {}
         self.quantum_circuits = {}
         self.quantum_states = {}  # 添加量子狀態管理
@@ -83,27 +89,21 @@ class QuantumAdaptiveSignalEngine:
         if not models_dir.exists():
             raise FileNotFoundError(f"模型目錄不存在: {models_dir}")
         
-        # 檢查必需的模型檔案
+        # 檢查必需的模型 (只解析版本，模型在首次使用時才載入)
         required_symbols = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT', 'XRPUSDT', 'DOGEUSDT', 'ADAUSDT']
         
         for symbol in required_symbols:
-            model_file = models_dir / f"quantum_model_{symbol.replace('USDT', '').lower()}.pkl"
+            version = self.model_registry.resolve(symbol, force=True)
             
-            if not model_file.exists():
-                raise FileNotFoundError(f"缺少必要的量子模型: {model_file}")
+            if version is None:
+                raise FileNotFoundError(f"缺少必要的量子模型: {symbol}")
             
-            try:
-                with open(model_file, 'rb') as f:
-                    model_data = pickle.load(f)
-                
-                self.trained_models[symbol] = model_data
-                logger.info(f"✅ 載入 {symbol} 量子模型: {model_file.name}")
-                
-            except Exception as e:
-                raise RuntimeError(f"載入 {symbol} 量子模型失敗: {e}")
+            logger.info(f"✅ 註冊 {symbol} 量子模型: {version.version} ({version.format})")
         
+        self.trained_models = self.model_registry.view(required_symbols)
+        self.quantum_circuits = self.model_registry.circuit_view(required_symbols, self._build_transpiled_circuit)
         self.models_loaded = True
-        logger.info("✅ 所有量子模型載入完成")
+        logger.info("✅ 所有量子模型已註冊 (延遲載入)")
     
     def initialize_quantum_states(self, symbols: List[str]):
         """初始化量子狀態 - 對戰競技場需要的方法"""
@@ -261,15 +261,16 @@ class QuantumAdaptiveSignalEngine:
             if symbol not in self.trained_models:
                 raise RuntimeError(f"缺少 {symbol} 的訓練模型")
             
-            # 從訓練模型中獲取量子參數
-            model_data = self.trained_models[symbol]
-            
-            # 創建量子電路
-            qc = self._create_quantum_circuit_from_trained_model(symbol, model_data)
-            self.quantum_circuits[symbol] = qc
+            # 預熱: 載入模型並快取預編譯電路
+            self.quantum_circuits[symbol]
             
             logger.info(f"✅ {symbol} 量子電路已建立")
     
+    def _build_transpiled_circuit(self, symbol: str, model_data: Dict) -> QuantumCircuit:
+        """註冊表電路建構器 - 從訓練模型創建電路並預先編譯到模擬器 (symbol 由註冊表傳入)"""
+        qc = self._create_quantum_circuit_from_trained_model(symbol, model_data)
+        return transpile(qc, self.quantum_simulator)
+    
     def _create_quantum_circuit_from_trained_model(self, symbol: str, model_data: Dict) -> QuantumCircuit:
         """從訓練模型創建量子電路"""
         
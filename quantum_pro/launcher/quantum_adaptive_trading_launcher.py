@@ -124,8 +124,9 @@ class QuantumAdaptiveTradingLauncher:
             logger.warning("⚠️ 模型目錄不存在，將自動創建")
             models_dir.mkdir(parents=True, exist_ok=True)
         
-        # 檢查已訓練的模型
-        model_files = list(models_dir.glob("quantum_model_*.pkl"))
+        # 檢查已訓練的模型 (註冊版本或舊 pickle，只解析版本不反序列化)
+        registry = self.quantum_engine.model_registry
+        model_files = registry.available_coins()
         
         logger.info(f"📊 量子模型狀態檢查:")
         logger.info(f"   已訓練模型: {len(model_files)}/7")
@@ -143,9 +144,12 @@ class QuantumAdaptiveTradingLauncher:
         else:
             logger.info("✅ 所有量子模型已就緒！")
         
-        for model_file in model_files:
-            coin = model_file.stem.replace("quantum_model_", "").upper()
-            logger.info(f"   ✅ {coin} 量子模型: {model_file.name}")
+        for coin in model_files:
+            version = registry.resolve(coin)
+            logger.info(f"   ✅ {coin} 量子模型: {version.version} ({version.format})")
+        
+        # 註冊模型 (延遲載入，首次使用時才反序列化)
+        self.quantum_engine.load_trained_quantum_models(models_dir)
     
     async def run_quantum_adaptive_loop(self):
         """運行量子自適應分析循環"""
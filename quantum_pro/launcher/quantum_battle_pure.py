@@ -25,9 +25,9 @@ import sqlite3
 import sys
 import time
 import warnings
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 # Qiskit 2.x SDK for Quantum Entropy-Driven Scheduling
 import numpy as np
@@ -703,6 +703,35 @@ class QuantumBattleDatabase:
         
         conn.commit()
         conn.close()
+    
+    def save_replay_batch(self, signals: List[tuple], trades: List[tuple],
+                          portfolio_statuses: List[tuple], battle_results: List[tuple]):
+        """批量儲存回放結果 - 單一連接、單一交易 (executemany)，時間戳為回放 K 線時間"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO battle_signals 
+                    (timestamp, team_name, symbol, signal_type, signal_strength, price, quantum_data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', signals)
+                conn.executemany('''
+                    INSERT INTO trade_history 
+                    (timestamp, team_name, symbol, action, size, price, pnl)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', trades)
+                conn.executemany('''
+                    INSERT INTO portfolio_status 
+                    (timestamp, team_name, total_value, cash, unrealized_pnl, positions)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', portfolio_statuses)
+                conn.executemany('''
+                    INSERT INTO battle_results 
+                    (timestamp, red_team_value, blue_team_value, winner, battle_duration, total_trades)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', battle_results)
+        finally:
+            conn.close()
         
     def get_latest_data(self, limit: int = 100):
         """獲取最新的對戰數據（供前端使用）"""
@@ -1112,6 +1141,236 @@ class BinanceRealTimeData:
             logger.error(f"❌ {symbol} WebSocket 連接失敗: {e}")
 
 
+# K 線週期 → 秒
+KLINE_INTERVAL_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '1d': 86400,
+}
+
+
+class ReplayKlineStore:
+    """回放 K 線倉庫 - 幣安歷史 K 線本地快取 (npz)，缺失區段才從 REST API 補抓"""
+    
+    def __init__(self, cache_dir: str = None):
+        if cache_dir is None:
+            cache_dir = str(Path(__file__).parent.parent / "data" / "cache" / "replay")
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _cache_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol.lower()}_{interval}.npz")
+    
+    def _load_cached(self, symbol: str, interval: str) -> Optional[np.ndarray]:
+        path = self._cache_path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as cached:
+            return cached['klines']
+    
+    async def _fetch_range(self, session: aiohttp.ClientSession, symbol: str, interval: str,
+                           start_ms: int, end_ms: int) -> np.ndarray:
+        """分頁抓取 [start_ms, end_ms) 的 K 線: 列為 open_time, open, high, low, close, volume"""
+        step_ms = KLINE_INTERVAL_SECONDS[interval] * 1000
+        rows = []
+        cursor = start_ms
+        while cursor < end_ms:
+            params = {'symbol': symbol, 'interval': interval, 'startTime': cursor,
+                      'endTime': end_ms - 1, 'limit': 1000}
+            async with session.get("https://api.binance.com/api/v3/klines", params=params,
+                                   timeout=aiohttp.ClientTimeout(total=30)) as response:
+                response.raise_for_status()
+                klines = await response.json()
+            if not klines:
+                break
+            rows.extend([float(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])]
+                        for k in klines)
+            cursor = int(klines[-1][0]) + step_ms
+        return np.array(rows, dtype=float).reshape(-1, 6)
+    
+    async def load(self, symbols: List[str], interval: str, start: datetime,
+                   end: datetime) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        載入並對齊多幣種 K 線
+        
+        Returns:
+            open_times: (T,) 毫秒時間戳 (所有幣種共同的 K 線)
+            closes: (T, S) 收盤價
+            volumes: (T, S) 成交量
+        """
+        start_ms = int(start.timestamp() * 1000)
+        end_ms = int(end.timestamp() * 1000)
+        per_symbol = {}
+        
+        async with aiohttp.ClientSession() as session:
+            for symbol in symbols:
+                cached = self._load_cached(symbol, interval)
+                if cached is None or len(cached) == 0:
+                    cached = np.zeros((0, 6))
+                
+                # 只補抓快取範圍之外的區段
+                missing = []
+                if len(cached) == 0:
+                    missing.append((start_ms, end_ms))
+                else:
+                    if start_ms < cached[0, 0]:
+                        missing.append((start_ms, int(cached[0, 0])))
+                    if end_ms > cached[-1, 0] + KLINE_INTERVAL_SECONDS[interval] * 1000:
+                        missing.append((int(cached[-1, 0]) + KLINE_INTERVAL_SECONDS[interval] * 1000, end_ms))
+                
+                if missing:
+                    fetched = [await self._fetch_range(session, symbol, interval, lo, hi) for lo, hi in missing]
+                    merged = np.concatenate([cached] + fetched)
+                    _, unique_idx = np.unique(merged[:, 0], return_index=True)
+                    cached = merged[unique_idx]
+                    np.savez(self._cache_path(symbol, interval), klines=cached)
+                    logger.info(f"📥 {symbol} {interval} K 線快取更新: {len(cached)} 根")
+                
+                in_range = (cached[:, 0] >= start_ms) & (cached[:, 0] < end_ms)
+                per_symbol[symbol] = cached[in_range]
+        
+        # 對齊: 只保留所有幣種都有的 K 線
+        common_times = per_symbol[symbols[0]][:, 0]
+        for symbol in symbols[1:]:
+            common_times = np.intersect1d(common_times, per_symbol[symbol][:, 0])
+        
+        closes = np.empty((len(common_times), len(symbols)))
+        volumes = np.empty((len(common_times), len(symbols)))
+        for j, symbol in enumerate(symbols):
+            klines = per_symbol[symbol]
+            idx = np.searchsorted(klines[:, 0], common_times)
+            closes[:, j] = klines[idx, 4]
+            volumes[:, j] = klines[idx, 5]
+        
+        return common_times, closes, volumes
+
+
+def compute_replay_features(closes: np.ndarray, volumes: np.ndarray, interval: str) -> Dict[str, np.ndarray]:
+    """
+    向量化計算回放所需的市場特徵 (T, S)，與實時路徑的特徵定義一致：
+    24h 漲跌幅、最近 24 根收益率標準差、最近 10 根線性回歸斜率 / 均價
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+    
+    T, S = closes.shape
+    bars_per_day = max(1, 86400 // KLINE_INTERVAL_SECONDS[interval])
+    
+    # 24h 漲跌幅 (%)，不足一天時使用第一根 K 線
+    reference = np.vstack([np.repeat(closes[:1], min(bars_per_day, T), axis=0), closes])[:T]
+    change_percent = (closes / reference - 1.0) * 100.0
+    
+    returns = np.zeros_like(closes)
+    returns[1:] = closes[1:] / closes[:-1] - 1.0
+    
+    # 最近 24 個價格點的收益率波動率 (23 個收益率)，歷史不足時使用默認 2%
+    volatility = np.full((T, S), 0.02)
+    if T >= 24:
+        volatility[23:] = sliding_window_view(returns[1:], 23, axis=0).std(axis=-1)
+    
+    # 最近 10 個價格點的線性回歸斜率 / 均價
+    momentum = np.zeros((T, S))
+    if T >= 10:
+        windows = sliding_window_view(closes, 10, axis=0)  # (T-9, S, 10)
+        x = np.arange(10) - 4.5
+        momentum[9:] = (windows @ x) / (x @ x) / windows.mean(axis=-1)
+    
+    return {
+        'close': closes,
+        'volume': volumes,
+        'change_percent': change_percent,
+        'volatility': volatility,
+        'momentum': momentum,
+    }
+
+
+class VectorizedBattlePortfolios:
+    """
+    向量化對戰投資組合 - 紅藍隊 (K 隊) 狀態以陣列保存
+    
+    交易規則與 QuantumPortfolio.execute_trade 一致 (同一根 K 線內按幣種順序成交，
+    每筆交易以當時現金計算倉位)；各隊同步以陣列運算推進，量子風險調整一次批量取得。
+    """
+    
+    def __init__(self, team_names: List[str], symbols: List[str], initial_capital: float = 10.0):
+        self.team_names = team_names
+        self.symbols = symbols
+        self.initial_capital = initial_capital
+        
+        K, S = len(team_names), len(symbols)
+        self.capital = np.full(K, initial_capital)
+        self.size = np.zeros((K, S))
+        self.entry_price = np.zeros((K, S))
+        self.held = np.zeros((K, S), dtype=bool)
+        
+        self.trade_count = np.zeros(K, dtype=int)
+        self.profitable_trades = np.zeros(K, dtype=int)
+    
+    def execute_bar(self, prices: np.ndarray, signals: np.ndarray, strengths: np.ndarray,
+                    risk_adjustments: np.ndarray) -> List[Tuple[int, int, str, float, float]]:
+        """
+        執行一根 K 線的所有交易
+        
+        Args:
+            prices: (S,) 成交價
+            signals: (K, S) 1=BULL, -1=BEAR, 0=NEUTRAL
+            strengths: (K, S) 信號強度
+            risk_adjustments: (K, S) 量子不確定性風險調整值
+            
+        Returns:
+            trades: [(team_idx, symbol_idx, action, amount, realized_pnl)]
+        """
+        trades = []
+        teams = np.arange(len(self.team_names))
+        
+        for j in range(len(self.symbols)):
+            price = prices[j]
+            base_amount = np.abs(self.capital) * np.minimum(strengths[:, j], 1.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                adjustment = np.where(base_amount > 0, np.clip(risk_adjustments[:, j] / base_amount, 0.1, 2.0), 1.0)
+            trade_amount = base_amount * adjustment
+            
+            # 買入 (加倉時以加權平均更新進場價)
+            buy = (signals[:, j] == 1) & (trade_amount > 0)
+            shares = trade_amount / price
+            new_size = self.size[:, j] + shares
+            self.entry_price[:, j] = np.where(
+                buy, (self.size[:, j] * self.entry_price[:, j] + shares * price) / np.where(buy, new_size, 1.0),
+                self.entry_price[:, j])
+            self.size[:, j] = np.where(buy, new_size, self.size[:, j])
+            self.held[:, j] |= buy
+            self.capital -= np.where(buy, trade_amount, 0.0)  # 直接扣除資金，可以變負數
+            
+            # 賣出 (剩餘 ≤ 0.001 時平倉)
+            sell = (signals[:, j] == -1) & self.held[:, j]
+            sell_shares = np.where(sell, np.minimum(self.size[:, j], trade_amount / price), 0.0)
+            realized_pnl = (price - self.entry_price[:, j]) * sell_shares
+            remaining = self.size[:, j] - sell_shares
+            closed = sell & (remaining <= 0.001)
+            self.size[:, j] = np.where(closed, 0.0, remaining)
+            self.entry_price[:, j] = np.where(closed, 0.0, self.entry_price[:, j])
+            self.held[:, j] &= ~closed
+            self.capital += sell_shares * price
+            
+            self.trade_count += buy | sell
+            self.profitable_trades += sell & (realized_pnl > 0)
+            for k in teams[buy]:
+                trades.append((k, j, 'BUY', float(shares[k]), 0.0))
+            for k in teams[sell]:
+                trades.append((k, j, 'SELL', float(sell_shares[k]), float(realized_pnl[k])))
+        
+        return trades
+    
+    def values(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """投資組合總價值與未實現損益 (K,)"""
+        unrealized = np.where(self.held, (prices[None, :] - self.entry_price) * self.size, 0.0).sum(axis=1)
+        return self.capital + unrealized, unrealized
+    
+    def positions(self, team_idx: int) -> Dict[str, Dict[str, float]]:
+        return {
+            symbol: {'size': float(self.size[team_idx, j]), 'entry_price': float(self.entry_price[team_idx, j])}
+            for j, symbol in enumerate(self.symbols) if self.held[team_idx, j]
+        }
+
+
 class QuantumBattleOrchestrator:
     """🥊 純量子對戰編排器"""
     
@@ -1949,14 +2208,8 @@ class QuantumBattleOrchestrator:
                 if 'signal' not in signal or 'confidence' not in signal:
                     raise RuntimeError(f"藍隊量子引擎返回的信號格式不完整: {signal}")
                 
-                # 轉換信號類型到標準格式
-                signal_type = signal['signal']
-                if signal_type in ['LONG', 'BUY']:
-                    converted_signal = 'BULL'
-                elif signal_type in ['SHORT', 'SELL']:
-                    converted_signal = 'BEAR'
-                else:
-                    converted_signal = 'NEUTRAL'
+                # 轉換信號類型到標準格式 (藍隊處理器直接輸出 BULL/BEAR/NEUTRAL)
+                converted_signal = self._normalize_signal_type(signal['signal'])
                 
                 confidence = signal['confidence']
                 strength = signal.get('signal_strength', confidence)
@@ -2119,6 +2372,215 @@ class QuantumBattleOrchestrator:
         # 🕰️ 顯示量子信號統計
         self._display_signal_statistics()
     
+    # ========== ⏩ 離線加速回放對戰 ==========
+    
+    @staticmethod
+    def _normalize_signal_type(signal_type: str) -> str:
+        """統一信號類型: LONG/BUY/BULL → BULL, SHORT/SELL/BEAR → BEAR, 其他 → NEUTRAL"""
+        if signal_type in ['LONG', 'BUY', 'BULL']:
+            return 'BULL'
+        elif signal_type in ['SHORT', 'SELL', 'BEAR']:
+            return 'BEAR'
+        return 'NEUTRAL'
+    
+    async def _initialize_replay_engines(self):
+        """初始化回放用引擎 - 與實時對戰相同的紅藍隊模型，但不做實時數據驗證"""
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            from btc_quantum_ultimate_model import BTCQuantumUltimateModel
+            from quantum_adaptive_trading_launcher import QuantumAdaptiveTradingLauncher
+        
+        self.red_quantum_engine = BTCQuantumUltimateModel()
+        if not getattr(self.red_quantum_engine, 'is_fitted', False):
+            raise RuntimeError("紅隊量子引擎處於未初始化狀態")
+        
+        self.blue_quantum_engine = QuantumAdaptiveTradingLauncher()
+        # 信號處理器在整段回放中只建立一次
+        self.blue_signal_processor = await self.blue_quantum_engine._initialize_real_quantum_signal_processor()
+        
+        logger.info("✅ 回放引擎就緒: 🔴 btc_quantum_ultimate_model vs 🔵 quantum_adaptive_trading_launcher")
+    
+    def _red_team_replay_signals(self, features: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        紅隊批量信號 - 紅隊模型逐樣本無狀態，整段回放的 (T × S) 樣本一次批量量子推理
+        
+        Returns:
+            signals: (T, S) 1/0/-1, confidences: (T, S), probabilities: (T, S, 3)
+        """
+        T, S = features['close'].shape
+        # 與 extract_features_from_blockchain_data 相同的 5 維特徵 (K 線無訂單簿: 價差/壓力取默認值)
+        X = np.stack([
+            features['change_percent'] / 100.0,
+            features['volatility'],
+            features['momentum'],
+            np.full((T, S), 0.001),
+            np.zeros((T, S)),
+        ], axis=-1).reshape(T * S, 5)
+        X = np.nan_to_num(X, nan=0.0, posinf=1.0, neginf=-1.0)
+        
+        predictions, probabilities = self.red_quantum_engine.predict(X)
+        predictions = np.asarray(predictions).reshape(T, S)
+        probabilities = np.asarray(probabilities).reshape(T, S, -1)
+        
+        # 0=SHORT, 1=NEUTRAL, 2=LONG
+        signals = np.select([predictions == 2, predictions == 0], [1, -1], 0)
+        return signals, probabilities.max(axis=-1), probabilities
+    
+    async def _blue_team_replay_signals(self, bar_features: Dict[str, np.ndarray],
+                                        timestamp: datetime) -> Tuple[np.ndarray, np.ndarray, List[Dict]]:
+        """藍隊單根 K 線的所有幣種信號 - 藍隊引擎帶每幣種在線狀態，需按時間順序推進"""
+        market_data = []
+        for j, symbol in enumerate(self.symbols):
+            change_percent = float(bar_features['change_percent'][j])
+            market_data.append({
+                'current_price': float(bar_features['close'][j]),
+                'price_change_percent': change_percent,
+                'volatility': abs(change_percent) * 0.01,
+                'momentum': change_percent * 0.01,
+                'rsi': 50.0 + change_percent * 2,
+                'bb_position': max(0.0, min(1.0, 0.5 + change_percent * 0.05)),
+                'volume': float(bar_features['volume'][j]),
+                'volume_change_percent': 0.0,
+                'symbol': symbol,
+                'timestamp': timestamp.isoformat(),
+            })
+        
+        results = await asyncio.gather(*(
+            self.blue_signal_processor.generate_signal(symbol, data)
+            for symbol, data in zip(self.symbols, market_data)
+        ))
+        
+        signal_map = {'BULL': 1, 'BEAR': -1, 'NEUTRAL': 0}
+        signals = np.array([signal_map[self._normalize_signal_type(r['signal'])] for r in results])
+        confidences = np.array([r['confidence'] for r in results], dtype=float)
+        return signals, confidences, results
+    
+    async def run_replay_battle(self, start: datetime, end: datetime, interval: str = '5m',
+                                db_path: str = None, flush_every: int = 500) -> Dict:
+        """
+        ⏩ 離線加速回放對戰
+        
+        以最快速度回放歷史 K 線：紅隊整段批量推理、藍隊逐根 K 線推進所有幣種、
+        投資組合以陣列運算模擬、結果批量寫入獨立的回放資料庫。
+        回放不做信號時效強制平倉 (時效以秒計，小於 K 線週期)。
+        """
+        from regime_hmm_quantum import _quantum_uncertainty_risk_batch
+        
+        if interval not in KLINE_INTERVAL_SECONDS:
+            raise ValueError(f"不支援的 K 線週期: {interval}")
+        
+        replay_start = time.perf_counter()
+        logger.info(f"⏩ 回放對戰: {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M} ({interval})")
+        
+        if db_path is None:
+            db_path = str(Path(__file__).parent / "quantum_battle_replay.db")
+        replay_db = QuantumBattleDatabase(db_path)
+        
+        open_times, closes, volumes = await ReplayKlineStore().load(self.symbols, interval, start, end)
+        if len(open_times) == 0:
+            raise RuntimeError("❌ 回放區間內沒有可用的 K 線數據")
+        features = compute_replay_features(closes, volumes, interval)
+        T = len(open_times)
+        logger.info(f"📊 回放 K 線: {T} 根 × {len(self.symbols)} 幣種")
+        
+        await self._initialize_replay_engines()
+        
+        stage_start = time.perf_counter()
+        red_signals, red_confidences, red_probabilities = self._red_team_replay_signals(features)
+        logger.info(f"🔴 紅隊批量推理完成: {T * len(self.symbols)} 個樣本, {time.perf_counter() - stage_start:.1f}s")
+        
+        team_names = ["Pure Quantum", "Adaptive Quantum"]
+        portfolios = VectorizedBattlePortfolios(team_names, self.symbols, initial_capital=10.0)
+        bar_seconds = KLINE_INTERVAL_SECONDS[interval]
+        buffers = {'signals': [], 'trades': [], 'portfolio_statuses': [], 'battle_results': []}
+        
+        def flush():
+            replay_db.save_replay_batch(buffers['signals'], buffers['trades'],
+                                        buffers['portfolio_statuses'], buffers['battle_results'])
+            for rows in buffers.values():
+                rows.clear()
+        
+        for t in range(T):
+            timestamp = datetime.fromtimestamp(open_times[t] / 1000)
+            ts = timestamp.isoformat()
+            prices = closes[t]
+            bar_features = {key: values[t] for key, values in features.items()}
+            
+            blue_signals, blue_confidences, blue_results = await self._blue_team_replay_signals(bar_features, timestamp)
+            
+            signals = np.stack([red_signals[t], blue_signals])
+            strengths = np.stack([red_confidences[t], blue_confidences])
+            risk_adjustments = _quantum_uncertainty_risk_batch(strengths)
+            
+            trades = portfolios.execute_bar(prices, signals, strengths, risk_adjustments)
+            values, unrealized = portfolios.values(prices)
+            
+            signal_names = {1: 'BULL', -1: 'BEAR', 0: 'NEUTRAL'}
+            for j, symbol in enumerate(self.symbols):
+                buffers['signals'].append((
+                    ts, team_names[0], symbol, signal_names[int(red_signals[t, j])], float(red_confidences[t, j]),
+                    float(prices[j]), json.dumps({'probabilities': red_probabilities[t, j].tolist(), 'mode': 'replay'})
+                ))
+                buffers['signals'].append((
+                    ts, team_names[1], symbol, signal_names[int(blue_signals[j])], float(blue_confidences[j]),
+                    float(prices[j]), json.dumps({'probabilities': blue_results[j].get('probabilities'), 'mode': 'replay'})
+                ))
+            for k, j, action, amount, pnl in trades:
+                buffers['trades'].append((ts, team_names[k], self.symbols[j], action, amount, float(prices[j]), pnl))
+            for k, team_name in enumerate(team_names):
+                buffers['portfolio_statuses'].append((
+                    ts, team_name, float(values[k]), float(portfolios.capital[k]), float(unrealized[k]),
+                    json.dumps(portfolios.positions(k))
+                ))
+            
+            red_value, blue_value = float(values[0]), float(values[1])
+            winner = "Pure Quantum" if red_value > blue_value else "Adaptive Quantum"
+            if abs(red_value - blue_value) < 0.01:
+                winner = "Draw"
+            buffers['battle_results'].append((ts, red_value, blue_value, winner, bar_seconds, 2 * len(self.symbols)))
+            
+            self.battle_count += 1
+            self.battle_results['total_battles'] += 1
+            if red_value > blue_value:
+                self.battle_results['red_wins'] += 1
+            elif blue_value > red_value:
+                self.battle_results['blue_wins'] += 1
+            else:
+                self.battle_results['draws'] += 1
+            
+            if (t + 1) % flush_every == 0:
+                flush()
+                elapsed = time.perf_counter() - replay_start
+                logger.info(f"⏩ 回放進度 {t + 1}/{T} ({(t + 1) / elapsed:.1f} 根/秒) | "
+                            f"🔴 ${red_value:.2f} vs 🔵 ${blue_value:.2f}")
+        
+        flush()
+        
+        final_values, _ = portfolios.values(closes[-1])
+        total = self.battle_results['total_battles']
+        summary = {
+            'bars': T,
+            'interval': interval,
+            'elapsed_seconds': time.perf_counter() - replay_start,
+            'red_final_value': float(final_values[0]),
+            'blue_final_value': float(final_values[1]),
+            'red_trades': int(portfolios.trade_count[0]),
+            'blue_trades': int(portfolios.trade_count[1]),
+            'red_win_rate': self.battle_results['red_wins'] / total,
+            'blue_win_rate': self.battle_results['blue_wins'] / total,
+            'db_path': db_path
+        }
+        
+        logger.info("🏁 ========== 回放對戰 - 最終戰績 ==========")
+        logger.info(f"🔴 紅隊: 勝率 {summary['red_win_rate'] * 100:.1f}%, 最終價值 ${summary['red_final_value']:.2f}, "
+                    f"交易 {summary['red_trades']} 筆")
+        logger.info(f"🔵 藍隊: 勝率 {summary['blue_win_rate'] * 100:.1f}%, 最終價值 ${summary['blue_final_value']:.2f}, "
+                    f"交易 {summary['blue_trades']} 筆")
+        logger.info(f"⏱️ 回放 {T} 根 K 線耗時 {summary['elapsed_seconds']:.1f}s, 結果已寫入 {db_path}")
+        return summary
+    
     # ========== 🕰️ 量子信號過期追踪系統 ==========
     
     def _register_signal(self, team: str, signal_data: Dict, symbol: str, entry_price: float) -> str:
@@ -2241,7 +2703,7 @@ class QuantumBattleOrchestrator:
             logger.info(f"   • 平均P&L: {avg_pnl:+.2f}%")
 
 
-async def main():
+async def main(replay_days: Optional[int] = None, replay_interval: str = '5m'):
     """主程序"""
     
     logger.info("🚀 啟動純量子物理對戰競技場...")
@@ -2249,7 +2711,11 @@ async def main():
     orchestrator = QuantumBattleOrchestrator()
     
     try:
-        await orchestrator.start_quantum_battle()
+        if replay_days:
+            end = datetime.now()
+            await orchestrator.run_replay_battle(end - timedelta(days=replay_days), end, replay_interval)
+        else:
+            await orchestrator.start_quantum_battle()
     except Exception as e:
         logger.error(f"❌ 系統運行失敗: {e}")
     finally:
@@ -2263,4 +2729,11 @@ if __name__ == "__main__":
     logger.info("   • 禁止測試數據") 
     logger.info("   • 僅允許純Qiskit 2.x SDK")
     
-    asyncio.run(main())
+    # 離線加速回放模式 (不影響嚴格量子模式設定)
+    import argparse
+    parser = argparse.ArgumentParser(description="純量子物理對戰競技場")
+    parser.add_argument('--replay-days', type=int, default=None, help='回放最近 N 天的歷史 K 線')
+    parser.add_argument('--replay-interval', default='5m', choices=sorted(KLINE_INTERVAL_SECONDS), help='回放 K 線週期')
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.replay_days, args.replay_interval))
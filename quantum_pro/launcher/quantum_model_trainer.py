@@ -28,7 +28,8 @@ import os
 import sys
 import time
 import warnings
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
@@ -66,6 +67,13 @@ except ImportError as e:
     print(f"❌ 量子模型導入失敗: {e}")
     sys.exit(1)
 
+# 導入模型註冊表 (發布 memory-mapped 參數版本，供運行中的引擎熱重載)
+try:
+    from model_registry import get_model_registry
+except ImportError as e:
+    print(f"⚠️ 模型註冊表不可用，僅保存 pickle: {e}")
+    get_model_registry = None
+
 # 導入數據連接器
 try:
     import requests
@@ -77,6 +85,10 @@ except ImportError:
 # 全局變量追踪數據來源
 USING_REAL_DATA = False
 
+# 訓練數據集磁碟快取 (特徵計算方式變更時遞增版本號使舊快取失效)
+TRAINING_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cache', 'training')
+FEATURE_CACHE_VERSION = 2
+
 # 設置日誌 - 實時寫入，保存在當前目錄
 current_dir = os.path.dirname(os.path.abspath(__file__))
 log_filename = os.path.join(current_dir, f'quantum_training_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
@@ -326,50 +338,90 @@ class QuantumModelTrainer:
         
         return X, y
     
+    def _sample_parameterized_batch(self, circuit, parameter_values: np.ndarray, shots: int,
+                                    chunk_size: int = 256) -> np.ndarray:
+        """
+        以參數綁定批次執行整段序列 - 每次 SamplerV2 調用送出 chunk_size 組參數
+        
+        Args:
+            circuit: 參數化量子電路 (measure_all)
+            parameter_values: 每根 K 線一組參數 (B, P)
+            shots: 每組參數的測量次數
+            chunk_size: 每次 SamplerV2 調用綁定的參數組數
+            
+        Returns:
+            bits: 測量比特 (B, shots, n_qubits)，位序與計數字串相同 (最後一位為 qubit 0)
+        """
+        from qiskit_aer.primitives import SamplerV2
+        
+        if getattr(self, '_indicator_sampler', None) is None:
+            self._indicator_sampler = SamplerV2()
+        
+        n_qubits = circuit.num_qubits
+        chunks = []
+        for start in range(0, len(parameter_values), chunk_size):
+            values = parameter_values[start:start + chunk_size]
+            result = self._indicator_sampler.run([(circuit, values)], shots=shots).result()
+            packed = result[0].data.meas.array  # (B, shots, n_bytes)
+            chunks.append(np.unpackbits(packed, axis=-1)[..., -n_qubits:])
+        return np.concatenate(chunks, axis=0)
+    
+    def _indicator_circuit(self, name: str):
+        """指標用參數化電路 - 每個訓練器只構建一次"""
+        from qiskit import QuantumCircuit
+        from qiskit.circuit import ParameterVector
+        
+        if not hasattr(self, '_indicator_circuits'):
+            self._indicator_circuits = {}
+        if name in self._indicator_circuits:
+            return self._indicator_circuits[name]
+        
+        if name == 'rsi':
+            theta = ParameterVector('rsi', 3)
+            qc = QuantumCircuit(3)
+            for q in range(3):
+                qc.ry(theta[q], q)
+            qc.cx(0, 1)
+            qc.cx(1, 2)
+        elif name == 'macd':
+            theta = ParameterVector('macd', 2)
+            qc = QuantumCircuit(4)
+            qc.ry(theta[0], 0)
+            qc.ry(theta[1], 1)
+            qc.cx(0, 2)
+            qc.cx(1, 3)
+            qc.cx(2, 3)
+        else:
+            theta = ParameterVector('bb', 5)
+            qc = QuantumCircuit(5)
+            for q in range(5):
+                qc.ry(theta[q], q)
+            for q in range(4):
+                qc.cx(q, q + 1)
+        qc.measure_all()
+        
+        self._indicator_circuits[name] = qc
+        return qc
+    
     def _calculate_quantum_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """量子計算 RSI - 使用量子隨機數替代傳統計算"""
         try:
-            from qiskit import QuantumCircuit, transpile
-            from qiskit_aer import AerSimulator
-            
-            # 使用量子計算進行 RSI 指標計算
-            simulator = AerSimulator()
+            # 編碼價格變化到量子態: 當前變化、前 period 根變化的均值與標準差 (滾動窗口向量化)
             delta = prices.diff().dropna()
-            
-            quantum_rsi = []
-            for i in range(len(delta)):
-                if i < period:
-                    quantum_rsi.append(50.0)  # 中性值
-                    continue
-                
-                # 創建量子電路進行 RSI 計算
-                qc = QuantumCircuit(3, 3)
-                
-                # 編碼價格變化到量子態
-                price_change = delta.iloc[i]
-                normalized_change = np.tanh(price_change)  # 歸一化到 [-1, 1]
-                
-                qc.ry(normalized_change * np.pi, 0)
-                qc.ry(np.mean(delta.iloc[max(0, i-period):i]) * np.pi, 1)
-                qc.ry(np.std(delta.iloc[max(0, i-period):i]) * np.pi, 2)
-                
-                # 量子糾纏用於計算相關性
-                qc.cx(0, 1)
-                qc.cx(1, 2)
-                
-                qc.measure_all()
-                
-                # 執行量子計算
-                job = simulator.run(transpile(qc, simulator), shots=1000)
-                result = job.result()
-                counts = result.get_counts()
-                
-                # 從量子測量結果計算 RSI
-                total_shots = sum(counts.values())
-                weighted_sum = sum(int(outcome.replace(' ', ''), 2) * count for outcome, count in counts.items())
-                quantum_rsi_value = (weighted_sum / total_shots / 7.0) * 100  # 歸一化到 0-100
-                
-                quantum_rsi.append(quantum_rsi_value)
+            window_mean = delta.rolling(period).mean().shift(1)
+            window_std = delta.rolling(period).std(ddof=0).shift(1)
+            angles = np.column_stack([
+                np.tanh(delta.values) * np.pi,
+                window_mean.values * np.pi,
+                window_std.values * np.pi
+            ])[period:]
+            
+            quantum_rsi = np.full(len(delta), 50.0)  # 前 period 根為中性值
+            if len(angles) > 0:
+                bits = self._sample_parameterized_batch(self._indicator_circuit('rsi'), angles, shots=1000)
+                outcomes = bits @ np.array([4, 2, 1])
+                # 原電路另有 3 位未使用的經典暫存器 (恆為 0)，位串拼接後等於左移 3 位
+                quantum_rsi[period:] = (outcomes * 8).mean(axis=1) / 7.0 * 100  # 歸一化到 0-100
             
             # 填充原始 Series 的索引
             result_series = pd.Series(index=prices.index, dtype=float)
@@ -378,79 +430,41 @@ class QuantumModelTrainer:
             
         except Exception as e:
             logger.error(f"量子 RSI 計算失敗: {e}")
-            # 緊急回退：使用量子隨機數而非傳統公式
-            qubits_needed = len(prices) * 8
+            # 緊急回退：使用量子隨機數而非傳統公式 (8 個 Hadamard 量子位，一次取 len(prices) 個 shot)
             try:
-                simulator = AerSimulator()
-                qc = QuantumCircuit(8, 8)
-                for i in range(8):
-                    qc.h(i)
-                qc.measure_all()
+                from qiskit import QuantumCircuit
+                from qiskit_aer.primitives import SamplerV2
                 
-                quantum_values = []
-                for _ in range(len(prices)):
-                    job = simulator.run(transpile(qc, simulator), shots=1)
-                    result = job.result()
-                    counts = result.get_counts()
-                    binary_result = list(counts.keys())[0].replace(' ', '')
-                    rsi_value = int(binary_result, 2) / 255.0 * 100
-                    quantum_values.append(rsi_value)
+                qc = QuantumCircuit(8)
+                qc.h(range(8))
+                qc.measure_all()
                 
-                return pd.Series(quantum_values, index=prices.index)
+                result = SamplerV2().run([(qc,)], shots=len(prices)).result()
+                values = result[0].data.meas.array[:, -1].astype(float)
+                return pd.Series(values / 255.0 * 100, index=prices.index)
             except:
                 raise RuntimeError("❌ 量子 RSI 計算完全失敗，系統不允許使用傳統指標")
     
     def _calculate_quantum_macd(self, prices: pd.Series) -> pd.Series:
         """量子計算 MACD - 使用量子相位編碼"""
         try:
-            from qiskit import QuantumCircuit, transpile
-            from qiskit_aer import AerSimulator
+            # 短期和長期價格編碼 (前 12 / 26 根均價，滾動窗口向量化)
+            short_mean = prices.rolling(12).mean().shift(1)
+            long_mean = prices.rolling(26).mean().shift(1)
             
-            simulator = AerSimulator()
-            quantum_macd = []
+            # 量子相位編碼
+            phases = np.column_stack([
+                (short_mean / prices - 1).values * np.pi,
+                (long_mean / prices - 1).values * np.pi
+            ])[26:]
             
-            for i in range(len(prices)):
-                if i < 26:  # 需要足夠的歷史數據
-                    quantum_macd.append(0.0)
-                    continue
-                
-                # 創建量子電路
-                qc = QuantumCircuit(4, 4)
+            quantum_macd = np.zeros(len(prices))  # 需要足夠的歷史數據
+            if len(phases) > 0:
+                bits = self._sample_parameterized_batch(self._indicator_circuit('macd'), phases, shots=1000)
                 
-                # 短期和長期價格編碼
-                short_window = prices.iloc[max(0, i-12):i]
-                long_window = prices.iloc[max(0, i-26):i]
-                
-                short_mean = short_window.mean()
-                long_mean = long_window.mean()
-                current_price = prices.iloc[i]
-                
-                # 量子相位編碼
-                short_phase = (short_mean / current_price - 1) * np.pi
-                long_phase = (long_mean / current_price - 1) * np.pi
-                
-                qc.ry(short_phase, 0)
-                qc.ry(long_phase, 1)
-                qc.cx(0, 2)
-                qc.cx(1, 3)
-                qc.cx(2, 3)
-                
-                qc.measure_all()
-                
-                # 量子計算
-                job = simulator.run(transpile(qc, simulator), shots=1000)
-                result = job.result()
-                counts = result.get_counts()
-                
-                # 計算量子 MACD
-                macd_sum = 0
-                total_shots = sum(counts.values())
-                for outcome, count in counts.items():
-                    bits = [int(b) for b in outcome.replace(' ', '')]
-                    macd_value = (sum(bits) - 2) * (current_price * 0.01)  # 比例縮放
-                    macd_sum += macd_value * count
-                
-                quantum_macd.append(macd_sum / total_shots)
+                # 計算量子 MACD: (測量比特和 - 2) × 比例縮放
+                bit_sums = bits.sum(axis=-1).mean(axis=1)
+                quantum_macd[26:] = (bit_sums - 2) * (prices.values[26:] * 0.01)
             
             return pd.Series(quantum_macd, index=prices.index)
             
@@ -461,61 +475,26 @@ class QuantumModelTrainer:
     def _calculate_quantum_bollinger_bands(self, prices: pd.Series, period: int = 20) -> Tuple[pd.Series, pd.Series]:
         """量子計算布林帶 - 使用量子不確定性原理"""
         try:
-            from qiskit import QuantumCircuit, transpile
-            from qiskit_aer import AerSimulator
-            
-            simulator = AerSimulator()
-            upper_bands = []
-            lower_bands = []
-            
-            for i in range(len(prices)):
-                if i < period:
-                    price = prices.iloc[i]
-                    upper_bands.append(price * 1.02)
-                    lower_bands.append(price * 0.98)
-                    continue
-                
-                # 量子不確定性計算
-                qc = QuantumCircuit(5, 5)
-                
-                # 價格窗口編碼
-                window = prices.iloc[max(0, i-period):i]
-                price_mean = window.mean()
-                price_current = prices.iloc[i]
-                
-                # 量子疊加態編碼價格分佈
-                for j in range(5):
-                    normalized_idx = j / 4.0
-                    if j < len(window):
-                        price_ratio = window.iloc[j] / price_mean
-                        angle = np.arctan(price_ratio - 1) 
-                        qc.ry(angle, j)
-                
-                # 量子糾纏用於計算相關性
-                for j in range(4):
-                    qc.cx(j, j+1)
-                
-                qc.measure_all()
-                
-                # 量子測量
-                job = simulator.run(transpile(qc, simulator), shots=2000)
-                result = job.result()
-                counts = result.get_counts()
-                
-                # 從量子測量計算帶寬
-                variance_estimate = 0
-                total_shots = sum(counts.values())
+            price_values = prices.values.astype(float)
+            upper_bands = price_values * 1.02
+            lower_bands = price_values * 0.98
+            
+            if len(prices) > period:
+                # 量子疊加態編碼價格分佈: 窗口前 5 根價格相對窗口均價的偏離
+                price_mean = prices.rolling(period).mean().shift(1)
+                angles = np.column_stack([
+                    np.arctan((prices.shift(period - j) / price_mean - 1).values) for j in range(5)
+                ])[period:]
                 
-                for outcome, count in counts.items():
-                    bit_pattern = [int(b) for b in outcome.replace(' ', '')]
-                    pattern_variance = np.var(bit_pattern) if len(bit_pattern) > 1 else 0.1
-                    variance_estimate += pattern_variance * count
+                bits = self._sample_parameterized_batch(self._indicator_circuit('bb'), angles, shots=2000)
                 
-                variance_estimate /= total_shots
-                quantum_std = np.sqrt(variance_estimate) * price_current * 0.02  # 縮放因子
+                # 從量子測量計算帶寬: 原電路另有 5 位恆為 0 的經典位，位模式共 10 位
+                ones_ratio = bits.sum(axis=-1) / 10.0
+                variance_estimate = (ones_ratio - ones_ratio ** 2).mean(axis=1)
+                quantum_std = np.sqrt(variance_estimate) * price_values[period:] * 0.02  # 縮放因子
                 
-                upper_bands.append(price_current + 2 * quantum_std)
-                lower_bands.append(price_current - 2 * quantum_std)
+                upper_bands[period:] = price_values[period:] + 2 * quantum_std
+                lower_bands[period:] = price_values[period:] - 2 * quantum_std
             
             upper_series = pd.Series(upper_bands, index=prices.index)
             lower_series = pd.Series(lower_bands, index=prices.index)
@@ -595,6 +574,17 @@ class QuantumModelTrainer:
             logger.info(f"💾 模型已保存到: {self.model_path}")
         except Exception as e:
             logger.error(f"❌ 模型保存失敗: {e}")
+            return
+        
+        if get_model_registry is not None:
+            try:
+                get_model_registry().publish(
+                    self.coin_symbol,
+                    self.model.export_model_data(),
+                    metadata={'symbol': self.symbol, 'trained_at': datetime.now().isoformat()}
+                )
+            except Exception as e:
+                logger.error(f"❌ 模型版本發布失敗: {e}")
     
     def test_model(self, X: np.ndarray, y: np.ndarray) -> Dict:
         """測試模型性能"""
@@ -628,6 +618,101 @@ class QuantumModelTrainer:
             logger.error(f"❌ 模型測試失敗: {e}")
             return {}
 
+class TrainingDatasetCache:
+    """訓練數據集磁碟快取 - 同一 UTC 日內重複訓練不再重抓幣安數據與重算量子特徵"""
+    
+    def __init__(self, cache_dir: str = TRAINING_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _prefix(self, symbol: str, days: int) -> str:
+        return f"{symbol.lower()}_{days}d_"
+    
+    def _path(self, symbol: str, days: int, kind: str) -> str:
+        today = datetime.now(timezone.utc).strftime('%Y%m%d')
+        return os.path.join(self.cache_dir, f"{self._prefix(symbol, days)}{today}_{kind}")
+    
+    def _prune(self, symbol: str, days: int):
+        """刪除同一幣種較舊日期的快取"""
+        prefix = self._prefix(symbol, days)
+        current = os.path.basename(self._path(symbol, days, ''))
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and not name.startswith(current):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+    
+    def load_raw(self, symbol: str, days: int) -> Optional[pd.DataFrame]:
+        path = self._path(symbol, days, 'raw.pkl')
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            logger.warning(f"⚠️ 原始數據快取讀取失敗 {path}: {e}")
+            return None
+    
+    def save_raw(self, symbol: str, days: int, data: pd.DataFrame):
+        path = self._path(symbol, days, 'raw.pkl')
+        data.to_pickle(path)
+        self._prune(symbol, days)
+    
+    def load_features(self, symbol: str, days: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        path = self._path(symbol, days, f'features_v{FEATURE_CACHE_VERSION}.npz')
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as cached:
+                return cached['X'], cached['y']
+        except Exception as e:
+            logger.warning(f"⚠️ 特徵快取讀取失敗 {path}: {e}")
+            return None
+    
+    def save_features(self, symbol: str, days: int, X: np.ndarray, y: np.ndarray):
+        path = self._path(symbol, days, f'features_v{FEATURE_CACHE_VERSION}.npz')
+        np.savez(path, X=X, y=y)
+
+class TrainingProgressLog:
+    """結構化訓練進度日誌 (JSON Lines)，多個訓練進程追加寫入同一檔案"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def record(self, event: str, **fields):
+        entry = {'timestamp': datetime.now().isoformat(), 'event': event, 'pid': os.getpid(), **fields}
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        try:
+            # 單行小寫入在 O_APPEND 下是原子的，進程間無需加鎖
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        except OSError as e:
+            logger.warning(f"⚠️ 訓練進度日誌寫入失敗: {e}")
+
+def _init_training_worker(threads_per_worker: int):
+    """訓練進程初始化 - 限制每個進程的模擬器執行緒，避免多進程超額訂閱 CPU"""
+    os.environ['OMP_NUM_THREADS'] = str(threads_per_worker)
+
+def _train_coin_worker(symbol: str, coin: str, quick_mode: bool, use_cache: bool, progress_path: str) -> Dict:
+    """單幣種訓練任務 (在進程池中執行)，返回結果與各階段耗時"""
+    progress = TrainingProgressLog(progress_path)
+    dataset_cache = TrainingDatasetCache() if use_cache else None
+    timings = {}
+    error = None
+    
+    start_time = time.perf_counter()
+    progress.record('coin_start', coin=coin, quick_mode=quick_mode)
+    try:
+        success = train_single_coin_internal(symbol, coin, quick_mode, dataset_cache, progress, timings)
+    except Exception as e:
+        success = False
+        error = str(e)
+        logger.error(f"{coin} 訓練異常: {e}")
+    timings['total_s'] = time.perf_counter() - start_time
+    
+    progress.record('coin_done', coin=coin, success=success, error=error, **timings)
+    return {'coin': coin, 'success': success, 'error': error, 'timings': timings}
+
 def main():
     """主訓練流程"""
     print("🌌 Trading X 量子模型自動訓練器")
@@ -662,48 +747,72 @@ def main():
         print("\n👋 退出訓練")
         return
 
-def train_all_coins(coins: list, quick_mode: bool = False):
-    """訓練所有幣種 - 量子自適應版本"""
+def train_all_coins(coins: list, quick_mode: bool = False, max_workers: Optional[int] = None,
+                    use_cache: bool = True):
+    """訓練所有幣種 - 量子自適應版本 (進程池並行，每個幣種一個進程)"""
     mode_name = "量子快速收斂" if quick_mode else "量子標準收斂"
-    # 量子自適應時間估算 - 基於量子坍縮機率
-    estimated_time_range = f"{len(coins) * 10}-{len(coins) * 30}" if quick_mode else f"{len(coins) * 20}-{len(coins) * 60}"
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(len(coins), max_workers or cpu_count))
+    threads_per_worker = max(1, cpu_count // workers)
+    # 量子自適應時間估算 - 基於量子坍縮機率 (按並行輪數計)
+    rounds = -(-len(coins) // workers)
+    estimated_time_range = f"{rounds * 10}-{rounds * 30}" if quick_mode else f"{rounds * 20}-{rounds * 60}"
+    progress_path = log_filename.replace('.log', '_progress.jsonl')
+    progress = TrainingProgressLog(progress_path)
     
     print(f"\n🚀 開始 {mode_name} 訓練所有 {len(coins)} 個幣種")
+    print(f"⚙️ 並行進程: {workers} (每進程 {threads_per_worker} 執行緒), 數據集快取: {'啟用' if use_cache else '停用'}")
     print(f"⏱️ 量子自適應預計時間: {estimated_time_range} 分鐘 (依量子坍縮速度而定)")
+    print(f"📝 進度日誌: {progress_path}")
     print("🔮 每個幣種將由量子態自動決定收斂時機，無固定迭代限制")
     print("=" * 60)
     
     start_time = time.time()
-    success_count = 0
-    failed_coins = []
+    progress.record('run_start', coins=coins, quick_mode=quick_mode, workers=workers, use_cache=use_cache)
+    results = []
+    
+    def report(result: Dict):
+        results.append(result)
+        coin = result['coin']
+        elapsed = result['timings'].get('total_s', 0.0) / 60
+        print(f"\n📊 [{len(results)}/{len(coins)}] {coin} {'✅ 訓練成功' if result['success'] else '❌ 訓練失敗'} "
+              f"({elapsed:.1f} 分鐘)")
+        if result['error']:
+            print(f"❌ {coin} 訓練異常: {result['error']}")
+        print(f"⏳ 剩餘: {len(coins) - len(results)} 個幣種")
+    
+    if workers == 1:
+        for coin in coins:
+            report(_train_coin_worker(f"{coin}USDT", coin, quick_mode, use_cache, progress_path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_training_worker,
+                                 initargs=(threads_per_worker,)) as pool:
+            futures = {
+                pool.submit(_train_coin_worker, f"{coin}USDT", coin, quick_mode, use_cache, progress_path): coin
+                for coin in coins
+            }
+            for future in as_completed(futures):
+                coin = futures[future]
+                try:
+                    report(future.result())
+                except Exception as e:
+                    logger.error(f"{coin} 訓練進程異常: {e}")
+                    report({'coin': coin, 'success': False, 'error': str(e), 'timings': {}})
     
-    for i, coin in enumerate(coins, 1):
-        print(f"\n📊 [{i}/{len(coins)}] 開始訓練 {coin}...")
-        print(f"⏳ 剩餘: {len(coins) - i} 個幣種")
-        
-        symbol = f"{coin}USDT"
-        
-        try:
-            # 訓練單個幣種
-            success = train_single_coin_internal(symbol, coin, quick_mode)
-            if success:
-                success_count += 1
-                print(f"✅ {coin} 訓練成功!")
-            else:
-                failed_coins.append(coin)
-                print(f"❌ {coin} 訓練失敗")
-                
-        except Exception as e:
-            failed_coins.append(coin)
-            logger.error(f"{coin} 訓練異常: {e}")
-            print(f"❌ {coin} 訓練異常: {e}")
+    success_count = sum(1 for result in results if result['success'])
+    failed_coins = [result['coin'] for result in results if not result['success']]
     
     # 訓練總結
     total_time = (time.time() - start_time) / 60
+    progress.record('run_done', success=success_count, failed=failed_coins, total_min=total_time)
     print("\n" + "=" * 60)
     print("🎉 批量訓練完成!")
     print(f"✅ 成功: {success_count}/{len(coins)} 個幣種")
     print(f"⏱️ 總耗時: {total_time:.1f} 分鐘")
+    for result in sorted(results, key=lambda r: r['coin']):
+        timings = result['timings']
+        print(f"   {result['coin']:>5}: 數據 {timings.get('fetch_s', 0.0):6.1f}s | "
+              f"特徵 {timings.get('features_s', 0.0):6.1f}s | 訓練 {timings.get('train_s', 0.0):7.1f}s")
     
     if failed_coins:
         print(f"❌ 失敗的幣種: {', '.join(failed_coins)}")
@@ -752,29 +861,59 @@ def train_single_coin(supported_coins: list):
         return
     
     # 開始訓練
-    success = train_single_coin_internal(symbol, coin, quick_mode)
+    success = train_single_coin_internal(symbol, coin, quick_mode, dataset_cache=TrainingDatasetCache())
     
     if success:
         print(f"\n🎉 {coin} 量子模型訓練完成!")
     else:
         print(f"\n❌ {coin} 量子模型訓練失敗")
 
-def train_single_coin_internal(symbol: str, coin: str, quick_mode: bool) -> bool:
+def train_single_coin_internal(symbol: str, coin: str, quick_mode: bool,
+                               dataset_cache: Optional[TrainingDatasetCache] = None,
+                               progress: Optional[TrainingProgressLog] = None,
+                               timings: Optional[Dict] = None) -> bool:
     """內部單幣種校準函數"""
+    global USING_REAL_DATA
     calibrator = QuantumParameterCalibrator(symbol)
+    timings = timings if timings is not None else {}
+    days = 365  # 使用1年數據
     
     try:
-        # 1. 獲取歷史數據
-        data = calibrator.fetch_historical_data(days=365)  # 使用1年數據
+        dataset = dataset_cache.load_features(symbol, days) if dataset_cache else None
+        if dataset is not None:
+            X, y = dataset
+            USING_REAL_DATA = True  # 快取只保存真實幣安數據
+            logger.info(f"📦 {coin} 使用快取特徵: {X.shape[0]} 個樣本")
+        else:
+            # 1. 獲取歷史數據
+            stage_start = time.perf_counter()
+            data = dataset_cache.load_raw(symbol, days) if dataset_cache else None
+            if data is not None:
+                USING_REAL_DATA = True
+                logger.info(f"📦 {coin} 使用快取歷史數據: {len(data)} 條 K 線")
+            else:
+                data = calibrator.fetch_historical_data(days=days)
+                if dataset_cache:
+                    dataset_cache.save_raw(symbol, days, data)
+            timings['fetch_s'] = time.perf_counter() - stage_start
+            
+            # 2. 準備訓練數據
+            stage_start = time.perf_counter()
+            X, y = calibrator.prepare_training_data(data)
+            timings['features_s'] = time.perf_counter() - stage_start
+            if dataset_cache:
+                dataset_cache.save_features(symbol, days, X, y)
         
-        # 2. 準備訓練數據
-        X, y = calibrator.prepare_training_data(data)
+        if progress:
+            progress.record('dataset_ready', coin=coin, samples=int(len(X)), cached=dataset is not None, **timings)
         
         if len(X) < 100:
             logger.warning("⚠️ 數據量較少，建議增加歷史數據天數")
         
         # 3. 校準量子參數
+        stage_start = time.perf_counter()
         success = calibrator.calibrate_quantum_parameters(X, y, quick_mode=quick_mode)
+        timings['train_s'] = time.perf_counter() - stage_start
         
         if success:
             # 4. 測試校準效果
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+📦 量子模型註冊表 - 延遲載入 + LRU 暖快取 + 熱重載
+Quantum Model Registry
+
+每個幣種的模型以版本目錄保存：
+    registry/<coin>/manifest.json      版本清單 (當前版本 + 歷史)
+    registry/<coin>/v0003/<name>.npy   數值參數 (np.load mmap_mode='r' 載入)
+    registry/<coin>/v0003/objects.pkl  其餘物件 (config / scaler / pca ...)
+
+沒有註冊版本的幣種回退到舊的 quantum_model_<coin>.pkl。
+模型按幣種在首次使用時載入，進程內只保留最近使用的 N 個模型與預編譯電路；
+quantum_model_trainer.py 發布新版本後，下次存取時自動換上新版本。
+"""
+
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .config.model_paths import (
+        MODEL_REGISTRY_CACHE_SIZE,
+        MODEL_REGISTRY_DIR,
+        MODEL_REGISTRY_RELOAD_INTERVAL,
+        MODELS_DIR,
+        get_coin_registry_dir,
+        get_model_manifest_path,
+        get_quantum_model_path,
+    )
+except ImportError:
+    from config.model_paths import (
+        MODEL_REGISTRY_CACHE_SIZE,
+        MODEL_REGISTRY_DIR,
+        MODEL_REGISTRY_RELOAD_INTERVAL,
+        MODELS_DIR,
+        get_coin_registry_dir,
+        get_model_manifest_path,
+        get_quantum_model_path,
+    )
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_FILENAME = "objects.pkl"
+VERSION_DIR_PATTERN = re.compile(r"v\d{4}")
+
+
+def normalize_coin(symbol: str) -> str:
+    """'BTCUSDT' / 'btc' → 'BTC'"""
+    return symbol.upper().replace("USDT", "")
+
+
+@dataclass
+class ModelVersion:
+    """模型版本元數據"""
+    coin: str
+    version: str
+    format: str                      # 'npy' (memory-mapped) | 'pickle' (舊格式)
+    path: str
+    created_at: str
+    arrays: List[str] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class QuantumModelRegistry:
+    """量子模型註冊表"""
+
+    def __init__(self, root: Path = MODEL_REGISTRY_DIR, cache_size: int = MODEL_REGISTRY_CACHE_SIZE,
+                 reload_interval: float = MODEL_REGISTRY_RELOAD_INTERVAL, keep_versions: int = 3):
+        self.root = Path(root)
+        self.cache_size = max(1, cache_size)
+        self.reload_interval = reload_interval
+        self.keep_versions = keep_versions
+
+        self._lock = threading.RLock()
+        self._models: "OrderedDict[str, Tuple[ModelVersion, Dict[str, Any]]]" = OrderedDict()
+        self._circuits: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        # coin → (來源檔案, mtime_ns, 解析後版本, 上次檢查時間)
+        self._resolved: Dict[str, Tuple[Optional[Path], int, Optional[ModelVersion], float]] = {}
+
+        # 監控指標
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.hot_reloads = 0
+        self.evictions = 0
+        self.circuit_builds = 0
+
+    # ==================== 版本解析 ====================
+
+    def _source_file(self, coin: str) -> Optional[Path]:
+        """版本來源: 註冊清單優先，否則舊 pickle"""
+        manifest = get_model_manifest_path(coin)
+        if manifest.exists():
+            return manifest
+        legacy = Path(get_quantum_model_path(coin))
+        if legacy.exists():
+            return legacy
+        return None
+
+    def _read_version(self, coin: str, source: Path) -> ModelVersion:
+        if source.name == "manifest.json":
+            with open(source, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            current = manifest["current"]
+            return ModelVersion(**manifest["versions"][current])
+
+        stat = source.stat()
+        return ModelVersion(
+            coin=coin,
+            version=f"legacy-{stat.st_mtime_ns}",
+            format="pickle",
+            path=str(source),
+            created_at=datetime.fromtimestamp(stat.st_mtime).isoformat()
+        )
+
+    def resolve(self, symbol: str, force: bool = False) -> Optional[ModelVersion]:
+        """取得幣種當前版本 (不載入模型)；來源檔案的 stat 按 reload_interval 節流"""
+        coin = normalize_coin(symbol)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._resolved.get(coin)
+            if cached is not None and not force and now - cached[3] < self.reload_interval:
+                return cached[2]
+
+            source = self._source_file(coin)
+            if source is None:
+                self._resolved[coin] = (None, 0, None, now)
+                return None
+
+            mtime_ns = source.stat().st_mtime_ns
+            if cached is not None and cached[0] == source and cached[1] == mtime_ns:
+                self._resolved[coin] = (source, mtime_ns, cached[2], now)
+                return cached[2]
+
+            version = self._read_version(coin, source)
+            self._resolved[coin] = (source, mtime_ns, version, now)
+            return version
+
+    def has_model(self, symbol: str) -> bool:
+        return self.resolve(symbol) is not None
+
+    def available_coins(self) -> List[str]:
+        """所有有模型的幣種 (註冊版本或舊 pickle)"""
+        coins = set()
+        if self.root.exists():
+            coins.update(p.parent.name.upper() for p in self.root.glob("*/manifest.json"))
+        coins.update(p.stem.replace("quantum_model_", "").upper() for p in MODELS_DIR.glob("quantum_model_*.pkl"))
+        return sorted(coins)
+
+    # ==================== 載入與快取 ====================
+
+    def _load_version(self, version: ModelVersion) -> Dict[str, Any]:
+        if version.format == "pickle":
+            with open(version.path, "rb") as f:
+                return pickle.load(f)
+
+        version_dir = Path(version.path)
+        with open(version_dir / OBJECTS_FILENAME, "rb") as f:
+            model_data = pickle.load(f)
+        for name in version.arrays:
+            model_data[name] = np.load(version_dir / f"{name}.npy", mmap_mode="r")
+        return model_data
+
+    def _evict_coin(self, coin: str):
+        self._models.pop(coin, None)
+        for key in [key for key in self._circuits if key[0] == coin]:
+            del self._circuits[key]
+
+    def get(self, symbol: str) -> Dict[str, Any]:
+        """取得模型數據 - 首次使用時載入，版本更新時熱重載"""
+        coin = normalize_coin(symbol)
+        version = self.resolve(coin)
+        if version is None:
+            raise FileNotFoundError(f"缺少必要的量子模型: {coin}")
+
+        with self._lock:
+            cached = self._models.get(coin)
+            if cached is not None and cached[0].version == version.version:
+                self._models.move_to_end(coin)
+                self.hits += 1
+                return cached[1]
+
+            if cached is not None:
+                self.hot_reloads += 1
+                logger.info(f"🔄 {coin} 量子模型熱重載: {cached[0].version} → {version.version}")
+                self._evict_coin(coin)
+
+            self.misses += 1
+            start_time = time.perf_counter()
+            model_data = self._load_version(version)
+            self.loads += 1
+
+            self._models[coin] = (version, model_data)
+            while len(self._models) > self.cache_size:
+                evicted, _ = self._models.popitem(last=False)
+                self._evict_coin(evicted)
+                self.evictions += 1
+
+            logger.info(f"✅ 載入 {coin} 量子模型 {version.version} ({version.format}, "
+                        f"{(time.perf_counter() - start_time) * 1000:.1f}ms)")
+            return model_data
+
+    def get_circuit(self, symbol: str, builder: Callable[[str, Dict[str, Any]], Any], key: str = "default") -> Any:
+        """取得預編譯電路 - 以 (幣種, 版本, key) 快取，模型版本變更時自動重建；builder 以 (symbol, model_data) 呼叫"""
+        model_data = self.get(symbol)
+        coin = normalize_coin(symbol)
+
+        with self._lock:
+            version = self._models[coin][0].version
+            cache_key = (coin, version, key)
+            circuit = self._circuits.get(cache_key)
+            if circuit is not None:
+                self._circuits.move_to_end(cache_key)
+                return circuit
+
+            circuit = builder(symbol, model_data)
+            self.circuit_builds += 1
+            self._circuits[cache_key] = circuit
+            while len(self._circuits) > self.cache_size * 4:
+                self._circuits.popitem(last=False)
+            return circuit
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """清除快取 (全部或單一幣種)，下次存取重新解析版本"""
+        with self._lock:
+            if symbol is None:
+                self._models.clear()
+                self._circuits.clear()
+                self._resolved.clear()
+            else:
+                coin = normalize_coin(symbol)
+                self._evict_coin(coin)
+                self._resolved.pop(coin, None)
+
+    # ==================== 發布 ====================
+
+    def _read_manifest(self, coin: str) -> Dict[str, Any]:
+        manifest_path = get_model_manifest_path(coin)
+        if not manifest_path.exists():
+            return {"coin": coin, "current": None, "versions": {}}
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def publish(self, symbol: str, model_data: Dict[str, Any],
+                metadata: Optional[Dict[str, Any]] = None) -> ModelVersion:
+        """
+        發布新模型版本
+
+        數值 ndarray 寫成 .npy (載入時 memory-map)，其餘物件寫入 objects.pkl；
+        版本目錄寫完後才原子替換 manifest.json，讀取端不會看到半寫入的版本。
+        """
+        coin = normalize_coin(symbol)
+        coin_dir = get_coin_registry_dir(coin)
+        coin_dir.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            manifest = self._read_manifest(coin)
+            # 版本號同時跳過 manifest 記錄與磁碟上已存在的目錄 (例如上次發布在寫 manifest 前中斷)
+            existing = set(manifest["versions"]) | {p.name for p in coin_dir.iterdir()
+                                                    if p.is_dir() and VERSION_DIR_PATTERN.fullmatch(p.name)}
+            next_number = 1 + max((int(v[1:]) for v in existing), default=0)
+            version_name = f"v{next_number:04d}"
+            version_dir = coin_dir / version_name
+            staging_dir = coin_dir / f".{version_name}.tmp"
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir)
+            staging_dir.mkdir()
+
+            arrays = {name: value for name, value in model_data.items()
+                      if isinstance(value, np.ndarray) and value.dtype != object}
+            for name, value in arrays.items():
+                np.save(staging_dir / f"{name}.npy", np.ascontiguousarray(value))
+            objects = {name: value for name, value in model_data.items() if name not in arrays}
+            with open(staging_dir / OBJECTS_FILENAME, "wb") as f:
+                pickle.dump(objects, f)
+            if version_dir.exists():
+                # 其他進程在同一時間發布了相同版本號 - 不覆蓋已發布的版本
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise FileExistsError(f"{coin} 模型版本目錄已存在，放棄發布: {version_dir}")
+            os.replace(staging_dir, version_dir)
+
+            version = ModelVersion(
+                coin=coin,
+                version=version_name,
+                format="npy",
+                path=str(version_dir),
+                created_at=datetime.now().isoformat(),
+                arrays=sorted(arrays),
+                metadata=metadata or {}
+            )
+            manifest["current"] = version_name
+            manifest["versions"][version_name] = asdict(version)
+
+            # 只保留最近 keep_versions 個版本
+            for stale in sorted(manifest["versions"])[:-self.keep_versions]:
+                shutil.rmtree(coin_dir / stale, ignore_errors=True)
+                del manifest["versions"][stale]
+
+            manifest_path = get_model_manifest_path(coin)
+            tmp_path = manifest_path.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, manifest_path)
+
+            self._resolved.pop(coin, None)
+
+        logger.info(f"📦 {coin} 量子模型已發布: {version_name} ({len(arrays)} 個參數陣列)")
+        return version
+
+    # ==================== 視圖與監控 ====================
+
+    def view(self, symbols: List[str]) -> "RegistryModelView":
+        return RegistryModelView(self, symbols)
+
+    def circuit_view(self, symbols: List[str], builder: Callable[[str, Dict[str, Any]], Any]) -> "RegistryCircuitView":
+        return RegistryCircuitView(self, symbols, builder)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """註冊表監控指標"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cached_models": {coin: entry[0].version for coin, entry in self._models.items()},
+                "cached_circuits": len(self._circuits),
+                "cache_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "loads": self.loads,
+                "hot_reloads": self.hot_reloads,
+                "evictions": self.evictions,
+                "circuit_builds": self.circuit_builds
+            }
+
+
+class RegistryModelView(Mapping):
+    """以交易對為鍵的延遲載入模型視圖 (兼容原 trained_models 字典用法)"""
+
+    def __init__(self, registry: QuantumModelRegistry, symbols: List[str]):
+        self.registry = registry
+        self.symbols = list(symbols)
+
+    def __getitem__(self, symbol: str) -> Dict[str, Any]:
+        if symbol not in self.symbols or not self.registry.has_model(symbol):
+            raise KeyError(symbol)
+        return self.registry.get(symbol)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self.symbols and self.registry.has_model(symbol)
+
+    def __iter__(self) -> Iterator[str]:
+        return (symbol for symbol in self.symbols if self.registry.has_model(symbol))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class RegistryCircuitView(RegistryModelView):
+    """以交易對為鍵的預編譯電路視圖 (兼容原 quantum_circuits 字典用法)"""
+
+    def __init__(self, registry: QuantumModelRegistry, symbols: List[str],
+                 builder: Callable[[str, Dict[str, Any]], Any]):
+        super().__init__(registry, symbols)
+        self.builder = builder
+
+    def __getitem__(self, symbol: str) -> Any:
+        if symbol not in self:
+            raise KeyError(symbol)
+        return self.registry.get_circuit(symbol, self.builder)
+
+
+_model_registry: Optional[QuantumModelRegistry] = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> QuantumModelRegistry:
+    """取得全局量子模型註冊表 (首次使用時建立)"""
+    global _model_registry
+    if _model_registry is None:
+        with _model_registry_lock:
+            if _model_registry is None:
+                _model_registry = QuantumModelRegistry()
+    return _model_registry
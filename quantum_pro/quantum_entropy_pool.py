@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+⚛️ 量子熵池 - 預取量子隨機比特
+Quantum Entropy Pool
+
+背景執行緒以大批量 Hadamard 電路 (n_qubits × shots) 生成量子隨機比特，
+寫入環形緩衝區；深度低於低水位時自動補充。
+消費者直接從緩衝區取用，不再在信號生成熱路徑中逐次構建與模擬電路。
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from qiskit import QuantumCircuit
+    from qiskit_aer.primitives import SamplerV2
+    ENTROPY_POOL_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"⚠️ 量子熵池不可用 (Qiskit Aer 未安裝): {e}")
+    QuantumCircuit = None
+    SamplerV2 = None
+    ENTROPY_POOL_AVAILABLE = False
+
+
+class QuantumEntropyPool:
+    """量子熵池 - 環形緩衝區 + 低水位背景補充"""
+
+    def __init__(self, capacity_bits: int = 1 << 20, low_water_ratio: float = 0.25,
+                 n_qubits: int = 20, shots_per_refill: int = 8192):
+        self.capacity_bits = capacity_bits
+        self.low_water_bits = int(capacity_bits * low_water_ratio)
+        self.n_qubits = n_qubits
+        self.shots_per_refill = shots_per_refill
+
+        self._buffer = np.zeros(capacity_bits, dtype=np.uint8)
+        self._head = 0
+        self._size = 0
+        # _lock 保護環形緩衝區讀寫位置與計數；_generate_lock 串行化電路建立、採樣與補充寫入
+        self._lock = threading.Lock()
+        self._generate_lock = threading.Lock()
+        self._lifecycle_lock = threading.Lock()
+        self._refill_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._sampler = None
+        self._circuit = None
+
+        # 監控指標
+        self.refill_latencies_ms = deque(maxlen=100)
+        self.refill_count = 0
+        self.sync_refill_count = 0
+        self.bits_served = 0
+        self.bits_generated = 0
+
+    # ==================== 生命週期 ====================
+
+    def start(self):
+        """啟動背景補充執行緒"""
+        with self._lifecycle_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._refill_loop, name="QuantumEntropyPool", daemon=True)
+            self._thread.start()
+        self._refill_event.set()
+        logger.info(f"⚛️ 量子熵池已啟動: 容量 {self.capacity_bits} bits, 低水位 {self.low_water_bits} bits")
+
+    def stop(self):
+        """停止背景補充執行緒"""
+        with self._lifecycle_lock:
+            self._stop_event.set()
+            self._refill_event.set()
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+                self._thread = None
+
+    def _refill_loop(self):
+        while not self._stop_event.is_set():
+            self._refill_event.wait(timeout=1.0)
+            self._refill_event.clear()
+            try:
+                while not self._stop_event.is_set() and self.depth < self.capacity_bits - self._batch_bits:
+                    with self._generate_lock:
+                        self._write(self._generate_batch())
+            except Exception as e:
+                logger.error(f"❌ 量子熵池補充失敗: {e}")
+                time.sleep(1.0)
+
+    # ==================== 生成與緩衝區 ====================
+
+    @property
+    def _batch_bits(self) -> int:
+        return self.n_qubits * self.shots_per_refill
+
+    @property
+    def depth(self) -> int:
+        return self._size
+
+    def _generate_batch(self, shots: Optional[int] = None) -> np.ndarray:
+        """執行一個大批量量子電路 - 每個 shot 的每個量子位都是一個獨立隨機比特 (呼叫者須持有 _generate_lock)"""
+        if not ENTROPY_POOL_AVAILABLE:
+            raise RuntimeError("❌ Qiskit Aer 不可用，無法生成量子隨機比特")
+
+        if self._circuit is None:
+            circuit = QuantumCircuit(self.n_qubits)
+            circuit.h(range(self.n_qubits))
+            circuit.measure_all()
+            self._circuit = circuit
+            self._sampler = SamplerV2()
+
+        start_time = time.perf_counter()
+        shots = shots or self.shots_per_refill
+        result = self._sampler.run([(self._circuit,)], shots=shots).result()
+        # BitArray: (shots, bytes)，取最低 n_qubits 位
+        bits = np.unpackbits(result[0].data.meas.array, axis=-1)[:, -self.n_qubits:].reshape(-1)
+
+        self.refill_latencies_ms.append((time.perf_counter() - start_time) * 1000)
+        self.refill_count += 1
+        self.bits_generated += bits.size
+        return bits
+
+    def _write(self, bits: np.ndarray):
+        with self._lock:
+            writable = min(bits.size, self.capacity_bits - self._size)
+            tail = (self._head + self._size) % self.capacity_bits
+            first = min(writable, self.capacity_bits - tail)
+            self._buffer[tail:tail + first] = bits[:first]
+            self._buffer[:writable - first] = bits[first:writable]
+            self._size += writable
+
+    def _read(self, n: int) -> Optional[np.ndarray]:
+        with self._lock:
+            if self._size < n:
+                return None
+            first = min(n, self.capacity_bits - self._head)
+            out = np.concatenate((self._buffer[self._head:self._head + first], self._buffer[:n - first]))
+            self._head = (self._head + n) % self.capacity_bits
+            self._size -= n
+            self.bits_served += n
+            low = self._size < self.low_water_bits
+        if low:
+            self._refill_event.set()
+        return out
+
+    # ==================== 消費者介面 ====================
+
+    def draw_bits(self, n: int) -> np.ndarray:
+        """取出 n 個量子隨機比特 (uint8 0/1)"""
+        if n <= 0:
+            return np.zeros(0, dtype=np.uint8)
+        if self._thread is None:
+            self.start()
+
+        if n > self.capacity_bits:
+            # 超大請求直接生成，不經過緩衝區
+            shots = -(-n // self.n_qubits)
+            with self._generate_lock:
+                self.sync_refill_count += 1
+                bits = self._generate_batch(shots)[:n]
+            with self._lock:
+                self.bits_served += n
+            return bits
+
+        bits = self._read(n)
+        while bits is None:
+            # 緩衝區不足: 在呼叫者執行緒同步補充；等鎖期間其他執行緒可能已補充，先重試讀取
+            with self._generate_lock:
+                bits = self._read(n)
+                if bits is None:
+                    self.sync_refill_count += 1
+                    self._write(self._generate_batch())
+                    bits = self._read(n)
+
+        return bits
+
+    def draw_integers(self, n: int, bits_per_value: int = 16) -> np.ndarray:
+        """取出 n 個無符號整數，每個由 bits_per_value 個量子比特組成 (低位在前)"""
+        bits = self.draw_bits(n * bits_per_value).reshape(n, bits_per_value).astype(np.int64)
+        return bits @ (1 << np.arange(bits_per_value, dtype=np.int64))
+
+    def draw_uniform(self, n: int, bits_per_value: int = 16) -> np.ndarray:
+        """取出 n 個 [0, 1) 量子均勻隨機數"""
+        return self.draw_integers(n, bits_per_value) / float(1 << bits_per_value)
+
+    def draw_normal(self, n: int, bits_per_value: int = 16) -> np.ndarray:
+        """取出 n 個標準正態量子隨機數 (Box-Muller)"""
+        pairs = -(-n // 2)
+        u = self.draw_uniform(2 * pairs, bits_per_value).reshape(2, pairs)
+        radius = np.sqrt(-2.0 * np.log(np.maximum(u[0], 1e-10)))
+        angle = 2.0 * np.pi * u[1]
+        return np.concatenate((radius * np.cos(angle), radius * np.sin(angle)))[:n]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """熵池監控指標"""
+        latencies = list(self.refill_latencies_ms)
+        return {
+            "depth_bits": self.depth,
+            "capacity_bits": self.capacity_bits,
+            "low_water_bits": self.low_water_bits,
+            "fill_ratio": self.depth / self.capacity_bits,
+            "refill_count": self.refill_count,
+            "sync_refill_count": self.sync_refill_count,
+            "bits_generated": self.bits_generated,
+            "bits_served": self.bits_served,
+            "last_refill_latency_ms": latencies[-1] if latencies else 0.0,
+            "avg_refill_latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+            "running": self._thread is not None and self._thread.is_alive()
+        }
+
+
+_entropy_pool: Optional[QuantumEntropyPool] = None
+_entropy_pool_lock = threading.Lock()
+
+
+def get_entropy_pool() -> QuantumEntropyPool:
+    """取得全局量子熵池 (首次使用時建立)"""
+    global _entropy_pool
+    if _entropy_pool is None:
+        with _entropy_pool_lock:
+            if _entropy_pool is None:
+                _entropy_pool = QuantumEntropyPool()
+    return _entropy_pool
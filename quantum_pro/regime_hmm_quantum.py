@@ -84,7 +84,13 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 from scipy.optimize import minimize
-from scipy.special import digamma, logsumexp
+from scipy.special import digamma, gammaln, logsumexp
+
+# ⚛️ 預取量子熵池
+try:
+    from .quantum_entropy_pool import get_entropy_pool
+except ImportError:
+    from quantum_entropy_pool import get_entropy_pool
 
 # --------------------------
 # 量子計算函數實作 - 核心量子運算
@@ -102,100 +108,8 @@ def _generate_quantum_random_parameters(size):
         return np.random.randn(size)
     
     try:
-        # 使用已導入的 Qiskit 2.x API
-        n_qubits = min(8, max(1, int(np.log2(size)) + 1))
-        qc = QuantumCircuit(n_qubits, n_qubits)
-        
-        # Hadamard 閘建立疊加態
-        for i in range(n_qubits):
-            qc.h(i)
-        
-        # 測量產生隨機數
-        qc.measure_all()
-        
-        # 執行量子電路 (使用 Qiskit 2.x API)
-        simulator = AerSimulator()
-        transpiled_qc = transpile(qc, simulator)
-        job = simulator.run(transpiled_qc, shots=size)
-        result = job.result()
-        counts = result.get_counts()
-        
-        # 🔬 精密量子隨機數生成 - 最大化量子優勢
-        random_values = []
-        
-        # 🌌 為每個隨機數執行獨立的量子測量
-        for i in range(size):
-            # 動態調整量子比特數以獲得最佳精度
-            optimal_qubits = min(8, max(3, int(np.log2(i + 2)) + 2))
-            
-            # 重新構建量子電路以避免相關性
-            qc_individual = QuantumCircuit(optimal_qubits, optimal_qubits)
-            
-            # 🔮 多層量子疊加 - 創造真正的量子隨機性
-            for q in range(optimal_qubits):
-                qc_individual.h(q)  # 哈達瑪門創建疊加
-                if q > 0:
-                    qc_individual.cx(q-1, q)  # 糾纏相鄰量子比特
-            
-            # 🎯 量子相位旋轉增加隨機性
-            for q in range(optimal_qubits):
-                phase = (i + 1) * np.pi / (2 * optimal_qubits)
-                qc_individual.rz(phase, q)
-            
-            # 📏 量子測量
-            qc_individual.measure_all()
-            
-            # 🖥️ 執行量子電路
-            transpiled_individual = transpile(qc_individual, simulator)
-            job = simulator.run(transpiled_individual, shots=1)
-            result = job.result()
-            counts = result.get_counts()
-            
-            # 🔧 解析量子測量結果
-            binary_result = max(counts.keys(), key=counts.get)
-            clean_binary = binary_result.replace(' ', '')
-            
-            # 💎 高精度數值轉換
-            if clean_binary and all(c in '01' for c in clean_binary):
-                try:
-                    quantum_int = int(clean_binary, 2)
-                    max_value = 2**optimal_qubits - 1
-                    if max_value > 0:
-                        uniform_random = quantum_int / max_value
-                    else:
-                        uniform_random = 0.5  # 默認值
-                except (ValueError, ZeroDivisionError):
-                    uniform_random = 0.5  # 默認值
-                
-                # 🎲 Box-Muller 變換需要成對處理
-                if i % 2 == 0:
-                    # 第一個隨機數
-                    u1 = max(1e-10, uniform_random)  # 避免 log(0)
-                    stored_u1 = u1
-                else:
-                    # 第二個隨機數，執行 Box-Muller 變換
-                    u2 = uniform_random
-                    
-                    # 🧮 Box-Muller 變換到標準正態分布
-                    z0 = np.sqrt(-2 * np.log(stored_u1)) * np.cos(2 * np.pi * u2)
-                    z1 = np.sqrt(-2 * np.log(stored_u1)) * np.sin(2 * np.pi * u2)
-                    
-                    # 添加兩個正態分布隨機數
-                    random_values.append(z0)
-                    if len(random_values) < size:
-                        random_values.append(z1)
-            else:
-                # 量子測量異常的備用方案
-                random_values.append(np.random.randn())
-        
-        # 🔢 確保返回精確數量的隨機數
-        while len(random_values) < size:
-            # 補充缺少的隨機數
-            extra_uniform = np.random.random()
-            extra_normal = np.sqrt(-2 * np.log(max(1e-10, extra_uniform))) * np.cos(2 * np.pi * np.random.random())
-            random_values.append(extra_normal)
-        
-        return np.array(random_values[:size])
+        # 從預取量子熵池取用，Box-Muller 變換到標準正態分布
+        return get_entropy_pool().draw_normal(size)
         
     except Exception as e:
         # 量子計算執行錯誤時的應急處理
@@ -227,21 +141,8 @@ def _generate_quantum_bernoulli(p=0.5):
         return np.random.random() < p
     
     try:
-        # ⚛️ 使用已導入的 Qiskit 2.x API
-        qc = QuantumCircuit(1, 1)
-        qc.h(0)  # 🌀 建立量子疊加態 |0⟩ + |1⟩
-        qc.measure_all()  # 📏 量子測量導致波函數坍縮
-        
-        # 🖥️ 使用 Qiskit 2.x 量子模擬器
-        simulator = AerSimulator()
-        transpiled_qc = transpile(qc, simulator)
-        job = simulator.run(transpiled_qc, shots=1)
-        result = job.result()
-        counts = result.get_counts()
-        
-        # 🎯 從量子測量結果提取伯努利值
-        measured_state = list(counts.keys())[0]
-        measured_bit = int(measured_state.split()[0])  # 取第一個 qubit 結果
+        # ⚛️ 從預取量子熵池取一個測量比特
+        measured_bit = int(get_entropy_pool().draw_bits(1)[0])
         
         # 🔄 量子概率映射（非線性量子效應）
         quantum_probability = measured_bit * np.sin(p * np.pi/2) + (1-measured_bit) * np.cos(p * np.pi/2)
@@ -514,6 +415,19 @@ def _quantum_uncertainty_risk(prediction_strength):
     risk_amplification = 1 / (prediction_strength + 0.1)
     return base_uncertainty * risk_amplification
 
+def _quantum_uncertainty_risk_batch(prediction_strengths):
+    """
+    量子不確定性風險評估 (批量) - 與逐筆調用 _quantum_uncertainty_risk 同分布，
+    一次從量子熵池取出所有位置不確定性與調製量
+    """
+    prediction_strengths = np.asarray(prediction_strengths, dtype=float)
+    hbar = 1.054571817e-34  # 約化普朗克常數
+    
+    draws = _generate_quantum_random_parameters(2 * prediction_strengths.size).reshape(2, *prediction_strengths.shape)
+    momentum_uncertainty = hbar / (2 * np.abs(draws[0]) + 1e-50)
+    base_uncertainty = momentum_uncertainty * draws[1] * 1e35
+    return base_uncertainty / (prediction_strengths + 0.1)
+
 def _quantum_true_time_measurement():
     """
     量子真實時間測量
@@ -3898,6 +3812,56 @@ class MultiAssetCoupledHMM:
             # BTC 影響其他所有資產
             self.coupling_matrix[btc_idx, :] = coupling_strength / self.n_assets
             self.coupling_matrix[btc_idx, btc_idx] = 1 - coupling_strength
+        
+        # 在線濾波器: 所有資產每根 K 線一次向量化前進
+        self.online_filter = OnlineRegimeFilter([self.individual_hmms[asset] for asset in asset_names])
+    
+    def _stack_sequences(self, 
+                         multi_asset_data: Dict[str, Dict[str, np.ndarray]],
+                         multi_asset_z: Dict[str, np.ndarray]) -> Optional[Tuple[Dict[str, np.ndarray], np.ndarray]]:
+        """將所有資產序列堆疊為 (A, T) / (A, T, D)；資產缺失或長度不一時返回 None"""
+        if any(asset not in multi_asset_data or asset not in multi_asset_z for asset in self.asset_names):
+            return None
+        
+        lengths = {len(multi_asset_z[asset]) for asset in self.asset_names}
+        lengths.update(len(multi_asset_data[asset][key]) for asset in self.asset_names for key in _OBSERVATION_KEYS)
+        if len(lengths) != 1:
+            return None
+        
+        x_batch = {key: np.stack([np.asarray(multi_asset_data[asset][key], dtype=float) for asset in self.asset_names])
+                   for key in _OBSERVATION_KEYS}
+        z_batch = np.stack([np.asarray(multi_asset_z[asset], dtype=float) for asset in self.asset_names])
+        return x_batch, z_batch
+    
+    def _coupled_transitions(self, regime_probs: np.ndarray, z_t: np.ndarray) -> np.ndarray:
+        """
+        向量化耦合轉移矩陣
+        
+        Args:
+            regime_probs: 各資產制度概率 (A, M)
+            z_t: 協變量 (D,)
+            
+        Returns:
+            coupled: (A, M, M)
+        """
+        params = self.online_filter.params
+        z_batch = np.broadcast_to(np.asarray(z_t, dtype=float), (self.n_assets, 1, len(z_t)))
+        base_A, _ = batched_transition_logs(params['b'], params['w'], z_batch)
+        
+        # 其他資產的制度影響本資產的轉移: Σ_j≠i C[j,i] · P_j P_j^T
+        # 如果 BTC 處於牛市制度，則增強其他資產進入牛市的概率
+        off_diagonal = self.coupling_matrix * (1 - np.eye(self.n_assets))
+        external_influence = np.einsum('ji,jk,jl->ikl', off_diagonal, regime_probs, regime_probs)
+        
+        # 組合基礎轉移和外部影響，確保每行和為1
+        coupled = (1 - self.coupling_strength) * base_A[:, 0] + self.coupling_strength * external_influence
+        return coupled / (coupled.sum(axis=-1, keepdims=True) + 1e-12)
+    
+    def _regime_matrix(self, individual_regimes: Dict[str, np.ndarray]) -> np.ndarray:
+        """制度概率字典 → (A, M)，缺失資產以均勻分布代替"""
+        uniform = np.ones(6) / 6
+        return np.stack([np.asarray(individual_regimes.get(asset, uniform), dtype=float)
+                         for asset in self.asset_names])
     
     def compute_coupled_transition_matrix(self, 
                                         individual_regimes: Dict[str, np.ndarray],
@@ -3912,35 +3876,8 @@ class MultiAssetCoupledHMM:
         Returns:
             coupled_transitions: 耦合後的轉移矩陣
         """
-        coupled_transitions = {}
-        
-        for i, asset in enumerate(self.asset_names):
-            # 獲取本資產的基礎轉移矩陣
-            base_A = self.individual_hmms[asset].get_transition_matrix(z_t)
-            
-            # 計算其他資產的影響
-            external_influence = np.zeros((6, 6))
-            
-            for j, other_asset in enumerate(self.asset_names):
-                if i != j:  # 不同資產
-                    other_regime_probs = individual_regimes.get(other_asset, np.ones(6)/6)
-                    coupling_weight = self.coupling_matrix[j, i]
-                    
-                    # 其他資產的制度影響本資產的轉移
-                    # 如果 BTC 處於牛市制度，則增強其他資產進入牛市的概率
-                    influence = np.outer(other_regime_probs, other_regime_probs)
-                    external_influence += coupling_weight * influence
-            
-            # 組合基礎轉移和外部影響
-            coupled_A = (1 - self.coupling_strength) * base_A + self.coupling_strength * external_influence
-            
-            # 確保每行和為1
-            row_sums = coupled_A.sum(axis=1, keepdims=True)
-            coupled_A = coupled_A / (row_sums + 1e-12)
-            
-            coupled_transitions[asset] = coupled_A
-        
-        return coupled_transitions
+        coupled = self._coupled_transitions(self._regime_matrix(individual_regimes), z_t)
+        return {asset: coupled[i] for i, asset in enumerate(self.asset_names)}
     
     def joint_regime_inference(self, 
                               multi_asset_data: Dict[str, Dict[str, np.ndarray]],
@@ -3957,44 +3894,79 @@ class MultiAssetCoupledHMM:
         """
         joint_regimes = {}
         
-        # 第一輪：獨立推理
+        # 第一輪：獨立推理 (序列等長時所有資產一次批量 forward)
         individual_regimes = {}
-        for asset in self.asset_names:
-            if asset in multi_asset_data and asset in multi_asset_z:
-                hmm = self.individual_hmms[asset]
-                log_alpha, _ = hmm.forward_log(
-                    multi_asset_data[asset], 
-                    multi_asset_z[asset]
-                )
-                individual_regimes[asset] = np.exp(log_alpha[-1])  # 最新時刻
+        stacked = self._stack_sequences(multi_asset_data, multi_asset_z)
+        if stacked is not None:
+            x_batch, z_batch = stacked
+            params = self.online_filter.params
+            log_em = batched_log_emissions(params['emissions'], x_batch)
+            _, logA = batched_transition_logs(params['b'], params['w'], z_batch)
+            log_alpha, _ = batched_forward_log(params['log_pi'], log_em, logA)
+            for i, asset in enumerate(self.asset_names):
+                individual_regimes[asset] = np.exp(log_alpha[i, -1])  # 最新時刻
+        else:
+            for asset in self.asset_names:
+                if asset in multi_asset_data and asset in multi_asset_z:
+                    hmm = self.individual_hmms[asset]
+                    log_alpha, _ = hmm.forward_log(
+                        multi_asset_data[asset], 
+                        multi_asset_z[asset]
+                    )
+                    individual_regimes[asset] = np.exp(log_alpha[-1])  # 最新時刻
         
         # 第二輪：耦合調整
         if len(multi_asset_z) > 0:
             # 使用第一個資產的協變量作為代表
             representative_z = list(multi_asset_z.values())[0][-1]
             
-            coupled_transitions = self.compute_coupled_transition_matrix(
-                individual_regimes, representative_z
-            )
+            original_probs = self._regime_matrix(individual_regimes)
+            coupled_A = self._coupled_transitions(original_probs, representative_z)
             
-            # 使用耦合後的轉移矩陣重新計算制度概率
-            for asset in self.asset_names:
+            # 應用耦合影響
+            adjusted_probs = np.einsum('aij,ai->aj', coupled_A, original_probs)
+            adjusted_probs = adjusted_probs / (adjusted_probs.sum(axis=1, keepdims=True) + 1e-12)
+            
+            for i, asset in enumerate(self.asset_names):
                 if asset in individual_regimes:
-                    # 簡化版：使用耦合轉移矩陣調整概率
-                    original_probs = individual_regimes[asset]
-                    coupled_A = coupled_transitions.get(asset, np.eye(6))
-                    
-                    # 應用耦合影響
-                    adjusted_probs = coupled_A.T @ original_probs
-                    adjusted_probs = adjusted_probs / (adjusted_probs.sum() + 1e-12)
-                    
-                    joint_regimes[asset] = adjusted_probs
+                    joint_regimes[asset] = adjusted_probs[i]
                 else:
                     joint_regimes[asset] = np.ones(6) / 6
         else:
             joint_regimes = individual_regimes
         
         return joint_regimes
+    
+    def update_bar(self, 
+                   bar_data: Dict[str, Dict[str, float]],
+                   bar_z: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        在線聯合制度推理 - 每根新 K 線所有資產一次向量化前進
+        
+        Args:
+            bar_data: 各資產最新觀測 {'BTC': {'ret': ..., 'logvol': ..., 'slope': ..., 'ob': ...}, ...}
+            bar_z: 各資產最新協變量
+            
+        Returns:
+            joint_regimes: 聯合制度概率
+        """
+        if not bar_z:
+            return {asset: np.ones(6) / 6 for asset in self.asset_names}
+        
+        observed = np.array([asset in bar_data for asset in self.asset_names])
+        x_t = {key: np.array([bar_data[asset][key] if asset in bar_data else 0.0 for asset in self.asset_names])
+               for key in _OBSERVATION_KEYS}
+        representative_z = np.asarray(next(iter(bar_z.values())), dtype=float)
+        z_t = np.stack([np.asarray(bar_z.get(asset, representative_z), dtype=float) for asset in self.asset_names])
+        
+        filtered = self.online_filter.step(x_t, z_t, observed=observed)
+        
+        # 耦合調整
+        coupled_A = self._coupled_transitions(filtered, representative_z)
+        adjusted_probs = np.einsum('aij,ai->aj', coupled_A, filtered)
+        adjusted_probs = adjusted_probs / (adjusted_probs.sum(axis=1, keepdims=True) + 1e-12)
+        
+        return {asset: adjusted_probs[i] for i, asset in enumerate(self.asset_names)}
 
 def student_t_logpdf(x: np.ndarray, mu: float, sigma: float, nu: float) -> np.ndarray:
     """向量化 Student-t 對數 PDF - 處理加密貨幣厚尾分布"""
@@ -4011,6 +3983,210 @@ def gaussian_logpdf(x: np.ndarray, mu: float, sigma: float) -> np.ndarray:
     sigma = max(sigma, 1e-9)
     return -0.5 * np.log(2 * math.pi) - np.log(sigma) - 0.5 * ((x - mu) ** 2) / (sigma ** 2)
 
+# --------------------------
+# 批量 HMM 核心 (資產 × 時間 × 狀態)
+# --------------------------
+
+_EMISSION_FIELDS = ('mu_ret', 'sigma_ret', 'nu_ret', 'mu_logvol', 'sigma_logvol',
+                    'mu_slope', 'sigma_slope', 'ob_loc', 'ob_scale')
+_OBSERVATION_KEYS = ('ret', 'logvol', 'slope', 'ob')
+
+def stack_hmm_parameters(hmms: List['TimeVaryingHMM']) -> Dict[str, Any]:
+    """將多個 HMM 的參數堆疊為 (A, ...) 張量"""
+    return {
+        'log_pi': np.stack([hmm.log_pi for hmm in hmms]),
+        'b': np.stack([hmm.b for hmm in hmms]),
+        'w': np.stack([hmm.w for hmm in hmms]),
+        'emissions': {
+            field: np.array([[getattr(ep, field) for ep in hmm.emissions] for hmm in hmms])
+            for field in _EMISSION_FIELDS
+        }
+    }
+
+def batched_log_emissions(emissions: Dict[str, np.ndarray], x_batch: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    批量發射對數概率
+    
+    Args:
+        emissions: 每個發射參數 (A, M)
+        x_batch: 每個觀測 (A, T)
+        
+    Returns:
+        log_em: (A, T, M)
+    """
+    def obs(key):
+        return np.asarray(x_batch[key], dtype=float)[:, :, None]
+    
+    def par(field):
+        return emissions[field][:, None, :]
+    
+    def gaussian(key, mu_field, sigma_field):
+        sigma = np.maximum(par(sigma_field), 1e-9)
+        return -0.5 * np.log(2 * math.pi) - np.log(sigma) - 0.5 * ((obs(key) - par(mu_field)) ** 2) / (sigma ** 2)
+    
+    # Student-t 收益率 (厚尾)
+    sigma_ret = np.maximum(par('sigma_ret'), 1e-9)
+    nu = np.maximum(par('nu_ret'), 2.1)
+    z = (obs('ret') - par('mu_ret')) / sigma_ret
+    l_ret = (gammaln((nu + 1.0) / 2.0) - gammaln(nu / 2.0) - 0.5 * np.log(nu * math.pi) -
+             np.log(sigma_ret) - (nu + 1.0) / 2.0 * np.log1p((z * z) / nu))
+    
+    return (l_ret + gaussian('logvol', 'mu_logvol', 'sigma_logvol') +
+            gaussian('slope', 'mu_slope', 'sigma_slope') + gaussian('ob', 'ob_loc', 'ob_scale'))
+
+def batched_transition_logs(b: np.ndarray, w: np.ndarray, z_batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量時變轉移矩陣 A_t[i,j] = softmax_j(b_ij + w_ij^T z_t)
+    
+    Args:
+        b: (A, M, M), w: (A, M, M, D), z_batch: (A, T, D)
+        
+    Returns:
+        A: (A, T, M, M), logA: (A, T, M, M)
+    """
+    logits = b[:, None, :, :] + np.einsum('aijd,atd->atij', w, z_batch)
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp_logits = np.exp(logits)
+    A = exp_logits / (exp_logits.sum(axis=-1, keepdims=True) + 1e-300)
+    return A, np.log(A + 1e-300)
+
+def batched_forward_log(log_pi: np.ndarray, log_em: np.ndarray, logA: np.ndarray,
+                        log_alpha_init: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量 Forward (對數空間)，時間遞推、資產與狀態向量化
+    
+    Args:
+        log_pi: (A, M)；log_em: (A, T, M)；logA: (A, T, M, M)
+        log_alpha_init: 可選的前一時刻濾波狀態 (A, M)，用於接續分塊或在線濾波
+        
+    Returns:
+        log_alpha: (A, T, M)，log_c: (A, T)
+    """
+    n_seq, T, M = log_em.shape
+    log_alpha = np.empty((n_seq, T, M))
+    log_c = np.empty((n_seq, T))
+    
+    if log_alpha_init is None:
+        current = log_pi + log_em[:, 0]
+    else:
+        current = logsumexp(log_alpha_init[:, :, None] + logA[:, 0], axis=1) + log_em[:, 0]
+    
+    for t in range(T):
+        if t > 0:
+            current = logsumexp(log_alpha[:, t - 1, :, None] + logA[:, t], axis=1) + log_em[:, t]
+        ct = logsumexp(current, axis=1)
+        log_alpha[:, t] = current - ct[:, None]
+        log_c[:, t] = ct
+    
+    return log_alpha, log_c
+
+def batched_backward_log(log_em: np.ndarray, logA: np.ndarray) -> np.ndarray:
+    """批量 Backward (對數空間) - 返回 log_beta (A, T, M)"""
+    n_seq, T, M = log_em.shape
+    log_beta = np.zeros((n_seq, T, M))
+    for t in range(T - 2, -1, -1):
+        emission_beta = log_em[:, t + 1] + log_beta[:, t + 1]  # (A, M)
+        log_beta[:, t] = logsumexp(logA[:, t + 1] + emission_beta[:, None, :], axis=2)
+    return log_beta
+
+def batched_posteriors(log_alpha: np.ndarray, log_beta: np.ndarray, log_em: np.ndarray,
+                       logA: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量後驗 (無時間迴圈)
+    
+    Returns:
+        gamma: (A, T, M)，xi: (A, T-1, M, M)
+    """
+    log_gamma = log_alpha + log_beta
+    log_gamma = log_gamma - logsumexp(log_gamma, axis=2, keepdims=True)
+    
+    # log xi_t(i,j) ∝ log_alpha[t,i] + log A[t+1,i,j] + log_em[t+1,j] + log_beta[t+1,j]
+    log_xi = (log_alpha[:, :-1, :, None] + logA[:, 1:] +
+              (log_em[:, 1:] + log_beta[:, 1:])[:, :, None, :])
+    log_xi = log_xi - logsumexp(log_xi, axis=(2, 3), keepdims=True)
+    
+    return np.exp(log_gamma), np.exp(log_xi)
+
+class OnlineRegimeFilter:
+    """
+    多資產在線制度濾波
+    
+    保存每個資產的 log_alpha (A, M)，每根新 K 線以一次向量化調用前進一步，
+    無需重跑整段序列。讀取 params 時比對各 HMM 的 param_version，
+    任一 HMM 經 EM 更新後自動重新堆疊參數。
+    """
+    
+    def __init__(self, hmms: List['TimeVaryingHMM']):
+        self.hmms = hmms
+        self.refresh_parameters()
+        self.log_alpha: Optional[np.ndarray] = None
+        self.log_likelihood = np.zeros(len(hmms))
+        self.n_steps = 0
+    
+    def _parameter_versions(self) -> Tuple[int, ...]:
+        return tuple(getattr(hmm, 'param_version', 0) for hmm in self.hmms)
+    
+    def refresh_parameters(self):
+        """重新堆疊 HMM 參數"""
+        self._params = stack_hmm_parameters(self.hmms)
+        self._versions = self._parameter_versions()
+    
+    @property
+    def params(self) -> Dict[str, Any]:
+        """堆疊後的 HMM 參數 - 任一 HMM 參數版本變動時重新堆疊"""
+        if self._versions != self._parameter_versions():
+            self.refresh_parameters()
+        return self._params
+    
+    def reset(self):
+        self.log_alpha = None
+        self.log_likelihood = np.zeros(len(self.hmms))
+        self.n_steps = 0
+    
+    def initialize(self, x_batch: Dict[str, np.ndarray], z_batch: np.ndarray) -> np.ndarray:
+        """以歷史序列 (A, T) 初始化濾波狀態，返回最新濾波概率 (A, M)"""
+        params = self.params
+        log_em = batched_log_emissions(params['emissions'], x_batch)
+        _, logA = batched_transition_logs(params['b'], params['w'], z_batch)
+        log_alpha, log_c = batched_forward_log(params['log_pi'], log_em, logA)
+        
+        self.log_alpha = log_alpha[:, -1]
+        self.log_likelihood = log_c.sum(axis=1)
+        self.n_steps = log_em.shape[1]
+        return np.exp(self.log_alpha)
+    
+    def step(self, x_t: Dict[str, np.ndarray], z_t: np.ndarray,
+             observed: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        前進一步
+        
+        Args:
+            x_t: 每個觀測 (A,)
+            z_t: 協變量 (A, D)
+            observed: 可選布林遮罩 (A,)，未觀測的資產只做轉移預測
+            
+        Returns:
+            filtered: 最新濾波概率 (A, M)
+        """
+        x_batch = {key: np.asarray(x_t[key], dtype=float).reshape(-1, 1) for key in _OBSERVATION_KEYS}
+        params = self.params
+        log_em = batched_log_emissions(params['emissions'], x_batch)[:, 0]  # (A, M)
+        if observed is not None:
+            log_em = np.where(np.asarray(observed, dtype=bool)[:, None], log_em, 0.0)
+        
+        if self.log_alpha is None:
+            current = params['log_pi'] + log_em
+        else:
+            _, logA = batched_transition_logs(params['b'], params['w'],
+                                              np.asarray(z_t, dtype=float)[:, None, :])
+            current = logsumexp(self.log_alpha[:, :, None] + logA[:, 0], axis=1) + log_em
+        
+        ct = logsumexp(current, axis=1)
+        self.log_alpha = current - ct[:, None]
+        self.log_likelihood += ct
+        self.n_steps += 1
+        return np.exp(self.log_alpha)
+
 # --------------------------
 # 發射參數結構
 # --------------------------
@@ -4079,6 +4255,9 @@ class TimeVaryingHMM:
         # 初始狀態分布 (對數空間)
         self.log_pi = np.log(np.ones(self.M) / self.M)
         
+        # 參數版本 - 每次 EM 更新後遞增，OnlineRegimeFilter 據此重新堆疊參數
+        self.param_version = 0
+        
         # 發射參數初始化
         self.emissions: List[EmissionParams] = []
         for i in range(self.M):
@@ -4467,25 +4646,8 @@ class TimeVaryingHMM:
         if not self.enable_quantum_features:
             raise ValueError("量子功能未啟用")
         
-        # 構造單點序列
-        x_single = {k: np.array([v]) for k, v in new_tick.items()}
-        z_single = new_features.reshape(1, -1)
-        
-        # 快速前向推理 (只計算濾波概率)
-        log_em = self.log_emission_matrix(x_single)  # (M, 1)
-        
-        if self.A_cache is not None:
-            # 使用最新的轉移矩陣
-            A_latest = self.A_cache[-1] if len(self.A_cache) > 0 else np.eye(self.M)
-        else:
-            A_latest = self.get_transition_matrix(new_features)
-        
-        # 簡化的濾波更新 (假設上一時刻為均勻分布)
-        prior = np.ones(self.M) / self.M
-        likelihood = np.exp(log_em[:, 0])
-        
-        posterior = prior * likelihood
-        posterior = posterior / (posterior.sum() + 1e-12)
+        # 在線濾波: alpha 前進一步 (無需重跑整段序列)
+        posterior = self.filter_step(new_tick, new_features)
         
         # 生成量子決策
         quantum_decision = self.quantum_selector.select_quantum_action(
@@ -4573,26 +4735,11 @@ class TimeVaryingHMM:
             self.A_cache.shape[0] == T):
             return
         
-        # 重新計算快取
-        A_cache = np.zeros((T, self.M, self.M))
-        logA_cache = np.zeros((T, self.M, self.M))
-        
-        # 向量化計算所有時間點的轉移矩陣
-        for t in range(T):
-            zt = z_seq[t]  # shape: (z_dim,)
-            # 使用 tensordot 進行高效矩陣乘法
-            logits = self.b + np.tensordot(self.w, zt, axes=([2], [0]))  # shape: (M, M)
-            
-            # 數值穩定的 softmax (按行)
-            row_max = logits.max(axis=1, keepdims=True)
-            exp_logits = np.exp(logits - row_max)
-            A = exp_logits / (exp_logits.sum(axis=1, keepdims=True) + 1e-300)
-            
-            A_cache[t] = A
-            logA_cache[t] = np.log(A + 1e-300)
+        # 一次 einsum 計算所有時間點的轉移矩陣
+        A_cache, logA_cache = batched_transition_logs(self.b[None], self.w[None], z_seq[None])
         
-        self.A_cache = A_cache
-        self.logA_cache = logA_cache
+        self.A_cache = A_cache[0]
+        self.logA_cache = logA_cache[0]
         self.last_z_seq_hash = z_hash
 
     def get_transition_matrix(self, z_t: np.ndarray, t_idx: int = None) -> np.ndarray:
@@ -4620,29 +4767,13 @@ class TimeVaryingHMM:
         Returns:
             log_em: 形狀 (M, T) 的發射對數概率矩陣
         """
-        T = x_seq['ret'].shape[0]
-        log_em = np.zeros((self.M, T))
-        
-        for h in range(self.M):
-            ep = self.emissions[h]
-            
-            # Student-t 分布用於收益率 (處理厚尾)
-            l_ret = student_t_logpdf(x_seq['ret'], ep.mu_ret, ep.sigma_ret, ep.nu_ret)
-            
-            # 高斯分布用於其他觀測變量
-            l_vol = gaussian_logpdf(x_seq['logvol'], ep.mu_logvol, ep.sigma_logvol)
-            l_slope = gaussian_logpdf(x_seq['slope'], ep.mu_slope, ep.sigma_slope)
-            
-            # 訂單簿不平衡的特殊處理
-            ob_diff = x_seq['ob'] - ep.ob_loc
-            l_ob = (-0.5 * (ob_diff ** 2) / (max(ep.ob_scale, 1e-9) ** 2) - 
-                    math.log(max(ep.ob_scale, 1e-9)) - 
-                    0.5 * math.log(2 * math.pi))
-            
-            # 組合所有觀測的對數概率
-            log_em[h, :] = l_ret + l_vol + l_slope + l_ob
-            
-        return log_em
+        params = stack_hmm_parameters([self])
+        return batched_log_emissions(params['emissions'], self._as_batch(x_seq))[0].T
+    
+    @staticmethod
+    def _as_batch(x_seq: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """單序列觀測轉為 (1, T) 批量格式"""
+        return {key: np.asarray(x_seq[key], dtype=float)[None, :] for key in _OBSERVATION_KEYS}
 
     # --------------------------
     # Forward 算法 (向量化 + 數值穩定)
@@ -4656,44 +4787,13 @@ class TimeVaryingHMM:
             log_alpha: 正規化的前向概率 (T x M)
             log_c: 正規化常數序列 (T,)
         """
-        T = x_seq['ret'].shape[0]
-        
-        # 預計算發射概率矩陣
         log_em = self.log_emission_matrix(x_seq)  # (M, T)
-        
-        # 確保轉移矩陣快取
         self.compute_A_cache(z_seq)
-        logA_cache = self.logA_cache  # (T, M, M)
         
-        # 初始化
-        log_alpha = np.full((T, self.M), -np.inf)
-        log_c = []
-        
-        # t=0: 初始化
-        log_alpha[0, :] = self.log_pi + log_em[:, 0]
-        c0 = logsumexp(log_alpha[0, :])
-        log_alpha[0, :] -= c0
-        log_c.append(c0)
-        
-        # t=1...T-1: 遞推計算
-        for t in range(1, T):
-            # 向量化計算: log_alpha[t-1, i] + log(A[t, i, j]) for all i,j
-            # 形狀: (M, 1) + (M, M) -> (M, M), 然後沿 axis=0 求 logsumexp
-            prev_alpha = log_alpha[t-1, :][:, None]  # (M, 1)
-            transition_logits = prev_alpha + logA_cache[t]  # (M, M)
-            
-            # 沿來源狀態維度求 logsumexp
-            forward_probs = logsumexp(transition_logits, axis=0)  # (M,)
-            
-            # 加上發射概率
-            log_alpha[t, :] = log_em[:, t] + forward_probs
-            
-            # 正規化
-            ct = logsumexp(log_alpha[t, :])
-            log_alpha[t, :] -= ct
-            log_c.append(ct)
-        
-        return log_alpha, np.array(log_c)
+        log_alpha, log_c = batched_forward_log(
+            self.log_pi[None], log_em.T[None], self.logA_cache[None]
+        )
+        return log_alpha[0], log_c[0]
 
     # --------------------------
     # Backward 算法 (向量化)
@@ -4707,32 +4807,13 @@ class TimeVaryingHMM:
             log_beta: 後向概率 (T x M)
         """
         T = x_seq['ret'].shape[0]
-        
-        # 預計算發射概率矩陣
         log_em = self.log_emission_matrix(x_seq)
         
         # 確保轉移矩陣快取
         if self.logA_cache is None or self.logA_cache.shape[0] != T:
             self.compute_A_cache(z_seq)
-        logA_cache = self.logA_cache
-        
-        # 初始化
-        log_beta = np.full((T, self.M), -np.inf)
-        log_beta[-1, :] = 0.0  # log(1)
-        
-        # 反向遞推
-        for t in range(T - 2, -1, -1):
-            # 使用 t+1 時刻的轉移矩陣
-            logA_next = logA_cache[t + 1]  # (M, M) i->j
-            
-            # 向量化計算: log(A[i,j]) + log_em[j,t+1] + log_beta[t+1,j]
-            emission_beta = log_em[:, t + 1] + log_beta[t + 1, :]  # (M,)
-            transition_emission = logA_next + emission_beta[None, :]  # (M, M)
-            
-            # 沿目標狀態維度求 logsumexp
-            log_beta[t, :] = logsumexp(transition_emission, axis=1)
         
-        return log_beta
+        return batched_backward_log(log_em.T[None], self.logA_cache[None])[0]
 
     # --------------------------
     # 後驗計算 (完整 xi 矩陣)
@@ -4751,32 +4832,12 @@ class TimeVaryingHMM:
             xi_t: 配對後驗 P(H_t=i, H_{t+1}=j|x_{1:T}) (T-1 x M x M)
         """
         T = log_alpha.shape[0]
-        
-        # 計算 gamma (單點後驗)
-        log_gamma = log_alpha + log_beta
-        for t in range(T):
-            log_gamma[t, :] -= logsumexp(log_gamma[t, :])
-        gamma = np.exp(log_gamma)
-        
-        # 計算 xi (配對後驗)
         if self.logA_cache is None or self.logA_cache.shape[0] != T:
             self.compute_A_cache(z_seq)
-        logA_cache = self.logA_cache
         log_em = self.log_emission_matrix(x_seq)
         
-        xi_t = np.zeros((T - 1, self.M, self.M))
-        
-        for t in range(T - 1):
-            # log xi_t(i,j) ∝ log_alpha[t,i] + log(A[t+1,i,j]) + log_em[j,t+1] + log_beta[t+1,j]
-            alpha_i = log_alpha[t, :][:, None]  # (M, 1)
-            transition_ij = logA_cache[t + 1]   # (M, M)
-            emission_beta_j = log_em[:, t + 1] + log_beta[t + 1, :]  # (M,)
-            
-            log_xi = alpha_i + transition_ij + emission_beta_j[None, :]
-            log_xi -= logsumexp(log_xi)  # 正規化
-            xi_t[t] = np.exp(log_xi)
-        
-        return gamma, xi_t
+        gamma, xi_t = batched_posteriors(log_alpha[None], log_beta[None], log_em.T[None], self.logA_cache[None])
+        return gamma[0], xi_t[0]
 
     # --------------------------
     # M-step: 發射參數更新 (加權 MLE + 數值 nu 估計)
@@ -4964,6 +5025,13 @@ class TimeVaryingHMM:
     # EM 算法 (Baum-Welch 訓練)
     # --------------------------
     
+    def _parameters_updated(self):
+        """M-step 之後: 清除轉移矩陣快取並遞增參數版本 (所有引用本 HMM 的在線濾波器會重新堆疊參數)"""
+        self.A_cache = None
+        self.logA_cache = None
+        self.last_z_seq_hash = None
+        self.param_version += 1
+    
     def fit_EM(self, 
                x_seq: Dict[str, np.ndarray], 
                z_seq: np.ndarray, 
@@ -5004,9 +5072,7 @@ class TimeVaryingHMM:
             self.m_step_transition(xi_t, z_seq)
             
             # 清除快取以使用新參數
-            self.A_cache = None
-            self.logA_cache = None
-            self.last_z_seq_hash = None
+            self._parameters_updated()
             
             # 檢查收斂
             if abs(current_loglik - last_loglik) < tol:
@@ -5016,6 +5082,101 @@ class TimeVaryingHMM:
                 
             last_loglik = current_loglik
 
+    def fit_EM_chunked(self, 
+                       x_seq: Dict[str, np.ndarray], 
+                       z_seq: np.ndarray, 
+                       chunk_size: int = 2048, 
+                       n_iter: int = 10, 
+                       tol: float = 1e-4, 
+                       verbose: bool = True):
+        """
+        分塊 EM - 長歷史切成等長分塊，E-step 以 (分塊 × 時間 × 狀態) 批量計算
+        
+        每個分塊視為從初始分布開始的獨立序列 (捨去分塊邊界的配對後驗)，
+        尾部不足一塊的最新數據作為一個獨立的短序列單獨處理，不會被丟棄。
+        """
+        T = x_seq['ret'].shape[0]
+        n_chunks = max(1, T // chunk_size)
+        chunk_len = chunk_size if T >= chunk_size else T
+        usable = n_chunks * chunk_len
+        tail_len = T - usable
+        
+        x_all = {key: np.asarray(x_seq[key], dtype=float) for key in _OBSERVATION_KEYS}
+        z_all = np.asarray(z_seq, dtype=float).reshape(T, -1)
+        
+        # 分段: 等長分塊 (n_chunks, chunk_len) + 可選的尾部 (1, tail_len)
+        segments = [(
+            {key: values[:usable].reshape(n_chunks, chunk_len) for key, values in x_all.items()},
+            z_all[:usable].reshape(n_chunks, chunk_len, -1)
+        )]
+        if tail_len > 0:
+            segments.append((
+                {key: values[usable:].reshape(1, tail_len) for key, values in x_all.items()},
+                z_all[usable:].reshape(1, tail_len, -1)
+            ))
+        # 各分段按時間順序串接後即為完整序列
+        x_used = x_all
+        
+        # 轉移回歸的特徵: 每個分段內 [1, z_{t+1}]
+        X_transition = np.concatenate([
+            np.hstack([np.ones((z_chunks.shape[1] - 1, 1)), z_chunks[c, 1:]])
+            for _, z_chunks in segments for c in range(z_chunks.shape[0])
+        ])
+        last_loglik = -np.inf
+        
+        for iteration in range(n_iter):
+            start_time = time.time()
+            params = stack_hmm_parameters([self])
+            
+            # E-step: 每個分段的所有分塊一次批量計算
+            gammas, xis, current_loglik = [], [], 0.0
+            for x_chunks, z_chunks in segments:
+                n_seq, seq_len = z_chunks.shape[:2]
+                tiled = lambda arr: np.repeat(arr, n_seq, axis=0)
+                emissions = {field: tiled(values) for field, values in params['emissions'].items()}
+                
+                log_em = batched_log_emissions(emissions, x_chunks)
+                _, logA = batched_transition_logs(tiled(params['b']), tiled(params['w']), z_chunks)
+                log_alpha, log_c = batched_forward_log(tiled(params['log_pi']), log_em, logA)
+                current_loglik += float(np.sum(log_c))
+                
+                if seq_len > 1:
+                    log_beta = batched_backward_log(log_em, logA)
+                    gamma, xi = batched_posteriors(log_alpha, log_beta, log_em, logA)
+                    xis.append(xi.reshape(-1, self.M, self.M))
+                else:
+                    # 單根 K 線: 後驗即濾波概率，沒有配對後驗
+                    gamma = np.exp(log_alpha)
+                gammas.append(gamma.reshape(-1, self.M))
+            
+            if verbose:
+                elapsed = time.time() - start_time
+                print(f"[EM-chunked] Iter {iteration}: LogLik = {current_loglik:.6f}, "
+                      f"Time = {elapsed:.3f}s, T = {T}, chunks = {n_chunks}, tail = {tail_len}")
+            
+            # M-step
+            self.m_step_emissions(x_used, np.concatenate(gammas), update_nu=True)
+            xi_all = np.concatenate(xis) if xis else np.zeros((0, self.M, self.M))
+            for i in range(self.M):
+                self._optimize_row_parameters(i, xi_all, X_transition, X_transition.shape[1])
+            
+            self._parameters_updated()
+            
+            if abs(current_loglik - last_loglik) < tol:
+                if verbose:
+                    print(f"[EM-chunked] Converged at iteration {iteration}")
+                break
+            
+            last_loglik = current_loglik
+
+    def filter_step(self, x_t: Dict[str, float], z_t: np.ndarray) -> np.ndarray:
+        """在線濾波 - 以新 K 線將 alpha 前進一步，返回濾波概率 (M,)"""
+        if getattr(self, '_online_filter', None) is None:
+            self._online_filter = OnlineRegimeFilter([self])
+        
+        x_batch = {key: np.array([x_t[key]], dtype=float) for key in _OBSERVATION_KEYS}
+        return self._online_filter.step(x_batch, np.asarray(z_t, dtype=float).reshape(1, -1))[0]
+
     # --------------------------
     # Viterbi 算法 (最優路徑解碼)
     # --------------------------
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試 SMTP 郵件工作器 - 以 aiosmtpd 本地伺服器驗證突發彙總、斷線重連與退避重試
+==============================================
+
+    python test_smtp_mail_worker.py
+"""
+
+import asyncio
+import socket
+import sys
+from email import message_from_bytes
+from email.mime.text import MIMEText
+from pathlib import Path
+
+from aiosmtpd.controller import Controller
+
+# 添加路徑
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.smtp_mail_worker import SmtpMailWorker
+
+SENDER = "sender@trading-x.test"
+RECIPIENT = "recipient@trading-x.test"
+
+
+class RecordingHandler:
+    """記錄收到的郵件正文（已解碼）"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        message = message_from_bytes(envelope.content)
+        self.messages.append("".join(
+            part.get_payload(decode=True).decode("utf-8") for part in message.walk() if not part.is_multipart()
+        ))
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _worker(port: int, **kwargs) -> SmtpMailWorker:
+    return SmtpMailWorker(SENDER, None, RECIPIENT, host="127.0.0.1", port=port, use_tls=False, **kwargs)
+
+
+def _mail(subject: str) -> MIMEText:
+    message = MIMEText(f"{subject} body", "plain", "utf-8")
+    message["From"] = SENDER
+    message["To"] = RECIPIENT
+    message["Subject"] = subject
+    return message
+
+
+def test_burst_is_coalesced_into_one_digest():
+    handler = RecordingHandler()
+    port = _free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    worker = _worker(port, digest_window=0.3)
+
+    async def run():
+        try:
+            return await asyncio.gather(*[
+                worker.submit(_mail(f"signal {i}"), digest_key="sniper",
+                              digest_title=f"BTCUSDT 信號 {i}", digest_body=f"信心度 0.{i}")
+                for i in range(3)
+            ])
+        finally:
+            await worker.close()
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        controller.stop()
+
+    assert results == [True, True, True]
+    assert len(handler.messages) == 1
+    assert all(f"BTCUSDT 信號 {i}" in handler.messages[0] for i in range(3))
+    assert worker.metrics['digests_sent'] == 1
+    assert worker.metrics['sent_mails'] == 3
+    assert worker.metrics['connections_opened'] == 1
+
+
+def test_reconnects_after_server_disconnect():
+    handler = RecordingHandler()
+    port = _free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    worker = _worker(port)
+
+    async def run():
+        nonlocal controller
+        try:
+            first = await worker.submit(_mail("before restart"))
+            # 伺服器重啟會關閉工作器持有的會話
+            controller.stop()
+            controller = Controller(handler, hostname="127.0.0.1", port=port)
+            controller.start()
+            second = await worker.submit(_mail("after restart"))
+            return first, second
+        finally:
+            await worker.close()
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        controller.stop()
+
+    assert first and second
+    assert len(handler.messages) == 2
+    assert "after restart" in handler.messages[1]
+    assert worker.metrics['connections_opened'] == 2
+    assert worker.metrics['retries_scheduled'] == 0
+
+
+def test_failed_send_is_retried_with_backoff():
+    handler = RecordingHandler()
+    port = _free_port()
+    worker = _worker(port, retry_delays=(0.5,))
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+
+    async def run():
+        try:
+            # 伺服器尚未啟動：首次發送失敗，退避期間伺服器上線後重試成功
+            pending = asyncio.ensure_future(worker.submit(_mail("retried")))
+            await asyncio.sleep(0.1)
+            controller.start()
+            return await pending
+        finally:
+            await worker.close()
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        controller.stop()
+
+    assert result is True
+    assert len(handler.messages) == 1
+    assert worker.metrics['retries_scheduled'] == 1
+    assert worker.metrics['failed_mails'] == 0
+
+
+if __name__ == "__main__":
+    for test in (test_burst_is_coalesced_into_one_digest,
+                 test_reconnects_after_server_disconnect,
+                 test_failed_send_is_retried_with_backoff):
+        test()
+        print(f"✅ {test.__name__}")